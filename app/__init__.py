@@ -10,17 +10,45 @@ def create_app() -> Flask:
     app = Flask(__name__)
     f = config.factory(app_context if app_context else 'development')
     app.config.from_object(f)
+    f.init_app(app)
+    
+    from app.utils.plantillas import obtener_bytecode_cache, cargar_plantillas_html
+    # Debe configurarse antes del primer acceso a app.jinja_env
+    app.jinja_options = {**app.jinja_options, 'bytecode_cache': obtener_bytecode_cache(app.config.get('TEMPLATE_CACHE_DIR'))}
     
     from app.handlers import register_error_handlers
     register_error_handlers(app)
 
-    from app.middleware import register_logging_middleware, register_error_middleware
+    from app.middleware import (
+        register_logging_middleware, register_error_middleware, register_admission_middleware,
+        register_metrics_middleware, register_profiling_middleware, register_memory_middleware
+    )
     register_logging_middleware(app)
     register_error_middleware(app)
+    register_admission_middleware(app)
+    register_metrics_middleware(app)
+    register_profiling_middleware(app)
+    register_memory_middleware(app)
     
-    from app.resources import home, certificado_bp
+    from app.resources import home, certificado_bp, jobs_bp, metricas_bp, admin_bp
     app.register_blueprint(home, url_prefix='/api/v1')
     app.register_blueprint(certificado_bp, url_prefix='/api/v1')
+    app.register_blueprint(jobs_bp, url_prefix='/api/v1')
+    if app.config.get('ADMIN_ENABLED'):
+        app.register_blueprint(admin_bp, url_prefix='/api/v1')
+    if app.config.get('METRICS_ENABLED'):
+        # Ruta estándar que espera Prometheus, fuera de /api/v1
+        app.register_blueprint(metricas_bp)
+
+    if app.config.get('TEMPLATE_PRELOAD'):
+        cargar_plantillas_html(app)
+
+    @app.cli.command('precompilar-plantillas')
+    def precompilar_plantillas():
+        """Compila las plantillas de todos los formatos al bytecode cache (TEMPLATE_CACHE_DIR)"""
+        from app.services import CertificateService
+        for linea in CertificateService().precompilar_plantillas():
+            print(linea)
 
     @app.shell_context_processor
     def ctx():
@@ -0,0 +1,208 @@
+"""
+Modo de servicio ASGI (granian --interface asgi asgi:app).
+
+En las rutas GET /api/v1/certificado/<id>/<formato> la búsqueda del alumno
+y de la especialidad se hace de forma nativa asíncrona (Redis y HTTP sin
+bloquear hilos). El resultado se entrega a la misma ruta Flask que en modo
+WSGI, ejecutada en un executor: admisión, métricas, Server-Timing,
+perfilado, ETag/304, almacén de artefactos, singleflight y manejo de
+errores son los mismos en ambos modos. El resto de la API se delega a la
+app Flask a través de asgiref.
+
+El cuerpo de esas respuestas se lee en el executor en tramos de
+TAMANIO_TRAMO y se envía con more_body: un documento del almacén no se
+carga entero en memoria, aunque ASGI no tiene el sendfile del modo WSGI.
+"""
+import io
+import re
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional, Tuple
+
+import httpx
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+from flask import Flask
+from werkzeug.datastructures import Headers
+from werkzeug.test import run_wsgi_app
+
+from app.utils.metricas import CLAVE_INICIO
+
+if TYPE_CHECKING:
+    from app.repositories.async_redis_client import AsyncRedisClient
+    from app.services.async_certificate_service import AsyncCertificateService
+
+logger = logging.getLogger(__name__)
+
+
+class CertificadosASGI:
+    """Aplicación ASGI: datos de certificados resueltos de forma asíncrona + Flask para todo lo demás"""
+
+    RUTA_CERTIFICADO = re.compile(r'^/api/v1/certificado/(\d+)/(pdf|odt|docx)$')
+    # Bytes mínimos por mensaje http.response.body (send_file lee de a 8 KiB)
+    TAMANIO_TRAMO = 64 * 1024
+
+    def __init__(self, flask_app: Flask):
+        self.flask_app = flask_app
+        self.wsgi = WsgiToAsgi(flask_app)
+        self.servicio: Optional['AsyncCertificateService'] = None
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._redis_client: Optional['AsyncRedisClient'] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._procesos: Optional[ProcessPoolExecutor] = None
+        self._lock_inicio: Optional[asyncio.Lock] = None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+
+        if scope['type'] == 'http' and scope['method'] == 'GET':
+            ruta = self.RUTA_CERTIFICADO.match(scope['path'])
+            if ruta:
+                await self._certificado(int(ruta.group(1)), ruta.group(2), scope, send)
+                return
+
+        await self.wsgi(scope, receive, send)
+
+    async def _lifespan(self, receive, send) -> None:
+        """Crea los clientes asíncronos al iniciar y los cierra al terminar el worker"""
+        while True:
+            mensaje = await receive()
+            if mensaje['type'] == 'lifespan.startup':
+                await self._iniciar()
+                await send({'type': 'lifespan.startup.complete'})
+            elif mensaje['type'] == 'lifespan.shutdown':
+                await self._cerrar()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _iniciar(self) -> 'AsyncCertificateService':
+        """Inicializa servicio, pool HTTP y executors (una vez por worker)"""
+        if self._lock_inicio is None:
+            self._lock_inicio = asyncio.Lock()
+
+        async with self._lock_inicio:
+            if self.servicio is not None:
+                return self.servicio
+
+            # Imports diferidos: evitan el ciclo app.resources -> app.services al cargar el módulo
+            from app.resources.certificado_resource import get_alumno_service
+            from app.services.async_certificate_service import (
+                AsyncCertificateService, _inicializar_proceso_render, renderizador_en_procesos
+            )
+            from app.repositories.async_redis_client import AsyncRedisClient
+            from app.repositories.async_alumno_repository import AsyncAlumnoRepository
+            from app.repositories.async_especialidad_repository import AsyncEspecialidadRepository
+
+            config = self.flask_app.config
+            self._http_client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=config['ASGI_HTTP_MAX_CONNECTIONS'])
+            )
+            # Hilos que ejecutan la ruta Flask de certificados una vez resueltos los datos
+            self._executor = ThreadPoolExecutor(
+                max_workers=config['ASGI_RENDER_WORKERS'], thread_name_prefix='render'
+            )
+
+            with self.flask_app.app_context():
+                # El mismo servicio que usa la ruta Flask: comparten almacén y singleflight
+                certificados = get_alumno_service().certificate_service
+                if config['ASGI_RENDER_EXECUTOR'] == 'process':
+                    self._procesos = ProcessPoolExecutor(
+                        max_workers=config['ASGI_RENDER_WORKERS'], initializer=_inicializar_proceso_render
+                    )
+                    certificados.renderizador = renderizador_en_procesos(self._procesos)
+
+                self._redis_client = AsyncRedisClient()
+                self.servicio = AsyncCertificateService(
+                    AsyncAlumnoRepository(self._http_client, self._redis_client),
+                    AsyncEspecialidadRepository(self._http_client, self._redis_client),
+                    certificados,
+                )
+            logger.info(f"Modo ASGI iniciado (executor de render: {config['ASGI_RENDER_EXECUTOR']})")
+            return self.servicio
+
+    async def _cerrar(self) -> None:
+        """Libera conexiones y executors"""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+        if self._redis_client is not None:
+            await self._redis_client.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        if self._procesos is not None:
+            self._procesos.shutdown(wait=False)
+            if self.servicio is not None:
+                self.servicio.certificate_service.renderizador = None
+        self.servicio = None
+        self._http_client = self._redis_client = None
+        self._executor = self._procesos = None
+
+    async def _certificado(self, alumno_id: int, formato: str, scope, send) -> None:
+        """
+        Resuelve alumno y especialidad sin bloquear y entrega el resto a Flask.
+
+        Los errores de la etapa asíncrona (alumno inexistente, upstream
+        caído) viajan en el environ y los lanza la vista, para que respondan
+        los mismos error handlers que en modo WSGI.
+        """
+        from app.resources.certificado_resource import CLAVE_PREPARADO
+
+        inicio = time.perf_counter()
+        servicio = self.servicio or await self._iniciar()
+
+        preparado: object
+        with self.flask_app.app_context():
+            try:
+                preparado = await servicio.preparar_certificado_async(alumno_id, formato)
+            except Exception as e:
+                preparado = e
+
+        instancia = WsgiToAsgiInstance(self.flask_app)
+        instancia.scope = scope
+        environ = instancia.build_environ(scope, io.BytesIO())
+        environ[CLAVE_INICIO] = inicio
+        environ[CLAVE_PREPARADO] = preparado
+
+        loop = asyncio.get_running_loop()
+        iterable, status, headers = await loop.run_in_executor(self._executor, self._despachar, environ)
+        try:
+            await send({
+                'type': 'http.response.start',
+                'status': int(status.split(' ', 1)[0]),
+                'headers': [(nombre.lower().encode('latin-1'), valor.encode('latin-1'))
+                            for nombre, valor in headers.items()],
+            })
+            partes = iter(iterable)
+            while True:
+                tramo, hay_mas = await loop.run_in_executor(self._executor, self._leer_tramo, partes)
+                await send({'type': 'http.response.body', 'body': tramo, 'more_body': hay_mas})
+                if not hay_mas:
+                    break
+        finally:
+            # Cierra el archivo de send_file y ejecuta los call_on_close de la respuesta
+            close = getattr(iterable, 'close', None)
+            if close is not None:
+                await loop.run_in_executor(self._executor, close)
+
+    def _despachar(self, environ: dict) -> Tuple[Iterable[bytes], str, Headers]:
+        """Ejecuta la app Flask (en un hilo del executor); el cuerpo queda sin leer"""
+        return run_wsgi_app(self.flask_app, environ)
+
+    def _leer_tramo(self, partes: Iterator[bytes]) -> Tuple[bytes, bool]:
+        """Lee del cuerpo WSGI (en un hilo del executor) al menos TAMANIO_TRAMO bytes, o hasta el final"""
+        tramo = bytearray()
+        for parte in partes:
+            tramo += parte
+            if len(tramo) >= self.TAMANIO_TRAMO:
+                return bytes(tramo), True
+        return bytes(tramo), False
+
+
+def create_asgi_app(flask_app: Optional[Flask] = None) -> CertificadosASGI:
+    """Crea la app ASGI a partir de la app Flask (la crea si no se pasa una)"""
+    if flask_app is None:
+        from app import create_app
+        flask_app = create_app()
+    return CertificadosASGI(flask_app)
@@ -1,7 +1,8 @@
 from dotenv import load_dotenv
 from pathlib import Path
 import os
-import logging
+import tempfile
+from typing import Optional
 
 
 basedir = os.path.abspath(Path(__file__).parents[2])
@@ -28,19 +29,135 @@ class Config(object):
     # HTTP Request Configuration
     REQUEST_TIMEOUT = int(os.getenv('REQUEST_TIMEOUT', 10))  # segundos
     
+    # Modo payload (POST /certificado/<formato>): firma HMAC opcional del body
+    # Si no se define el secreto, no se exige firma
+    PAYLOAD_SIGNATURE_SECRET = os.getenv('PAYLOAD_SIGNATURE_SECRET', None)
+    PAYLOAD_SIGNATURE_HEADER = os.getenv('PAYLOAD_SIGNATURE_HEADER', 'X-Signature')
+    
+    # Jobs asíncronos (cola en Redis consumida por worker.py)
+    JOB_TTL = int(os.getenv('JOB_TTL', 3600))  # estado del job: 1 hora
+    JOB_RESULT_TTL = int(os.getenv('JOB_RESULT_TTL', 600))  # documento generado: 10 minutos
+    JOB_BATCH_MAX = int(os.getenv('JOB_BATCH_MAX', 100))  # alumnos por lote
+    JOB_MAX_WAIT = float(os.getenv('JOB_MAX_WAIT', 4))  # tope de long-polling (s), < socket_timeout de Redis
+    JOB_VISIBILITY_TIMEOUT = int(os.getenv('JOB_VISIBILITY_TIMEOUT', 300))  # sin latido: el job se reencola
+    JOB_MAX_INTENTOS = int(os.getenv('JOB_MAX_INTENTOS', 3))
+    JOB_REAPER_INTERVAL = float(os.getenv('JOB_REAPER_INTERVAL', 30))
+    JOB_WORKER_BLOCK_TIMEOUT = int(os.getenv('JOB_WORKER_BLOCK_TIMEOUT', 2))  # < socket_timeout de Redis
+    
+    # Modo ASGI (granian --interface asgi asgi:app)
+    ASGI_RENDER_EXECUTOR = os.getenv('ASGI_RENDER_EXECUTOR', 'thread')  # 'thread' o 'process'
+    ASGI_RENDER_WORKERS = int(os.getenv('ASGI_RENDER_WORKERS', os.cpu_count() or 2))
+    ASGI_HTTP_MAX_CONNECTIONS = int(os.getenv('ASGI_HTTP_MAX_CONNECTIONS', 200))
+    
+    # Idioma de la fecha de los certificados (ver app/utils/fechas.py)
+    CERTIFICADO_LOCALE = os.getenv('CERTIFICADO_LOCALE', 'es_AR')
+    
+    # Salida reproducible: mismos insumos → mismos bytes (fechas fijadas a la emisión)
+    DOCUMENTOS_DETERMINISTAS = os.getenv('DOCUMENTOS_DETERMINISTAS', 'true').lower() == 'true'
+    
+    # Micro-batching de PDFs: requests concurrentes dentro de la ventana se renderizan en una pasada
+    PDF_MICROBATCH_ENABLED = os.getenv('PDF_MICROBATCH_ENABLED', 'false').lower() == 'true'
+    PDF_MICROBATCH_WINDOW_MS = float(os.getenv('PDF_MICROBATCH_WINDOW_MS', 10))
+    PDF_MICROBATCH_MAX = int(os.getenv('PDF_MICROBATCH_MAX', 16))
+    
+    # Formatos que sirve esta réplica (los backends de los demás nunca se importan)
+    FORMATOS_HABILITADOS = tuple(
+        f.strip().lower() for f in os.getenv('FORMATOS_HABILITADOS', 'pdf,odt,docx').split(',') if f.strip()
+    )
+    
+    # Motor PDF del certificado: 'weasyprint' o 'overlay' (fondo precalculado + texto)
+    PDF_ENGINE = os.getenv('PDF_ENGINE', 'weasyprint').lower()
+    # Fuentes que embebe el overlay: las de font-family: sans-serif en la imagen (fontconfig → DejaVu Sans)
+    PDF_OVERLAY_FUENTE = os.getenv('PDF_OVERLAY_FUENTE', '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf')
+    PDF_OVERLAY_FUENTE_NEGRITA = os.getenv('PDF_OVERLAY_FUENTE_NEGRITA', '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf')
+    
+    # Singleflight: requests concurrentes idénticos comparten un único render
+    # Con SINGLEFLIGHT_REDIS la deduplicación abarca todos los workers/réplicas (lock + slot en Redis)
+    SINGLEFLIGHT_REDIS = os.getenv('SINGLEFLIGHT_REDIS', 'false').lower() == 'true'
+    SINGLEFLIGHT_LOCK_TTL = float(os.getenv('SINGLEFLIGHT_LOCK_TTL', 30))  # segundos
+    SINGLEFLIGHT_RESULT_TTL = int(os.getenv('SINGLEFLIGHT_RESULT_TTL', 10))  # segundos
+    SINGLEFLIGHT_MAX_WAIT = float(os.getenv('SINGLEFLIGHT_MAX_WAIT', 30))  # espera máxima al líder (hilo u otro worker)
+    
+    # Almacén de documentos generados en disco (direccionado por la huella de los insumos)
+    ARTIFACT_STORE_ENABLED = os.getenv('ARTIFACT_STORE_ENABLED', 'true').lower() == 'true'
+    ARTIFACT_STORE_DIR = os.getenv('ARTIFACT_STORE_DIR', os.path.join(tempfile.gettempdir(), 'gestion-documentos-artefactos'))
+    ARTIFACT_STORE_MAX_BYTES = int(os.getenv('ARTIFACT_STORE_MAX_BYTES', 512 * 1024 * 1024))  # 512 MB
+    ARTIFACT_STORE_SWEEP_INTERVAL = float(os.getenv('ARTIFACT_STORE_SWEEP_INTERVAL', 60))  # segundos
+    
+    # Bytecode de plantillas Jinja2 en disco, compartido entre workers (ver app/utils/plantillas.py)
+    # Se genera en el build con `flask precompilar-plantillas`; vacío = compilar en memoria
+    TEMPLATE_CACHE_DIR: Optional[str] = os.getenv('TEMPLATE_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'gestion-documentos-jinja'))
+    TEMPLATE_PRELOAD = os.getenv('TEMPLATE_PRELOAD', 'true').lower() == 'true'  # cargar plantillas HTML al iniciar
+    
+    # Control de admisión (ver app/middleware/admission_middleware.py)
+    # Límite de renderizados simultáneos por formato: "formato=n,..." (un PDF cuesta más CPU que un DOCX)
+    # Por defecto se calcula con los hilos bloqueantes del worker de Granian (la misma variable que
+    # lee Granian): un formato saturado nunca ocupa todos los hilos y queda lugar para el resto de la API
+    GRANIAN_BLOCKING_THREADS = int(os.getenv('GRANIAN_BLOCKING_THREADS', 4))
+    ADMISSION_ENABLED = os.getenv('ADMISSION_ENABLED', 'true').lower() == 'true'
+    ADMISSION_LIMITES = os.getenv(
+        'ADMISSION_LIMITES',
+        f"pdf={max(1, GRANIAN_BLOCKING_THREADS // 2)},odt={max(1, GRANIAN_BLOCKING_THREADS - 1)},"
+        f"docx={max(1, GRANIAN_BLOCKING_THREADS - 1)},multiformato={max(1, GRANIAN_BLOCKING_THREADS // 2)}"
+    )
+    ADMISSION_MAX_COLA = int(os.getenv('ADMISSION_MAX_COLA', 32))  # requests esperando por formato
+    ADMISSION_ESPERA_MAX = float(os.getenv('ADMISSION_ESPERA_MAX', 5.0))  # segundos máximos en cola
+    ADMISSION_OBJETIVO = float(os.getenv('ADMISSION_OBJETIVO', 0.1))  # espera tolerable (CoDel target)
+    ADMISSION_INTERVALO = float(os.getenv('ADMISSION_INTERVALO', 1.0))  # CoDel interval
+    ADMISSION_RETRY_AFTER = int(os.getenv('ADMISSION_RETRY_AFTER', 1))  # header Retry-After del 503
+    
+    # Métricas Prometheus en /metrics (multiproceso con PROMETHEUS_MULTIPROC_DIR)
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    SERVER_TIMING_ENABLED = os.getenv('SERVER_TIMING_ENABLED', 'true').lower() == 'true'  # header con tiempos por etapa
+    LOG_SERVER_TIMING = os.getenv('LOG_SERVER_TIMING', 'false').lower() == 'true'  # también en la línea de log de la respuesta
+
+    # Perfilado con cProfile de requests de certificados (header o muestreo)
+    PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'false').lower() == 'true'
+    PROFILING_HEADER = os.getenv('PROFILING_HEADER', 'X-Profile')
+    PROFILING_TOKEN = os.getenv('PROFILING_TOKEN')  # valor exigido en el header; sin definir = cualquiera
+    PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', 0.0))  # fracción de requests perfilados
+    PROFILING_DIR = os.getenv('PROFILING_DIR', os.path.join(tempfile.gettempdir(), 'gestion-documentos-perfiles'))
+    # Perfilador por muestreo continuo (un hilo por worker, pilas colapsadas en PROFILING_DIR)
+    PROFILING_SAMPLER_ENABLED = os.getenv('PROFILING_SAMPLER_ENABLED', 'false').lower() == 'true'
+    PROFILING_SAMPLER_INTERVAL = float(os.getenv('PROFILING_SAMPLER_INTERVAL', 0.02))  # segundos entre muestras
+    PROFILING_SAMPLER_MAX_OVERHEAD = float(os.getenv('PROFILING_SAMPLER_MAX_OVERHEAD', 0.01))  # fracción de CPU
+    PROFILING_SAMPLER_FLUSH_INTERVAL = float(os.getenv('PROFILING_SAMPLER_FLUSH_INTERVAL', 60))  # segundos
+
+    # Memoria: tracemalloc (lento, solo para diagnóstico) y reciclaje de workers
+    TRACEMALLOC_ENABLED = os.getenv('TRACEMALLOC_ENABLED', 'false').lower() == 'true'
+    TRACEMALLOC_FRAMES = int(os.getenv('TRACEMALLOC_FRAMES', 10))  # frames guardados por asignación
+    WORKER_MAX_REQUESTS = int(os.getenv('WORKER_MAX_REQUESTS', 0))  # 0 = sin límite; requiere --respawn-failed-workers
+    WORKER_MAX_REQUESTS_JITTER = int(os.getenv('WORKER_MAX_REQUESTS_JITTER', 0))
+
+    # Chequeos de dependencias de /health: en segundo plano y en paralelo, /health devuelve el último resultado
+    HEALTH_CHECK_INTERVAL = float(os.getenv('HEALTH_CHECK_INTERVAL', 10))  # segundos entre chequeos
+    HEALTH_CHECK_TIMEOUT = float(os.getenv('HEALTH_CHECK_TIMEOUT', 3))  # segundos máximos por chequeo
+
+    # Endpoints de diagnóstico /api/v1/admin/* (protegidos con ADMIN_TOKEN en el header X-Admin-Token)
+    ADMIN_ENABLED = os.getenv('ADMIN_ENABLED', 'false').lower() == 'true'
+    ADMIN_TOKEN = os.getenv('ADMIN_TOKEN')
+
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')  # json o texto
+    LOG_QUEUE = os.getenv('LOG_QUEUE', 'true').lower() == 'true'  # escribir los logs desde un hilo aparte
+    LOG_SAMPLE_RATE = float(os.getenv('LOG_SAMPLE_RATE', 1.0))  # fracción de requests exitosos logeados
 
     @staticmethod
     def init_app(app):
-        log_level = getattr(logging, app.config['LOG_LEVEL'])
-        logging.basicConfig(
-            level=log_level,
-            format='%(asctime)s [%(levelname)s] %(name)s: %(message)s'
-        )
+        """Lo llama create_app: configura el logging del proceso con LOG_LEVEL, LOG_FORMAT y LOG_QUEUE"""
+        from app.utils.logs import configurar_logging
+        configurar_logging(app.config['LOG_LEVEL'], app.config['LOG_FORMAT'], app.config['LOG_QUEUE'])
 
 class TestConfig(Config):
     TESTING = True
     DEBUG = True
+    ARTIFACT_STORE_ENABLED = False
+    TEMPLATE_CACHE_DIR = None
+
+    @staticmethod
+    def init_app(app):
+        # Los tests conservan el logging del runner (captura de pytest/unittest)
+        pass
     
 class DevelopmentConfig(Config):
     TESTING = True
@@ -3,6 +3,15 @@ from app.exceptions.custom_exceptions import (
     AlumnoNotFoundException,
     EspecialidadNotFoundException,
     ServiceUnavailableException,
+    UpstreamResponseException,
     CacheException,
-    DocumentGenerationException
+    DocumentGenerationException,
+    InvalidPayloadException,
+    InvalidSignatureException,
+    JobNotFoundException,
+    JobNotReadyException,
+    ServiceOverloadedException,
+    FormatNotEnabledException,
+    AdminUnauthorizedException,
+    MemoryTracingUnavailableException
 )
\ No newline at end of file
@@ -58,6 +58,20 @@ class ServiceUnavailableException(BaseAppException):
         return result
 
 
+class UpstreamResponseException(BaseAppException):
+    def __init__(self, service_name: str, reason: str):
+        message = f"Respuesta inválida del servicio '{service_name}': {reason}"
+        super().__init__(message, status_code=502, error_code="InvalidUpstreamResponse")
+        self.service_name = service_name
+        self.reason = reason
+    
+    def to_dict(self) -> dict:
+        """Incluye service_name en la respuesta"""
+        result = super().to_dict()
+        result["service_name"] = self.service_name
+        return result
+
+
 class CacheException(BaseAppException):
     def __init__(self, operation: str, key: str, reason: str = None):
         message = f"Error en caché - operación '{operation}' en clave '{key}'"
@@ -91,3 +105,91 @@ class DocumentGenerationException(BaseAppException):
         result = super().to_dict()
         result["document_type"] = self.document_type
         return result
+
+
+class InvalidPayloadException(BaseAppException):
+    def __init__(self, errors: dict):
+        message = "El cuerpo de la solicitud no es válido"
+        super().__init__(message, status_code=400, error_code="InvalidPayload")
+        self.errors = errors
+    
+    def to_dict(self) -> dict:
+        """Incluye el detalle de validación de Marshmallow"""
+        result = super().to_dict()
+        result["errors"] = self.errors
+        return result
+
+
+class InvalidSignatureException(BaseAppException):
+    def __init__(self, reason: str = "Firma ausente o inválida"):
+        super().__init__(reason, status_code=401, error_code="InvalidSignature")
+        self.reason = reason
+
+
+class JobNotFoundException(BaseAppException):
+    def __init__(self, job_id: str):
+        message = f"Job '{job_id}' no encontrado o expirado"
+        super().__init__(message, status_code=404, error_code="JobNotFound")
+        self.job_id = job_id
+    
+    def to_dict(self) -> dict:
+        """Incluye job_id en la respuesta"""
+        result = super().to_dict()
+        result["job_id"] = self.job_id
+        return result
+
+
+class JobNotReadyException(BaseAppException):
+    def __init__(self, job_id: str, estado: str):
+        message = f"El job '{job_id}' todavía no tiene resultado (estado: {estado})"
+        super().__init__(message, status_code=409, error_code="JobNotReady")
+        self.job_id = job_id
+        self.estado = estado
+    
+    def to_dict(self) -> dict:
+        """Incluye job_id y estado en la respuesta"""
+        result = super().to_dict()
+        result["job_id"] = self.job_id
+        result["estado"] = self.estado
+        return result
+
+
+class ServiceOverloadedException(BaseAppException):
+    def __init__(self, formato: str, retry_after: int = 1):
+        message = f"Servidor saturado: no se admiten más certificados '{formato}' por el momento"
+        super().__init__(message, status_code=503, error_code="ServiceOverloaded")
+        self.formato = formato
+        self.retry_after = retry_after
+    
+    def to_dict(self) -> dict:
+        """Incluye formato y retry_after en la respuesta"""
+        result = super().to_dict()
+        result["formato"] = self.formato
+        result["retry_after"] = self.retry_after
+        return result
+
+
+class FormatNotEnabledException(BaseAppException):
+    def __init__(self, formato: str, habilitados: list):
+        message = f"El formato '{formato}' no está habilitado en este servicio"
+        super().__init__(message, status_code=404, error_code="FormatNotEnabled")
+        self.formato = formato
+        self.habilitados = habilitados
+    
+    def to_dict(self) -> dict:
+        """Incluye los formatos que sí atiende esta réplica"""
+        result = super().to_dict()
+        result["formato"] = self.formato
+        result["formatos_habilitados"] = self.habilitados
+        return result
+
+
+class AdminUnauthorizedException(BaseAppException):
+    def __init__(self):
+        super().__init__("Token de administración ausente o inválido", status_code=401, error_code="AdminUnauthorized")
+
+
+class MemoryTracingUnavailableException(BaseAppException):
+    def __init__(self, reason: str):
+        super().__init__(reason, status_code=409, error_code="MemoryTracingUnavailable")
+        self.reason = reason
@@ -1,7 +1,7 @@
 import logging
 from flask import Flask, jsonify
 from werkzeug.exceptions import HTTPException
-from app.exceptions import BaseAppException
+from app.exceptions import BaseAppException, ServiceOverloadedException
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +24,14 @@ def register_error_handlers(app: Flask) -> None:
         logger.error(f"{error.error_code}: {error.message}")
         return jsonify(error.to_dict()), error.status_code
     
+    @app.errorhandler(ServiceOverloadedException)
+    def handle_service_overloaded(error: ServiceOverloadedException):
+        """503 por control de admisión: indica al cliente cuándo reintentar"""
+        logger.warning(f"{error.error_code}: {error.message}")
+        response = jsonify(error.to_dict())
+        response.headers['Retry-After'] = str(error.retry_after)
+        return response, error.status_code
+    
     @app.errorhandler(HTTPException)
     def handle_http_exception(error: HTTPException):
         response = {
@@ -1,3 +1,7 @@
 from .alumno_mapping import AlumnoMapping
 from .especialidad_mapping import EspecialidadMapping
-from .tipodocumento_mapping import TipoDocumentoMapping
\ No newline at end of file
+from .tipodocumento_mapping import TipoDocumentoMapping
+from .facultad_mapping import FacultadMapping
+from .universidad_mapping import UniversidadMapping
+from .certificado_payload_mapping import CertificadoPayloadMapping
+from .job_mapping import JobCertificadoMapping
\ No newline at end of file
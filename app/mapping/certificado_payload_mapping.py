@@ -0,0 +1,32 @@
+from marshmallow import Schema, fields, post_load
+from .alumno_mapping import AlumnoMapping
+from .especialidad_mapping import EspecialidadMapping
+from .facultad_mapping import FacultadMapping
+from .universidad_mapping import UniversidadMapping
+
+
+class CertificadoPayloadMapping(Schema):
+    """
+    Mapping para el body de los endpoints POST de certificados.
+    
+    Permite que el llamador envíe los datos completos y evita las consultas
+    a los microservicios de alumnos y gestión académica:
+    {"alumno": {...}, "especialidad": {...}, "facultad": {...}, "universidad": {...}}
+    
+    La facultad de la especialidad se toma del objeto "facultad" del body,
+    por eso no se exige como string dentro de "especialidad".
+    """
+    alumno = fields.Nested(AlumnoMapping(exclude=('especialidad', 'especialidad_id')), required=True)
+    especialidad = fields.Nested(EspecialidadMapping(partial=('facultad',)), required=True)
+    facultad = fields.Nested(FacultadMapping, required=True)
+    universidad = fields.Nested(UniversidadMapping, required=True)
+
+    @post_load
+    def nuevo_alumno_completo(self, data, **kwargs):
+        facultad = data['facultad']
+        facultad.universidad = data['universidad']
+        especialidad = data['especialidad']
+        especialidad.facultad = facultad
+        alumno = data['alumno']
+        alumno.especialidad = especialidad
+        return alumno
@@ -1,5 +1,21 @@
-from marshmallow import fields, Schema, post_load, validate
+from marshmallow import fields, Schema, post_load, validate, ValidationError
 from app.models import Especialidad
+from .facultad_mapping import FacultadMapping
+
+
+class FacultadField(fields.Field):
+    """
+    Facultad de la especialidad: objeto completo (con su universidad, lo que
+    necesita el certificado) o solo el nombre, como la devuelven algunas
+    versiones del MS académica.
+    """
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        if isinstance(value, dict):
+            return FacultadMapping().load(value)
+        if isinstance(value, str) and value:
+            return value
+        raise ValidationError('Debe ser un objeto facultad o su nombre.')
 
 
 class EspecialidadMapping(Schema):
@@ -7,7 +23,7 @@ class EspecialidadMapping(Schema):
     nombre = fields.String(required=True, validate=validate.Length(min=1, max=100))
     letra = fields.String(required=True, validate=validate.Length(equal=1))
     observacion = fields.String(validate=validate.Length(max=255), allow_none=True)
-    facultad = fields.String(required=True)
+    facultad = FacultadField(required=True)
 
     @post_load
     def nueva_especialidad(self, data, **kwargs):
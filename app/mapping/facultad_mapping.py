@@ -0,0 +1,21 @@
+from marshmallow import fields, Schema, post_load, validate
+from app.models import Facultad
+from .universidad_mapping import UniversidadMapping
+
+
+class FacultadMapping(Schema):
+    id = fields.Integer()
+    nombre = fields.String(required=True, validate=validate.Length(min=1, max=100))
+    ciudad = fields.String(required=True, validate=validate.Length(min=1, max=100))
+    provincia = fields.String(required=True, validate=validate.Length(min=1, max=100))
+    universidad = fields.Nested(UniversidadMapping, required=False, allow_none=True)
+
+    @post_load
+    def nueva_facultad(self, data, **kwargs):
+        facultad = Facultad()
+        facultad.id = data.get('id')
+        facultad.nombre = data.get('nombre')
+        facultad.ciudad = data.get('ciudad')
+        facultad.provincia = data.get('provincia')
+        facultad.universidad = data.get('universidad')
+        return facultad
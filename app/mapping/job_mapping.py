@@ -0,0 +1,17 @@
+from marshmallow import Schema, fields, validate, validates_schema, ValidationError
+
+
+class JobCertificadoMapping(Schema):
+    """
+    Mapping para el body de POST /jobs/certificados.
+    
+    Acepta un alumno ({"alumno_id": 1}) o un lote ({"alumno_ids": [1, 2, 3]}).
+    """
+    formato = fields.String(required=True, validate=validate.OneOf(['pdf', 'odt', 'docx']))
+    alumno_id = fields.Integer(validate=validate.Range(min=1))
+    alumno_ids = fields.List(fields.Integer(validate=validate.Range(min=1)), validate=validate.Length(min=1))
+
+    @validates_schema
+    def validar_alumnos(self, data, **kwargs):
+        if ('alumno_id' in data) == ('alumno_ids' in data):
+            raise ValidationError('Debe indicar alumno_id o alumno_ids (solo uno de los dos)')
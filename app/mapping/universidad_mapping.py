@@ -0,0 +1,14 @@
+from marshmallow import fields, Schema, post_load, validate
+from app.models import Universidad
+
+
+class UniversidadMapping(Schema):
+    id = fields.Integer()
+    nombre = fields.String(required=True, validate=validate.Length(min=1, max=100))
+
+    @post_load
+    def nueva_universidad(self, data, **kwargs):
+        universidad = Universidad()
+        universidad.id = data.get('id')
+        universidad.nombre = data.get('nombre')
+        return universidad
@@ -1,3 +1,7 @@
 
 from app.middleware.logging_middleware import register_logging_middleware
 from app.middleware.error_middleware import register_error_middleware
+from app.middleware.admission_middleware import register_admission_middleware, ControlDeAdmision
+from app.middleware.metrics_middleware import register_metrics_middleware
+from app.middleware.profiling_middleware import register_profiling_middleware
+from app.middleware.memory_middleware import register_memory_middleware
@@ -0,0 +1,231 @@
+import logging
+import math
+import threading
+import time
+from typing import Dict, Optional
+from flask import Flask, request, g, current_app
+
+from app.exceptions import ServiceOverloadedException
+
+logger = logging.getLogger(__name__)
+
+
+def parsear_limites(limites: str) -> Dict[str, int]:
+    """Convierte "pdf=4,docx=8" en {'pdf': 4, 'docx': 8}"""
+    resultado = {}
+    for par in limites.split(','):
+        if not par.strip():
+            continue
+        formato, _, valor = par.partition('=')
+        resultado[formato.strip().lower()] = int(valor)
+    return resultado
+
+
+class _ColaFormato:
+    """
+    Semáforo de un formato con cola acotada y descarte CoDel (RFC 8289).
+
+    CoDel mira el tiempo que cada request pasó en cola (no el largo de la
+    cola): si la espera se mantiene por encima del objetivo durante todo un
+    intervalo hay una cola permanente y se entra en estado de descarte. En
+    ese estado se descarta con 503 un request que sale de la cola, el
+    siguiente descarte ocurre intervalo/√n después (n = descartes de este
+    episodio) y los requests que salen entre medio se admiten. Apenas una
+    espera queda por debajo del objetivo se sale del estado de descarte.
+    """
+
+    def __init__(self, limite: int, max_cola: int, objetivo: float, intervalo: float):
+        self.semaforo = threading.BoundedSemaphore(limite)
+        self.limite = limite
+        self.max_cola = max_cola
+        self.objetivo = objetivo
+        self.intervalo = intervalo
+        self._lock = threading.Lock()
+        self.en_curso = 0
+        self.en_cola = 0
+        self.rechazados = 0
+        # Estado CoDel: primer instante en que se puede descartar, si se está
+        # descartando, próximo descarte y descartes del episodio actual y del anterior
+        self._descartable_desde: Optional[float] = None
+        self._descartando = False
+        self._proximo_descarte = 0.0
+        self._descartes = 0
+        self._descartes_previos = 0
+
+    def adquirir(self, espera_max: float) -> bool:
+        """
+        Intenta tomar un lugar de renderizado.
+
+        Returns:
+            True si el request fue admitido, False si debe descartarse
+        """
+        # Camino rápido: hay lugar libre y no hace falta encolarse
+        if self.semaforo.acquire(blocking=False):
+            self._registrar_espera(0.0, time.monotonic())
+            return self._admitir()
+
+        with self._lock:
+            if self.en_cola >= self.max_cola:
+                self.rechazados += 1
+                return False
+            self.en_cola += 1
+
+        inicio = time.monotonic()
+        try:
+            obtenido = self.semaforo.acquire(timeout=espera_max)
+        finally:
+            with self._lock:
+                self.en_cola -= 1
+
+        ahora = time.monotonic()
+        if not obtenido:
+            with self._lock:
+                self.rechazados += 1
+            return False
+
+        if self._registrar_espera(ahora - inicio, ahora):
+            self.semaforo.release()
+            with self._lock:
+                self.rechazados += 1
+            return False
+
+        return self._admitir()
+
+    def liberar(self) -> None:
+        """Devuelve el lugar tomado por adquirir()"""
+        with self._lock:
+            self.en_curso -= 1
+        self.semaforo.release()
+
+    def _admitir(self) -> bool:
+        with self._lock:
+            self.en_curso += 1
+        return True
+
+    def _registrar_espera(self, espera: float, ahora: float) -> bool:
+        """Actualiza el estado CoDel y retorna True si el request debe descartarse"""
+        with self._lock:
+            if espera < self.objetivo:
+                self._descartable_desde = None
+                self._descartando = False
+                return False
+
+            if self._descartable_desde is None:
+                self._descartable_desde = ahora + self.intervalo
+                return False
+            if ahora < self._descartable_desde:
+                return False
+
+            if self._descartando:
+                if ahora < self._proximo_descarte:
+                    return False
+                self._descartes += 1
+                self._proximo_descarte = self._ley_de_control(self._proximo_descarte)
+                return True
+
+            # Entrada al estado de descarte: si el episodio anterior terminó hace
+            # poco se retoma su frecuencia en lugar de empezar de nuevo
+            self._descartando = True
+            delta = self._descartes - self._descartes_previos
+            reciente = ahora - self._proximo_descarte < 16 * self.intervalo
+            self._descartes = delta if delta > 1 and reciente else 1
+            self._descartes_previos = self._descartes
+            self._proximo_descarte = self._ley_de_control(ahora)
+            return True
+
+    def _ley_de_control(self, desde: float) -> float:
+        """Instante del próximo descarte: intervalo/√n, más frecuente mientras la cola persiste"""
+        return desde + self.intervalo / math.sqrt(self._descartes)
+
+    def estado(self) -> dict:
+        with self._lock:
+            return {
+                'limite': self.limite,
+                'en_curso': self.en_curso,
+                'en_cola': self.en_cola,
+                'rechazados': self.rechazados,
+            }
+
+
+class ControlDeAdmision:
+    """
+    Control de admisión por formato de certificado.
+
+    Traefik limita requests por segundo pero no sabe que un PDF cuesta
+    mucho más CPU que un DOCX. Cada formato tiene su propio límite de
+    renderizados simultáneos y una cola acotada; lo que no entra se
+    rechaza enseguida con 503 + Retry-After, de modo que una réplica
+    saturada mantiene acotada la latencia de los requests que sí atiende.
+    """
+
+    def __init__(self, limites: Dict[str, int], max_cola: int = 32, espera_max: float = 5.0,
+                 objetivo: float = 0.1, intervalo: float = 1.0, retry_after: int = 1):
+        self.espera_max = espera_max
+        self.retry_after = retry_after
+        self.colas = {
+            formato: _ColaFormato(limite, max_cola, objetivo, intervalo)
+            for formato, limite in limites.items()
+        }
+
+    @classmethod
+    def desde_config(cls, config) -> 'ControlDeAdmision':
+        return cls(
+            limites=parsear_limites(config['ADMISSION_LIMITES']),
+            max_cola=config['ADMISSION_MAX_COLA'],
+            espera_max=config['ADMISSION_ESPERA_MAX'],
+            objetivo=config['ADMISSION_OBJETIVO'],
+            intervalo=config['ADMISSION_INTERVALO'],
+            retry_after=config['ADMISSION_RETRY_AFTER'],
+        )
+
+    def adquirir(self, formato: str) -> bool:
+        """
+        Admite el request o lanza ServiceOverloadedException.
+
+        Returns:
+            True si el formato tiene límite (hay que llamar a liberar), False si no
+        """
+        cola = self.colas.get(formato)
+        if cola is None:
+            return False
+        if not cola.adquirir(self.espera_max):
+            logger.warning(f"Request de certificado {formato} descartado por sobrecarga: {cola.estado()}")
+            raise ServiceOverloadedException(formato, self.retry_after)
+        return True
+
+    def liberar(self, formato: str) -> None:
+        self.colas[formato].liberar()
+
+    def estado(self) -> Dict[str, dict]:
+        return {formato: cola.estado() for formato, cola in self.colas.items()}
+
+
+def _formato_del_request() -> Optional[str]:
+    """Formato que renderiza el request: parámetro <formato> o último segmento de la ruta"""
+    if request.blueprint != 'certificado':
+        return None
+    formato = (request.view_args or {}).get('formato')
+    if formato:
+        return formato
+    return request.path.rstrip('/').rsplit('/', 1)[-1]
+
+
+def register_admission_middleware(app: Flask) -> None:
+
+    if not app.config.get('ADMISSION_ENABLED', False):
+        return
+
+    app.extensions['admision'] = ControlDeAdmision.desde_config(app.config)
+
+    @app.before_request
+    def admitir_request():
+        """Toma un lugar del formato pedido o rechaza con 503 si no hay capacidad"""
+        formato = _formato_del_request()
+        if formato and current_app.extensions['admision'].adquirir(formato):
+            g.formato_admitido = formato
+
+    @app.teardown_request
+    def liberar_request(exception=None):
+        formato = g.pop('formato_admitido', None)
+        if formato:
+            current_app.extensions['admision'].liberar(formato)
@@ -1,6 +1,8 @@
 import logging
+import random
 import time
 from flask import Flask, request, g
+from app.utils.metricas import encabezado_server_timing, inicio_del_request, tiempos_del_request
 
 logger = logging.getLogger(__name__)
 
@@ -10,32 +12,41 @@ def register_logging_middleware(app: Flask) -> None:
     @app.before_request
     def log_request():
         """Logea información de la request entrante y marca el inicio del tiempo"""
-        g.start_time = time.time()
+        g.start_time = inicio_del_request()
+        # Muestreo de los logs de requests exitosos: los errores se logean siempre
+        g.log_muestreado = random.random() < app.config.get('LOG_SAMPLE_RATE', 1.0)
         
-        logger.info(
-            f"Incoming request: {request.method} {request.path} "
-            f"from {request.remote_addr}"
-        )
+        if g.log_muestreado:
+            logger.info("Incoming request: %s %s from %s", request.method, request.path, request.remote_addr)
     
     @app.after_request
     def log_response(response):
         # Calcular tiempo de procesamiento
-        if hasattr(g, 'start_time'):
-            duration = int((time.time() - g.start_time) * 1000)  # En milisegundos
-        else:
-            duration = 0
+        transcurrido = time.perf_counter() - g.start_time if hasattr(g, 'start_time') else 0.0
+        duration = int(transcurrido * 1000)  # En milisegundos
+        
+        # Tiempos por etapa registrados por el servicio (solo rutas que generan documentos)
+        server_timing = ''
+        tiempos = tiempos_del_request()
+        if tiempos and app.config.get('SERVER_TIMING_ENABLED'):
+            server_timing = encabezado_server_timing(tiempos, transcurrido)
+            response.headers['Server-Timing'] = server_timing
         
         # Log con nivel según status code
         if response.status_code >= 500:
             log_level = logging.ERROR
         elif response.status_code >= 400:
             log_level = logging.WARNING
-        else:
+        elif g.get('log_muestreado', True):
             log_level = logging.INFO
+        else:
+            return response
         
-        logger.log(
-            log_level,
-            f"Response: {response.status_code} - {request.method} {request.path} - {duration}ms"
-        )
+        if server_timing and app.config.get('LOG_SERVER_TIMING'):
+            logger.log(log_level, "Response: %s - %s %s - %sms [%s]", response.status_code,
+                       request.method, request.path, duration, server_timing)
+        else:
+            logger.log(log_level, "Response: %s - %s %s - %sms", response.status_code,
+                       request.method, request.path, duration)
         
         return response
@@ -0,0 +1,44 @@
+import logging
+import tracemalloc
+from flask import Flask, g
+from app.middleware.admission_middleware import _formato_del_request
+from app.utils.memoria import iniciar_tracemalloc, obtener_reciclaje, rss_bytes
+from app.utils.metricas import MEMORIA_REQUEST, RSS_WORKER
+
+logger = logging.getLogger(__name__)
+
+
+def register_memory_middleware(app: Flask) -> None:
+
+    if app.config.get('TRACEMALLOC_ENABLED', False):
+        # Antes del fork: los workers heredan el rastreo activo
+        iniciar_tracemalloc(app.config['TRACEMALLOC_FRAMES'])
+
+        @app.before_request
+        def medir_memoria_inicial():
+            """Memoria rastreada al empezar un request de certificado"""
+            formato = _formato_del_request()
+            if formato and tracemalloc.is_tracing():
+                g.memoria_formato = formato
+                g.memoria_inicio = tracemalloc.get_traced_memory()[0]
+
+        @app.teardown_request
+        def registrar_memoria_retenida(exception=None):
+            # Diferencia del proceso entero: con requests concurrentes es una aproximación
+            inicio = g.pop('memoria_inicio', None)
+            if inicio is not None and tracemalloc.is_tracing():
+                retenida = tracemalloc.get_traced_memory()[0] - inicio
+                MEMORIA_REQUEST.labels(g.pop('memoria_formato')).observe(max(retenida, 0))
+
+    maximo = app.config.get('WORKER_MAX_REQUESTS', 0)
+
+    @app.teardown_request
+    def controlar_worker(exception=None):
+        """Actualiza la RSS del worker y lo recicla al llegar a WORKER_MAX_REQUESTS"""
+        rss = rss_bytes()
+        if rss is not None:
+            RSS_WORKER.set(rss)
+        if maximo > 0:
+            reciclaje = obtener_reciclaje(app.config)
+            if reciclaje.registrar_request():
+                reciclaje.reciclar()
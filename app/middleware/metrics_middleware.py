@@ -0,0 +1,36 @@
+import time
+from flask import Flask, request, g
+from app.middleware.admission_middleware import _formato_del_request
+from app.utils.metricas import REQUESTS_EN_CURSO, inicio_del_request, registrar_costo_request, registrar_request
+
+
+def register_metrics_middleware(app: Flask) -> None:
+
+    if not app.config.get('METRICS_ENABLED', False):
+        return
+
+    @app.before_request
+    def iniciar_metricas():
+        """Cuenta el request en curso y marca su inicio (tiempo real y CPU del hilo)"""
+        g.metricas_inicio = inicio_del_request()
+        g.metricas_cpu = time.thread_time()
+        REQUESTS_EN_CURSO.inc()
+
+    @app.after_request
+    def registrar_metricas(response):
+        if hasattr(g, 'metricas_inicio'):
+            # Regla de la ruta (no el path): /certificado/<int:id>/pdf no crea una serie por alumno
+            endpoint = request.url_rule.rule if request.url_rule else 'sin_ruta'
+            segundos = time.perf_counter() - g.metricas_inicio
+            registrar_request(endpoint, request.method, response.status_code, segundos)
+            formato = _formato_del_request()
+            # Solo certificados generados: los 304 y los errores no representan el costo de un documento
+            if formato and response.status_code == 200:
+                registrar_costo_request(formato, time.thread_time() - g.metricas_cpu, segundos)
+        return response
+
+    @app.teardown_request
+    def finalizar_metricas(exception=None):
+        # teardown corre también si la vista lanzó una excepción no manejada
+        if g.pop('metricas_inicio', None) is not None:
+            REQUESTS_EN_CURSO.dec()
@@ -0,0 +1,109 @@
+import cProfile
+import hmac
+import logging
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from flask import Flask, request, g
+from app.middleware.admission_middleware import _formato_del_request
+from app.utils.perfilador_muestreo import obtener_perfilador
+
+logger = logging.getLogger(__name__)
+
+_ID_VALIDO = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+# Un solo perfil cProfile a la vez por proceso: desde Python 3.12 cProfile usa
+# sys.monitoring, que es global, y un segundo enable() lanza ValueError
+_perfil_en_curso = threading.Lock()
+
+
+def _id_del_request() -> str:
+    """X-Request-ID del cliente si es seguro para un nombre de archivo, o uno nuevo"""
+    request_id = request.headers.get('X-Request-ID', '')
+    return request_id if _ID_VALIDO.match(request_id) else uuid.uuid4().hex[:16]
+
+
+def _debe_perfilar(config) -> bool:
+    """Header de activación (con PROFILING_TOKEN como valor, si está configurado) o muestreo"""
+    valor = request.headers.get(config['PROFILING_HEADER'])
+    if valor is not None:
+        token = config.get('PROFILING_TOKEN')
+        if not token or hmac.compare_digest(valor, token):
+            return True
+        logger.warning(f"Header {config['PROFILING_HEADER']} con token inválido desde {request.remote_addr}")
+    tasa = config['PROFILING_SAMPLE_RATE']
+    return tasa > 0 and random.random() < tasa
+
+
+def _registrar_perfilador_muestreo(app: Flask) -> None:
+
+    @app.before_request
+    def etiquetar_muestras():
+        """Inicia el perfilador del worker (primer request) y marca el formato del hilo"""
+        obtener_perfilador(app.config).etiquetar(_formato_del_request())
+
+    @app.teardown_request
+    def desetiquetar_muestras(exception=None):
+        obtener_perfilador(app.config).etiquetar(None)
+
+
+def register_profiling_middleware(app: Flask) -> None:
+
+    if app.config.get('PROFILING_SAMPLER_ENABLED', False):
+        _registrar_perfilador_muestreo(app)
+
+    if not app.config.get('PROFILING_ENABLED', False):
+        return
+
+    directorio = app.config['PROFILING_DIR']
+    os.makedirs(directorio, exist_ok=True)
+
+    @app.before_request
+    def iniciar_perfil():
+        """
+        Perfila con cProfile los requests de certificados elegidos por header o muestreo.
+        
+        Si el worker ya está perfilando otro request (u otra herramienta usa
+        el perfilador del proceso) el request se atiende sin perfil. Desde
+        Python 3.12 el perfil incluye lo que ejecutan los demás hilos del
+        worker mientras dura el request.
+        """
+        formato = _formato_del_request()
+        if not formato or not _debe_perfilar(app.config):
+            return
+        if not _perfil_en_curso.acquire(blocking=False):
+            logger.info(f"Perfil omitido en {request.path}: el worker ya está perfilando otro request")
+            return
+        perfil = cProfile.Profile()
+        try:
+            perfil.enable()
+        except ValueError as e:
+            _perfil_en_curso.release()
+            logger.warning(f"Perfil omitido en {request.path}: {e}")
+            return
+        nombre = f"{time.strftime('%Y%m%dT%H%M%S')}_{_id_del_request()}_{formato}.pstats"
+        g.perfil_archivo = os.path.join(directorio, nombre)
+        g.perfil = perfil
+
+    @app.after_request
+    def informar_perfil(response):
+        if 'perfil_archivo' in g:
+            response.headers['X-Profile-File'] = os.path.basename(g.perfil_archivo)
+        return response
+
+    @app.teardown_request
+    def guardar_perfil(exception=None):
+        perfil = g.pop('perfil', None)
+        if perfil is None:
+            return
+        perfil.disable()
+        _perfil_en_curso.release()
+        ruta = g.pop('perfil_archivo')
+        try:
+            perfil.dump_stats(ruta)
+            logger.info(f"Perfil de {request.method} {request.path} guardado en {ruta}")
+        except OSError as e:
+            logger.error(f"No se pudo guardar el perfil {ruta}: {e}")
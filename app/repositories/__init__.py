@@ -1,5 +1,7 @@
 from app.repositories.redis_client import RedisClient
 from app.repositories.alumno_repository import AlumnoRepository
 from app.repositories.especialidad_repository import EspecialidadRepository
+from app.repositories.job_repository import JobRepository
+from app.repositories.artifact_store import ArtifactStore
 
-__all__ = ['RedisClient', 'AlumnoRepository', 'EspecialidadRepository']
+__all__ = ['RedisClient', 'AlumnoRepository', 'EspecialidadRepository', 'JobRepository', 'ArtifactStore']
@@ -7,6 +7,7 @@ from app.repositories.redis_client import RedisClient
 from app.mapping import AlumnoMapping
 from app.models import Alumno
 from app.utils import retry
+from app.utils.metricas import registrar_cache, registrar_upstream
 
 logger = logging.getLogger(__name__)
 
@@ -34,7 +35,12 @@ class AlumnoRepository:
         """Obtiene el alumno desde el microservicio externo con retry automático"""
         url = f"{current_app.config['ALUMNO_SERVICE_URL']}/alumnos/{alumno_id}"
         timeout = current_app.config['REQUEST_TIMEOUT']
-        response = requests.get(url, timeout=timeout)
+        try:
+            response = requests.get(url, timeout=timeout)
+        except requests.RequestException:
+            registrar_upstream('alumnos', 'error')
+            raise
+        registrar_upstream('alumnos', response.status_code)
         response.raise_for_status()
         return response.json()
     
@@ -44,6 +50,7 @@ class AlumnoRepository:
         
         # Intentar obtener del cache
         cached_data = self.redis_client.get(cache_key)
+        registrar_cache('redis_alumno', bool(cached_data))
         if cached_data:
             try:
                 return self.alumno_mapping.load(cached_data)
@@ -0,0 +1,199 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import BinaryIO, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ArtifactStore:
+    """
+    Almacén de documentos generados en disco, direccionado por contenido.
+
+    La clave es la huella de los insumos del renderizado (ver
+    app/utils/fingerprint.py), así que un documento se genera una sola vez
+    y lo comparten todos los workers de Granian sin pasar binarios por
+    Redis. Los documentos sobreviven a los reinicios de los workers.
+
+    Estructura en disco:
+    - <directorio>/<ab>/<clave>.<ext>        → documento
+    - <directorio>/<ab>/<clave>.<ext>.json   → índice de metadatos (formato, tamaño, creado)
+
+    Las escrituras son atómicas (archivo temporal + os.replace) y el mtime
+    del documento registra el último acceso, que usa el barrido LRU para
+    mantener el directorio por debajo de max_bytes.
+    """
+
+    SUFIJO_META = '.json'
+    SUFIJO_TEMPORAL = '.tmp'
+
+    def __init__(self, directorio: str, max_bytes: int, intervalo_barrido: float = 60):
+        """
+        Args:
+            directorio: Carpeta raíz del almacén (se crea si no existe)
+            max_bytes: Tamaño máximo total de los documentos
+            intervalo_barrido: Segundos mínimos entre barridos de un mismo proceso
+        """
+        self.directorio = directorio
+        self.max_bytes = max_bytes
+        self.intervalo_barrido = intervalo_barrido
+        self._ultimo_barrido = 0.0
+        self._lock_barrido = threading.Lock()
+        os.makedirs(directorio, exist_ok=True)
+
+    def _ruta(self, clave: str, extension: str) -> str:
+        return os.path.join(self.directorio, clave[:2], f"{clave}.{extension}")
+
+    def obtener(self, clave: str, extension: str) -> Optional[str]:
+        """
+        Retorna la ruta del documento o None si no está almacenado.
+
+        Actualiza el mtime (último acceso) para el barrido LRU.
+        """
+        ruta = self._ruta(clave, extension)
+        try:
+            os.utime(ruta)
+        except FileNotFoundError:
+            return None
+        logger.debug(f"Artefacto {clave[:12]}.{extension} encontrado en el almacén")
+        return ruta
+
+    def abrir(self, clave: str, extension: str) -> Optional[BinaryIO]:
+        """
+        Abre el documento para leerlo o retorna None si no está almacenado.
+
+        A diferencia de la ruta de obtener(), el archivo abierto sigue siendo
+        legible aunque el barrido de otro worker lo elimine antes de enviarlo.
+        """
+        try:
+            documento = open(self._ruta(clave, extension), 'rb')
+        except FileNotFoundError:
+            return None
+        os.utime(documento.fileno())
+        logger.debug(f"Artefacto {clave[:12]}.{extension} encontrado en el almacén")
+        return documento
+
+    def guardar(self, clave: str, extension: str, contenido: bytes, metadatos: Optional[dict] = None) -> str:
+        """
+        Guarda un documento de forma atómica y retorna su ruta.
+
+        Si dos workers generan la misma clave a la vez, el último os.replace
+        gana; ambos contenidos son equivalentes.
+        """
+        ruta = self._ruta(clave, extension)
+        carpeta = os.path.dirname(ruta)
+        os.makedirs(carpeta, exist_ok=True)
+
+        meta = dict(metadatos or {}, clave=clave, formato=extension,
+                    tamanio=len(contenido), creado=time.time())
+        self._escribir_atomico(carpeta, ruta + self.SUFIJO_META,
+                               json.dumps(meta, ensure_ascii=False).encode('utf-8'))
+        self._escribir_atomico(carpeta, ruta, contenido)
+        logger.info(f"Artefacto {clave[:12]}.{extension} guardado: {len(contenido)} bytes")
+
+        self._barrer_si_corresponde(conservar=ruta)
+        return ruta
+
+    def metadatos(self, clave: str, extension: str) -> Optional[dict]:
+        """Lee el índice de metadatos de un documento"""
+        try:
+            with open(self._ruta(clave, extension) + self.SUFIJO_META, 'rb') as f:
+                return json.loads(f.read())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _escribir_atomico(self, carpeta: str, ruta: str, contenido: bytes) -> None:
+        descriptor, temporal = tempfile.mkstemp(dir=carpeta, suffix=self.SUFIJO_TEMPORAL)
+        try:
+            with os.fdopen(descriptor, 'wb') as f:
+                f.write(contenido)
+            os.chmod(temporal, 0o644)
+            os.replace(temporal, ruta)
+        except BaseException:
+            try:
+                os.unlink(temporal)
+            except FileNotFoundError:
+                pass
+            raise
+
+    def _barrer_si_corresponde(self, conservar: Optional[str] = None) -> None:
+        """Barrido LRU limitado a uno cada intervalo_barrido segundos por proceso"""
+        ahora = time.monotonic()
+        if ahora - self._ultimo_barrido < self.intervalo_barrido:
+            return
+        if not self._lock_barrido.acquire(blocking=False):
+            return
+        try:
+            self._ultimo_barrido = ahora
+            self.barrer(conservar)
+        except OSError as e:
+            logger.warning(f"Error en el barrido del almacén de artefactos: {e}")
+        finally:
+            self._lock_barrido.release()
+
+    def _listar(self) -> List[os.DirEntry]:
+        entradas = []
+        for carpeta in os.scandir(self.directorio):
+            if not carpeta.is_dir():
+                continue
+            for entrada in os.scandir(carpeta.path):
+                entradas.append(entrada)
+        return entradas
+
+    def barrer(self, conservar: Optional[str] = None) -> int:
+        """
+        Elimina los documentos menos usados hasta quedar en el 90% de max_bytes.
+
+        También elimina temporales huérfanos (escrituras interrumpidas).
+        Tolera que otro worker esté barriendo a la vez.
+
+        Args:
+            conservar: Ruta que no se elimina aunque exceda el límite (el documento recién guardado)
+
+        Returns:
+            Cantidad de documentos eliminados
+        """
+        documentos = []
+        total = 0
+        ahora = time.time()
+
+        for entrada in self._listar():
+            try:
+                stat = entrada.stat()
+            except FileNotFoundError:
+                continue
+            if entrada.name.endswith(self.SUFIJO_TEMPORAL):
+                if ahora - stat.st_mtime > 3600:
+                    self._eliminar(entrada.path)
+                continue
+            if entrada.name.endswith(self.SUFIJO_META):
+                continue
+            total += stat.st_size
+            if entrada.path != conservar:
+                documentos.append((stat.st_mtime, stat.st_size, entrada.path))
+
+        if total <= self.max_bytes:
+            return 0
+
+        objetivo = self.max_bytes * 0.9
+        eliminados = 0
+        for _, tamanio, ruta in sorted(documentos):
+            if total <= objetivo:
+                break
+            self._eliminar(ruta)
+            self._eliminar(ruta + self.SUFIJO_META)
+            total -= tamanio
+            eliminados += 1
+
+        logger.info(f"Barrido del almacén: {eliminados} artefactos eliminados, {total} bytes en uso")
+        return eliminados
+
+    @staticmethod
+    def _eliminar(ruta: str) -> None:
+        try:
+            os.unlink(ruta)
+        except FileNotFoundError:
+            pass
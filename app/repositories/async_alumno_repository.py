@@ -0,0 +1,77 @@
+import httpx
+import logging
+from typing import Optional, cast
+from flask import current_app
+
+from app.repositories.async_redis_client import AsyncRedisClient
+from app.mapping import AlumnoMapping
+from app.models import Alumno
+from app.utils import retry
+from app.utils.metricas import registrar_cache, registrar_upstream
+
+logger = logging.getLogger(__name__)
+
+class AsyncAlumnoRepository:
+    """Versión asíncrona de AlumnoRepository (cache Redis + httpx) para el modo ASGI"""
+    
+    def __init__(self, http_client: httpx.AsyncClient,
+                 redis_client: Optional[AsyncRedisClient] = None,
+                 alumno_mapping: Optional[AlumnoMapping] = None):
+        """
+        Constructor con inyección de dependencias.
+        
+        Args:
+            http_client: Cliente HTTP asíncrono compartido (pool de conexiones)
+            redis_client: Cliente Redis asíncrono (opcional, se crea uno por defecto)
+            alumno_mapping: Mapper de alumno (opcional, se crea uno por defecto)
+        """
+        self.http_client = http_client
+        self.redis_client = redis_client or AsyncRedisClient()
+        self.alumno_mapping = alumno_mapping or AlumnoMapping()
+    
+    def _get_cache_key(self, alumno_id: int) -> str:
+        """Genera la clave de cache para un alumno (compartida con AlumnoRepository)"""
+        return f"alumno:{alumno_id}"
+    
+    @retry(max_attempts=3, delay=0.5, backoff=2.0, exceptions=(httpx.HTTPError,))
+    async def _fetch_from_service(self, alumno_id: int) -> dict:
+        """Obtiene el alumno desde el microservicio externo con retry automático"""
+        url = f"{current_app.config['ALUMNO_SERVICE_URL']}/alumnos/{alumno_id}"
+        timeout = current_app.config['REQUEST_TIMEOUT']
+        try:
+            response = await self.http_client.get(url, timeout=timeout)
+        except httpx.HTTPError:
+            registrar_upstream('alumnos', 'error')
+            raise
+        registrar_upstream('alumnos', response.status_code)
+        response.raise_for_status()
+        return response.json()
+    
+    async def get_alumno_by_id(self, alumno_id: int) -> Optional[Alumno]:
+        """Obtiene un alumno por ID usando cache Redis"""
+        cache_key = self._get_cache_key(alumno_id)
+        
+        cached_data = await self.redis_client.get(cache_key)
+        registrar_cache('redis_alumno', bool(cached_data))
+        if cached_data:
+            try:
+                return cast(Alumno, self.alumno_mapping.load(cached_data))
+            except Exception as e:
+                logger.error(f"Error al deserializar alumno desde cache: {e}")
+                await self.redis_client.delete(cache_key)
+        
+        try:
+            alumno_data = await self._fetch_from_service(alumno_id)
+            
+            ttl = current_app.config['CACHE_ALUMNO_TTL']
+            await self.redis_client.set(cache_key, alumno_data, ttl)
+            
+            return cast(Alumno, self.alumno_mapping.load(alumno_data))
+            
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                return None
+            raise
+        except Exception as e:
+            logger.error(f"Error al obtener alumno {alumno_id}: {e}")
+            raise
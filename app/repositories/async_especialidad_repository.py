@@ -0,0 +1,79 @@
+import httpx
+import logging
+from typing import Optional, cast
+from flask import current_app
+
+from app.repositories.async_redis_client import AsyncRedisClient
+from app.mapping import EspecialidadMapping
+from app.models import Especialidad
+from app.utils import retry
+from app.utils.metricas import registrar_cache, registrar_upstream
+
+logger = logging.getLogger(__name__)
+
+class AsyncEspecialidadRepository:
+    """Versión asíncrona de EspecialidadRepository (cache Redis + httpx) para el modo ASGI"""
+    
+    def __init__(self, http_client: httpx.AsyncClient,
+                 redis_client: Optional[AsyncRedisClient] = None,
+                 especialidad_mapping: Optional[EspecialidadMapping] = None):
+        """
+        Constructor con inyección de dependencias.
+        
+        Args:
+            http_client: Cliente HTTP asíncrono compartido (pool de conexiones)
+            redis_client: Cliente Redis asíncrono (opcional, se crea uno por defecto)
+            especialidad_mapping: Mapper de especialidad (opcional, se crea uno por defecto)
+        """
+        self.http_client = http_client
+        self.redis_client = redis_client or AsyncRedisClient()
+        self.especialidad_mapping = especialidad_mapping or EspecialidadMapping()
+    
+    def _get_cache_key(self, especialidad_id: int) -> str:
+        """Genera la clave de cache para una especialidad (compartida con EspecialidadRepository)"""
+        return f"especialidad:{especialidad_id}"
+    
+    @retry(max_attempts=3, delay=0.5, backoff=2.0, exceptions=(httpx.HTTPError,))
+    async def _fetch_from_service(self, especialidad_id: int) -> dict:
+        """Obtiene la especialidad desde el microservicio externo con retry automático"""
+        url = f"{current_app.config['ESPECIALIDAD_SERVICE_URL']}/especialidades/{especialidad_id}"
+        timeout = current_app.config['REQUEST_TIMEOUT']
+        try:
+            response = await self.http_client.get(url, timeout=timeout)
+        except httpx.HTTPError:
+            registrar_upstream('academica', 'error')
+            raise
+        registrar_upstream('academica', response.status_code)
+        response.raise_for_status()
+        return response.json()
+    
+    async def get_especialidad_by_id(self, especialidad_id: int) -> Optional[Especialidad]:
+        """Obtiene una especialidad por ID usando cache Redis (None si no existe)"""
+        cache_key = self._get_cache_key(especialidad_id)
+        
+        cached_data = await self.redis_client.get(cache_key)
+        registrar_cache('redis_especialidad', bool(cached_data))
+        if cached_data:
+            logger.debug(f"Cache HIT para especialidad {especialidad_id}")
+            try:
+                return cast(Especialidad, self.especialidad_mapping.load(cached_data))
+            except Exception as e:
+                logger.error(f"Error al deserializar especialidad desde cache: {e}")
+                await self.redis_client.delete(cache_key)
+        
+        logger.debug(f"Cache MISS para especialidad {especialidad_id}")
+        try:
+            especialidad_data = await self._fetch_from_service(especialidad_id)
+            
+            ttl = current_app.config['CACHE_ESPECIALIDAD_TTL']
+            await self.redis_client.set(cache_key, especialidad_data, ttl)
+            
+            return cast(Especialidad, self.especialidad_mapping.load(especialidad_data))
+            
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                return None
+            raise
+        except Exception as e:
+            logger.error(f"Error al obtener especialidad {especialidad_id}: {e}")
+            raise
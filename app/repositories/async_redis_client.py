@@ -0,0 +1,58 @@
+import json
+import logging
+from typing import Optional, Any
+from flask import current_app
+from redis import asyncio as aioredis
+import redis
+
+logger = logging.getLogger(__name__)
+
+class AsyncRedisClient:
+    """
+    Cliente Redis asíncrono para el modo ASGI.
+    
+    Misma interfaz y semántica que RedisClient (JSON, errores silenciosos),
+    pero sin bloquear el event loop mientras espera a Redis.
+    """
+    
+    def __init__(self):
+        """Crea el pool de conexiones (la conexión se abre en el primer comando)"""
+        self.client = aioredis.Redis(
+            host=current_app.config['REDIS_HOST'],
+            port=current_app.config['REDIS_PORT'],
+            db=current_app.config['REDIS_DB'],
+            password=current_app.config.get('REDIS_PASSWORD'),
+            decode_responses=True,
+            socket_connect_timeout=5,
+            socket_timeout=5
+        )
+    
+    async def get(self, key: str) -> Optional[Any]:
+        """Obtiene un valor de Redis deserializado desde JSON"""
+        try:
+            value = await self.client.get(key)
+            return json.loads(value) if value else None
+        except (json.JSONDecodeError, redis.RedisError) as e:
+            logger.error(f"Error al obtener {key}: {e}")
+            return None
+    
+    async def set(self, key: str, value: Any, ttl: int) -> bool:
+        """Almacena un valor en Redis serializado a JSON"""
+        try:
+            await self.client.setex(key, ttl, json.dumps(value))
+            return True
+        except (TypeError, json.JSONDecodeError, redis.RedisError) as e:
+            logger.error(f"Error al almacenar {key}: {e}")
+            return False
+    
+    async def delete(self, key: str) -> bool:
+        """Elimina una clave de Redis"""
+        try:
+            return bool(await self.client.delete(key))
+        except redis.RedisError as e:
+            logger.error(f"Error al eliminar {key}: {e}")
+            return False
+    
+    async def close(self) -> None:
+        """Cierra el pool de conexiones"""
+        await self.client.close()
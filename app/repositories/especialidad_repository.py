@@ -7,6 +7,7 @@ from app.repositories.redis_client import RedisClient
 from app.mapping import EspecialidadMapping
 from app.models import Especialidad
 from app.utils import retry
+from app.utils.metricas import registrar_cache, registrar_upstream
 
 logger = logging.getLogger(__name__)
 
@@ -34,7 +35,12 @@ class EspecialidadRepository:
         """Obtiene la especialidad desde el microservicio externo con retry automático"""
         url = f"{current_app.config['ESPECIALIDAD_SERVICE_URL']}/especialidades/{especialidad_id}"
         timeout = current_app.config['REQUEST_TIMEOUT']
-        response = requests.get(url, timeout=timeout)
+        try:
+            response = requests.get(url, timeout=timeout)
+        except requests.RequestException:
+            registrar_upstream('academica', 'error')
+            raise
+        registrar_upstream('academica', response.status_code)
         response.raise_for_status()
         return response.json()
     
@@ -63,8 +69,9 @@ class EspecialidadRepository:
         
         # Intentar obtener del cache
         cached_data = self.redis_client.get(cache_key)
+        registrar_cache('redis_especialidad', bool(cached_data))
         if cached_data:
-            logger.debug(f"Cache HIT para especialidad {especialidad_id}")
+            logger.debug("Cache HIT para especialidad %s", especialidad_id)
             try:
                 return self.especialidad_mapping.load(cached_data)
             except Exception as e:
@@ -72,14 +79,14 @@ class EspecialidadRepository:
                 self.redis_client.delete(cache_key)
         
         # Cache miss - consultar servicio
-        logger.debug(f"Cache MISS para especialidad {especialidad_id}")
+        logger.debug("Cache MISS para especialidad %s", especialidad_id)
         try:
             especialidad_data = self._fetch_from_service(especialidad_id)
             
             # Guardar en cache
             ttl = current_app.config['CACHE_ESPECIALIDAD_TTL']
             self.redis_client.set(cache_key, especialidad_data, ttl)
-            logger.debug(f"Especialidad {especialidad_id} guardada en cache (TTL={ttl}s)")
+            logger.debug("Especialidad %s guardada en cache (TTL=%ss)", especialidad_id, ttl)
             
             return self.especialidad_mapping.load(especialidad_data)
             
@@ -0,0 +1,217 @@
+import json
+import logging
+import uuid
+from typing import Dict, List, Optional, cast
+from flask import current_app
+
+import redis
+
+from app.repositories.redis_client import RedisClient
+from app.exceptions import ServiceUnavailableException
+
+logger = logging.getLogger(__name__)
+
+class JobRepository:
+    """
+    Repositorio de jobs asíncronos de certificados sobre Redis.
+
+    Estructura en Redis:
+    - jobs:cola              → lista con los IDs pendientes (LPUSH / BLMOVE)
+    - jobs:procesando        → IDs tomados por un worker y todavía sin confirmar
+    - job:<id>               → hash con el estado y los parámetros del job
+    - job:<id>:resultado     → documento (o ZIP) generado, en binario
+    - job:<id>:fin           → aviso de fin para el long-polling (un elemento)
+
+    Desencolar mueve el ID a jobs:procesando en la misma operación: si el
+    worker muere antes de confirmar, el job sigue ahí y otro worker lo
+    reencola (ver JobService.recuperar_huerfanos).
+
+    Todas las claves de un job expiran (JOB_TTL / JOB_RESULT_TTL).
+    """
+
+    COLA_KEY = "jobs:cola"
+    PROCESANDO_KEY = "jobs:procesando"
+
+    # Quita el ID de jobs:procesando y lo devuelve a la cola en un solo paso,
+    # para que dos workers no reencolen el mismo job
+    _REENCOLAR = """
+    if redis.call('LREM', KEYS[1], 1, ARGV[1]) == 1 then
+        redis.call('RPUSH', KEYS[2], ARGV[1])
+        return 1
+    end
+    return 0
+    """
+
+    def __init__(self, redis_client: Optional[RedisClient] = None):
+        """
+        Constructor con inyección de dependencias.
+
+        Args:
+            redis_client: Cliente Redis binario (opcional, se crea uno por defecto)
+        """
+        self.redis_client = redis_client or RedisClient(decode_responses=False)
+
+    def _get_job_key(self, job_id: str) -> str:
+        """Genera la clave del hash de estado de un job"""
+        return f"job:{job_id}"
+
+    def _get_resultado_key(self, job_id: str) -> str:
+        """Genera la clave del resultado binario de un job"""
+        return f"job:{job_id}:resultado"
+
+    def _get_fin_key(self, job_id: str) -> str:
+        """Genera la clave del aviso de fin de un job"""
+        return f"job:{job_id}:fin"
+
+    def _cliente(self) -> redis.Redis:
+        """Retorna el cliente Redis o falla si no hay conexión (la cola no tiene fallback)"""
+        if not self.redis_client.client:
+            raise ServiceUnavailableException('redis', 'La cola de jobs requiere Redis')
+        return self.redis_client.client
+
+    def crear(self, datos: dict) -> str:
+        """Registra un job nuevo en estado 'pendiente' y lo encola"""
+        job_id = uuid.uuid4().hex
+        job_key = self._get_job_key(job_id)
+        ttl = current_app.config['JOB_TTL']
+
+        campos = {clave: json.dumps(valor) for clave, valor in datos.items()}
+
+        try:
+            pipe = self._cliente().pipeline()
+            pipe.hset(job_key, mapping=campos)
+            pipe.expire(job_key, ttl)
+            pipe.lpush(self.COLA_KEY, job_id)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.error(f"Error al encolar job {job_id}: {e}")
+            raise ServiceUnavailableException('redis', str(e))
+
+        logger.info(f"Job {job_id} encolado")
+        return job_id
+
+    def obtener(self, job_id: str) -> Optional[dict]:
+        """Obtiene el estado de un job o None si no existe/expiró"""
+        try:
+            campos = cast(Dict[bytes, bytes], self._cliente().hgetall(self._get_job_key(job_id)))
+        except redis.RedisError as e:
+            logger.error(f"Error al obtener job {job_id}: {e}")
+            raise ServiceUnavailableException('redis', str(e))
+
+        if not campos:
+            return None
+        return {clave.decode('utf-8'): json.loads(valor) for clave, valor in campos.items()}
+
+    def actualizar(self, job_id: str, **campos) -> None:
+        """Actualiza campos del hash de un job"""
+        try:
+            self._cliente().hset(
+                self._get_job_key(job_id),
+                mapping={clave: json.dumps(valor) for clave, valor in campos.items()}
+            )
+        except redis.RedisError as e:
+            logger.error(f"Error al actualizar job {job_id}: {e}")
+            raise ServiceUnavailableException('redis', str(e))
+
+    def guardar_resultado(self, job_id: str, contenido: bytes) -> None:
+        """Guarda el documento generado con TTL propio"""
+        ttl = current_app.config['JOB_RESULT_TTL']
+        try:
+            self._cliente().setex(self._get_resultado_key(job_id), ttl, contenido)
+        except redis.RedisError as e:
+            logger.error(f"Error al guardar resultado del job {job_id}: {e}")
+            raise ServiceUnavailableException('redis', str(e))
+
+    def obtener_resultado(self, job_id: str) -> Optional[bytes]:
+        """Obtiene el documento generado o None si expiró"""
+        try:
+            return cast(Optional[bytes], self._cliente().get(self._get_resultado_key(job_id)))
+        except redis.RedisError as e:
+            logger.error(f"Error al obtener resultado del job {job_id}: {e}")
+            raise ServiceUnavailableException('redis', str(e))
+
+    def desencolar(self, timeout: int = 2) -> Optional[str]:
+        """
+        Espera (bloqueante) el próximo job de la cola y lo pasa a jobs:procesando.
+
+        El worker debe llamar a confirmar() al terminarlo, haya salido bien o mal.
+
+        Args:
+            timeout: Segundos máximos de espera (menor al socket_timeout del cliente)
+
+        Returns:
+            ID del job o None si no llegó ninguno en el tiempo indicado
+        """
+        job_id = cast(Optional[bytes],
+                      self._cliente().blmove(self.COLA_KEY, self.PROCESANDO_KEY, timeout, 'RIGHT', 'LEFT'))
+        if job_id is None:
+            return None
+        return job_id.decode('utf-8')
+
+    def confirmar(self, job_id: str) -> None:
+        """Saca el job de jobs:procesando y avisa a los clientes que esperan su fin"""
+        fin_key = self._get_fin_key(job_id)
+        try:
+            pipe = self._cliente().pipeline()
+            pipe.lrem(self.PROCESANDO_KEY, 1, job_id)
+            pipe.delete(fin_key)
+            pipe.lpush(fin_key, 1)
+            pipe.expire(fin_key, current_app.config['JOB_TTL'])
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.error("Error al confirmar job %s: %s", job_id, e)
+            raise ServiceUnavailableException('redis', str(e))
+
+    def en_proceso(self) -> List[str]:
+        """IDs tomados por algún worker y todavía sin confirmar"""
+        try:
+            ids = cast(List[bytes], self._cliente().lrange(self.PROCESANDO_KEY, 0, -1))
+            return [job_id.decode('utf-8') for job_id in ids]
+        except redis.RedisError as e:
+            logger.error("Error al listar jobs en proceso: %s", e)
+            raise ServiceUnavailableException('redis', str(e))
+
+    def reencolar(self, job_id: str) -> bool:
+        """
+        Devuelve a la cola un job de jobs:procesando (queda primero para desencolar).
+
+        Returns:
+            False si otro worker ya lo confirmó o lo reencoló
+        """
+        try:
+            cliente = self._cliente()
+            # pyrefly: ignore  # bad-argument-type
+            return bool(cliente.eval(self._REENCOLAR, 2, self.PROCESANDO_KEY, self.COLA_KEY, job_id))
+        except redis.RedisError as e:
+            logger.error("Error al reencolar job %s: %s", job_id, e)
+            raise ServiceUnavailableException('redis', str(e))
+
+    def descartar(self, job_id: str) -> None:
+        """Saca de jobs:procesando un job que ya no existe"""
+        try:
+            self._cliente().lrem(self.PROCESANDO_KEY, 1, job_id)
+        except redis.RedisError as e:
+            logger.error("Error al descartar job %s: %s", job_id, e)
+            raise ServiceUnavailableException('redis', str(e))
+
+    def esperar_fin(self, job_id: str, timeout: float) -> bool:
+        """
+        Bloquea en Redis hasta que el job se confirme o pase timeout.
+
+        BLMOVE sobre la misma lista rota el aviso sin consumirlo, así que
+        todos los clientes que esperan el mismo job se despiertan.
+
+        Args:
+            timeout: Segundos máximos (menor al socket_timeout del cliente)
+
+        Returns:
+            True si el job terminó
+        """
+        fin_key = self._get_fin_key(job_id)
+        try:
+            # BLMOVE acepta segundos con decimales (Redis >= 6); el stub de redis-py declara int
+            # pyrefly: ignore  # bad-argument-type
+            return self._cliente().blmove(fin_key, fin_key, timeout, 'RIGHT', 'LEFT') is not None
+        except redis.RedisError as e:
+            logger.error("Error al esperar el fin del job %s: %s", job_id, e)
+            raise ServiceUnavailableException('redis', str(e))
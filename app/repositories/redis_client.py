@@ -9,15 +9,21 @@ logger = logging.getLogger(__name__)
 class RedisClient:
     """Cliente para gestionar conexiones con Redis"""
     
-    def __init__(self):
-        """Inicializa la conexión a Redis"""
+    def __init__(self, decode_responses: bool = True):
+        """
+        Inicializa la conexión a Redis.
+        
+        Args:
+            decode_responses: Si es False las respuestas llegan como bytes
+                              (necesario para guardar documentos binarios)
+        """
         try:
             self.client = redis.Redis(
                 host=current_app.config['REDIS_HOST'],
                 port=current_app.config['REDIS_PORT'],
                 db=current_app.config['REDIS_DB'],
                 password=current_app.config.get('REDIS_PASSWORD'),
-                decode_responses=True,
+                decode_responses=decode_responses,
                 socket_connect_timeout=5,
                 socket_timeout=5
             )
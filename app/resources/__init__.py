@@ -1,3 +1,5 @@
-
 from .home import home
 from .certificado_resource import certificado_bp
+from .job_resource import jobs_bp
+from .metricas_resource import metricas_bp
+from .admin_resource import admin_bp
@@ -0,0 +1,108 @@
+import hmac
+import logging
+import os
+import tracemalloc
+from flask import Blueprint, Response, current_app, jsonify, request
+from app.exceptions import AdminUnauthorizedException, MemoryTracingUnavailableException
+from app.utils.memoria import obtener_snapshots, reciclaje_actual, rss_bytes
+from app.utils.metricas import costos
+from app.utils.perfilador_muestreo import perfilador_actual
+
+logger = logging.getLogger(__name__)
+admin_bp = Blueprint('admin', __name__)
+
+
+@admin_bp.before_request
+def verificar_token():
+    """Con ADMIN_TOKEN configurado, exige el mismo valor en X-Admin-Token"""
+    token = current_app.config.get('ADMIN_TOKEN')
+    if token and not hmac.compare_digest(request.headers.get('X-Admin-Token', ''), token):
+        logger.warning(f"Acceso denegado a {request.path} desde {request.remote_addr}")
+        raise AdminUnauthorizedException()
+
+
+@admin_bp.route('/admin/perfil/muestras', methods=['GET'])
+def perfil_muestras() -> Response:
+    """
+    Pilas colapsadas del perfilador por muestreo de este worker (entrada de flamegraph.pl).
+    
+    Query: ?ventana=1 para solo las muestras posteriores al último volcado a disco.
+    """
+    perfilador = perfilador_actual()
+    texto = perfilador.texto(ventana=request.args.get('ventana') == '1') if perfilador else ''
+    return Response(texto, mimetype='text/plain')
+
+
+@admin_bp.route('/admin/perfil/estado', methods=['GET'])
+def perfil_estado() -> Response:
+    """Muestras tomadas, intervalo efectivo y overhead medido del perfilador de este worker"""
+    perfilador = perfilador_actual()
+    if perfilador is None:
+        return jsonify({'activo': False, 'habilitado': current_app.config.get('PROFILING_SAMPLER_ENABLED', False)})
+    return jsonify({**perfilador.estado(), 'habilitado': True})
+
+
+def _parametros_snapshot():
+    if not tracemalloc.is_tracing():
+        raise MemoryTracingUnavailableException('tracemalloc no está activo (TRACEMALLOC_ENABLED=false)')
+    agrupar = request.args.get('agrupar', 'lineno')
+    if agrupar not in ('lineno', 'filename', 'traceback'):
+        agrupar = 'lineno'
+    return request.args.get('top', 20, type=int), agrupar
+
+
+@admin_bp.route('/admin/memoria', methods=['GET'])
+def memoria_estado() -> Response:
+    """RSS del worker, memoria rastreada por tracemalloc y estado del reciclaje"""
+    actual, pico = tracemalloc.get_traced_memory()
+    snapshots = obtener_snapshots()
+    reciclaje = reciclaje_actual()
+    return jsonify({
+        'rss_bytes': rss_bytes(),
+        'tracemalloc': {
+            'activo': tracemalloc.is_tracing(),
+            'frames': tracemalloc.get_traceback_limit(),
+            'actual_bytes': actual,
+            'pico_bytes': pico,
+            'snapshot_base': snapshots.momento_base,
+        },
+        'reciclaje': reciclaje.estado() if reciclaje else None,
+    })
+
+
+@admin_bp.route('/admin/memoria/snapshot', methods=['POST'])
+def memoria_snapshot() -> Response:
+    """
+    Toma el snapshot base de este worker y devuelve sus mayores asignaciones.
+    
+    Query: ?top=20&agrupar=lineno|filename|traceback
+    """
+    top, agrupar = _parametros_snapshot()
+    return jsonify({'asignaciones': obtener_snapshots().tomar_base(top, agrupar)})
+
+
+@admin_bp.route('/admin/memoria/diff', methods=['GET'])
+def memoria_diff() -> Response:
+    """Mayores crecimientos de memoria desde el snapshot base (mismos parámetros que snapshot)"""
+    top, agrupar = _parametros_snapshot()
+    diferencias = obtener_snapshots().diferencias(top, agrupar)
+    if diferencias is None:
+        raise MemoryTracingUnavailableException('No hay snapshot base: POST /api/v1/admin/memoria/snapshot')
+    return jsonify({'diferencias': diferencias})
+
+
+@admin_bp.route('/admin/costos', methods=['GET'])
+def costos_por_formato() -> Response:
+    """
+    CPU y tiempo real por etapa y formato acumulados en este worker desde su
+    inicio (o el último DELETE), con la relación CPU/tiempo real y los núcleos
+    necesarios por cada 100 req/s de cada formato.
+    """
+    return jsonify({'pid': os.getpid(), 'formatos': costos.resumen()})
+
+
+@admin_bp.route('/admin/costos', methods=['DELETE'])
+def costos_reiniciar() -> Response:
+    """Reinicia el acumulado de este worker (por ejemplo, antes de una prueba de carga)"""
+    costos.reiniciar()
+    return jsonify({'pid': os.getpid(), 'formatos': {}})
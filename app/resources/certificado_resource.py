@@ -1,7 +1,16 @@
-from flask import Blueprint, send_file, jsonify
+import os
+from io import BytesIO
+from typing import Dict, Optional, TypedDict, cast
+from flask import Blueprint, Response, send_file, jsonify, request, current_app
+from werkzeug.http import is_resource_modified
+from marshmallow import ValidationError
 from app.services import AlumnoService
-from app.exceptions import DocumentGenerationException
-from app.validators import validar_id_alumno
+from app.mapping import CertificadoPayloadMapping
+from app.models import Alumno
+from app.exceptions import DocumentGenerationException, InvalidPayloadException, InvalidSignatureException
+from app.validators import validar_id_alumno, validar_firma_payload
+from app.utils import empaquetar_zip, empaquetar_multipart
+from app.utils.metricas import etapa, sumar_tiempos
 import logging
 
 logger = logging.getLogger(__name__)
@@ -17,8 +26,18 @@ def get_alumno_service():
         _alumno_service = AlumnoService()
     return _alumno_service
 
+# Clave del environ WSGI con el CertificadoPreparado (o la excepción) que el
+# modo ASGI obtuvo de forma asíncrona antes de entregar el request a Flask
+CLAVE_PREPARADO = 'documentos.certificado_preparado'
+
+class FormatoRespuesta(TypedDict):
+    mimetype: str
+    as_attachment: bool
+    download_name: Optional[str]
+
+
 # Configuración de formatos soportados
-FORMATOS_SOPORTADOS = {
+FORMATOS_SOPORTADOS: Dict[str, FormatoRespuesta] = {
     'pdf': {
         'mimetype': 'application/pdf',
         'as_attachment': False,
@@ -46,18 +65,85 @@ def _generar_certificado(alumno_id: int, formato: str):
             f"El ID del alumno debe ser un número positivo. Recibido: {alumno_id}"
         )
     
-    logger.info(f"Generando certificado {formato.upper()} para alumno ID: {alumno_id}")
-    documento = get_alumno_service().generar_certificado_alumno_regular(alumno_id, formato)
+    logger.info("Generando certificado %s para alumno ID: %s", formato.upper(), alumno_id)
+    servicio = get_alumno_service()
+    preparado = request.environ.get(CLAVE_PREPARADO)
+    if isinstance(preparado, Exception):
+        raise preparado
+    if preparado is not None:
+        context, huella = preparado.context, preparado.huella
+        sumar_tiempos(preparado.tiempos)
+    else:
+        context, huella = servicio.preparar_certificado(alumno_id, formato)
+    
+    # La huella se conoce sin renderizar: un cliente con la versión vigente recibe 304.
+    # Es el único validador: ninguna fecha refleja un cambio de datos del alumno o de plantilla
+    if not is_resource_modified(request.environ, etag=huella):
+        logger.info("Certificado %s de alumno %s sin cambios: 304", formato.upper(), alumno_id)
+        return _respuesta_no_modificado(huella)
+    
+    if current_app.config['ARTIFACT_STORE_ENABLED']:
+        # Archivo real abierto: send_file usa sendfile y soporta Range
+        documento = servicio.obtener_artefacto(context, formato, huella)
+    else:
+        documento = servicio.renderizar_certificado(context, formato, huella)
+    
+    return _enviar_documento(documento, formato, alumno_id, etag=huella)
+
+
+def _respuesta_no_modificado(huella: str) -> Response:
+    response = Response(status=304)
+    response.set_etag(huella)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+def _leer_payload_certificado() -> Alumno:
+    """Verifica la firma (si está configurada) y deserializa el body con Marshmallow."""
+    secreto = current_app.config.get('PAYLOAD_SIGNATURE_SECRET')
+    if secreto:
+        firma = request.headers.get(current_app.config['PAYLOAD_SIGNATURE_HEADER'])
+        if not validar_firma_payload(request.get_data(cache=True), firma, secreto):
+            raise InvalidSignatureException()
+    
+    datos = request.get_json(silent=True)
+    if datos is None:
+        raise InvalidPayloadException({'_schema': ['Se esperaba un body JSON']})
     
+    try:
+        return cast(Alumno, CertificadoPayloadMapping().load(datos))
+    except ValidationError as err:
+        raise InvalidPayloadException(err.normalized_messages())
+
+
+def _enviar_documento(documento, formato: str, alumno_id, etag=None):
+    """Arma la respuesta HTTP (BytesIO o archivo del almacén) con el mimetype y nombre de descarga del formato."""
     config = FORMATOS_SOPORTADOS[formato]
     download_name = config['download_name'].format(id=alumno_id) if config['download_name'] else None
     
-    return send_file(
-        documento,
-        mimetype=config['mimetype'],
-        as_attachment=config['as_attachment'],
-        download_name=download_name
-    )
+    with etapa('empaquetado', formato):
+        response = send_file(
+            documento,
+            mimetype=config['mimetype'],
+            as_attachment=config['as_attachment'],
+            download_name=download_name,
+            conditional=not etag,
+            etag=etag if etag else True
+        )
+        if response.content_length is None and not isinstance(documento, BytesIO):
+            # send_file solo calcula el tamaño de rutas y BytesIO; Range lo necesita
+            response.headers['Content-Length'] = str(os.fstat(documento.fileno()).st_size)
+        if etag:
+            # send_file pone como Last-Modified el mtime del archivo del almacén, que no
+            # cambia con los datos: se quita antes de evaluar If-None-Match y Range
+            response.headers.pop('Last-Modified', None)
+            response = response.make_conditional(request.environ, accept_ranges=True,
+                                                 complete_length=response.content_length)
+            # Revalidar siempre: el documento cambia si cambian los datos del alumno
+            response.cache_control.private = True
+            response.cache_control.no_cache = True
+    return response
 
 
 @certificado_bp.route('/certificado/<int:id>/pdf', methods=['GET'])
@@ -93,4 +179,67 @@ def reporte_en_docx(id: int):
         raise
     except Exception as e:
         logger.error(f"Error inesperado generando DOCX para alumno {id}: {str(e)}")
-        raise
\ No newline at end of file
+        raise
+
+
+@certificado_bp.route('/certificado/<any(pdf, odt, docx):formato>', methods=['POST'])
+def certificado_desde_payload(formato: str):
+    """
+    Genera certificado con los datos enviados en el body (sin consultar MS externos).
+    
+    Pensado para microservicios que ya tienen el registro completo del alumno.
+    """
+    alumno = _leer_payload_certificado()
+    identificador = alumno.id or alumno.legajo
+    
+    logger.info("Generando certificado %s desde payload para alumno: %s", formato.upper(), identificador)
+    documento = get_alumno_service().generar_certificado_desde_datos(alumno, formato)
+    
+    return _enviar_documento(documento, formato, identificador)
+
+
+
+@certificado_bp.route('/certificado/<int:id>/multiformato', methods=['GET'])
+def certificado_multiformato(id: int):
+    """
+    Genera el certificado en varios formatos con una sola búsqueda del alumno.
+    
+    Query: ?formatos=pdf,docx,odt (por defecto todos). Responde un ZIP, o
+    multipart/mixed si el cliente lo pide en el header Accept.
+    """
+    if not validar_id_alumno(id):
+        logger.warning(f"ID de alumno inválido: {id}")
+        raise DocumentGenerationException(
+            'multiformato',
+            f"El ID del alumno debe ser un número positivo. Recibido: {id}"
+        )
+    
+    formatos = [f.strip().lower() for f in request.args.get('formatos', 'pdf,docx,odt').split(',') if f.strip()]
+    formatos = list(dict.fromkeys(formatos))  # sin duplicados, respetando el orden
+    no_soportados = [f for f in formatos if f not in FORMATOS_SOPORTADOS]
+    if not formatos or no_soportados:
+        raise InvalidPayloadException({'formatos': [f'Formatos no soportados: {no_soportados}. '
+                                                    f'Válidos: {list(FORMATOS_SOPORTADOS)}']})
+    
+    logger.info("Generando certificado multiformato %s para alumno ID: %s", formatos, id)
+    documentos = get_alumno_service().generar_certificados_multiformato(id, formatos)
+    
+    nombres = {formato: f'certificado_alumno_{id}.{formato}' for formato in formatos}
+    
+    if request.accept_mimetypes.best_match(['application/zip', 'multipart/mixed']) == 'multipart/mixed':
+        partes = {
+            nombres[formato]: (FORMATOS_SOPORTADOS[formato]['mimetype'], documento.getvalue())
+            for formato, documento in documentos.items()
+        }
+        with etapa('empaquetado', 'multiformato'):
+            cuerpo, boundary = empaquetar_multipart(partes)
+        return Response(cuerpo, mimetype=f'multipart/mixed; boundary={boundary}')
+    
+    with etapa('empaquetado', 'multiformato'):
+        zip_io = empaquetar_zip({nombres[formato]: documento.getvalue() for formato, documento in documentos.items()})
+    return send_file(
+        zip_io,
+        mimetype='application/zip',
+        as_attachment=True,
+        download_name=f'certificados_alumno_{id}.zip'
+    )
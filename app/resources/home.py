@@ -5,6 +5,8 @@ from flask import jsonify, Blueprint, current_app
 from flask.wrappers import Response
 import requests
 import logging
+from app.services.documentos_office_service import formatos_habilitados, registro_documentos
+from app.utils.monitor_salud import obtener_monitor
 
 home = Blueprint('home', __name__)
 start_time = time.time()
@@ -30,7 +32,7 @@ def _check_service(url: str, service_name: str) -> dict:
     try:
         response = requests.get(
             f"{url.rstrip('/')}/health",
-            timeout=3
+            timeout=current_app.config.get('HEALTH_CHECK_TIMEOUT', 3)
         )
         if response.status_code == 200:
             return {'status': 'healthy', 'url': url}
@@ -40,6 +42,16 @@ def _check_service(url: str, service_name: str) -> dict:
         return {'status': 'unhealthy', 'url': url, 'message': str(e)}
 
 
+def _chequeos() -> dict:
+    """Chequeos de dependencias que ejecuta el monitor de salud en segundo plano"""
+    config = current_app.config
+    return {
+        'redis': _check_redis,
+        'alumno_service': lambda: _check_service(config['ALUMNO_SERVICE_URL'], 'Alumno Service'),
+        'especialidad_service': lambda: _check_service(config['ESPECIALIDAD_SERVICE_URL'], 'Especialidad Service'),
+    }
+
+
 @home.route('/', methods=['GET'])
 def index() -> Response:
     return jsonify('OK'), 200
@@ -49,7 +61,9 @@ def index() -> Response:
 def health() -> Response:
     """
     Endpoint de healthcheck profundo para monitoreo y orquestadores.
-    Verifica Redis y microservicios externos críticos.
+    Informa el estado de Redis y de los microservicios externos críticos
+    según el último chequeo del monitor de salud (HEALTH_CHECK_INTERVAL), con
+    la antigüedad de cada resultado; no consulta las dependencias en el request.
     
     Returns:
         200: Todos los servicios saludables
@@ -67,21 +81,13 @@ def health() -> Response:
         }), 200
     
     # Health check profundo para producción
+    # pyrefly: ignore  # missing-attribute
+    monitor = obtener_monitor(current_app._get_current_object(), _chequeos())
     checks = {
         'status': 'healthy',
         'service': 'documentos-service',
         'timestamp': datetime.utcnow().isoformat() + 'Z',
-        'dependencies': {
-            'redis': _check_redis(),
-            'alumno_service': _check_service(
-                current_app.config['ALUMNO_SERVICE_URL'],
-                'Alumno Service'
-            ),
-            'especialidad_service': _check_service(
-                current_app.config['ESPECIALIDAD_SERVICE_URL'],
-                'Especialidad Service'
-            )
-        }
+        'dependencies': monitor.instantanea()
     }
     
     # Verificar si alguna dependencia crítica está caída
@@ -107,6 +113,8 @@ def info_service() -> Response:
         "service": "certificados-api",
         "version": "1.0.0",
         "uptime_seconds": int(time.time() - start_time),
+        "formatos_habilitados": list(formatos_habilitados()),
+        "backends": registro_documentos.estado(),
         "timestamp": datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
     }
     return jsonify(data), 200
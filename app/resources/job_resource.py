@@ -0,0 +1,69 @@
+from typing import Optional, cast
+from flask import Blueprint, send_file, jsonify, request, current_app, url_for
+from marshmallow import ValidationError
+from app.services.job_service import JobService
+from app.mapping import JobCertificadoMapping
+from app.exceptions import InvalidPayloadException
+import logging
+
+logger = logging.getLogger(__name__)
+jobs_bp = Blueprint('jobs', __name__)
+
+# Instancia única del servicio (inicialización lazy)
+_job_service: Optional[JobService] = None
+
+def get_job_service():
+    """Obtiene la instancia del servicio de jobs (lazy initialization)."""
+    global _job_service
+    if _job_service is None:
+        _job_service = JobService()
+    return _job_service
+
+
+def _con_links(job: dict) -> dict:
+    """Agrega las URLs de estado y resultado a la representación del job."""
+    job_id = job['job_id']
+    job['links'] = {
+        'estado': url_for('jobs.estado_job', job_id=job_id),
+        'resultado': url_for('jobs.resultado_job', job_id=job_id),
+    }
+    return job
+
+
+@jobs_bp.route('/jobs/certificados', methods=['POST'])
+def crear_job_certificados():
+    """Registra un job de certificado o de lote y responde 202 sin generar nada"""
+    try:
+        datos = cast(dict, JobCertificadoMapping().load(request.get_json(silent=True) or {}))
+    except ValidationError as err:
+        raise InvalidPayloadException(err.normalized_messages())
+
+    alumno_ids = datos.get('alumno_ids') or [datos['alumno_id']]
+    maximo = current_app.config['JOB_BATCH_MAX']
+    if len(alumno_ids) > maximo:
+        raise InvalidPayloadException({'alumno_ids': [f'El lote admite como máximo {maximo} alumnos']})
+
+    job = _con_links(get_job_service().crear_job(alumno_ids, datos['formato']))
+    response = jsonify(job)
+    response.headers['Location'] = job['links']['estado']
+    return response, 202
+
+
+@jobs_bp.route('/jobs/<job_id>', methods=['GET'])
+def estado_job(job_id: str):
+    """Estado del job. Con ?wait=<segundos> hace long-polling hasta que termine"""
+    espera = request.args.get('wait', default=0.0, type=float)
+    job = get_job_service().obtener_estado(job_id, espera=max(espera, 0))
+    return jsonify(_con_links(job)), 200
+
+
+@jobs_bp.route('/jobs/<job_id>/resultado', methods=['GET'])
+def resultado_job(job_id: str):
+    """Descarga el documento (o ZIP del lote) de un job completado"""
+    documento, mimetype, download_name = get_job_service().obtener_resultado(job_id)
+    return send_file(
+        documento,
+        mimetype=mimetype,
+        as_attachment=True,
+        download_name=download_name
+    )
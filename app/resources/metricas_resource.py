@@ -0,0 +1,11 @@
+from flask import Blueprint, Response
+from app.utils.metricas import exportar
+
+metricas_bp = Blueprint('metricas', __name__)
+
+
+@metricas_bp.route('/metrics', methods=['GET'])
+def metricas() -> Response:
+    """Métricas en formato de exposición de Prometheus (agregadas entre workers)"""
+    contenido, content_type = exportar()
+    return Response(contenido, content_type=content_type)
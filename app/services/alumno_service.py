@@ -1,4 +1,5 @@
-from typing import Optional
+from typing import BinaryIO, Optional
+from app.models import Alumno
 from app.services.certificate_service import CertificateService
 
 class AlumnoService:
@@ -30,3 +31,59 @@ class AlumnoService:
             BytesIO con el documento generado
         """
         return self.certificate_service.generar_certificado_alumno_regular(id, tipo)
+
+    def preparar_certificado(self, id: int, tipo: str):
+        """
+        Busca y valida los datos del certificado sin renderizarlo.
+        
+        Returns:
+            Tupla (contexto, huella de los insumos)
+        """
+        return self.certificate_service.preparar_certificado(id, tipo)
+
+    def renderizar_certificado(self, context: dict, tipo: str, huella: Optional[str] = None):
+        """Renderiza un contexto preparado (un solo render por huella en vuelo). Retorna BytesIO"""
+        return self.certificate_service.renderizar_certificado(context, tipo, huella)
+
+    def obtener_artefacto(self, context: dict, tipo: str, clave: str) -> BinaryIO:
+        """Documento del almacén, abierto, de un contexto preparado (lo genera si no existe)"""
+        return self.certificate_service.obtener_artefacto(context, tipo, clave)
+
+    def obtener_artefacto_certificado(self, id: int, tipo: str) -> BinaryIO:
+        """
+        Obtiene el certificado desde el almacén de artefactos (lo genera si no existe).
+        
+        Args:
+            id: ID del alumno
+            tipo: Formato del certificado (pdf, docx, odt)
+            
+        Returns:
+            Documento del almacén abierto para leer
+        """
+        return self.certificate_service.obtener_artefacto_certificado(id, tipo)
+
+    def generar_certificado_desde_datos(self, alumno: Alumno, tipo: str):
+        """
+        Genera un certificado con datos provistos por el llamador (sin consultar MS externos).
+        
+        Args:
+            alumno: Alumno con especialidad, facultad y universidad completas
+            tipo: Formato del certificado (pdf, docx, odt)
+            
+        Returns:
+            BytesIO con el documento generado
+        """
+        return self.certificate_service.generar_certificado_desde_datos(alumno, tipo)
+
+    def generar_certificados_multiformato(self, id: int, tipos: list):
+        """
+        Genera el certificado de un alumno en varios formatos con una sola búsqueda.
+        
+        Args:
+            id: ID del alumno
+            tipos: Formatos a generar (pdf, docx, odt)
+            
+        Returns:
+            Diccionario formato -> BytesIO
+        """
+        return self.certificate_service.generar_certificados_multiformato(id, tipos)
@@ -0,0 +1,186 @@
+import os
+import time
+import asyncio
+import logging
+from concurrent.futures import Executor
+from contextlib import contextmanager
+from io import BytesIO
+from typing import Dict, Optional, Tuple
+from flask import Flask
+
+from app.models import Alumno
+from app.services.certificate_service import CertificadoPreparado, CertificateService
+from app.services.documentos_office_service import verificar_formato_habilitado
+from app.exceptions import (AlumnoNotFoundException, EspecialidadNotFoundException, DocumentGenerationException,
+                            ServiceUnavailableException, UpstreamResponseException)
+from app.repositories.async_alumno_repository import AsyncAlumnoRepository
+from app.repositories.async_especialidad_repository import AsyncEspecialidadRepository
+from app.utils.metricas import DURACION_ETAPA
+
+# Configurar logger para este módulo
+logger = logging.getLogger(__name__)
+
+# App propia de cada proceso del ProcessPoolExecutor (ver _inicializar_proceso_render)
+_app_proceso: Optional[Flask] = None
+
+
+def _app_de_proceso() -> Flask:
+    global _app_proceso
+    if _app_proceso is None:
+        from app import create_app
+        _app_proceso = create_app()
+    return _app_proceso
+
+
+def _inicializar_proceso_render() -> None:
+    """Initializer del ProcessPoolExecutor: cada proceso crea su propia app Flask"""
+    _app_de_proceso()
+
+
+def _renderizar_en_proceso(context: dict, tipo: str) -> bytes:
+    """Renderiza dentro de un proceso del pool (retorna bytes, que sí son picklables)"""
+    with _app_de_proceso().app_context():
+        return CertificateService._renderizar(context, tipo).getvalue()
+
+
+def renderizador_en_procesos(executor: Executor):
+    """
+    Renderizador para CertificateService que delega el render a un pool de procesos.
+
+    El singleflight y el almacén de artefactos siguen corriendo en el worker:
+    solo el render (CPU) cruza al pool.
+    """
+    def renderizar(context: dict, tipo: str) -> BytesIO:
+        return BytesIO(executor.submit(_renderizar_en_proceso, context, tipo).result())
+    return renderizar
+
+
+class AsyncCertificateService:
+    """
+    Preparación asíncrona de certificados para el modo ASGI.
+
+    Solo la búsqueda del alumno y el enriquecimiento de la especialidad usan
+    Redis y HTTP asíncronos, por lo que cientos de requests pueden esperar a
+    los servicios externos sin ocupar hilos. Lo demás (contexto, huella,
+    304, almacén, singleflight y render) lo hace CertificateService desde la
+    misma ruta Flask que en modo WSGI (ver app/asgi.py).
+    """
+
+    def __init__(self, alumno_repository: AsyncAlumnoRepository,
+                 especialidad_repository: AsyncEspecialidadRepository,
+                 certificate_service: Optional[CertificateService] = None):
+        """
+        Constructor con inyección de dependencias.
+
+        Args:
+            alumno_repository: Repositorio asíncrono de alumnos
+            especialidad_repository: Repositorio asíncrono de especialidades
+            certificate_service: Servicio sincrónico que arma el contexto y la huella (opcional)
+        """
+        self.alumno_repository = alumno_repository
+        self.especialidad_repository = especialidad_repository
+        self.certificate_service = certificate_service or CertificateService()
+
+    @staticmethod
+    @contextmanager
+    def _etapa(nombre: str, tipo: str, tiempos: Dict[str, float]):
+        """
+        Tiempo real de una etapa con await adentro. No mide CPU: durante la
+        espera el hilo del event loop atiende otros requests.
+        """
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            duracion = time.perf_counter() - inicio
+            DURACION_ETAPA.labels(nombre, tipo).observe(duracion)
+            tiempos[nombre] = duracion
+
+    async def preparar_certificado_async(self, id: int, tipo: str) -> CertificadoPreparado:
+        """
+        Equivalente asíncrono de CertificateService.preparar_certificado.
+
+        Returns:
+            Contexto validado, huella de los insumos y segundos por etapa
+        """
+        logger.info('Preparando certificado para alumno %s en formato %s', id, tipo)
+        verificar_formato_habilitado(tipo)
+        tiempos: Dict[str, float] = {}
+
+        try:
+            with self._etapa('alumno', tipo, tiempos):
+                alumno = await self._buscar_alumno_por_id_async(id)
+            with self._etapa('especialidad', tipo, tiempos):
+                alumno = await self._enriquecer_especialidad_async(alumno)
+            with self._etapa('contexto', tipo, tiempos):
+                # La huella hace stat (y, si cambió el mtime, lee y hashea) cada plantilla:
+                # fuera del event loop. to_thread copia el contexto, con la app Flask incluida
+                context, huella = await asyncio.to_thread(self._contexto_y_huella, alumno, tipo)
+            return CertificadoPreparado(context, huella, tiempos)
+
+        except (AlumnoNotFoundException, EspecialidadNotFoundException,
+                ServiceUnavailableException, UpstreamResponseException, DocumentGenerationException) as e:
+            logger.error(f'Error controlado al preparar certificado: {str(e)}')
+            raise
+        except Exception as e:
+            logger.exception(f'Error inesperado al preparar certificado para alumno {id}: {str(e)}')
+            raise DocumentGenerationException(tipo, f'Error inesperado al generar certificado: {str(e)}')
+
+    def _contexto_y_huella(self, alumno: Alumno, tipo: str) -> Tuple[dict, str]:
+        context = self.certificate_service._construir_contexto(alumno, tipo)
+        return context, self.certificate_service.huella_certificado(context, tipo)
+
+    async def _buscar_alumno_por_id_async(self, id: int) -> Alumno:
+        """Equivalente asíncrono de _buscar_alumno_por_id (mock, cache Redis o MS alumnos)"""
+        USE_MOCK = os.getenv('USE_MOCK_DATA', 'true').lower() == 'true'
+
+        if USE_MOCK:
+            alumno_mock = CertificateService._get_mock_alumno(id)
+            if alumno_mock is None:
+                raise AlumnoNotFoundException(id)
+            return alumno_mock
+
+        try:
+            alumno = await self.alumno_repository.get_alumno_by_id(id)
+        except Exception as e:
+            logger.error(f'Error al buscar alumno {id}: {str(e)}')
+            raise ServiceUnavailableException('alumnos', str(e))
+
+        if alumno is None:
+            logger.warning(f'Alumno {id} no encontrado en el microservicio')
+            raise AlumnoNotFoundException(id)
+        return alumno
+
+    async def _enriquecer_especialidad_async(self, alumno: Alumno) -> Alumno:
+        """Equivalente asíncrono de _enriquecer_especialidad"""
+        USE_MOCK = os.getenv('USE_MOCK_DATA', 'true').lower() == 'true'
+
+        if USE_MOCK:
+            return alumno
+
+        especialidad = getattr(alumno, 'especialidad', None)
+        if especialidad is not None and getattr(especialidad, 'nombre', None):
+            CertificateService._verificar_facultad(especialidad)
+            return alumno
+
+        especialidad_id = getattr(especialidad, 'id', None) or getattr(alumno, 'especialidad_id', None)
+        if not especialidad_id:
+            logger.error(f'Alumno {alumno.id} tiene especialidad inválida (sin ID ni nombre)')
+            raise DocumentGenerationException(
+                'certificado',
+                f'El alumno {alumno.id} no tiene información de especialidad'
+            )
+
+        logger.info(f'Enriqueciendo especialidad {especialidad_id} desde MS académica')
+        try:
+            especialidad_completa = await self.especialidad_repository.get_especialidad_by_id(especialidad_id)
+        except Exception as e:
+            logger.error(f'Error inesperado al obtener especialidad {especialidad_id}: {str(e)}')
+            raise ServiceUnavailableException('academica', str(e))
+
+        if especialidad_completa is None:
+            raise EspecialidadNotFoundException(especialidad_id)
+        CertificateService._verificar_facultad(especialidad_completa)
+
+        alumno.especialidad = especialidad_completa
+        return alumno
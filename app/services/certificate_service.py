@@ -1,19 +1,38 @@
 import datetime
 import os
-import locale
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
-from typing import Optional
+from typing import BinaryIO, Callable, Dict, List, NamedTuple, Optional, Tuple
+from flask import current_app
 from app.validators import validar_datos_alumno, validar_contexto, validar_id_alumno
-from app.models import Alumno
-from app.services.documentos_office_service import obtener_tipo_documento
-from app.exceptions import AlumnoNotFoundException, EspecialidadNotFoundException, DocumentGenerationException, ServiceUnavailableException
+from app.models import Alumno, Especialidad, Facultad
+from app.services.documentos_office_service import (
+    formatos_habilitados, motor_pdf, obtener_tipo_documento, verificar_formato_habilitado
+)
+from app.services.pdf_overlay import VERSION_OVERLAY
+from app.exceptions import (AlumnoNotFoundException, EspecialidadNotFoundException, DocumentGenerationException,
+                            ServiceUnavailableException, UpstreamResponseException)
 from app.repositories.alumno_repository import AlumnoRepository
 from app.repositories.especialidad_repository import EspecialidadRepository
+from app.repositories.artifact_store import ArtifactStore
+from app.utils.fechas import formatear_fecha
+from app.utils.fingerprint import huella_render
+from app.utils.metricas import etapa, registrar_cache
+from app.utils.plantillas import cargar_plantillas_html
+from app.utils.singleflight import SingleFlight
 
 # Configurar logger para este módulo
 logger = logging.getLogger(__name__)
 
+
+class CertificadoPreparado(NamedTuple):
+    """Certificado listo para renderizar, preparado fuera de Flask (modo ASGI)"""
+    context: dict
+    huella: str
+    tiempos: Dict[str, float]  # segundos por etapa, para Server-Timing
+
+
 class CertificateService:
     """
     Servicio para generación de certificados de alumnos.
@@ -22,117 +41,403 @@ class CertificateService:
     """
     
     def __init__(self, alumno_repository: Optional[AlumnoRepository] = None,
-                 especialidad_repository: Optional[EspecialidadRepository] = None):
+                 especialidad_repository: Optional[EspecialidadRepository] = None,
+                 artifact_store: Optional[ArtifactStore] = None,
+                 singleflight: Optional[SingleFlight] = None,
+                 renderizador: Optional[Callable[[dict, str], BytesIO]] = None):
         """
         Constructor con inyección de dependencias.
         
         Args:
             alumno_repository: Repositorio de alumnos (opcional)
             especialidad_repository: Repositorio de especialidades (opcional)
+            artifact_store: Almacén de documentos generados (opcional, se crea desde la config)
+            singleflight: Deduplicador de renders concurrentes (opcional, se crea desde la config)
+            renderizador: Reemplazo de _renderizar, p. ej. un pool de procesos (opcional)
         """
         self.alumno_repository = alumno_repository or AlumnoRepository()
         self.especialidad_repository = especialidad_repository or EspecialidadRepository()
+        self._artifact_store = artifact_store
+        self._singleflight = singleflight
+        self.renderizador = renderizador
+    
+    @property
+    def artifact_store(self) -> ArtifactStore:
+        """Almacén en disco configurado con ARTIFACT_STORE_DIR / ARTIFACT_STORE_MAX_BYTES"""
+        if self._artifact_store is None:
+            self._artifact_store = ArtifactStore(
+                current_app.config['ARTIFACT_STORE_DIR'],
+                current_app.config['ARTIFACT_STORE_MAX_BYTES'],
+                current_app.config['ARTIFACT_STORE_SWEEP_INTERVAL']
+            )
+        return self._artifact_store
+    
+    @property
+    def singleflight(self) -> SingleFlight:
+        """Deduplicador de renders; con SINGLEFLIGHT_REDIS también entre workers"""
+        if self._singleflight is None:
+            redis_client = None
+            if current_app.config['SINGLEFLIGHT_REDIS']:
+                from app.repositories.redis_client import RedisClient
+                redis_client = RedisClient(decode_responses=False).client
+            self._singleflight = SingleFlight(
+                redis_client,
+                ttl_lock=current_app.config['SINGLEFLIGHT_LOCK_TTL'],
+                ttl_resultado=current_app.config['SINGLEFLIGHT_RESULT_TTL'],
+                espera_max=current_app.config['SINGLEFLIGHT_MAX_WAIT']
+            )
+        return self._singleflight
     
     def generar_certificado_alumno_regular(self, id: int, tipo: str) -> BytesIO:
 
 
-        logger.info(f'Iniciando generación de certificado para alumno {id} en formato {tipo}')
+        logger.info('Iniciando generación de certificado para alumno %s en formato %s', id, tipo)
+        verificar_formato_habilitado(tipo)
         
         try:
 
-            logger.debug(f'Buscando alumno con ID {id}')
-            alumno = self._buscar_alumno_por_id(id)
-            logger.debug(f'Alumno encontrado: {alumno.nombre} {alumno.apellido}')
+            logger.debug('Buscando alumno con ID %s', id)
+            with etapa('alumno', tipo):
+                alumno = self._buscar_alumno_por_id(id)
+            logger.debug('Alumno encontrado: %s %s', alumno.nombre, alumno.apellido)
             
             # Enriquecer especialidad si solo tiene ID (llamar a MS académica)
             logger.debug('Verificando y enriqueciendo datos de especialidad')
-            alumno = self._enriquecer_especialidad(alumno)
+            with etapa('especialidad', tipo):
+                alumno = self._enriquecer_especialidad(alumno)
+            
+            resultado = self._generar_documento(alumno, tipo)
+            logger.info('Certificado generado exitosamente para alumno %s', id)
+            return resultado
+
+            
+        except (AlumnoNotFoundException, EspecialidadNotFoundException, ServiceUnavailableException,
+                UpstreamResponseException, DocumentGenerationException) as e:
+            # Re-lanzar excepciones personalizadas sin modificar
+            logger.error(f'Error controlado al generar certificado: {str(e)}')
+            raise
+        except Exception as e:
+            # Convertir excepciones inesperadas en DocumentGenerationException
+            logger.exception(f'Error inesperado al generar certificado para alumno {id}: {str(e)}')
+            raise DocumentGenerationException(tipo, f'Error inesperado al generar certificado: {str(e)}')    
+
+    def preparar_certificado(self, id: int, tipo: str) -> Tuple[dict, str]:
+        """
+        Busca, enriquece y valida los datos del alumno sin renderizar.
+        
+        La huella identifica al documento antes de generarlo: sirve de clave
+        del almacén de artefactos y de ETag para GET condicionales.
+        
+        Args:
+            id: ID del alumno
+            tipo: Formato del certificado (pdf, docx, odt)
+            
+        Returns:
+            Tupla (contexto validado, huella de los insumos)
+        """
+        verificar_formato_habilitado(tipo)
+        try:
+            with etapa('alumno', tipo):
+                alumno = self._buscar_alumno_por_id(id)
+            with etapa('especialidad', tipo):
+                alumno = self._enriquecer_especialidad(alumno)
+            with etapa('contexto', tipo):
+                context = self._construir_contexto(alumno, tipo)
+                huella = self.huella_certificado(context, tipo)
+            return context, huella
+        
+        except (AlumnoNotFoundException, EspecialidadNotFoundException, ServiceUnavailableException,
+                UpstreamResponseException, DocumentGenerationException) as e:
+            logger.error(f'Error controlado al preparar certificado: {str(e)}')
+            raise
+        except Exception as e:
+            logger.exception(f'Error inesperado al preparar certificado para alumno {id}: {str(e)}')
+            raise DocumentGenerationException(tipo, f'Error inesperado al generar certificado: {str(e)}')
+
+    def renderizar_certificado(self, context: dict, tipo: str, huella: Optional[str] = None) -> BytesIO:
+        """
+        Renderiza un contexto ya preparado (ver preparar_certificado).
+        
+        Requests concurrentes con los mismos insumos comparten un único
+        render (singleflight por id, formato y huella).
+        """
+        try:
+            return BytesIO(self._renderizar_compartido(context, tipo, huella))
+        except DocumentGenerationException as e:
+            logger.error(f'Error controlado al generar certificado: {str(e)}')
+            raise
+        except Exception as e:
+            logger.exception(f'Error inesperado al renderizar certificado {tipo}: {str(e)}')
+            raise DocumentGenerationException(tipo, f'Error inesperado al generar certificado: {str(e)}')
+
+    def obtener_artefacto_certificado(self, id: int, tipo: str) -> BinaryIO:
+        """
+        Retorna el certificado del almacén abierto para leer, renderizándolo solo si no existe.
+        
+        Args:
+            id: ID del alumno
+            tipo: Formato del certificado (pdf, docx, odt)
             
-            logger.debug('Validando datos del alumno')
-            if not validar_datos_alumno(alumno):
-                logger.error(f'Datos incompletos para alumno {id}')
-                raise DocumentGenerationException(
-                    tipo,
-                    f'El alumno {id} tiene datos incompletos. '
-                    'Verifique que tenga nombre, apellido, documento, legajo, '
-                    'tipo de documento y especialidad.'
-                )
+        Returns:
+            Documento del almacén de artefactos (o BytesIO si un barrido lo eliminó)
+        """
+        context, clave = self.preparar_certificado(id, tipo)
+        return self.obtener_artefacto(context, tipo, clave)
+
+    def obtener_artefacto(self, context: dict, tipo: str, clave: str) -> BinaryIO:
+        """
+        Retorna el documento de un contexto preparado, renderizando solo si no existe.
+        
+        Si el almacén ya tiene la huella no se renderiza nada. El archivo se
+        abre acá y no se pasa su ruta: el barrido de otro worker puede
+        eliminarlo antes del envío, pero no cierra el descriptor abierto, y
+        send_file sigue usando sendfile sobre un archivo real.
+        """
+        alumno_id = context['alumno'].id
+        with etapa('almacen', tipo):
+            documento = self.artifact_store.abrir(clave, tipo)
+        registrar_cache('almacen', documento is not None)
+        if documento is not None:
+            logger.info('Certificado de alumno %s servido desde el almacén (%s)', alumno_id, clave[:12])
+            return documento
+        
+        def renderizar_y_guardar() -> bytes:
+            contenido = self._renderizar_documento(context, tipo).getvalue()
+            self.artifact_store.guardar(clave, tipo, contenido, {'alumno_id': alumno_id})
+            logger.info('Certificado generado y almacenado para alumno %s (%s)', alumno_id, clave[:12])
+            return contenido
+        
+        # Los requests concurrentes esperan al líder, que deja el documento en el almacén
+        try:
+            contenido = self._en_vuelo(context, tipo, clave, renderizar_y_guardar)
+        except DocumentGenerationException as e:
+            logger.error(f'Error controlado al generar certificado: {str(e)}')
+            raise
+        except Exception as e:
+            logger.exception(f'Error inesperado al renderizar certificado {tipo}: {str(e)}')
+            raise DocumentGenerationException(tipo, f'Error inesperado al generar certificado: {str(e)}')
+        # Un barrido pudo eliminar el documento del líder: se responde con el contenido en memoria
+        return self.artifact_store.abrir(clave, tipo) or BytesIO(contenido)
+
+    def huella_certificado(self, context: dict, tipo: str) -> str:
+        """Huella de los insumos del renderizado (contexto, plantillas, formato y motor PDF)"""
+        variante, rutas = tipo, self._rutas_plantilla(tipo)
+        if tipo == 'pdf' and motor_pdf() == 'overlay':
+            variante = f'{tipo}:overlay{VERSION_OVERLAY}'
+            rutas += (current_app.config['PDF_OVERLAY_FUENTE'], current_app.config['PDF_OVERLAY_FUENTE_NEGRITA'])
+        return huella_render(context, variante, rutas)
+
+    def _renderizar_compartido(self, context: dict, tipo: str, huella: Optional[str] = None) -> bytes:
+        """Renderiza con singleflight: un solo render por (id, formato, huella) en vuelo"""
+        huella = huella or self.huella_certificado(context, tipo)
+        return self._en_vuelo(context, tipo, huella, lambda: self._renderizar_documento(context, tipo).getvalue())
 
-            logger.debug('Construyendo contexto con datos del alumno y relaciones')
-            context = self._obtener_contexto_alumno(alumno)
+    def _en_vuelo(self, context: dict, tipo: str, huella: str, funcion) -> bytes:
+        alumno_id = getattr(context['alumno'], 'id', None)
+        return self.singleflight.ejecutar(f'{alumno_id}:{tipo}:{huella}', funcion)
+
+    def generar_certificado_desde_datos(self, alumno: Alumno, tipo: str) -> BytesIO:
+        """
+        Genera un certificado con los datos completos provistos por el llamador.
+        
+        No consulta los microservicios de alumnos ni de gestión académica:
+        el alumno debe llegar con especialidad, facultad y universidad cargadas
+        (ver CertificadoPayloadMapping).
+        
+        Args:
+            alumno: Alumno con todas sus relaciones completas
+            tipo: Formato del certificado (pdf, docx, odt)
+            
+        Returns:
+            BytesIO con el documento generado
+        """
+        logger.info('Generando certificado %s desde datos provistos (legajo %s)', tipo, alumno.legajo)
+        verificar_formato_habilitado(tipo)
+        
+        try:
+            return self._generar_documento(alumno, tipo)
+        except DocumentGenerationException as e:
+            logger.error(f'Error controlado al generar certificado: {str(e)}')
+            raise
+        except Exception as e:
+            logger.exception(f'Error inesperado al generar certificado desde datos: {str(e)}')
+            raise DocumentGenerationException(tipo, f'Error inesperado al generar certificado: {str(e)}')
 
-            logger.debug('Validando contexto completo')
-            if not validar_contexto(context):
-                logger.error('Contexto incompleto para generar documento')
-                raise DocumentGenerationException(
-                    tipo,
-                    'El contexto para generar el documento está incompleto. '
-                    'Faltan datos de alumno, especialidad, facultad, universidad o fecha.'
-                )
+    def generar_certificados_multiformato(self, id: int, tipos: List[str]) -> Dict[str, BytesIO]:
+        """
+        Genera el certificado de un alumno en varios formatos con una sola búsqueda.
+        
+        Busca, enriquece, valida y arma el contexto una única vez y luego
+        renderiza los formatos en paralelo (un hilo por formato), solapando
+        el renderizado de CPU con la E/S de archivos temporales.
+        
+        Args:
+            id: ID del alumno
+            tipos: Formatos a generar (pdf, docx, odt)
+            
+        Returns:
+            Diccionario formato -> BytesIO con cada documento generado
+        """
+        logger.info('Iniciando generación multiformato para alumno %s: %s', id, tipos)
+        for tipo in tipos:
+            verificar_formato_habilitado(tipo)
+        
+        try:
+            # Etapas comunes a todos los formatos: se registran como 'multiformato'
+            with etapa('alumno', 'multiformato'):
+                alumno = self._buscar_alumno_por_id(id)
+            with etapa('especialidad', 'multiformato'):
+                alumno = self._enriquecer_especialidad(alumno)
+            with etapa('contexto', 'multiformato'):
+                context = self._construir_contexto(alumno, ','.join(tipos))
             
-            logger.debug(f'Obteniendo generador para tipo: {tipo}')
-            documento = obtener_tipo_documento(tipo)
-            if not documento:
-                logger.error(f'Tipo de documento no soportado: {tipo}')
-                raise DocumentGenerationException(tipo, f'Tipo de documento no soportado: {tipo}')
+            # pyrefly: ignore  # missing-attribute
+            app = current_app._get_current_object()
             
-            if tipo in ('odt', 'docx'):
-                plantilla = 'certificado_plantilla'
-            else:
-                plantilla = 'certificado_pdf'
+            def renderizar_con_app_context(tipo: str) -> BytesIO:
+                # Los generadores usan current_app: cada hilo necesita su app context
+                with app.app_context():
+                    return self._renderizar_documento(context, tipo)
             
-            logger.debug(f'Usando plantilla: {plantilla}')
+            # Los renders de cada hilo van al histograma; el request ve el tiempo total en paralelo
+            with etapa('render', 'multiformato'), \
+                    ThreadPoolExecutor(max_workers=len(tipos), thread_name_prefix='multiformato') as executor:
+                futuros = {tipo: executor.submit(renderizar_con_app_context, tipo) for tipo in tipos}
+                resultados = {tipo: futuro.result() for tipo, futuro in futuros.items()}
             
-            logger.info(f'Generando documento {tipo} con plantilla {plantilla}')
+            logger.info('Certificados %s generados exitosamente para alumno %s', tipos, id)
+            return resultados
+        
+        except (AlumnoNotFoundException, EspecialidadNotFoundException, ServiceUnavailableException,
+                UpstreamResponseException, DocumentGenerationException) as e:
+            logger.error(f'Error controlado al generar certificados: {str(e)}')
+            raise
+        except Exception as e:
+            logger.exception(f'Error inesperado al generar certificados para alumno {id}: {str(e)}')
+            raise DocumentGenerationException(','.join(tipos), f'Error inesperado al generar certificados: {str(e)}')
+
+    def _generar_documento(self, alumno: Alumno, tipo: str) -> BytesIO:
+        """Valida los datos del alumno, construye el contexto y renderiza el documento."""
+        with etapa('contexto', tipo):
+            context = self._construir_contexto(alumno, tipo)
+        return BytesIO(self._renderizar_compartido(context, tipo))
+
+    def _construir_contexto(self, alumno: Alumno, tipo: str) -> dict:
+        """Valida los datos del alumno y arma el contexto validado para las plantillas."""
+        logger.debug('Validando datos del alumno')
+        if not validar_datos_alumno(alumno):
+            logger.error(f'Datos incompletos para alumno {alumno.id}')
+            raise DocumentGenerationException(
+                tipo,
+                f'El alumno {alumno.id} tiene datos incompletos. '
+                'Verifique que tenga nombre, apellido, documento, legajo, '
+                'tipo de documento y especialidad.'
+            )
+
+        logger.debug('Construyendo contexto con datos del alumno y relaciones')
+        context = self._obtener_contexto_alumno(alumno)
+
+        logger.debug('Validando contexto completo')
+        if not validar_contexto(context):
+            logger.error('Contexto incompleto para generar documento')
+            raise DocumentGenerationException(
+                tipo,
+                'El contexto para generar el documento está incompleto. '
+                'Faltan datos de alumno, especialidad, facultad, universidad o fecha.'
+            )
+        return context
+
+    def precompilar_plantillas(self) -> List[str]:
+        """
+        Compila las plantillas de los formatos habilitados al bytecode cache (TEMPLATE_CACHE_DIR).
+        
+        Las HTML se compilan con get_template. Las de DOCX/ODT se compilan al
+        renderizarlas una vez con un alumno de ejemplo: el XML que recibe Jinja
+        es el de la plantilla, igual para cualquier alumno.
+        
+        Returns:
+            Una línea de resumen por formato
+        """
+        resumen = [f'html: {cargar_plantillas_html(current_app)} plantilla(s)']
+        context = self._obtener_contexto_alumno(self._get_mock_alumno(1))
+        for tipo in ('docx', 'odt'):
+            if tipo not in formatos_habilitados():
+                continue
+            self._renderizar(context, tipo)
+            resumen.append(f'{tipo}: {self._nombre_plantilla(tipo)}.{tipo}')
+        return resumen
+
+    def _renderizar_documento(self, context: dict, tipo: str) -> BytesIO:
+        """Renderiza con el renderizador inyectado o, si no hay, en el hilo actual"""
+        if self.renderizador is not None:
+            return self.renderizador(context, tipo)
+        return self._renderizar(context, tipo)
+
+    @staticmethod
+    def _renderizar(context: dict, tipo: str) -> BytesIO:
+        """Renderiza el documento del formato pedido a partir de un contexto ya validado."""
+        logger.debug('Obteniendo generador para tipo: %s', tipo)
+        documento = obtener_tipo_documento(tipo)
+        if not documento:
+            logger.error(f'Tipo de documento no soportado: {tipo}')
+            raise DocumentGenerationException(tipo, f'Tipo de documento no soportado: {tipo}')
+        
+        plantilla = CertificateService._nombre_plantilla(tipo)
+        
+        logger.debug('Usando plantilla: %s', plantilla)
+        
+        logger.info('Generando documento %s con plantilla %s', tipo, plantilla)
+        with etapa('render', tipo):
             resultado = documento.generar(
                 carpeta='certificado',
                 plantilla=plantilla,
                 context=context
             )
-            
-            if not resultado:
-                logger.error('El generador retornó None')
-                raise DocumentGenerationException(tipo, 'Error al generar el documento')
-            
-            logger.info(f'Certificado generado exitosamente para alumno {id}')
-            return resultado
+        
+        if not resultado:
+            logger.error('El generador retornó None')
+            raise DocumentGenerationException(tipo, 'Error al generar el documento')
+        
+        return resultado
 
-            
-        except (AlumnoNotFoundException, DocumentGenerationException) as e:
-            # Re-lanzar excepciones personalizadas sin modificar
-            logger.error(f'Error controlado al generar certificado: {str(e)}')
-            raise
-        except Exception as e:
-            # Convertir excepciones inesperadas en DocumentGenerationException
-            logger.exception(f'Error inesperado al generar certificado para alumno {id}: {str(e)}')
-            raise DocumentGenerationException(tipo, f'Error inesperado al generar certificado: {str(e)}')    
+    @staticmethod
+    def _nombre_plantilla(tipo: str) -> str:
+        """Plantilla (sin extensión) dentro de templates/certificado para cada formato"""
+        if tipo in ('odt', 'docx'):
+            return 'certificado_plantilla'
+        return 'certificado_pdf'
 
+    @staticmethod
+    def _rutas_plantilla(tipo: str) -> Tuple[str, ...]:
+        """Archivos que intervienen en el renderizado: plantilla del formato e imágenes de static/img"""
+        extension = 'html' if tipo == 'pdf' else tipo
+        # template_folder y static_folder son opcionales en Flask; esta app siempre los tiene
+        # pyrefly: ignore  # no-matching-overload
+        plantilla = os.path.join(current_app.root_path, current_app.template_folder, 'certificado',
+                                 f'{CertificateService._nombre_plantilla(tipo)}.{extension}')
+        # pyrefly: ignore  # no-matching-overload
+        carpeta_img = os.path.join(current_app.static_folder, 'img')
+        imagenes = tuple(os.path.join(carpeta_img, nombre) for nombre in sorted(os.listdir(carpeta_img)))
+        return (plantilla,) + imagenes
          
     def _obtener_contexto_alumno(self, alumno: Alumno) -> dict:
         especialidad = alumno.especialidad
         facultad = especialidad.facultad
         universidad = facultad.universidad
+        hoy = datetime.date.today()
         return {
             "alumno": alumno,
             "especialidad": especialidad,
             "facultad": facultad,
             "universidad": universidad,
-            "fecha": self._obtener_fechaactual()
+            "fecha": self._obtener_fechaactual(hoy),
+            "fecha_emision": hoy
         }
     
     
-    def _obtener_fechaactual(self):
-        """Obtiene la fecha actual formateada en español."""
-        # Intentar configurar locale español (silenciosamente si falla)
-        for loc in ['es_ES.UTF-8', 'es_AR.UTF-8', 'Spanish_Spain.1252', 'es_MX.UTF-8']:
-            try:
-                locale.setlocale(locale.LC_TIME, loc)
-                break
-            except locale.Error:
-                continue
-        
-        fecha_actual = datetime.datetime.now()
-        return fecha_actual.strftime('%d de %B de %Y')
+    def _obtener_fechaactual(self, fecha: Optional[datetime.date] = None):
+        """Obtiene la fecha actual (o la indicada) formateada en español, sin tocar el locale del proceso."""
+        return formatear_fecha(fecha or datetime.date.today(), current_app.config.get('CERTIFICADO_LOCALE', 'es'))
     
     def _buscar_alumno_por_id(self, id: int) -> Alumno:
         """
@@ -158,14 +463,14 @@ class CertificateService:
         USE_MOCK = os.getenv('USE_MOCK_DATA', 'true').lower() == 'true'
         
         if USE_MOCK:
-            logger.debug(f'Usando datos mock para alumno {id}')
+            logger.debug('Usando datos mock para alumno %s', id)
             alumno_mock = self._get_mock_alumno(id)
             if alumno_mock is None:
                 raise AlumnoNotFoundException(f'Alumno con ID {id} no encontrado')
             return alumno_mock
         
         # Usar repositorio con cache Redis + retry automático
-        logger.debug(f'Buscando alumno {id} en repositorio (cache + HTTP)')
+        logger.debug('Buscando alumno %s en repositorio (cache + HTTP)', id)
         repo = self.alumno_repository
         
         try:
@@ -175,7 +480,7 @@ class CertificateService:
                 logger.warning(f'Alumno {id} no encontrado en el microservicio')
                 raise AlumnoNotFoundException(id)
             
-            logger.debug(f'Alumno {id} obtenido exitosamente')
+            logger.debug('Alumno %s obtenido exitosamente', id)
             return alumno
             
         except AlumnoNotFoundException:
@@ -206,6 +511,7 @@ class CertificateService:
         Raises:
             EspecialidadNotFoundException: Si la especialidad no existe
             ServiceUnavailableException: Si el MS académica no responde
+            UpstreamResponseException: Si la especialidad no trae la facultad completa
             DocumentGenerationException: Si no hay datos de especialidad
         """
         USE_MOCK = os.getenv('USE_MOCK_DATA', 'true').lower() == 'true'
@@ -214,8 +520,9 @@ class CertificateService:
             logger.debug('Usando mock: especialidad ya incluida completa')
             return alumno
         
-        # Verificar si especialidad existe
-        if not hasattr(alumno, 'especialidad') or alumno.especialidad is None:
+        # Verificar si especialidad existe (o al menos su ID, para MS que solo devuelven especialidad_id)
+        especialidad = getattr(alumno, 'especialidad', None)
+        if especialidad is None and not getattr(alumno, 'especialidad_id', None):
             logger.error(f'Alumno {alumno.id} no tiene datos de especialidad')
             raise DocumentGenerationException(
                 'certificado',
@@ -223,30 +530,34 @@ class CertificateService:
             )
         
         # Verificar si la especialidad ya tiene datos completos
-        if hasattr(alumno.especialidad, 'nombre') and alumno.especialidad.nombre:
+        if especialidad is not None and getattr(especialidad, 'nombre', None):
             logger.debug('Especialidad completa ya presente en el alumno')
+            self._verificar_facultad(especialidad)
             return alumno
         
         # Si solo tiene ID, obtener especialidad completa del MS académica
-        if hasattr(alumno.especialidad, 'id') and alumno.especialidad.id:
-            especialidad_id = alumno.especialidad.id
-            logger.info(f'Enriqueciendo especialidad {especialidad_id} desde MS académica')
+        especialidad_id = getattr(especialidad, 'id', None) or getattr(alumno, 'especialidad_id', None)
+        if especialidad_id:
+            logger.info('Enriqueciendo especialidad %s desde MS académica', especialidad_id)
             
             repo = self.especialidad_repository
             
             try:
                 especialidad_completa = repo.get_especialidad_by_id(especialidad_id)
+                if especialidad_completa is None:
+                    raise EspecialidadNotFoundException(especialidad_id)
+                self._verificar_facultad(especialidad_completa)
                 
                 # Reemplazar especialidad parcial con datos completos
                 alumno.especialidad = especialidad_completa
-                logger.info(f'Especialidad {especialidad_id} enriquecida: {especialidad_completa.nombre}')
+                logger.info('Especialidad %s enriquecida: %s', especialidad_id, especialidad_completa.nombre)
                 return alumno
                 
             except EspecialidadNotFoundException:
                 logger.error(f'Especialidad {especialidad_id} no encontrada en MS académica')
                 raise
-            except ServiceUnavailableException:
-                logger.error(f'MS académica no disponible al buscar especialidad {especialidad_id}')
+            except (ServiceUnavailableException, UpstreamResponseException):
+                logger.error(f'MS académica no disponible o con respuesta inválida para especialidad {especialidad_id}')
                 raise
             except Exception as e:
                 logger.error(f'Error inesperado al obtener especialidad {especialidad_id}: {str(e)}')
@@ -259,6 +570,24 @@ class CertificateService:
             f'El alumno {alumno.id} tiene especialidad inválida'
         )
     
+    @staticmethod
+    def _verificar_facultad(especialidad: Especialidad) -> None:
+        """
+        El certificado necesita la facultad completa (ciudad, provincia y
+        universidad). Algunas versiones del MS académica devuelven solo su
+        nombre: con eso no se puede armar el contexto.
+        
+        Raises:
+            UpstreamResponseException: Si la facultad no viene como objeto con universidad
+        """
+        facultad = especialidad.facultad
+        if not isinstance(facultad, Facultad) or facultad.universidad is None:
+            logger.error(f'Especialidad {especialidad.id} sin facultad completa: {facultad!r}')
+            raise UpstreamResponseException(
+                'academica',
+                f'la especialidad {especialidad.id} no trae la facultad con su universidad'
+            )
+    
     @staticmethod
     def _get_mock_alumno(id: int) -> Alumno:
         """Retorna datos mock de un alumno para testing"""
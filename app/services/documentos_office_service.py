@@ -2,12 +2,18 @@ from abc import ABC, abstractmethod
 from io import BytesIO
 import os
 import logging
+import importlib
 import tempfile
-from flask import current_app, render_template
-from python_odt_template import ODTTemplate
-from python_odt_template.jinja import get_odt_renderer
-from docxtpl import DocxTemplate
-import jinja2 
+import threading
+import time
+from typing import Dict, Optional, Tuple, Type
+from flask import current_app, has_app_context, render_template
+from app.exceptions import FormatNotEnabledException
+from app.utils.determinista import momento_emision, normalizar_docx, normalizar_odt
+from app.services.pdf_batcher import obtener_pdf_batcher, escribir_pdf
+from app.services.pdf_overlay import TextoNoRepresentable, obtener_fondo, parrafos_certificado
+from app.utils.plantillas import entorno_cacheado
+from app.utils.metricas import etapa
 
 # Configurar logger para este módulo
 logger = logging.getLogger(__name__)
@@ -62,6 +68,10 @@ class PDFDocument(Document):
         3. Convierte HTML a PDF con WeasyPrint
         4. Retorna BytesIO con el PDF generado
         
+        Con DOCUMENTOS_DETERMINISTAS las fechas de creación/modificación se
+        fijan a context['fecha_emision'] y el /ID se deriva del contenido,
+        de modo que insumos idénticos producen bytes idénticos.
+        
         Args:
             carpeta: Subcarpeta en templates/ (ej: 'certificado')
             plantilla: Nombre de plantilla sin extensión (ej: 'certificado_pdf')
@@ -70,18 +80,19 @@ class PDFDocument(Document):
         Returns:
             BytesIO con el PDF generado
         """
-        logger.debug(f'Generando PDF desde {carpeta}/{plantilla}.html')
+        logger.debug('Generando PDF desde %s/%s.html', carpeta, plantilla)
         
         # Construir base_url file:/// para que WeasyPrint pueda abrir archivos locales
         base_path = current_app.root_path.replace('\\', '/')
         base_url = f"file:///{base_path}"
-        logger.debug(f'Base URL configurada: {base_url}')
+        logger.debug('Base URL configurada: %s', base_url)
 
         render_context = dict(context or {})
         render_context.update({"url_base": base_url})
 
         logger.debug('Renderizando plantilla HTML con Jinja2')
-        html_string = render_template(f"{carpeta}/{plantilla}.html", **render_context)
+        with etapa('plantilla_html', 'pdf'):
+            html_string = render_template(f"{carpeta}/{plantilla}.html", **render_context)
         
         logger.debug('Convirtiendo HTML a PDF con WeasyPrint')
         # Lazy import: solo importar WeasyPrint cuando realmente se necesita
@@ -95,13 +106,81 @@ class PDFDocument(Document):
                 "En Windows, puede instalar GTK desde https://github.com/tschoonj/GTK-for-Windows-Runtime-Environment-Installer"
             ) from e
         
-        bytes_data = HTML(string=html_string, base_url=base_url).write_pdf()
+        fecha = None
+        if current_app.config.get('DOCUMENTOS_DETERMINISTAS'):
+            # Metadatos fijados a la fecha de emisión e identificador derivado del contenido
+            fecha = momento_emision(render_context.get('fecha_emision')).strftime('%Y-%m-%dT%H:%M:%SZ')
+        
+        with etapa('weasyprint', 'pdf'):
+            if current_app.config.get('PDF_MICROBATCH_ENABLED'):
+                # Requests concurrentes comparten una pasada de WeasyPrint (ver pdf_batcher.py)
+                bytes_data = obtener_pdf_batcher().renderizar(html_string, base_url, fecha)
+            else:
+                documento = HTML(string=html_string, base_url=base_url).render()
+                bytes_data = escribir_pdf(documento, fecha_emision=fecha)
         pdf_io = BytesIO(bytes_data)
         
-        logger.info(f'PDF generado exitosamente: {len(bytes_data)} bytes')
+        logger.info('PDF generado exitosamente: %s bytes', len(bytes_data))
         return pdf_io
 
 
+class OverlayPDFDocument(Document):
+    """
+    Generador PDF rápido para el certificado: fondo precalculado + texto.
+
+    La parte estática del certificado (logos, fuentes, página) se serializa
+    una vez por versión de plantilla y por request solo se agrega el texto
+    justificado, sin pasar por WeasyPrint (ver pdf_overlay.py). Otras
+    plantillas, y los certificados con caracteres que no están en las
+    fuentes embebidas, se delegan a PDFDocument.
+    """
+
+    PLANTILLAS = {('certificado', 'certificado_pdf')}
+
+    @staticmethod
+    # pyrefly: ignore  # bad-override
+    def generar(carpeta: str, plantilla: str, context: dict) -> BytesIO:
+        """
+        Genera el PDF superponiendo el texto del contexto al fondo cacheado.
+
+        Args:
+            carpeta: Subcarpeta en templates/ (ej: 'certificado')
+            plantilla: Nombre de plantilla sin extensión (ej: 'certificado_pdf')
+            context: Datos del certificado (alumno, especialidad, etc.)
+
+        Returns:
+            BytesIO con el PDF generado
+        """
+        if (carpeta, plantilla) not in OverlayPDFDocument.PLANTILLAS:
+            logger.debug('Sin fondo precalculado para %s/%s: se usa WeasyPrint', carpeta, plantilla)
+            return PDFDocument.generar(carpeta, plantilla, context)
+
+        carpeta_img = os.path.join(current_app.static_folder, 'img')
+        fondo = obtener_fondo(
+            os.path.join(current_app.root_path, current_app.template_folder, carpeta, f'{plantilla}.html'),
+            os.path.join(carpeta_img, 'logo-ministerio.png'),
+            os.path.join(carpeta_img, 'logo-utn.png'),
+            current_app.config['PDF_OVERLAY_FUENTE'],
+            current_app.config['PDF_OVERLAY_FUENTE_NEGRITA'],
+        )
+
+        fecha = None
+        if current_app.config.get('DOCUMENTOS_DETERMINISTAS'):
+            fecha = momento_emision(context.get('fecha_emision'))
+
+        alumno = context['alumno']
+        titulo = f'Certificado para el Alumno: {alumno.apellido}, {alumno.nombre}'
+        try:
+            with etapa('overlay', 'pdf'):
+                bytes_data = fondo.generar(parrafos_certificado(context), titulo, fecha)
+        except TextoNoRepresentable as e:
+            logger.info('Certificado con texto no representable en el overlay (%s): se usa WeasyPrint', e)
+            return PDFDocument.generar(carpeta, plantilla, context)
+
+        logger.info('PDF (overlay) generado exitosamente: %s bytes', len(bytes_data))
+        return BytesIO(bytes_data)
+
+
 class ODTDocument(Document):
     """
     Generador de documentos ODT (OpenDocument Text) usando python-odt-template.
@@ -132,31 +211,42 @@ class ODTDocument(Document):
             BytesIO con el documento ODT generado
             
         Note:
-            Usa archivos temporales durante generación (se eliminan automáticamente)
+            Usa archivos temporales durante generación (se eliminan automáticamente).
+            Con DOCUMENTOS_DETERMINISTAS el ZIP se normaliza (ver app/utils/determinista.py).
         """
-        logger.debug(f'Generando ODT desde {carpeta}/{plantilla}.odt')
+        # Lazy import: el backend ODT se carga en el primer uso (ver RegistroDocumentos)
+        from python_odt_template import ODTTemplate
+        from python_odt_template.jinja import get_odt_renderer, UndefinedSilently, finalize_value
+        
+        logger.debug('Generando ODT desde %s/%s.odt', carpeta, plantilla)
         
         templates_root = os.path.join(current_app.root_path, current_app.template_folder)
         path_template = os.path.join(templates_root, carpeta, f"{plantilla}.odt")
-        logger.debug(f'Ruta plantilla: {path_template}')
+        logger.debug('Ruta plantilla: %s', path_template)
 
         # media path para que el renderer encuentre imágenes dentro de static
         media_path = current_app.static_folder
-        logger.debug(f'Media path para imágenes: {media_path}')
-        odt_renderer = get_odt_renderer(media_path=media_path)
+        logger.debug('Media path para imágenes: %s', media_path)
+        # Entorno equivalente al de python-odt-template, con las plantillas compiladas cacheadas
+        entorno = entorno_cacheado('odt', current_app.config.get('TEMPLATE_CACHE_DIR'),
+                                   undefined=UndefinedSilently, autoescape=True, finalize=finalize_value)
+        odt_renderer = get_odt_renderer(media_path=media_path, env=entorno)
 
         odt_io = BytesIO()
         with tempfile.NamedTemporaryFile(suffix='.odt', delete=False) as temp_file:
             temp_path = temp_file.name
         
         logger.debug('Renderizando plantilla ODT')
-        with ODTTemplate(path_template) as template:
+        with etapa('plantilla_odt', 'odt'), ODTTemplate(path_template) as template:
             odt_renderer.render(template, context=context)
             template.pack(temp_path)
-            with open(temp_path, 'rb') as f:
-                content = f.read()
-                odt_io.write(content)
-                logger.info(f'ODT generado exitosamente: {len(content)} bytes')
+        with open(temp_path, 'rb') as f:
+            content = f.read()
+        if current_app.config.get('DOCUMENTOS_DETERMINISTAS'):
+            with etapa('normalizacion', 'odt'):
+                content = normalizar_odt(content, (context or {}).get('fecha_emision'))
+        odt_io.write(content)
+        logger.info('ODT generado exitosamente: %s bytes', len(content))
 
         os.unlink(temp_path)
         odt_io.seek(0)
@@ -179,7 +269,7 @@ class DOCXDocument(Document):
         
         Proceso:
         1. Localiza plantilla en templates/carpeta/plantilla.docx
-        2. Crea entorno Jinja2 para renderizado
+        2. Obtiene el entorno Jinja2 del proceso (plantillas compiladas cacheadas)
         3. Agrega url_base al contexto para recursos locales
         4. Renderiza usando docxtpl
         5. Guarda en archivo temporal y retorna BytesIO
@@ -194,13 +284,17 @@ class DOCXDocument(Document):
             
         Note:
             La plantilla debe ser un .docx válido con marcadores Jinja2
-            como {{ alumno.nombre }} o {% for item in lista %}
+            como {{ alumno.nombre }} o {% for item in lista %}.
+            Con DOCUMENTOS_DETERMINISTAS el ZIP se normaliza (ver app/utils/determinista.py).
         """
-        logger.debug(f'Generando DOCX desde {carpeta}/{plantilla}.docx')
+        # Lazy import: el backend DOCX se carga en el primer uso (ver RegistroDocumentos)
+        from docxtpl import DocxTemplate
+        
+        logger.debug('Generando DOCX desde %s/%s.docx', carpeta, plantilla)
         
         templates_root = os.path.join(current_app.root_path, current_app.template_folder)
         path_template = os.path.join(templates_root, carpeta, f"{plantilla}.docx")
-        logger.debug(f'Ruta plantilla: {path_template}')
+        logger.debug('Ruta plantilla: %s', path_template)
 
         doc = DocxTemplate(path_template)
 
@@ -208,50 +302,164 @@ class DOCXDocument(Document):
         with tempfile.NamedTemporaryFile(suffix='.docx', delete=False) as temp_file:
             temp_path = temp_file.name
 
-        jinja_env = jinja2.Environment()
+        jinja_env = entorno_cacheado('docx', current_app.config.get('TEMPLATE_CACHE_DIR'))
         render_context = dict(context or {})
         base_path = current_app.root_path.replace('\\', '/')
         render_context.update({"url_base": "file:///" + base_path})
         
         logger.debug('Renderizando plantilla DOCX con Jinja2')
-        doc.render(render_context, jinja_env)
-        doc.save(temp_path)
+        with etapa('plantilla_docx', 'docx'):
+            doc.render(render_context, jinja_env)
+            doc.save(temp_path)
         
         with open(temp_path, 'rb') as f:
             content = f.read()
-            docx_io.write(content)
-            logger.info(f'DOCX generado exitosamente: {len(content)} bytes')
+        if current_app.config.get('DOCUMENTOS_DETERMINISTAS'):
+            with etapa('normalizacion', 'docx'):
+                content = normalizar_docx(content, render_context.get('fecha_emision'))
+        docx_io.write(content)
+        logger.info('DOCX generado exitosamente: %s bytes', len(content))
 
         os.unlink(temp_path)
         docx_io.seek(0)
         return docx_io
 
 
+def motor_pdf() -> str:
+    """Motor configurado para PDFs: 'weasyprint' (por defecto) u 'overlay'"""
+    if not has_app_context():
+        return 'weasyprint'
+    return current_app.config.get('PDF_ENGINE', 'weasyprint')
+
+
+def formatos_habilitados() -> Tuple[str, ...]:
+    """Formatos que sirve esta réplica (FORMATOS_HABILITADOS); todos fuera de una app"""
+    if not has_app_context():
+        return tuple(registro_documentos.formatos())
+    return tuple(current_app.config.get('FORMATOS_HABILITADOS') or registro_documentos.formatos())
+
+
+class RegistroDocumentos:
+    """
+    Registro de backends de documentos con carga diferida.
+    
+    Cada backend declara los módulos pesados que necesita (WeasyPrint,
+    docxtpl, python-odt-template, Pillow). Se importan la primera vez que se
+    pide el formato, o todos juntos con calentar(), y se registra cuánto
+    tardó cada import. Una réplica que solo sirve PDF nunca carga docxtpl.
+    """
+    
+    def __init__(self):
+        self._backends: Dict[str, Tuple[Tuple[str, ...], Type[Document]]] = {}
+        self._tiempos: Dict[str, float] = {}
+        self._errores: Dict[str, str] = {}
+        self._lock = threading.Lock()
+    
+    def registrar(self, nombre: str, modulos: Tuple[str, ...], generador: Type[Document]) -> None:
+        self._backends[nombre] = (modulos, generador)
+    
+    def formatos(self) -> Tuple[str, ...]:
+        """Formatos con al menos un backend (pdf-overlay es una variante de pdf)"""
+        return tuple(dict.fromkeys(nombre.split('-')[0] for nombre in self._backends))
+    
+    def obtener(self, nombre: str) -> Optional[Type[Document]]:
+        """Generador del backend, importando sus módulos si es el primer uso"""
+        backend = self._backends.get(nombre)
+        if backend is None:
+            return None
+        if nombre not in self._tiempos and nombre not in self._errores:
+            self._cargar(nombre)
+        return backend[1]
+    
+    def _cargar(self, nombre: str) -> None:
+        with self._lock:
+            if nombre in self._tiempos or nombre in self._errores:
+                return
+            inicio = time.perf_counter()
+            try:
+                for modulo in self._backends[nombre][0]:
+                    importlib.import_module(modulo)
+            except (OSError, ImportError) as e:
+                # El generador reporta el error al usarse (ej: WeasyPrint sin GTK)
+                self._errores[nombre] = str(e)
+                logger.warning(f'No se pudo cargar el backend {nombre}: {e}')
+                return
+            self._tiempos[nombre] = time.perf_counter() - inicio
+            logger.info('Backend %s cargado en %.0f ms', nombre, self._tiempos[nombre] * 1000)
+    
+    def calentar(self, nombres) -> Dict[str, float]:
+        """Carga ahora los backends indicados (precarga antes del fork, warm-up)"""
+        for nombre in nombres:
+            self.obtener(nombre)
+        return {nombre: self._tiempos[nombre] for nombre in nombres if nombre in self._tiempos}
+    
+    def estado(self) -> Dict[str, dict]:
+        """Por backend: si está cargado, cuánto tardó el import y el error si falló"""
+        return {
+            nombre: {
+                'cargado': nombre in self._tiempos,
+                'import_ms': round(self._tiempos[nombre] * 1000, 1) if nombre in self._tiempos else None,
+                'error': self._errores.get(nombre),
+            }
+            for nombre in self._backends
+        }
+
+
+registro_documentos = RegistroDocumentos()
+registro_documentos.registrar('pdf', ('weasyprint',), PDFDocument)
+registro_documentos.registrar('pdf-overlay', ('PIL.Image',), OverlayPDFDocument)
+registro_documentos.registrar('odt', ('python_odt_template', 'python_odt_template.jinja'), ODTDocument)
+registro_documentos.registrar('docx', ('docxtpl',), DOCXDocument)
+
+
+def backend_de(tipo: str) -> str:
+    """Backend que atiende un formato según la configuración (PDF_ENGINE)"""
+    if tipo == 'pdf' and motor_pdf() == 'overlay':
+        return 'pdf-overlay'
+    return tipo
+
+
+def verificar_formato_habilitado(tipo: str) -> None:
+    """
+    Raises:
+        FormatNotEnabledException: Si el formato existe pero esta réplica no lo sirve
+    """
+    if tipo in registro_documentos.formatos() and tipo not in formatos_habilitados():
+        raise FormatNotEnabledException(tipo, list(formatos_habilitados()))
+
+
+def calentar_backends() -> Dict[str, float]:
+    """Importa los backends de los formatos habilitados; retorna los segundos de import de cada uno"""
+    return registro_documentos.calentar([backend_de(tipo) for tipo in formatos_habilitados()])
+
+
 def obtener_tipo_documento(tipo: str) -> Document:
     """
     Factory function que retorna el generador de documentos apropiado.
     
+    Los backends se resuelven en RegistroDocumentos: sus dependencias se
+    importan en el primer uso del formato.
+    
     Args:
         tipo: Tipo de documento deseado ('pdf', 'odt', 'docx')
         
     Returns:
-        Clase generadora correspondiente (PDFDocument, ODTDocument, DOCXDocument)
+        Clase generadora correspondiente (PDFDocument u OverlayPDFDocument según
+        PDF_ENGINE, ODTDocument, DOCXDocument)
         None si el tipo no es soportado
         
+    Raises:
+        FormatNotEnabledException: Si el formato no está en FORMATOS_HABILITADOS
+        
     Examples:
         >>> generador = obtener_tipo_documento('pdf')
         >>> generador.generar('certificado', 'certificado_pdf', context)
     """
-    logger.debug(f'Solicitando generador para tipo: {tipo}')
-    
-    tipos = {
-        'pdf': PDFDocument,
-        'odt': ODTDocument,
-        'docx': DOCXDocument,
-    }
+    logger.debug('Solicitando generador para tipo: %s', tipo)
     
-    generador = tipos.get(tipo)
+    verificar_formato_habilitado(tipo)
+    generador = registro_documentos.obtener(backend_de(tipo))
     if not generador:
-        logger.warning(f'Tipo de documento no soportado: {tipo}. Tipos válidos: {list(tipos.keys())}')
+        logger.warning(f'Tipo de documento no soportado: {tipo}. Tipos válidos: {list(registro_documentos.formatos())}')
     
     return generador
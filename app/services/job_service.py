@@ -0,0 +1,223 @@
+import time
+import logging
+from io import BytesIO
+from typing import List, Optional, Tuple
+from flask import current_app
+
+from app.services.certificate_service import CertificateService
+from app.repositories.job_repository import JobRepository
+from app.exceptions import BaseAppException, JobNotFoundException, JobNotReadyException
+from app.utils import empaquetar_zip
+
+# Configurar logger para este módulo
+logger = logging.getLogger(__name__)
+
+# Estados posibles de un job
+PENDIENTE = 'pendiente'
+PROCESANDO = 'procesando'
+COMPLETADO = 'completado'
+ERROR = 'error'
+
+ESTADOS_FINALES = (COMPLETADO, ERROR)
+
+MIMETYPES = {
+    'pdf': 'application/pdf',
+    'odt': 'application/vnd.oasis.opendocument.text',
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'zip': 'application/zip',
+}
+
+
+class JobService:
+    """
+    Servicio de jobs asíncronos de certificados.
+
+    Los requests HTTP solo registran el job en Redis (respuesta 202) y los
+    workers (ver app/workers) lo procesan en otro proceso, de modo que el
+    renderizado escala independientemente del front HTTP.
+    """
+
+    def __init__(self, job_repository: Optional[JobRepository] = None,
+                 certificate_service: Optional[CertificateService] = None):
+        """
+        Constructor con inyección de dependencias.
+
+        Args:
+            job_repository: Repositorio de jobs (opcional)
+            certificate_service: Servicio de certificados (opcional, solo lo usan los workers)
+        """
+        self.job_repository = job_repository or JobRepository()
+        self._certificate_service = certificate_service
+
+    @property
+    def certificate_service(self) -> CertificateService:
+        """El front HTTP no necesita el servicio de certificados: se crea al procesar"""
+        if self._certificate_service is None:
+            self._certificate_service = CertificateService()
+        return self._certificate_service
+
+    def crear_job(self, alumno_ids: List[int], formato: str) -> dict:
+        """
+        Registra un job de certificado (un alumno) o de lote (varios alumnos).
+
+        Args:
+            alumno_ids: IDs de los alumnos a certificar
+            formato: Formato de los certificados (pdf, docx, odt)
+
+        Returns:
+            Estado inicial del job (incluye job_id)
+        """
+        ahora = time.time()
+        datos = {
+            'tipo': 'certificado' if len(alumno_ids) == 1 else 'lote',
+            'estado': PENDIENTE,
+            'formato': formato,
+            'alumno_ids': alumno_ids,
+            'creado': ahora,
+            'actualizado': ahora,
+        }
+        job_id = self.job_repository.crear(datos)
+        logger.info(f'Job {job_id} creado: {datos["tipo"]} {formato} para {len(alumno_ids)} alumno(s)')
+        return dict(datos, job_id=job_id)
+
+    def obtener_estado(self, job_id: str, espera: float = 0) -> dict:
+        """
+        Obtiene el estado de un job, con long-polling opcional.
+
+        La espera bloquea en Redis (sin sondear) y tiene como tope
+        JOB_MAX_WAIT, unos pocos segundos: el hilo de Granian queda ocupado
+        mientras tanto.
+
+        Args:
+            job_id: ID del job
+            espera: Segundos a esperar a que el job termine (0 = polling simple)
+
+        Returns:
+            Estado del job
+
+        Raises:
+            JobNotFoundException: Si el job no existe o expiró
+        """
+        job = self.job_repository.obtener(job_id)
+        if job is None:
+            raise JobNotFoundException(job_id)
+
+        if espera > 0 and job['estado'] not in ESTADOS_FINALES:
+            if self.job_repository.esperar_fin(job_id, min(espera, current_app.config['JOB_MAX_WAIT'])):
+                job = self.job_repository.obtener(job_id)
+                if job is None:
+                    raise JobNotFoundException(job_id)
+
+        return dict(job, job_id=job_id)
+
+    def obtener_resultado(self, job_id: str) -> Tuple[BytesIO, str, str]:
+        """
+        Obtiene el documento generado por un job completado.
+
+        Returns:
+            Tupla (documento, mimetype, nombre de descarga)
+
+        Raises:
+            JobNotFoundException: Si el job o su resultado expiraron
+            JobNotReadyException: Si el job todavía no terminó o falló
+        """
+        job = self.job_repository.obtener(job_id)
+        if job is None:
+            raise JobNotFoundException(job_id)
+        if job['estado'] != COMPLETADO:
+            raise JobNotReadyException(job_id, job['estado'])
+
+        contenido = self.job_repository.obtener_resultado(job_id)
+        if contenido is None:
+            raise JobNotFoundException(job_id)
+
+        extension = job['extension']
+        return BytesIO(contenido), MIMETYPES[extension], f"certificados_{job_id}.{extension}"
+
+    def procesar(self, job_id: str) -> None:
+        """
+        Procesa un job: genera los certificados y guarda el resultado en Redis.
+
+        Un job de un solo alumno guarda el documento tal cual; un lote se
+        empaqueta en ZIP. En un lote, los alumnos que fallan se informan en
+        'errores' sin abortar al resto.
+        """
+        job = self.job_repository.obtener(job_id)
+        if job is None:
+            logger.warning(f'Job {job_id} desencolado pero ya expiró')
+            return
+
+        formato = job['formato']
+        intentos = job.get('intentos', 0) + 1
+        self.job_repository.actualizar(job_id, estado=PROCESANDO, intentos=intentos, actualizado=time.time())
+        logger.info(f'Procesando job {job_id} ({job["tipo"]} {formato}, intento {intentos})')
+
+        documentos = {}
+        errores = {}
+        for indice, alumno_id in enumerate(job['alumno_ids']):
+            if indice:
+                # Latido: un lote largo no debe parecer abandonado (ver recuperar_huerfanos)
+                self.job_repository.actualizar(job_id, actualizado=time.time())
+            try:
+                documento = self.certificate_service.generar_certificado_alumno_regular(alumno_id, formato)
+                documentos[f'certificado_alumno_{alumno_id}.{formato}'] = documento.getvalue()
+            except BaseAppException as e:
+                logger.error(f'Job {job_id}: error con alumno {alumno_id}: {e.message}')
+                errores[str(alumno_id)] = e.to_dict()
+
+        if not documentos:
+            self.job_repository.actualizar(job_id, estado=ERROR, errores=errores, actualizado=time.time())
+            logger.error(f'Job {job_id} finalizado con error')
+            return
+
+        if job['tipo'] == 'certificado':
+            contenido, extension = next(iter(documentos.values())), formato
+        else:
+            contenido, extension = empaquetar_zip(documentos).getvalue(), 'zip'
+
+        self.job_repository.guardar_resultado(job_id, contenido)
+        self.job_repository.actualizar(
+            job_id, estado=COMPLETADO, extension=extension, errores=errores,
+            tamanio=len(contenido), actualizado=time.time()
+        )
+        logger.info(f'Job {job_id} completado: {len(contenido)} bytes')
+
+    def recuperar_huerfanos(self) -> int:
+        """
+        Reencola los jobs que un worker tomó y no confirmó (murió o lo
+        reiniciaron) en JOB_VISIBILITY_TIMEOUT segundos.
+
+        Un job que ya se intentó JOB_MAX_INTENTOS veces se marca como error
+        en lugar de reencolarse, para que un job que tira abajo al worker no
+        circule para siempre. Procesar dos veces el mismo job es inofensivo:
+        el resultado se sobrescribe.
+
+        Returns:
+            Cantidad de jobs reencolados
+        """
+        limite = time.time() - current_app.config['JOB_VISIBILITY_TIMEOUT']
+        max_intentos = current_app.config['JOB_MAX_INTENTOS']
+        reencolados = 0
+
+        for job_id in self.job_repository.en_proceso():
+            job = self.job_repository.obtener(job_id)
+            if job is None:
+                self.job_repository.descartar(job_id)
+                continue
+            if job['actualizado'] > limite:
+                continue
+
+            if job.get('intentos', 0) >= max_intentos:
+                logger.error('Job %s abandonado tras %s intentos', job_id, job['intentos'])
+                self.job_repository.actualizar(
+                    job_id, estado=ERROR, errores={'job': f"Abandonado tras {job['intentos']} intentos"},
+                    actualizado=time.time()
+                )
+                self.job_repository.confirmar(job_id)
+            elif self.job_repository.reencolar(job_id):
+                logger.warning('Job %s sin confirmar desde hace más de %ss: reencolado',
+                               job_id, current_app.config['JOB_VISIBILITY_TIMEOUT'])
+                self.job_repository.actualizar(job_id, estado=PENDIENTE, actualizado=time.time())
+                reencolados += 1
+
+        return reencolados
@@ -0,0 +1,221 @@
+import hashlib
+import html as html_lib
+import logging
+import re
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from flask import current_app
+
+from app.exceptions import DocumentGenerationException
+
+# Configurar logger para este módulo
+logger = logging.getLogger(__name__)
+
+_HEAD = re.compile(r'<head[^>]*>(.*?)</head>', re.IGNORECASE | re.DOTALL)
+_TITULO = re.compile(r'<title[^>]*>(.*?)</title>', re.IGNORECASE | re.DOTALL)
+_BODY = re.compile(r'<body[^>]*>(.*)</body>', re.IGNORECASE | re.DOTALL)
+
+PREFIJO_ANCLA = 'lote-'
+
+
+def _renderizar_weasyprint(html_string: str, base_url: str):
+    """Renderizador por defecto: layout de WeasyPrint (sin escribir el PDF)"""
+    from weasyprint import HTML
+    return HTML(string=html_string, base_url=base_url).render()
+
+
+def escribir_pdf(documento, titulo: Optional[str] = None, fecha_emision: Optional[str] = None) -> bytes:
+    """
+    Serializa un documento de WeasyPrint ya renderizado.
+
+    Args:
+        documento: weasyprint.Document (o una copia con un subconjunto de páginas)
+        titulo: Título de los metadatos del PDF
+        fecha_emision: Fecha W3C para created/modified (modo determinístico)
+    """
+    if titulo is not None:
+        documento.metadata.title = titulo
+    if fecha_emision is None:
+        return documento.write_pdf()
+    documento.metadata.created = fecha_emision
+    documento.metadata.modified = fecha_emision
+    return documento.write_pdf(pdf_identifier=True)
+
+
+class _Solicitud:
+    """Un certificado PDF esperando en un lote"""
+
+    def __init__(self, html: str, head: str, titulo: Optional[str], body: Optional[str],
+                 fecha_emision: Optional[str]):
+        self.html = html
+        self.head = head
+        self.titulo = titulo
+        self.body = body
+        self.fecha_emision = fecha_emision
+        self.resultado: Optional[bytes] = None
+        self.error: Optional[BaseException] = None
+        self.terminada = threading.Event()
+
+
+class _Lote:
+    def __init__(self):
+        self.solicitudes: List[_Solicitud] = []
+        self.lleno = threading.Event()
+
+
+class PDFMicroBatcher:
+    """
+    Agrupa PDFs concurrentes en una sola pasada de WeasyPrint.
+
+    Buena parte del costo de WeasyPrint es fijo por llamada (parseo, cascada
+    de estilos, carga de fuentes). El primer request de un lote espera una
+    ventana corta (PDF_MICROBATCH_WINDOW_MS); los que llegan en ese lapso con
+    la misma plantilla se unen como secciones de un único documento HTML, que
+    se renderiza una vez y se divide por páginas en un PDF por request.
+
+    Cada sección lleva un ancla (id="lote-N") para saber en qué página
+    empieza. Si el render conjunto falla, cada request se renderiza por
+    separado para que un documento problemático no afecte al resto.
+    """
+
+    def __init__(self, renderizador: Optional[Callable] = None, ventana: float = 0.01, max_lote: int = 16):
+        """
+        Args:
+            renderizador: Función (html, base_url) -> documento renderizado
+            ventana: Segundos que el primer request espera compañeros de lote
+            max_lote: Requests máximos por lote (el lote sale antes si se llena)
+        """
+        self.renderizador = renderizador or _renderizar_weasyprint
+        self.ventana = ventana
+        self.max_lote = max_lote
+        self._lock = threading.Lock()
+        self._abiertos: Dict[Tuple[str, str], _Lote] = {}
+
+    def renderizar(self, html_string: str, base_url: str, fecha_emision: Optional[str] = None) -> bytes:
+        """
+        Renderiza un certificado PDF, compartiendo la pasada de WeasyPrint con requests concurrentes.
+
+        Args:
+            html_string: HTML completo del certificado
+            base_url: Base para resolver imágenes y estilos
+            fecha_emision: Fecha W3C para los metadatos (None = modo no determinístico)
+
+        Returns:
+            Bytes del PDF de este request
+        """
+        head, titulo, body = self._dividir(html_string)
+        solicitud = _Solicitud(html_string, head, titulo, body, fecha_emision)
+        clave = (hashlib.sha256(head.encode('utf-8')).hexdigest(), base_url)
+
+        nuevo = _Lote()
+        with self._lock:
+            lote = self._abiertos.setdefault(clave, nuevo)
+            es_lider = lote is nuevo
+            lote.solicitudes.append(solicitud)
+            if len(lote.solicitudes) >= self.max_lote:
+                del self._abiertos[clave]
+                lote.lleno.set()
+
+        if es_lider:
+            lote.lleno.wait(self.ventana)
+            with self._lock:
+                if self._abiertos.get(clave) is lote:
+                    del self._abiertos[clave]
+            self._procesar(lote, base_url)
+        else:
+            solicitud.terminada.wait()
+
+        if solicitud.error is not None:
+            raise solicitud.error
+        if solicitud.resultado is None:
+            raise DocumentGenerationException('pdf', 'El lote de PDFs terminó sin resultado para el request')
+        return solicitud.resultado
+
+    @staticmethod
+    def _dividir(html_string: str):
+        """Separa head (sin <title>), título y body. Sin <head>/<body> el documento no se agrupa"""
+        head = _HEAD.search(html_string)
+        body = _BODY.search(html_string)
+        if not head or not body:
+            return html_string, None, None
+        titulo = _TITULO.search(head.group(1))
+        head_sin_titulo = _TITULO.sub('', head.group(1))
+        return head_sin_titulo, html_lib.unescape(titulo.group(1).strip()) if titulo else None, body.group(1)
+
+    def _procesar(self, lote: _Lote, base_url: str) -> None:
+        solicitudes = lote.solicitudes
+        try:
+            if len(solicitudes) == 1 or any(s.body is None for s in solicitudes):
+                for solicitud in solicitudes:
+                    self._renderizar_individual(solicitud, base_url)
+                return
+
+            try:
+                self._renderizar_lote(solicitudes, base_url)
+                logger.info(f'Lote de {len(solicitudes)} PDFs renderizado en una pasada')
+            except Exception as e:
+                logger.warning(f'Falló el render conjunto de {len(solicitudes)} PDFs, se renderizan por separado: {e}')
+                for solicitud in solicitudes:
+                    if solicitud.resultado is None:
+                        self._renderizar_individual(solicitud, base_url)
+        finally:
+            for solicitud in solicitudes:
+                solicitud.terminada.set()
+
+    def _renderizar_individual(self, solicitud: _Solicitud, base_url: str) -> None:
+        try:
+            documento = self.renderizador(solicitud.html, base_url)
+            solicitud.resultado = escribir_pdf(documento, solicitud.titulo, solicitud.fecha_emision)
+        except Exception as e:
+            solicitud.error = e
+
+    def _renderizar_lote(self, solicitudes: List[_Solicitud], base_url: str) -> None:
+        html_string = self._armar_html(solicitudes[0].head, [s.body or '' for s in solicitudes], solicitudes[0].titulo)
+        documento = self.renderizador(html_string, base_url)
+
+        inicios = {}
+        for numero, pagina in enumerate(documento.pages):
+            for ancla in list(pagina.anchors):
+                if ancla.startswith(PREFIJO_ANCLA):
+                    inicios.setdefault(int(ancla[len(PREFIJO_ANCLA):]), numero)
+                    # Sin el ancla (destino con nombre en el PDF) cada PDF es igual al renderizado solo
+                    del pagina.anchors[ancla]
+        if sorted(inicios) != list(range(len(solicitudes))):
+            raise ValueError(f'No se encontraron las {len(solicitudes)} anclas del lote')
+
+        limites = [inicios[i] for i in range(len(solicitudes))] + [len(documento.pages)]
+        for i, solicitud in enumerate(solicitudes):
+            paginas = documento.pages[limites[i]:limites[i + 1]]
+            solicitud.resultado = escribir_pdf(documento.copy(paginas), solicitud.titulo, solicitud.fecha_emision)
+
+    @staticmethod
+    def _armar_html(head: str, bodies: List[str], titulo: Optional[str]) -> str:
+        """Un documento con una sección por certificado, cada una desde una página nueva"""
+        titulo_html = f'<title>{html_lib.escape(titulo)}</title>' if titulo else ''
+        secciones = ''.join(
+            f'<section class="lote-certificado" id="{PREFIJO_ANCLA}{i}">{body}</section>'
+            for i, body in enumerate(bodies)
+        )
+        return (
+            f'<!DOCTYPE html><html><head>{titulo_html}{head}'
+            '<style>.lote-certificado + .lote-certificado { break-before: page; }</style>'
+            f'</head><body>{secciones}</body></html>'
+        )
+
+
+_batcher: Optional[PDFMicroBatcher] = None
+_batcher_lock = threading.Lock()
+
+
+def obtener_pdf_batcher() -> PDFMicroBatcher:
+    """Batcher del proceso (lazy), configurado con PDF_MICROBATCH_WINDOW_MS y PDF_MICROBATCH_MAX"""
+    global _batcher
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                _batcher = PDFMicroBatcher(
+                    ventana=current_app.config['PDF_MICROBATCH_WINDOW_MS'] / 1000,
+                    max_lote=current_app.config['PDF_MICROBATCH_MAX']
+                )
+    return _batcher
@@ -0,0 +1,394 @@
+"""
+Motor PDF de "fondo precalculado + texto superpuesto" para el certificado.
+
+El diseño de certificado_pdf.html es fijo: dos logos y un texto legal en el
+que solo cambian unos pocos campos. En lugar de pasar por WeasyPrint en
+cada request, la parte estática (logos, fuentes y recursos de la página) se
+serializa una vez por versión de plantilla como bytes PDF ya numerados, y
+por request solo se compone el texto en un content stream que se agrega
+junto con el xref. El texto usa DejaVu Sans y DejaVu Sans Bold embebidas
+como CIDFontType2 (Identity-H, con ToUnicode) en el fondo, subconjuntadas
+al repertorio latino de REPERTORIO; el texto se justifica con los anchos de
+avance (hmtx) de esas mismas fuentes.
+
+La maquetación reproduce la de la plantilla HTML: A4, márgenes de 2cm,
+logos de 304px de ancho y párrafos justificados de 1.2em con interlineado
+1.5. Si se modifica certificado_pdf.html hay que ajustar este módulo.
+"""
+import datetime
+import hashlib
+import io
+import threading
+import unicodedata
+import zlib
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.utils.fingerprint import huella_plantillas
+
+# Cambiar cuando se modifique la maquetación (invalida los fondos cacheados)
+VERSION_OVERLAY = '2'
+
+# Geometría en puntos PDF (1px CSS = 0.75pt)
+ANCHO_PAGINA, ALTO_PAGINA = 595.28, 841.89
+MARGEN = 56.69                       # 2cm
+ANCHO_UTIL = ANCHO_PAGINA - 2 * MARGEN
+ANCHO_LOGO = 304 * 0.75
+TAMANIO_BASE = 12.0                  # font-size del body: 16px
+TAMANIO_TEXTO = 14.4                 # 1.2em de 16px
+INTERLINEADO = TAMANIO_TEXTO * 1.5
+MARGEN_PARRAFO = 15.0                # margin-top: 20px (colapsa con el margin-bottom de 1em)
+
+# Caracteres embebidos de cada fuente: Latin-1, Latin Extended-A y la puntuación
+# tipográfica de Windows-1252 (nombres de personas, ciudades e instituciones)
+REPERTORIO = frozenset(range(0x20, 0x7F)) | frozenset(range(0xA0, 0x180)) | frozenset(map(ord, '–—‘’‚“”„•…€'))
+
+Segmento = Tuple[str, bool]  # (texto, negrita)
+
+
+class TextoNoRepresentable(ValueError):
+    """El texto tiene caracteres que no están en las fuentes embebidas del fondo"""
+
+
+class FuenteEmbebida:
+    """
+    Subconjunto de una fuente TrueType embebido como CIDFontType2 (Identity-H).
+
+    El subconjunto se arma una vez al construir el fondo; por request solo se
+    traducen caracteres a glifos y se suman anchos.
+    """
+
+    def __init__(self, ruta: str):
+        from fontTools import subset
+        from fontTools.ttLib import TTFont
+
+        # Sin recalcular head.modified: el mismo archivo produce siempre los mismos bytes
+        fuente = TTFont(ruta, recalcTimestamp=False)
+        opciones = subset.Options()
+        opciones.layout_features = []
+        opciones.hinting = False
+        # pyrefly: ignore  # bad-assignment
+        opciones.name_IDs = ['*']
+        opciones.notdef_outline = True
+        opciones.drop_tables += ['GSUB', 'GPOS', 'GDEF', 'kern', 'FFTM']
+        subconjunto = subset.Subsetter(opciones)
+        subconjunto.populate(unicodes=REPERTORIO)
+        subconjunto.subset(fuente)
+
+        cabecera = fuente['head']
+        # pyrefly: ignore  # missing-attribute
+        unidades = cabecera.unitsPerEm
+        escala = 1000 / unidades
+        glifos = {nombre: numero for numero, nombre in enumerate(fuente.getGlyphOrder())}
+        metricas = fuente['hmtx'].metrics
+        cmap = fuente.getBestCmap() or {}
+        self._glifos = {codigo: glifos[nombre] for codigo, nombre in cmap.items()}
+        # Anchos en milésimas de em, por caracter y por glifo (array /W)
+        self._anchos = {codigo: metricas[nombre][0] * escala for codigo, nombre in cmap.items()}
+        self._anchos_glifo = [round(metricas[nombre][0] * escala) for nombre in fuente.getGlyphOrder()]
+
+        self.ascendente = fuente['hhea'].ascent / unidades
+        self.descendente = -fuente['hhea'].descent / unidades
+        self._caja = [round(v * escala) for v in (cabecera.xMin, cabecera.yMin, cabecera.xMax, cabecera.yMax)]
+        self._altura_mayusculas = round(getattr(fuente['OS/2'], 'sCapHeight', 0) * escala) or round(self.ascendente * 700)
+
+        salida = io.BytesIO()
+        fuente.save(salida)
+        self._datos = salida.getvalue()
+        nombre = fuente['name'].getDebugName(6) or 'Fuente'
+        # Prefijo de subconjunto (6 mayúsculas) derivado del contenido: mismo archivo, mismo nombre
+        etiqueta = ''.join(chr(65 + b % 26) for b in hashlib.sha256(self._datos).digest()[:6])
+        self.nombre = f'{etiqueta}+{nombre}'
+
+    def ancho(self, texto: str, tamanio: float = TAMANIO_TEXTO) -> float:
+        """Ancho en puntos de un texto (suma de avances, sin kerning)"""
+        try:
+            return sum(self._anchos[ord(c)] for c in unicodedata.normalize('NFC', texto)) * tamanio / 1000
+        except KeyError as e:
+            raise TextoNoRepresentable(f'Caracter U+{e.args[0]:04X} fuera de las fuentes embebidas') from None
+
+    def codificar(self, texto: str) -> bytes:
+        """String hexadecimal PDF con los glifos del texto (2 bytes por glifo, Identity-H)"""
+        try:
+            glifos = [self._glifos[ord(c)] for c in unicodedata.normalize('NFC', texto)]
+        except KeyError as e:
+            raise TextoNoRepresentable(f'Caracter U+{e.args[0]:04X} fuera de las fuentes embebidas') from None
+        return b'<' + ''.join(f'{glifo:04X}' for glifo in glifos).encode('ascii') + b'>'
+
+    def objetos(self, numero: int, primero_libre: int) -> List[Tuple[int, bytes]]:
+        """Type0 en `numero` y sus cuatro objetos auxiliares desde `primero_libre`"""
+        cid, descriptor, archivo, unicode_ = range(primero_libre, primero_libre + 4)
+        comprimido = zlib.compress(self._datos, 6)
+        anchos = b' '.join(b'%d' % ancho for ancho in self._anchos_glifo)
+        nombre = self.nombre.encode('ascii', errors='ignore')
+        mapa = self._to_unicode()
+        return [
+            (numero, b'<< /Type /Font /Subtype /Type0 /BaseFont /' + nombre + b' /Encoding /Identity-H '
+                     b'/DescendantFonts [%d 0 R] /ToUnicode %d 0 R >>' % (cid, unicode_)),
+            (cid, b'<< /Type /Font /Subtype /CIDFontType2 /BaseFont /' + nombre
+                  + b' /CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> '
+                  b'/FontDescriptor %d 0 R /CIDToGIDMap /Identity /DW 1000 /W [0 [' % descriptor + anchos + b']] >>'),
+            (descriptor, b'<< /Type /FontDescriptor /FontName /' + nombre + b' /Flags 32 /FontBBox [%d %d %d %d] '
+                         % tuple(self._caja) + b'/ItalicAngle 0 /Ascent %d /Descent %d /CapHeight %d /StemV 80 '
+                         % (round(self.ascendente * 1000), -round(self.descendente * 1000), self._altura_mayusculas)
+                         + b'/FontFile2 %d 0 R >>' % archivo),
+            (archivo, b'<< /Length %d /Length1 %d /Filter /FlateDecode >>\nstream\n' % (len(comprimido), len(self._datos))
+                      + comprimido + b'\nendstream'),
+            (unicode_, b'<< /Length %d >>\nstream\n' % len(mapa) + mapa + b'\nendstream'),
+        ]
+
+    def _to_unicode(self) -> bytes:
+        """CMap ToUnicode: permite copiar y buscar el texto del PDF"""
+        pares = sorted((glifo, codigo) for codigo, glifo in self._glifos.items())
+        bloques = []
+        for inicio in range(0, len(pares), 100):
+            bloque = pares[inicio:inicio + 100]
+            lineas = b'\n'.join(b'<%04X> <%04X>' % par for par in bloque)
+            bloques.append(b'%d beginbfchar\n' % len(bloque) + lineas + b'\nendbfchar')
+        return (b'/CIDInit /ProcSet findresource begin\n12 dict begin\nbegincmap\n'
+                b'/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def\n'
+                b'/CMapName /Adobe-Identity-UCS def\n/CMapType 2 def\n'
+                b'1 begincodespacerange\n<0000> <FFFF>\nendcodespacerange\n'
+                + b'\n'.join(bloques)
+                + b'\nendcmap\nCMapName currentdict /CMap defineresource pop\nend\nend')
+
+
+Fuentes = Dict[bool, FuenteEmbebida]  # negrita -> fuente
+
+
+def _valor(objeto, *atributos) -> str:
+    for atributo in atributos:
+        objeto = getattr(objeto, atributo, None) if objeto is not None else None
+    return '' if objeto is None else str(objeto)
+
+
+def parrafos_certificado(context: dict) -> List[List[Segmento]]:
+    """Los dos párrafos de certificado_pdf.html como secuencias de segmentos"""
+    alumno = context['alumno']
+    facultad = context['facultad']
+    return [
+        [
+            ('Por la presente se hace constar que ', False),
+            (f"{_valor(alumno, 'apellido')}, {_valor(alumno, 'nombre')}", True),
+            (' - ', False),
+            (_valor(alumno, 'tipo_documento', 'nombre'), True),
+            (': ', False),
+            (_valor(alumno, 'nrodocumento'), True),
+            (' - LEGAJO Nº: ', False),
+            (_valor(alumno, 'legajo'), True),
+            (', es Estudiante Regular de la especialidad ', False),
+            (_valor(context['especialidad'], 'nombre'), True),
+            (' que se dicta en la ', False),
+            (_valor(facultad, 'nombre'), True),
+            (' de la ', False),
+            (_valor(context['universidad'], 'nombre'), True),
+            ('.', False),
+        ],
+        [
+            ('A solicitud del interesado y a los fines de ser presentado ante quien corresponda, '
+             'se le extiende el presente certificado, sin enmiendas ni raspaduras, en ', False),
+            (f"{_valor(facultad, 'ciudad').upper()}, {_valor(facultad, 'provincia').upper()}", True),
+            ('. el ', False),
+            (str(context.get('fecha', '')), True),
+            ('.-', False),
+        ],
+    ]
+
+
+def _palabras(segmentos: Sequence[Segmento]) -> List[List[Segmento]]:
+    """Agrupa los segmentos en palabras (una palabra puede mezclar negrita y normal)"""
+    palabras, actual = [], []
+    for texto, negrita in segmentos:
+        for indice, pieza in enumerate(texto.replace('\n', ' ').split(' ')):
+            # Entre dos piezas consecutivas había un espacio: corte de palabra
+            if indice and actual:
+                palabras.append(actual)
+                actual = []
+            if pieza:
+                actual.append((pieza, negrita))
+    if actual:
+        palabras.append(actual)
+    return palabras
+
+
+def dividir_lineas(segmentos: Sequence[Segmento], fuentes: Fuentes, ancho: float = ANCHO_UTIL,
+                   tamanio: float = TAMANIO_TEXTO) -> List[List[Tuple[List[Segmento], float]]]:
+    """Corte de líneas greedy: lista de líneas, cada una con sus palabras y anchos"""
+    espacio = fuentes[False].ancho(' ', tamanio)
+    lineas, actual, ocupado = [], [], 0.0
+    for palabra in _palabras(segmentos):
+        ancho_palabra = sum(fuentes[negrita].ancho(texto, tamanio) for texto, negrita in palabra)
+        necesario = ancho_palabra if not actual else ocupado + espacio + ancho_palabra
+        if actual and necesario > ancho:
+            lineas.append(actual)
+            actual, ocupado = [], 0.0
+            necesario = ancho_palabra
+        actual.append((palabra, ancho_palabra))
+        ocupado = necesario
+    if actual:
+        lineas.append(actual)
+    return lineas
+
+
+_RECURSO_FUENTE = {False: b'/F1', True: b'/F2'}
+
+
+def _numero(valor: float) -> bytes:
+    return (f'{valor:.2f}'.rstrip('0').rstrip('.') or '0').encode('ascii')
+
+
+def operadores_texto(parrafos: List[List[Segmento]], y_inicial: float, fuentes: Fuentes) -> bytes:
+    """Content stream con los párrafos justificados (la última línea alineada a la izquierda)"""
+    espacio = fuentes[False].ancho(' ')
+    ascendente, descendente = fuentes[False].ascendente, fuentes[False].descendente
+    operadores = [b'BT']
+    fuente_actual = None
+    y = y_inicial
+    for indice, parrafo in enumerate(parrafos):
+        if indice:
+            y -= MARGEN_PARRAFO
+        lineas = dividir_lineas(parrafo, fuentes)
+        for numero, linea in enumerate(lineas):
+            base = y - (INTERLINEADO - TAMANIO_TEXTO * (ascendente + descendente)) / 2 - TAMANIO_TEXTO * ascendente
+            separacion = espacio
+            if numero < len(lineas) - 1 and len(linea) > 1:
+                natural = sum(ancho for _, ancho in linea) + espacio * (len(linea) - 1)
+                separacion = espacio + (ANCHO_UTIL - natural) / (len(linea) - 1)
+            x = MARGEN
+            for palabra, ancho_palabra in linea:
+                x_segmento = x
+                for texto, negrita in palabra:
+                    if negrita != fuente_actual:
+                        operadores.append(_RECURSO_FUENTE[negrita] + b' ' + _numero(TAMANIO_TEXTO) + b' Tf')
+                        fuente_actual = negrita
+                    operadores.append(b'1 0 0 1 ' + _numero(x_segmento) + b' ' + _numero(base) + b' Tm '
+                                      + fuentes[negrita].codificar(texto) + b' Tj')
+                    x_segmento += fuentes[negrita].ancho(texto)
+                x += ancho_palabra + separacion
+            y -= INTERLINEADO
+    operadores.append(b'ET')
+    return b'\n'.join(operadores)
+
+
+def _imagen(ruta: str, numero: int) -> Tuple[List[Tuple[int, bytes]], int, int]:
+    """Objetos PDF (imagen RGB + máscara alfa) de un PNG y sus dimensiones en píxeles"""
+    from PIL import Image
+    with Image.open(ruta) as original:
+        imagen = original.convert('RGBA')
+    ancho, alto = imagen.size
+    rgb = zlib.compress(imagen.convert('RGB').tobytes(), 6)
+    alfa = zlib.compress(imagen.getchannel('A').tobytes(), 6)
+
+    mascara = (b'<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceGray '
+               b'/BitsPerComponent 8 /Filter /FlateDecode /Length %d >>\nstream\n' % (ancho, alto, len(alfa))
+               + alfa + b'\nendstream')
+    color = (b'<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceRGB '
+             b'/BitsPerComponent 8 /SMask %d 0 R /Filter /FlateDecode /Length %d >>\nstream\n'
+             % (ancho, alto, numero + 1, len(rgb)) + rgb + b'\nendstream')
+    return [(numero, color), (numero + 1, mascara)], ancho, alto
+
+
+class FondoCertificado:
+    """
+    Parte estática del PDF, serializada una vez por versión de plantilla.
+
+    Objetos fijos: 1 Catalog, 2 Pages, 3 Page, 4-5 fuentes (Type0), 6 content
+    stream de los logos, 7-10 las imágenes y 11-18 los objetos de las fuentes
+    embebidas. Cada request agrega solo su content stream de texto y el
+    diccionario Info.
+    """
+
+    def __init__(self, ruta_logo_izquierdo: str, ruta_logo_derecho: str,
+                 ruta_fuente: str, ruta_fuente_negrita: str):
+        objetos: List[Tuple[int, bytes]] = []
+        izquierdo, ancho_i, alto_i = _imagen(ruta_logo_izquierdo, 7)
+        derecho, ancho_d, alto_d = _imagen(ruta_logo_derecho, 9)
+        self.fuentes: Fuentes = {False: FuenteEmbebida(ruta_fuente), True: FuenteEmbebida(ruta_fuente_negrita)}
+        self.num_contenido = 19
+        self.num_info = 20
+
+        alto_logo_i = ANCHO_LOGO * alto_i / ancho_i
+        alto_logo_d = ANCHO_LOGO * alto_d / ancho_d
+        tope = ALTO_PAGINA - MARGEN
+        # Las imágenes se apoyan en la línea base: debajo queda el descendente de la fuente del body
+        hueco_bajo_logos = TAMANIO_BASE * self.fuentes[False].descendente
+        self.y_texto = tope - max(alto_logo_i, alto_logo_d) - hueco_bajo_logos - MARGEN_PARRAFO
+
+        logos = b'\n'.join([
+            b'q ' + _numero(ANCHO_LOGO) + b' 0 0 ' + _numero(alto_logo_i) + b' ' + _numero(MARGEN) + b' '
+            + _numero(tope - alto_logo_i) + b' cm /Im1 Do Q',
+            b'q ' + _numero(ANCHO_LOGO) + b' 0 0 ' + _numero(alto_logo_d) + b' '
+            + _numero(MARGEN + ANCHO_UTIL - ANCHO_LOGO) + b' ' + _numero(tope - alto_logo_d) + b' cm /Im2 Do Q',
+        ])
+
+        objetos.append((1, b'<< /Type /Catalog /Pages 2 0 R >>'))
+        objetos.append((2, b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>'))
+        objetos.append((3, b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 ' + _numero(ANCHO_PAGINA) + b' '
+                        + _numero(ALTO_PAGINA) + b'] /Resources << /Font << /F1 4 0 R /F2 5 0 R >> '
+                        b'/XObject << /Im1 7 0 R /Im2 9 0 R >> /ProcSet [/PDF /Text /ImageC] >> '
+                        b'/Contents [6 0 R %d 0 R] >>' % self.num_contenido))
+        objetos.append((6, b'<< /Length %d >>\nstream\n' % len(logos) + logos + b'\nendstream'))
+        objetos.extend(izquierdo)
+        objetos.extend(derecho)
+        objetos.extend(self.fuentes[False].objetos(4, 11))
+        objetos.extend(self.fuentes[True].objetos(5, 15))
+        objetos.sort()
+
+        prefijo = bytearray(b'%PDF-1.7\n%\xe2\xe3\xcf\xd3\n')
+        self.offsets: Dict[int, int] = {}
+        for numero, cuerpo in objetos:
+            self.offsets[numero] = len(prefijo)
+            prefijo += b'%d 0 obj\n' % numero + cuerpo + b'\nendobj\n'
+        self.prefijo = bytes(prefijo)
+
+    def generar(self, parrafos: List[List[Segmento]], titulo: str,
+                fecha: Optional[datetime.datetime] = None) -> bytes:
+        """
+        Agrega el texto del request al fondo y cierra el archivo (xref + trailer).
+
+        Raises:
+            TextoNoRepresentable: Si el texto usa caracteres fuera de las fuentes embebidas
+        """
+        texto = zlib.compress(operadores_texto(parrafos, self.y_texto, self.fuentes), 6)
+        momento = fecha or datetime.datetime.now(datetime.timezone.utc)
+        fecha_pdf = momento.strftime("D:%Y%m%d%H%M%S+00'00'").encode('ascii')
+        titulo_pdf = b'<' + ('\ufeff' + titulo).encode('utf-16-be').hex().upper().encode('ascii') + b'>'
+
+        salida = bytearray(self.prefijo)
+        offsets = dict(self.offsets)
+        offsets[self.num_contenido] = len(salida)
+        salida += (b'%d 0 obj\n<< /Length %d /Filter /FlateDecode >>\nstream\n' % (self.num_contenido, len(texto))
+                   + texto + b'\nendstream\nendobj\n')
+        offsets[self.num_info] = len(salida)
+        salida += (b'%d 0 obj\n<< /Producer (gestion-documentos overlay %s) /Title ' % (self.num_info, VERSION_OVERLAY.encode('ascii'))
+                   + titulo_pdf + b' /CreationDate (' + fecha_pdf + b') /ModDate (' + fecha_pdf + b') >>\nendobj\n')
+
+        identificador = hashlib.md5(bytes(salida)).hexdigest().encode('ascii')
+        inicio_xref = len(salida)
+        total = self.num_info + 1
+        salida += b'xref\n0 %d\n0000000000 65535 f \n' % total
+        for numero in range(1, total):
+            salida += b'%010d 00000 n \n' % offsets[numero]
+        salida += (b'trailer\n<< /Size %d /Root 1 0 R /Info %d 0 R /ID [<%s> <%s>] >>\nstartxref\n%d\n%%%%EOF\n'
+                   % (total, self.num_info, identificador, identificador, inicio_xref))
+        return bytes(salida)
+
+
+_fondos: Dict[str, FondoCertificado] = {}
+_lock = threading.Lock()
+
+
+def obtener_fondo(ruta_plantilla: str, ruta_logo_izquierdo: str, ruta_logo_derecho: str,
+                  ruta_fuente: str, ruta_fuente_negrita: str) -> FondoCertificado:
+    """Fondo cacheado por proceso; se reconstruye si cambian la plantilla, los logos o las fuentes"""
+    clave = VERSION_OVERLAY + huella_plantillas(
+        (ruta_plantilla, ruta_logo_izquierdo, ruta_logo_derecho, ruta_fuente, ruta_fuente_negrita)
+    )
+    fondo = _fondos.get(clave)
+    if fondo is None:
+        with _lock:
+            fondo = _fondos.get(clave)
+            if fondo is None:
+                fondo = FondoCertificado(ruta_logo_izquierdo, ruta_logo_derecho, ruta_fuente, ruta_fuente_negrita)
+                _fondos.clear()
+                _fondos[clave] = fondo
+    return fondo
@@ -1,3 +1,4 @@
 from .retry_decorator import retry
+from .empaquetado import empaquetar_zip, empaquetar_multipart
 
-__all__ = ['retry']
+__all__ = ['retry', 'empaquetar_zip', 'empaquetar_multipart']
@@ -0,0 +1,101 @@
+"""
+Salida byte a byte reproducible de los documentos generados.
+
+Los generadores incrustan fechas volátiles (timestamps de las entradas ZIP
+de DOCX/ODT, metadatos de creación) y el mismo contenido produce bytes
+distintos en cada renderizado. Estas funciones fijan esos valores a la
+fecha de emisión del certificado para que insumos idénticos den archivos
+idénticos (hash, deduplicación y caché HTTP estables).
+"""
+import datetime
+import re
+import zipfile
+from io import BytesIO
+from typing import Callable, Dict, Optional
+
+# Entradas que deben ir primero (ODF exige 'mimetype' primero y sin comprimir)
+_ENTRADAS_INICIALES = ('mimetype', '[Content_Types].xml')
+
+_OOXML_CREATED = re.compile(rb'(<dcterms:created\b[^>]*>)[^<]*(</dcterms:created>)')
+_OOXML_MODIFIED = re.compile(rb'(<dcterms:modified\b[^>]*>)[^<]*(</dcterms:modified>)')
+_ODF_CREATION_DATE = re.compile(rb'(<meta:creation-date>)[^<]*(</meta:creation-date>)')
+_ODF_DATE = re.compile(rb'(<dc:date>)[^<]*(</dc:date>)')
+
+
+def momento_emision(fecha: Optional[datetime.date]) -> datetime.datetime:
+    """Medianoche UTC de la fecha de emisión (hoy si no se indica)"""
+    fecha = fecha or datetime.date.today()
+    return datetime.datetime(fecha.year, fecha.month, fecha.day, tzinfo=datetime.timezone.utc)
+
+
+def fijar_fechas_ooxml(xml: bytes, momento: datetime.datetime) -> bytes:
+    """Fija dcterms:created y dcterms:modified de docProps/core.xml (DOCX)"""
+    valor = momento.strftime('%Y-%m-%dT%H:%M:%SZ').encode('ascii')
+    xml = _OOXML_CREATED.sub(lambda m: m.group(1) + valor + m.group(2), xml)
+    return _OOXML_MODIFIED.sub(lambda m: m.group(1) + valor + m.group(2), xml)
+
+
+def fijar_fechas_odf(xml: bytes, momento: datetime.datetime) -> bytes:
+    """Fija meta:creation-date y dc:date de meta.xml (ODT)"""
+    valor = momento.strftime('%Y-%m-%dT%H:%M:%S').encode('ascii')
+    xml = _ODF_CREATION_DATE.sub(lambda m: m.group(1) + valor + m.group(2), xml)
+    return _ODF_DATE.sub(lambda m: m.group(1) + valor + m.group(2), xml)
+
+
+def normalizar_zip(contenido: bytes, momento: datetime.datetime,
+                   reemplazos: Optional[Dict[str, Callable[[bytes], bytes]]] = None) -> bytes:
+    """
+    Reescribe un contenedor ZIP (DOCX/ODT) de forma determinística.
+
+    - Todas las entradas llevan el timestamp de la fecha de emisión y
+      atributos fijos (0644, sistema Unix).
+    - Orden estable: 'mimetype' y '[Content_Types].xml' primero, el resto
+      alfabético. 'mimetype' se guarda sin comprimir (requisito ODF).
+    - reemplazos permite transformar entradas (ej: metadatos con fechas).
+
+    Args:
+        contenido: Bytes del ZIP original
+        momento: Fecha a usar en las entradas y metadatos
+        reemplazos: Nombre de entrada -> función que transforma su contenido
+
+    Returns:
+        Bytes del ZIP normalizado
+    """
+    reemplazos = reemplazos or {}
+    fecha_zip = (max(momento.year, 1980), momento.month, momento.day, 0, 0, 0)
+
+    with zipfile.ZipFile(BytesIO(contenido)) as origen:
+        nombres = origen.namelist()
+        iniciales = [nombre for nombre in _ENTRADAS_INICIALES if nombre in nombres]
+        orden = iniciales + sorted(nombre for nombre in nombres if nombre not in iniciales)
+
+        salida = BytesIO()
+        with zipfile.ZipFile(salida, 'w') as destino:
+            for nombre in orden:
+                datos = origen.read(nombre)
+                if nombre in reemplazos:
+                    datos = reemplazos[nombre](datos)
+
+                info = zipfile.ZipInfo(nombre, date_time=fecha_zip)
+                info.create_system = 3
+                info.external_attr = 0o644 << 16
+                info.compress_type = zipfile.ZIP_STORED if nombre == 'mimetype' else zipfile.ZIP_DEFLATED
+                destino.writestr(info, datos, compresslevel=6)
+
+    return salida.getvalue()
+
+
+def normalizar_docx(contenido: bytes, fecha: Optional[datetime.date]) -> bytes:
+    """DOCX reproducible: ZIP normalizado y docProps/core.xml con la fecha de emisión"""
+    momento = momento_emision(fecha)
+    return normalizar_zip(contenido, momento, {
+        'docProps/core.xml': lambda xml: fijar_fechas_ooxml(xml, momento),
+    })
+
+
+def normalizar_odt(contenido: bytes, fecha: Optional[datetime.date]) -> bytes:
+    """ODT reproducible: ZIP normalizado y meta.xml con la fecha de emisión"""
+    momento = momento_emision(fecha)
+    return normalizar_zip(contenido, momento, {
+        'meta.xml': lambda xml: fijar_fechas_odf(xml, momento),
+    })
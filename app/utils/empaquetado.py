@@ -0,0 +1,51 @@
+"""
+Utilidades para empaquetar varios documentos generados en una sola respuesta.
+"""
+import uuid
+import zipfile
+from io import BytesIO
+from typing import Dict, Tuple
+
+
+def empaquetar_zip(archivos: Dict[str, bytes]) -> BytesIO:
+    """
+    Empaqueta varios documentos en un ZIP en memoria.
+    
+    Los documentos PDF/DOCX/ODT ya vienen comprimidos, por eso se guardan
+    sin recompresión (ZIP_STORED) para no gastar CPU en vano.
+    
+    Args:
+        archivos: Diccionario nombre_de_archivo -> contenido binario
+        
+    Returns:
+        BytesIO posicionado al inicio con el ZIP generado
+    """
+    zip_io = BytesIO()
+    with zipfile.ZipFile(zip_io, 'w', compression=zipfile.ZIP_STORED) as zf:
+        for nombre, contenido in archivos.items():
+            zf.writestr(nombre, contenido)
+    zip_io.seek(0)
+    return zip_io
+
+
+def empaquetar_multipart(partes: Dict[str, Tuple[str, bytes]]) -> Tuple[bytes, str]:
+    """
+    Empaqueta varios documentos en un cuerpo multipart/mixed (RFC 2046).
+    
+    Args:
+        partes: Diccionario nombre_de_archivo -> (mimetype, contenido binario)
+        
+    Returns:
+        Tupla (cuerpo, boundary) para armar el header Content-Type
+    """
+    boundary = uuid.uuid4().hex
+    cuerpo = BytesIO()
+    for nombre, (mimetype, contenido) in partes.items():
+        cuerpo.write(f'--{boundary}\r\n'.encode('ascii'))
+        cuerpo.write(f'Content-Type: {mimetype}\r\n'.encode('ascii'))
+        cuerpo.write(f'Content-Disposition: attachment; filename="{nombre}"\r\n'.encode('utf-8'))
+        cuerpo.write(f'Content-Length: {len(contenido)}\r\n\r\n'.encode('ascii'))
+        cuerpo.write(contenido)
+        cuerpo.write(b'\r\n')
+    cuerpo.write(f'--{boundary}--\r\n'.encode('ascii'))
+    return cuerpo.getvalue(), boundary
@@ -0,0 +1,42 @@
+"""
+Formateo de fechas en español sin depender del locale del sistema.
+
+locale.setlocale es global al proceso: cambiarlo en cada request no es
+thread-safe (afecta el formateo de los otros hilos de Granian) y falla si la
+imagen no tiene el locale instalado. Los nombres de los meses están acá y el
+resultado se memoiza por día calendario e idioma.
+"""
+import datetime
+from functools import lru_cache
+
+MESES = {
+    'es': ('enero', 'febrero', 'marzo', 'abril', 'mayo', 'junio', 'julio',
+           'agosto', 'septiembre', 'octubre', 'noviembre', 'diciembre'),
+}
+
+FORMATOS = {
+    'es': '{dia:02d} de {mes} de {anio}',
+}
+
+IDIOMA_POR_DEFECTO = 'es'
+
+
+def _idioma(locale: str) -> str:
+    """'es_AR.UTF-8' → 'es'; idiomas sin nombres de meses usan el idioma por defecto"""
+    idioma = (locale or IDIOMA_POR_DEFECTO).replace('-', '_').split('_')[0].split('.')[0].lower()
+    return idioma if idioma in MESES else IDIOMA_POR_DEFECTO
+
+
+@lru_cache(maxsize=64)
+def formatear_fecha(fecha: datetime.date, locale: str = IDIOMA_POR_DEFECTO) -> str:
+    """
+    Fecha larga para los certificados (ej: '05 de marzo de 2025').
+
+    Args:
+        fecha: Día a formatear (un datetime se toma por su fecha)
+        locale: Locale pedido ('es', 'es_AR', 'es_ES.UTF-8', ...)
+    """
+    if isinstance(fecha, datetime.datetime):
+        return formatear_fecha(fecha.date(), locale)
+    idioma = _idioma(locale)
+    return FORMATOS[idioma].format(dia=fecha.day, mes=MESES[idioma][fecha.month - 1], anio=fecha.year)
@@ -0,0 +1,92 @@
+"""
+Huellas (hashes) de los insumos de un renderizado.
+
+La huella identifica un documento antes de generarlo: mismos datos del
+alumno, mismas plantillas y misma fecha producen el mismo documento. Se usa
+como clave del almacén de artefactos y como ETag.
+"""
+import dataclasses
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Iterable, Tuple
+
+# Cambiar cuando se modifique la forma de renderizar (invalida huellas previas)
+VERSION_RENDER = '2'
+
+_huellas_archivo = {}
+_lock = threading.Lock()
+
+
+def huella_archivo(ruta: str) -> str:
+    """
+    SHA-256 del contenido de un archivo, memorizado por (mtime, tamaño).
+
+    Las plantillas casi nunca cambian: se leen una vez por proceso y se
+    vuelven a leer solo si cambia su fecha de modificación.
+    """
+    stat = os.stat(ruta)
+    firma = (stat.st_mtime_ns, stat.st_size)
+
+    cacheado = _huellas_archivo.get(ruta)
+    if cacheado is not None and cacheado[0] == firma:
+        return cacheado[1]
+
+    sha = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(1024 * 1024), b''):
+            sha.update(bloque)
+    digest = sha.hexdigest()
+
+    with _lock:
+        _huellas_archivo[ruta] = (firma, digest)
+    return digest
+
+
+def huella_plantillas(rutas: Iterable[str]) -> str:
+    """Huella combinada de las plantillas y recursos (imágenes) de un formato"""
+    sha = hashlib.sha256()
+    for ruta in sorted(rutas):
+        sha.update(os.path.basename(ruta).encode('utf-8'))
+        sha.update(huella_archivo(ruta).encode('ascii'))
+    return sha.hexdigest()
+
+
+def _normalizar(valor: Any) -> Any:
+    """Convierte modelos (dataclasses) y colecciones a tipos JSON con orden estable"""
+    if dataclasses.is_dataclass(valor) and not isinstance(valor, type):
+        return {campo.name: _normalizar(getattr(valor, campo.name, None))
+                for campo in dataclasses.fields(valor)}
+    if isinstance(valor, dict):
+        return {str(clave): _normalizar(v) for clave, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_normalizar(v) for v in valor]
+    if valor is None or isinstance(valor, (str, int, float, bool)):
+        return valor
+    return str(valor)
+
+
+def serializar_contexto(context: dict) -> bytes:
+    """Serialización determinística del contexto de renderizado"""
+    return json.dumps(_normalizar(context), sort_keys=True, ensure_ascii=False,
+                      separators=(',', ':')).encode('utf-8')
+
+
+def huella_render(context: dict, tipo: str, rutas_plantilla: Tuple[str, ...]) -> str:
+    """
+    Huella de un renderizado: versión, formato, plantillas y contexto.
+
+    Args:
+        context: Contexto validado (alumno, especialidad, ..., fecha)
+        tipo: Formato del documento (pdf, docx, odt)
+        rutas_plantilla: Archivos que intervienen en el renderizado
+
+    Returns:
+        SHA-256 hexadecimal
+    """
+    sha = hashlib.sha256()
+    sha.update(f'{VERSION_RENDER}:{tipo}:'.encode('utf-8'))
+    sha.update(huella_plantillas(rutas_plantilla).encode('ascii'))
+    sha.update(serializar_contexto(context))
+    return sha.hexdigest()
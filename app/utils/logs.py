@@ -0,0 +1,132 @@
+"""
+Configuración del logging del proceso: salida JSON (o texto) a stdout a
+través de una cola.
+
+Los loggers solo interpolan el mensaje y encolan el registro (QueueHandler);
+un hilo por proceso (QueueListener) lo formatea, lo serializa y lo escribe.
+Así el formateo y la escritura en stdout no suman latencia a los requests. El hilo no
+sobrevive al fork de los workers de Granian: cada hijo crea su propia cola y
+su propio hilo (os.register_at_fork).
+"""
+import atexit
+import datetime
+import json
+import logging
+import os
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+FORMATO_TEXTO = '%(asctime)s [%(levelname)s] %(name)s: %(message)s'
+
+# Atributos propios de LogRecord: el resto (extra=...) se agrega al JSON
+_ATRIBUTOS_RECORD = frozenset(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+_listener: Optional[QueueListener] = None
+_handler: Optional[QueueHandler] = None
+_fork_registrado = False
+
+
+class FormateadorJSON(logging.Formatter):
+    """Una línea JSON por registro: ts, nivel, logger, mensaje, pid y los campos de extra"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        datos = {
+            'ts': datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc)
+                  .isoformat(timespec='milliseconds'),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'mensaje': record.getMessage(),
+            'pid': record.process,
+        }
+        for clave, valor in vars(record).items():
+            if clave not in _ATRIBUTOS_RECORD and not clave.startswith('_'):
+                datos[clave] = valor
+        if record.exc_info:
+            datos['excepcion'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            datos['excepcion'] = record.exc_text
+        return json.dumps(datos, ensure_ascii=False, default=str)
+
+
+class _HandlerCola(QueueHandler):
+    """
+    Encola el registro con el mensaje ya interpolado.
+
+    El mensaje se fija en el hilo que logea: los argumentos pueden cambiar
+    antes de que el hilo escritor lo tome. A diferencia de QueueHandler.prepare
+    no se copia el registro ni se formatea la excepción: la cola es del mismo
+    proceso, y el formato (texto o JSON) queda para el hilo escritor.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def _crear_formateador(formato: str) -> logging.Formatter:
+    return FormateadorJSON() if formato == 'json' else logging.Formatter(FORMATO_TEXTO)
+
+
+def _iniciar_listener(handler: QueueHandler, salida: logging.Handler) -> None:
+    global _listener
+    cola = queue.SimpleQueue()
+    handler.queue = cola
+    _listener = QueueListener(cola, salida, respect_handler_level=True)
+    _listener.start()
+
+
+def _reiniciar_en_hijo() -> None:
+    # Los registros encolados antes del fork ya los escribe el padre
+    if _handler is not None and _listener is not None:
+        _iniciar_listener(_handler, *_listener.handlers)
+
+
+def detener_logging() -> None:
+    """Escribe lo que quede en la cola y detiene el hilo escritor"""
+    global _listener
+    if _listener is not None and _listener._thread is not None:
+        _listener.stop()
+    _listener = None
+
+
+def configurar_logging(nivel: Optional[str] = None, formato: Optional[str] = None,
+                       en_cola: Optional[bool] = None, salida=None) -> None:
+    """
+    Configura el logger raíz del proceso. Lo llama Config.init_app desde
+    create_app, con LOG_LEVEL, LOG_FORMAT y LOG_QUEUE de la configuración.
+
+    Args:
+        nivel: Nivel del logger raíz (default LOG_LEVEL o INFO)
+        formato: 'json' o 'texto' (default LOG_FORMAT o json)
+        en_cola: Escribir desde un hilo aparte (default LOG_QUEUE o true)
+        salida: Stream de salida (default sys.stdout)
+    """
+    global _handler, _fork_registrado
+    nivel = (nivel or os.getenv('LOG_LEVEL', 'INFO')).upper()
+    formato = (formato or os.getenv('LOG_FORMAT', 'json')).lower()
+    if en_cola is None:
+        en_cola = os.getenv('LOG_QUEUE', 'true').lower() == 'true'
+
+    detener_logging()
+    raiz = logging.getLogger()
+    for handler in list(raiz.handlers):
+        raiz.removeHandler(handler)
+    raiz.setLevel(getattr(logging, nivel))
+
+    escritor = logging.StreamHandler(salida or sys.stdout)
+    escritor.setFormatter(_crear_formateador(formato))
+    if not en_cola:
+        _handler = None
+        raiz.addHandler(escritor)
+        return
+
+    _handler = _HandlerCola(queue.SimpleQueue())
+    _iniciar_listener(_handler, escritor)
+    raiz.addHandler(_handler)
+    if not _fork_registrado:
+        os.register_at_fork(after_in_child=_reiniciar_en_hijo)
+        atexit.register(detener_logging)
+        _fork_registrado = True
@@ -0,0 +1,155 @@
+"""
+Instrumentación de memoria de los workers: RSS, snapshots de tracemalloc y
+reciclaje del worker después de N requests.
+
+El reciclaje por RSS lo hace Granian (workers_max_rss, ver wsgi.py): levanta
+el worker nuevo antes de detener el viejo. El reciclaje por cantidad de
+requests no existe en Granian; ReciclajeWorker envía SIGTERM al propio
+worker, Granian lo detiene en forma ordenada (termina los requests en curso)
+y, con respawn_failed_workers, crea uno nuevo.
+"""
+import logging
+import os
+import random
+import signal
+import threading
+import time
+import tracemalloc
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+_PAGINA = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+# Asignaciones del propio tracemalloc y del sistema de imports: ruido en los snapshots
+_FILTROS_SNAPSHOT = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+
+def rss_bytes() -> Optional[int]:
+    """RSS actual del proceso (Linux, /proc/self/statm); None si no está disponible"""
+    try:
+        with open('/proc/self/statm') as archivo:
+            return int(archivo.read().split()[1]) * _PAGINA
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def iniciar_tracemalloc(frames: int) -> None:
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+        logger.warning(f"tracemalloc activo ({frames} frames): las asignaciones son más lentas")
+
+
+class SnapshotsMemoria:
+    """Snapshot base de tracemalloc del worker y comparación contra el estado actual"""
+
+    def __init__(self):
+        self.base: Optional[tracemalloc.Snapshot] = None
+        self.momento_base: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _tomar(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(_FILTROS_SNAPSHOT)
+
+    def tomar_base(self, top: int = 20, agrupar: str = 'lineno') -> List[dict]:
+        """Guarda un snapshot como base de las comparaciones y devuelve sus mayores asignaciones"""
+        snapshot = self._tomar()
+        with self._lock:
+            self.base, self.momento_base = snapshot, time.time()
+        return [_estadistica(e) for e in snapshot.statistics(agrupar)[:top]]
+
+    def diferencias(self, top: int = 20, agrupar: str = 'lineno') -> Optional[List[dict]]:
+        """Mayores crecimientos desde el snapshot base; None si todavía no hay base"""
+        with self._lock:
+            base = self.base
+        if base is None:
+            return None
+        return [_diferencia(d) for d in self._tomar().compare_to(base, agrupar)[:top]]
+
+
+def _ubicacion(traceback: tracemalloc.Traceback) -> List[str]:
+    return [f'{frame.filename}:{frame.lineno}' for frame in traceback]
+
+
+def _estadistica(estadistica: tracemalloc.Statistic) -> dict:
+    return {'ubicacion': _ubicacion(estadistica.traceback), 'bytes': estadistica.size, 'bloques': estadistica.count}
+
+
+def _diferencia(diferencia: tracemalloc.StatisticDiff) -> dict:
+    return {
+        'ubicacion': _ubicacion(diferencia.traceback),
+        'bytes': diferencia.size,
+        'bytes_diferencia': diferencia.size_diff,
+        'bloques': diferencia.count,
+        'bloques_diferencia': diferencia.count_diff,
+    }
+
+
+class ReciclajeWorker:
+    """
+    Pide a Granian reiniciar el worker después de max_requests requests.
+
+    El límite de cada worker se desplaza al azar hasta jitter requests para
+    que los workers no se reinicien todos juntos. Un worker más joven que
+    edad_minima segundos no se recicla: Granian trata dos salidas seguidas
+    del mismo worker como un crash loop y se detiene.
+    """
+
+    def __init__(self, max_requests: int, jitter: int = 0, edad_minima: float = 10.0):
+        self.limite = max_requests + (random.randint(0, jitter) if jitter > 0 else 0)
+        self.edad_minima = edad_minima
+        self.pid = os.getpid()
+        self.requests = 0
+        self.inicio = time.monotonic()
+        self.solicitado = False
+        self._lock = threading.Lock()
+
+    def registrar_request(self) -> bool:
+        """Cuenta un request terminado; True la primera vez que hay que reciclar"""
+        with self._lock:
+            self.requests += 1
+            if self.solicitado or self.requests < self.limite:
+                return False
+            if time.monotonic() - self.inicio < self.edad_minima:
+                return False
+            self.solicitado = True
+            return True
+
+    def reciclar(self) -> None:
+        """SIGTERM al propio worker: Granian deja de aceptar, termina los requests en curso y sale"""
+        logger.info(f"Worker {self.pid} reciclado tras {self.requests} requests (RSS {rss_bytes()} bytes)")
+        os.kill(self.pid, signal.SIGTERM)
+
+    def estado(self) -> dict:
+        return {'requests': self.requests, 'limite': self.limite, 'solicitado': self.solicitado}
+
+
+_snapshots: Optional[SnapshotsMemoria] = None
+_reciclaje: Optional[ReciclajeWorker] = None
+
+
+def obtener_snapshots() -> SnapshotsMemoria:
+    """Snapshots del proceso actual (uno por worker)"""
+    global _snapshots
+    if _snapshots is None:
+        _snapshots = SnapshotsMemoria()
+    return _snapshots
+
+
+def obtener_reciclaje(config) -> ReciclajeWorker:
+    """Contador de requests del proceso actual; se crea de nuevo en cada worker después del fork"""
+    global _reciclaje
+    if _reciclaje is None or _reciclaje.pid != os.getpid():
+        _reciclaje = ReciclajeWorker(config['WORKER_MAX_REQUESTS'], config['WORKER_MAX_REQUESTS_JITTER'])
+    return _reciclaje
+
+
+def reciclaje_actual() -> Optional[ReciclajeWorker]:
+    if _reciclaje is not None and _reciclaje.pid == os.getpid():
+        return _reciclaje
+    return None
@@ -0,0 +1,266 @@
+"""
+Métricas Prometheus del microservicio (expuestas en /metrics).
+
+Con la variable de entorno PROMETHEUS_MULTIPROC_DIR cada worker de Granian
+escribe sus valores en archivos mmap de ese directorio y /metrics agrega los
+de todos los procesos; sin ella se usa el registro en memoria del proceso
+(desarrollo y tests). La variable debe existir antes de importar
+prometheus_client y el directorio debe estar vacío al arrancar el servidor.
+"""
+import atexit
+import logging
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+from flask import g, has_request_context, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+)
+
+logger = logging.getLogger(__name__)
+
+# Clave del environ WSGI con el inicio del request (time.perf_counter) cuando
+# el modo ASGI ya trabajó sobre él antes de entregarlo a Flask (ver app/asgi.py)
+CLAVE_INICIO = 'documentos.inicio'
+
+DIRECTORIO_MULTIPROCESO = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+
+# De 1 ms (contexto, caches) a 10 s (WeasyPrint bajo carga)
+BUCKETS_SEGUNDOS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+DURACION_ETAPA = Histogram(
+    'documentos_etapa_segundos',
+    'Duración de cada etapa de la generación de un documento',
+    ['etapa', 'formato'],
+    buckets=BUCKETS_SEGUNDOS
+)
+DURACION_REQUEST = Histogram(
+    'documentos_request_segundos',
+    'Duración total de los requests HTTP',
+    ['endpoint', 'metodo', 'status'],
+    buckets=BUCKETS_SEGUNDOS
+)
+REQUESTS_EN_CURSO = Gauge(
+    'documentos_requests_en_curso',
+    'Requests HTTP en curso (suma de los workers vivos)',
+    multiprocess_mode='livesum'
+)
+CONSULTAS_CACHE = Counter(
+    'documentos_cache_consultas_total',
+    'Consultas a cada nivel de cache por resultado (hit/miss)',
+    ['nivel', 'resultado']
+)
+REINTENTOS = Counter(
+    'documentos_reintentos_total',
+    'Reintentos de operaciones fallidas (decorator retry)',
+    ['operacion']
+)
+RESPUESTAS_UPSTREAM = Counter(
+    'documentos_upstream_respuestas_total',
+    'Respuestas de los microservicios externos por código de estado',
+    ['servicio', 'status']
+)
+
+MEMORIA_REQUEST = Histogram(
+    'documentos_request_memoria_bytes',
+    'Memoria Python retenida al terminar cada request (solo con TRACEMALLOC_ENABLED)',
+    ['formato'],
+    buckets=tuple(2 ** n for n in range(10, 28, 2))  # 1 KiB a 128 MiB
+)
+RSS_WORKER = Gauge(
+    'documentos_worker_rss_bytes',
+    'RSS del worker al terminar su último request',
+    multiprocess_mode='liveall'
+)
+
+CPU_ETAPA = Counter(
+    'documentos_etapa_cpu_segundos_total',
+    'CPU del hilo (time.thread_time) consumida en cada etapa; dividir por documentos_etapa_segundos_sum',
+    ['etapa', 'formato']
+)
+CPU_REQUEST = Histogram(
+    'documentos_request_cpu_segundos',
+    'CPU del hilo del request por certificado generado',
+    ['formato'],
+    buckets=BUCKETS_SEGUNDOS
+)
+
+
+class CostosPorFormato:
+    """
+    Acumulado en memoria del worker de CPU y tiempo real por etapa y formato.
+
+    La CPU es la del hilo que ejecuta la etapa (time.thread_time): el trabajo
+    delegado a otro hilo (lote de WeasyPrint con PDF_MICROBATCH_ENABLED,
+    render multiformato) se cuenta en la etapa que lo ejecuta y no en la que
+    espera, que queda con una relación CPU/tiempo real baja.
+    """
+
+    def __init__(self):
+        self._acumulado: Dict[Tuple[str, str], list] = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, nombre: str, formato: str, cpu: float, real: float) -> None:
+        with self._lock:
+            acumulado = self._acumulado.setdefault((nombre, formato), [0, 0.0, 0.0])
+            acumulado[0] += 1
+            acumulado[1] += cpu
+            acumulado[2] += real
+
+    def reiniciar(self) -> None:
+        with self._lock:
+            self._acumulado.clear()
+
+    def resumen(self) -> Dict[str, dict]:
+        """
+        Por formato: cantidad, CPU y tiempo real (total y promedio en ms) y la
+        relación CPU/tiempo real de cada etapa. Con la etapa 'request' agrega
+        los núcleos necesarios para 100 req/s de ese formato en este worker.
+        """
+        with self._lock:
+            acumulado = {clave: list(valores) for clave, valores in self._acumulado.items()}
+        formatos: Dict[str, dict] = {}
+        for (nombre, formato), (cantidad, cpu, real) in sorted(acumulado.items()):
+            etapas = formatos.setdefault(formato, {'etapas': {}})['etapas']
+            etapas[nombre] = {
+                'cantidad': cantidad,
+                'cpu_segundos': round(cpu, 6),
+                'real_segundos': round(real, 6),
+                'cpu_ms_promedio': round(cpu / cantidad * 1000, 3),
+                'real_ms_promedio': round(real / cantidad * 1000, 3),
+                'cpu_real': round(cpu / real, 3) if real > 0 else None,
+            }
+        for datos in formatos.values():
+            request = datos['etapas'].get('request')
+            if request:
+                datos['nucleos_por_100_rps'] = round(request['cpu_ms_promedio'] / 1000 * 100, 3)
+        return formatos
+
+
+costos = CostosPorFormato()
+
+
+@contextmanager
+def etapa(nombre: str, formato: str = '-'):
+    """
+    Mide la duración de una etapa y la registra en documentos_etapa_segundos.
+
+    También mide la CPU del hilo (documentos_etapa_cpu_segundos y el
+    acumulado de costos por formato). Dentro de un request acumula la
+    duración en g.tiempos_etapas, de donde sale el header Server-Timing
+    (ver logging_middleware).
+
+    Args:
+        nombre: Etapa (alumno, especialidad, contexto, render, ...)
+        formato: Formato del documento o '-' si la etapa no depende de él
+    """
+    inicio = time.perf_counter()
+    cpu_inicio = time.thread_time()
+    try:
+        yield
+    finally:
+        cpu = time.thread_time() - cpu_inicio
+        duracion = time.perf_counter() - inicio
+        DURACION_ETAPA.labels(nombre, formato).observe(duracion)
+        CPU_ETAPA.labels(nombre, formato).inc(cpu)
+        costos.registrar(nombre, formato, cpu, duracion)
+        # Los hilos con solo app context (render multiformato) tienen otro g: no se acumulan
+        if has_request_context():
+            tiempos = g.setdefault('tiempos_etapas', {})
+            tiempos[nombre] = tiempos.get(nombre, 0.0) + duracion
+
+
+def inicio_del_request() -> float:
+    """Inicio del request actual en time.perf_counter (el que fijó el modo ASGI o ahora)"""
+    return request.environ.get(CLAVE_INICIO, time.perf_counter())
+
+
+def sumar_tiempos(tiempos: Dict[str, float]) -> None:
+    """Acumula en el request actual etapas medidas fuera de él (ver etapa)"""
+    acumulado = g.setdefault('tiempos_etapas', {})
+    for nombre, duracion in tiempos.items():
+        acumulado[nombre] = acumulado.get(nombre, 0.0) + duracion
+
+
+def tiempos_del_request() -> Dict[str, float]:
+    """Segundos acumulados por etapa en el request actual, en el orden en que terminaron"""
+    return g.get('tiempos_etapas', {}) if has_request_context() else {}
+
+
+def encabezado_server_timing(tiempos: Dict[str, float], total: Optional[float] = None) -> str:
+    """
+    Valor del header Server-Timing: 'alumno;dur=12.3, render;dur=80.1, total;dur=95.0'.
+
+    Las etapas anidadas (weasyprint dentro de render) se informan por separado
+    y se superponen, como permite la especificación.
+    """
+    metricas = [f'{nombre};dur={segundos * 1000:.1f}' for nombre, segundos in tiempos.items()]
+    if total is not None:
+        metricas.append(f'total;dur={total * 1000:.1f}')
+    return ', '.join(metricas)
+
+
+def registrar_cache(nivel: str, hit: bool) -> None:
+    CONSULTAS_CACHE.labels(nivel, 'hit' if hit else 'miss').inc()
+
+
+def registrar_reintento(operacion: str) -> None:
+    REINTENTOS.labels(operacion).inc()
+
+
+def registrar_upstream(servicio: str, status) -> None:
+    """status: código HTTP o 'error' si no hubo respuesta (timeout, conexión rechazada)"""
+    RESPUESTAS_UPSTREAM.labels(servicio, str(status)).inc()
+
+
+def registrar_request(endpoint: str, metodo: str, status: int, segundos: float) -> None:
+    DURACION_REQUEST.labels(endpoint, metodo, str(status)).observe(segundos)
+
+
+def registrar_costo_request(formato: str, cpu: float, segundos: float) -> None:
+    """CPU y tiempo real de un request que generó un certificado (etapa 'request' de los costos)"""
+    CPU_REQUEST.labels(formato).observe(cpu)
+    costos.registrar('request', formato, cpu, segundos)
+
+
+def exportar() -> Tuple[bytes, str]:
+    """Texto de exposición de Prometheus; en modo multiproceso agrega los archivos de todos los workers"""
+    if DIRECTORIO_MULTIPROCESO:
+        registro = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registro)
+        return generate_latest(registro), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+def limpiar_directorio_multiproceso(directorio: Optional[str] = None) -> None:
+    """
+    Vacía PROMETHEUS_MULTIPROC_DIR antes de crear los workers.
+
+    Los archivos de una ejecución anterior sumarían contadores viejos. Solo
+    debe llamarse desde el proceso padre (python wsgi.py --preload): los
+    workers ya vivos perderían sus valores.
+    """
+    directorio = directorio or DIRECTORIO_MULTIPROCESO
+    if not directorio:
+        return
+    os.makedirs(directorio, exist_ok=True)
+    for nombre in os.listdir(directorio):
+        ruta = os.path.join(directorio, nombre)
+        if os.path.isdir(ruta):
+            shutil.rmtree(ruta, ignore_errors=True)
+        else:
+            os.remove(ruta)
+    logger.info(f"Directorio de métricas multiproceso vaciado: {directorio}")
+
+
+def _marcar_proceso_terminado() -> None:
+    # Los gauges 'livesum' dejan de contar al worker que termina
+    multiprocess.mark_process_dead(os.getpid(), DIRECTORIO_MULTIPROCESO)
+
+
+if DIRECTORIO_MULTIPROCESO:
+    atexit.register(_marcar_proceso_terminado)
@@ -0,0 +1,167 @@
+"""
+Monitor de salud de las dependencias (Redis y microservicios externos).
+
+Un hilo por worker ejecuta los chequeos en paralelo cada intervalo segundos
+y guarda el último resultado de cada uno; /health responde con esa
+instantánea sin esperar a las dependencias. Cada resultado informa su
+antigüedad y queda marcado como vencido si el refresco dejó de actualizarlo.
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class MonitorSalud:
+    """
+    Ejecuta chequeos de salud en segundo plano y cachea sus resultados.
+
+    Cada chequeo es una función sin argumentos que devuelve un dict con al
+    menos 'status' (healthy, degraded o unhealthy). Un chequeo que no termina
+    en timeout segundos se informa como unhealthy y no se vuelve a lanzar
+    hasta que termine, para no acumular hilos contra una dependencia colgada.
+    """
+
+    def __init__(self, chequeos: Dict[str, Callable[[], dict]], intervalo: float = 10.0,
+                 timeout: float = 3.0, max_edad: Optional[float] = None, app=None):
+        self.chequeos = chequeos
+        self.intervalo = intervalo
+        self.timeout = timeout
+        self.max_edad = max_edad if max_edad is not None else 3 * intervalo + timeout
+        self.app = app
+        self.pid = os.getpid()
+        self.resultados: Dict[str, dict] = {}
+        self._momentos: Dict[str, float] = {}
+        self._en_curso: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._primer_refresco = threading.Event()
+        self._detener = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+        self._executor = ThreadPoolExecutor(max_workers=max(1, len(chequeos)), thread_name_prefix='monitor-salud')
+
+    def iniciar(self) -> None:
+        if self._hilo is not None:
+            return
+        self._hilo = threading.Thread(target=self._ejecutar, name='monitor-salud', daemon=True)
+        self._hilo.start()
+        logger.info("Monitor de salud iniciado en el worker %s (cada %ss)", self.pid, self.intervalo)
+
+    def detener(self) -> None:
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _chequear(self, chequeo: Callable[[], dict]) -> dict:
+        inicio = time.perf_counter()
+        resultado: dict
+        try:
+            if self.app is not None:
+                # RedisClient y la configuración de las URLs requieren app context
+                with self.app.app_context():
+                    resultado = dict(chequeo())
+            else:
+                resultado = dict(chequeo())
+        except Exception as e:
+            resultado = {'status': 'unhealthy', 'message': str(e)}
+        resultado['duration_ms'] = round((time.perf_counter() - inicio) * 1000, 1)
+        return resultado
+
+    def refrescar(self) -> None:
+        """Ejecuta todos los chequeos en paralelo y espera como máximo timeout segundos"""
+        lanzados = {}
+        for nombre, chequeo in self.chequeos.items():
+            anterior = self._en_curso.get(nombre)
+            if anterior is not None and not anterior.done():
+                continue
+            lanzados[nombre] = self._en_curso[nombre] = self._executor.submit(self._chequear, chequeo)
+
+        limite = time.monotonic() + self.timeout
+        nuevos = {}
+        for nombre in self.chequeos:
+            futuro = lanzados.get(nombre)
+            if futuro is None:
+                nuevos[nombre] = {'status': 'unhealthy', 'message': 'Chequeo anterior todavía en curso'}
+                continue
+            try:
+                nuevos[nombre] = futuro.result(timeout=max(0.0, limite - time.monotonic()))
+            except TimeoutError:
+                nuevos[nombre] = {'status': 'unhealthy', 'message': f'Timeout ({self.timeout}s)'}
+
+        ahora = time.time()
+        with self._lock:
+            for nombre, resultado in nuevos.items():
+                self.resultados[nombre] = resultado
+                self._momentos[nombre] = ahora
+        self._primer_refresco.set()
+
+    def _ejecutar(self) -> None:
+        while not self._detener.is_set():
+            try:
+                self.refrescar()
+            except Exception as e:
+                logger.error("Error al refrescar los chequeos de salud: %s", e)
+            self._detener.wait(self.intervalo)
+
+    def instantanea(self) -> Dict[str, dict]:
+        """
+        Último resultado de cada chequeo con su antigüedad (age_seconds).
+
+        Solo el primer llamado de un worker puede esperar, hasta timeout
+        segundos, a que termine el primer refresco.
+        """
+        self._primer_refresco.wait(self.timeout + 1)
+        ahora = time.time()
+        with self._lock:
+            resultados = dict(self.resultados)
+            momentos = dict(self._momentos)
+        dependencias = {}
+        for nombre in self.chequeos:
+            if nombre not in resultados:
+                dependencias[nombre] = {'status': 'unhealthy', 'message': 'Sin chequear todavía'}
+                continue
+            edad = ahora - momentos[nombre]
+            dependencias[nombre] = {
+                **resultados[nombre],
+                'checked_at': datetime.fromtimestamp(momentos[nombre], timezone.utc)
+                              .isoformat(timespec='seconds').replace('+00:00', 'Z'),
+                'age_seconds': round(edad, 1),
+            }
+            if edad > self.max_edad:
+                dependencias[nombre].update(status='unhealthy', stale=True)
+        return dependencias
+
+
+_monitor: Optional[MonitorSalud] = None
+_lock_monitor = threading.Lock()
+
+
+def obtener_monitor(app, chequeos: Dict[str, Callable[[], dict]]) -> MonitorSalud:
+    """
+    Monitor del proceso actual, creado e iniciado en el primer /health.
+
+    Se crea por pid: los hilos no sobreviven al fork de los workers.
+    """
+    global _monitor
+    if _monitor is None or _monitor.pid != os.getpid():
+        with _lock_monitor:
+            if _monitor is None or _monitor.pid != os.getpid():
+                _monitor = MonitorSalud(
+                    chequeos,
+                    intervalo=app.config['HEALTH_CHECK_INTERVAL'],
+                    timeout=app.config['HEALTH_CHECK_TIMEOUT'],
+                    app=app
+                )
+                _monitor.iniciar()
+    return _monitor
+
+
+def monitor_actual() -> Optional[MonitorSalud]:
+    if _monitor is not None and _monitor.pid == os.getpid():
+        return _monitor
+    return None
@@ -0,0 +1,202 @@
+"""
+Perfilador por muestreo continuo: un hilo por worker toma las pilas de todos
+los hilos con sys._current_frames() y cuenta pilas colapsadas
+("formato;archivo:funcion;...;archivo:funcion N"), el formato de entrada de
+flamegraph.pl y speedscope.
+
+No instrumenta llamadas como cProfile: el costo es proporcional a la
+frecuencia de muestreo, y el intervalo se alarga solo si el tiempo dedicado
+a muestrear supera la fracción máxima configurada (1% por defecto).
+"""
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+OTRAS_PILAS = '[otras pilas]'
+
+# Hojas de hilos ociosos (esperando un lock, una cola o el selector): no consumen CPU
+_MODULOS_OCIOSOS = ('threading.py', 'selectors.py', 'queue.py')
+
+
+def _nombre_frame(frame) -> str:
+    codigo = frame.f_code
+    return f'{os.path.basename(codigo.co_filename)}:{codigo.co_qualname}'
+
+
+def pila_colapsada(frame, max_profundidad: int = 128) -> str:
+    """Pila de un frame, de la raíz a la hoja, separada por ';'"""
+    nombres = []
+    while frame is not None and len(nombres) < max_profundidad:
+        nombres.append(_nombre_frame(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(nombres))
+
+
+class PerfiladorMuestreo:
+    """
+    Muestreador de pilas del proceso actual.
+
+    Las muestras se acumulan en memoria (total desde el inicio y ventana
+    actual) y cada intervalo_volcado segundos la ventana se escribe en
+    directorio/<fecha>_<pid>.folded. Los archivos de todos los workers se
+    pueden concatenar: flamegraph.pl suma las pilas repetidas.
+    """
+
+    def __init__(self, intervalo: float = 0.02, overhead_max: float = 0.01,
+                 directorio: Optional[str] = None, intervalo_volcado: float = 60,
+                 max_pilas: int = 10000, incluir_ociosos: bool = False):
+        self.intervalo = intervalo
+        self.overhead_max = overhead_max
+        self.directorio = directorio
+        self.intervalo_volcado = intervalo_volcado
+        self.max_pilas = max_pilas
+        self.incluir_ociosos = incluir_ociosos
+        self.pid = os.getpid()
+        self.total: Counter = Counter()
+        self.ventana: Counter = Counter()
+        self.muestras = 0
+        self.segundos_muestreando = 0.0
+        self.intervalo_efectivo = intervalo
+        self.ultimo_volcado: Optional[float] = None
+        self._etiquetas: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._detener = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+        self._inicio: Optional[float] = None
+
+    def iniciar(self) -> None:
+        if self._hilo is not None:
+            return
+        if self.directorio:
+            os.makedirs(self.directorio, exist_ok=True)
+        self._inicio = time.monotonic()
+        self._hilo = threading.Thread(target=self._ejecutar, name='perfilador-muestreo', daemon=True)
+        self._hilo.start()
+        logger.info(f"Perfilador por muestreo iniciado en el worker {self.pid} (cada {self.intervalo * 1000:.0f} ms)")
+
+    def detener(self) -> None:
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join()
+        self.volcar()
+
+    def etiquetar(self, formato: Optional[str]) -> None:
+        """Asocia el hilo actual al formato que está generando (None al terminar el request)"""
+        ident = threading.get_ident()
+        if formato:
+            self._etiquetas[ident] = formato
+        else:
+            self._etiquetas.pop(ident, None)
+
+    def muestrear(self) -> None:
+        """Toma una muestra de las pilas de todos los hilos menos el propio"""
+        propio = threading.get_ident()
+        frames = sys._current_frames()
+        pilas = []
+        for ident, frame in frames.items():
+            if ident == propio:
+                continue
+            if not self.incluir_ociosos and os.path.basename(frame.f_code.co_filename) in _MODULOS_OCIOSOS:
+                continue
+            pilas.append(f'{self._etiquetas.get(ident, "-")};{pila_colapsada(frame)}')
+        del frames
+        with self._lock:
+            for pila in pilas:
+                if pila not in self.total and len(self.total) >= self.max_pilas:
+                    pila = OTRAS_PILAS
+                self.total[pila] += 1
+                self.ventana[pila] += 1
+            self.muestras += 1
+
+    def _ejecutar(self) -> None:
+        proximo_volcado = time.monotonic() + self.intervalo_volcado
+        while not self._detener.is_set():
+            inicio = time.perf_counter()
+            try:
+                self.muestrear()
+            except Exception as e:
+                logger.error(f"Error al muestrear pilas: {e}")
+            costo = time.perf_counter() - inicio
+            self.segundos_muestreando += costo
+            # Espera mínima para que costo / (costo + espera) no supere overhead_max
+            self.intervalo_efectivo = max(self.intervalo, costo / self.overhead_max - costo)
+            if self.directorio and time.monotonic() >= proximo_volcado:
+                self.volcar()
+                proximo_volcado = time.monotonic() + self.intervalo_volcado
+            self._detener.wait(self.intervalo_efectivo)
+
+    def volcar(self) -> Optional[str]:
+        """Escribe la ventana actual en el directorio y la reinicia"""
+        with self._lock:
+            ventana, self.ventana = self.ventana, Counter()
+        if not self.directorio or not ventana:
+            return None
+        ruta = os.path.join(self.directorio, f"{time.strftime('%Y%m%dT%H%M%S')}_{self.pid}.folded")
+        try:
+            with open(ruta, 'w') as archivo:
+                archivo.write(colapsar(ventana))
+        except OSError as e:
+            logger.error(f"No se pudieron volcar las muestras en {ruta}: {e}")
+            return None
+        self.ultimo_volcado = time.time()
+        return ruta
+
+    def texto(self, ventana: bool = False) -> str:
+        with self._lock:
+            return colapsar(self.ventana if ventana else self.total)
+
+    def estado(self) -> dict:
+        transcurrido = time.monotonic() - self._inicio if self._inicio else 0.0
+        return {
+            'activo': self._hilo is not None and self._hilo.is_alive(),
+            'pid': self.pid,
+            'muestras': self.muestras,
+            'pilas_distintas': len(self.total),
+            'intervalo_ms': round(self.intervalo * 1000, 2),
+            'intervalo_efectivo_ms': round(self.intervalo_efectivo * 1000, 2),
+            'overhead': round(self.segundos_muestreando / transcurrido, 5) if transcurrido else 0.0,
+            'overhead_max': self.overhead_max,
+            'ultimo_volcado': self.ultimo_volcado,
+        }
+
+
+def colapsar(conteos: Counter) -> str:
+    return ''.join(f'{pila} {cantidad}\n' for pila, cantidad in conteos.most_common())
+
+
+_perfilador: Optional[PerfiladorMuestreo] = None
+_lock_perfilador = threading.Lock()
+
+
+def obtener_perfilador(config) -> PerfiladorMuestreo:
+    """
+    Perfilador del proceso actual, creado e iniciado en el primer uso.
+
+    Se crea por pid: con la precarga (wsgi.py --preload) la app se crea en el
+    padre y los hilos no sobreviven al fork, así que cada worker inicia el suyo.
+    """
+    global _perfilador
+    if _perfilador is None or _perfilador.pid != os.getpid():
+        with _lock_perfilador:
+            if _perfilador is None or _perfilador.pid != os.getpid():
+                _perfilador = PerfiladorMuestreo(
+                    intervalo=config['PROFILING_SAMPLER_INTERVAL'],
+                    overhead_max=config['PROFILING_SAMPLER_MAX_OVERHEAD'],
+                    directorio=config['PROFILING_DIR'],
+                    intervalo_volcado=config['PROFILING_SAMPLER_FLUSH_INTERVAL']
+                )
+                _perfilador.iniciar()
+    return _perfilador
+
+
+def perfilador_actual() -> Optional[PerfiladorMuestreo]:
+    """Perfilador del proceso actual si ya fue iniciado"""
+    if _perfilador is not None and _perfilador.pid == os.getpid():
+        return _perfilador
+    return None
@@ -0,0 +1,103 @@
+"""
+Compilación anticipada y cache de plantillas Jinja2.
+
+Jinja compila cada plantilla a código Python la primera vez que se usa, en
+cada worker y en cada reinicio. Con TEMPLATE_CACHE_DIR el bytecode se guarda
+en disco (FileSystemBytecodeCache) y se comparte entre workers y réplicas;
+`flask precompilar-plantillas` lo genera en el build de la imagen.
+
+Cada entrada guarda el checksum del código fuente de la plantilla: si la
+plantilla cambió, el bytecode se descarta y se recompila, nunca se usa
+código viejo. Las plantillas de DOCX/ODT se compilan con from_string sobre
+el XML del documento, que Jinja no cachea; EntornoCacheado las memoiza por
+hash de contenido y las pasa por el mismo bytecode cache.
+"""
+import hashlib
+import logging
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+import jinja2
+from jinja2.bccache import BytecodeCache, FileSystemBytecodeCache
+
+logger = logging.getLogger(__name__)
+
+_caches: Dict[str, FileSystemBytecodeCache] = {}
+_entornos: Dict[Tuple, 'EntornoCacheado'] = {}
+_lock = threading.Lock()
+
+
+def obtener_bytecode_cache(directorio: Optional[str]) -> Optional[BytecodeCache]:
+    """Bytecode cache en disco compartido por el proceso (None si no hay directorio)"""
+    if not directorio:
+        return None
+    with _lock:
+        cache = _caches.get(directorio)
+        if cache is None:
+            os.makedirs(directorio, exist_ok=True)
+            cache = _caches[directorio] = FileSystemBytecodeCache(directorio, '%s.jinja.cache')
+            logger.info(f'Bytecode cache de plantillas en {directorio}')
+        return cache
+
+
+class EntornoCacheado(jinja2.Environment):
+    """
+    Environment con from_string memoizado por hash del contenido.
+
+    docxtpl y python-odt-template llaman a from_string con el XML de la
+    plantilla en cada render. Acá el código compilado se busca primero en
+    memoria y luego en el bytecode cache (clave prefijo:sha256 del XML).
+    """
+
+    MAX_PLANTILLAS = 64
+
+    def __init__(self, prefijo: str, **opciones):
+        super().__init__(**opciones)
+        self.prefijo = prefijo
+        self._compiladas: Dict[str, jinja2.Template] = {}
+        self._lock_compiladas = threading.Lock()
+
+    def from_string(self, source, globals=None, template_class=None):
+        if globals is not None or template_class is not None or not isinstance(source, str):
+            return super().from_string(source, globals, template_class)
+
+        clave = hashlib.sha256(source.encode('utf-8')).hexdigest()
+        plantilla = self._compiladas.get(clave)
+        if plantilla is None:
+            plantilla = self.template_class.from_code(self, self._compilar(source, clave), self.make_globals(None))
+            with self._lock_compiladas:
+                if len(self._compiladas) >= self.MAX_PLANTILLAS:
+                    self._compiladas.clear()
+                self._compiladas[clave] = plantilla
+        return plantilla
+
+    def _compilar(self, source: str, clave: str):
+        if self.bytecode_cache is None:
+            return self.compile(source)
+        bucket = self.bytecode_cache.get_bucket(self, f'{self.prefijo}:{clave}', None, source)
+        if bucket.code is None:
+            bucket.code = self.compile(source)
+            self.bytecode_cache.set_bucket(bucket)
+        return bucket.code
+
+
+def entorno_cacheado(prefijo: str, directorio: Optional[str], **opciones) -> EntornoCacheado:
+    """EntornoCacheado del proceso para un prefijo (docx, odt) y directorio de cache"""
+    clave = (prefijo, directorio)
+    entorno = _entornos.get(clave)
+    if entorno is None:
+        bytecode_cache = obtener_bytecode_cache(directorio)
+        with _lock:
+            entorno = _entornos.get(clave)
+            if entorno is None:
+                entorno = _entornos[clave] = EntornoCacheado(prefijo, bytecode_cache=bytecode_cache, **opciones)
+    return entorno
+
+
+def cargar_plantillas_html(app) -> int:
+    """Compila (o carga del bytecode cache) todas las plantillas HTML de la app"""
+    nombres = app.jinja_env.list_templates(extensions=['html'])
+    for nombre in nombres:
+        app.jinja_env.get_template(nombre)
+    return len(nombres)
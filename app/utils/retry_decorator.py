@@ -3,9 +3,11 @@ Decorator para implementar patrón retry con backoff exponencial.
 Aplica principios KISS, DRY, SOLID y Clean Code.
 """
 import time
+import asyncio
 import logging
 from functools import wraps
 from typing import Callable, Type, Tuple
+from app.utils.metricas import registrar_reintento
 
 logger = logging.getLogger(__name__)
 
@@ -45,8 +47,15 @@ def retry(
         - DRY: Código reutilizable para cualquier función
         - SRP (SOLID): Solo se encarga de reintentos, no modifica lógica de negocio
         - OCP (SOLID): Extensible vía parámetros sin modificar el código
+    
+    Note:
+        También decora funciones async (repositorios del modo ASGI): en ese caso
+        la espera entre intentos usa asyncio.sleep y no bloquea el event loop.
     """
     def decorator(func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(func):
+            return _async_wrapper(func, max_attempts, delay, backoff, exceptions)
+        
         @wraps(func)
         def wrapper(*args, **kwargs):
             current_delay = delay
@@ -83,6 +92,8 @@ def retry(
                         f"reintentando en {current_delay:.1f}s: {type(e).__name__}: {e}"
                     )
                     
+                    registrar_reintento(func_name)
+                    
                     # Esperar antes del siguiente intento
                     time.sleep(current_delay)
                     
@@ -94,3 +105,43 @@ def retry(
         
         return wrapper
     return decorator
+
+
+
+def _async_wrapper(
+    func: Callable,
+    max_attempts: int,
+    delay: float,
+    backoff: float,
+    exceptions: Tuple[Type[Exception], ...]
+) -> Callable:
+    """Variante de retry para corrutinas: misma política, espera no bloqueante."""
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        current_delay = delay
+        func_name = getattr(func, '__name__', 'function')
+        
+        for attempt in range(1, max_attempts + 1):
+            try:
+                result = await func(*args, **kwargs)
+                
+                if attempt > 1:
+                    logger.info(f"{func_name} exitoso en intento {attempt}/{max_attempts}")
+                
+                return result
+                
+            except exceptions as e:
+                if attempt == max_attempts:
+                    logger.error(f"{func_name} falló después de {max_attempts} intentos: {e}")
+                    raise
+                
+                logger.warning(
+                    f"{func_name} falló (intento {attempt}/{max_attempts}), "
+                    f"reintentando en {current_delay:.1f}s: {type(e).__name__}: {e}"
+                )
+                
+                registrar_reintento(func_name)
+                await asyncio.sleep(current_delay)
+                current_delay *= backoff
+    
+    return wrapper
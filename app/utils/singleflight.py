@@ -0,0 +1,177 @@
+"""
+Deduplicación de trabajos idénticos en vuelo (patrón singleflight).
+
+Cuando varios requests piden el mismo documento a la vez, solo el primero
+(el líder) lo renderiza; el resto espera y recibe los mismos bytes. Opcionalmente
+la deduplicación se extiende a otros workers/réplicas con un lock en Redis y
+un slot compartido para el resultado.
+"""
+import logging
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Optional, cast
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+# Libera el lock solo si sigue siendo del líder que lo tomó
+_LIBERAR_LOCK = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class _Vuelo:
+    """Trabajo en curso dentro del proceso"""
+
+    def __init__(self):
+        self.terminado = threading.Event()
+        self.resultado = b''
+        self.error: Optional[BaseException] = None
+        self.seguidores = 0
+
+
+class SingleFlight:
+    """
+    Ejecuta una sola vez los trabajos concurrentes con la misma clave.
+
+    Dentro del proceso los seguidores esperan en un threading.Event hasta
+    espera_max segundos; si el líder no terminó para entonces (render
+    colgado) cada seguidor renderiza por su cuenta. Con redis_client, el
+    líder local además compite por un lock en Redis (SET NX PX): si otro
+    worker ya está renderizando, espera su resultado en el slot compartido;
+    si ese líder falla o tarda más que espera_max, renderiza por su cuenta.
+    """
+
+    PREFIJO = "singleflight"
+
+    def __init__(self, redis_client: Optional[redis.Redis] = None, ttl_lock: float = 30,
+                 ttl_resultado: int = 10, espera_max: float = 30, intervalo: float = 0.05):
+        """
+        Args:
+            redis_client: Cliente Redis binario (None = solo deduplicación local)
+            ttl_lock: Segundos de vida del lock distribuido (cubre un líder caído)
+            ttl_resultado: Segundos que el resultado queda disponible para otros workers
+            espera_max: Segundos máximos que un seguidor (local o remoto) espera al líder
+            intervalo: Segundos entre consultas al slot de resultado
+        """
+        self.redis_client = redis_client
+        self.ttl_lock = ttl_lock
+        self.ttl_resultado = ttl_resultado
+        self.espera_max = espera_max
+        self.intervalo = intervalo
+        self._lock = threading.Lock()
+        self._vuelos: Dict[str, _Vuelo] = {}
+
+    def ejecutar(self, clave: str, funcion: Callable[[], bytes]) -> bytes:
+        """
+        Ejecuta funcion() o espera al trabajo idéntico que ya está en curso.
+
+        Args:
+            clave: Identifica trabajos idénticos (ej: id:formato:huella)
+            funcion: Trabajo a deduplicar; debe retornar bytes
+
+        Returns:
+            Los bytes producidos por el líder
+
+        Raises:
+            La excepción del líder, también en los seguidores
+        """
+        nuevo = _Vuelo()
+        with self._lock:
+            vuelo = self._vuelos.setdefault(clave, nuevo)
+            if vuelo is not nuevo:
+                vuelo.seguidores += 1
+
+        if vuelo is not nuevo:
+            return self._esperar_lider(clave, vuelo, funcion)
+
+        try:
+            if self.redis_client is not None:
+                vuelo.resultado = self._ejecutar_distribuido(self.redis_client, clave, funcion)
+            else:
+                vuelo.resultado = funcion()
+            return vuelo.resultado
+        except BaseException as e:
+            vuelo.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._vuelos[clave]
+            vuelo.terminado.set()
+            if vuelo.seguidores:
+                logger.info(f"Render de {clave} compartido con {vuelo.seguidores} request(s) concurrente(s)")
+
+    def _esperar_lider(self, clave: str, vuelo: _Vuelo, funcion: Callable[[], bytes]) -> bytes:
+        """Otro hilo del proceso es el líder: espera su resultado o renderiza si no termina a tiempo"""
+        logger.debug(f"Esperando render en curso de {clave}")
+        if not vuelo.terminado.wait(self.espera_max):
+            logger.warning(f"Render de {clave} sin terminar tras {self.espera_max}s: se genera localmente")
+            return funcion()
+        if vuelo.error is not None:
+            raise vuelo.error
+        return vuelo.resultado
+
+    def _ejecutar_distribuido(self, redis_client: redis.Redis, clave: str, funcion: Callable[[], bytes]) -> bytes:
+        lock_key = f"{self.PREFIJO}:{clave}:lock"
+        slot_key = f"{self.PREFIJO}:{clave}:resultado"
+        token = uuid.uuid4().hex
+
+        try:
+            contenido = self._leer_resultado(redis_client, slot_key)
+            if contenido is not None:
+                return contenido
+            adquirido = redis_client.set(lock_key, token, nx=True, px=int(self.ttl_lock * 1000))
+        except redis.RedisError as e:
+            logger.warning(f"Singleflight sin Redis para {clave}: {e}")
+            return funcion()
+
+        if adquirido:
+            try:
+                contenido = funcion()
+                try:
+                    redis_client.setex(slot_key, self.ttl_resultado, contenido)
+                except redis.RedisError as e:
+                    logger.warning(f"No se pudo publicar el resultado de {clave}: {e}")
+                return contenido
+            finally:
+                try:
+                    # pyrefly: ignore  # bad-argument-type
+                    redis_client.eval(_LIBERAR_LOCK, 1, lock_key, token)
+                except redis.RedisError as e:
+                    logger.warning(f"No se pudo liberar el lock de {clave}: {e}")
+
+        return self._esperar_resultado_remoto(redis_client, clave, lock_key, slot_key, funcion)
+
+    @staticmethod
+    def _leer_resultado(redis_client: redis.Redis, slot_key: str) -> Optional[bytes]:
+        """Resultado publicado por el líder (el cliente no decodifica: bytes o None)"""
+        return cast(Optional[bytes], redis_client.get(slot_key))
+
+    def _esperar_resultado_remoto(self, redis_client: redis.Redis, clave: str, lock_key: str, slot_key: str,
+                                  funcion: Callable[[], bytes]) -> bytes:
+        """Otro worker es el líder: espera su resultado o renderiza si falla"""
+        logger.debug(f"Esperando render de {clave} en otro worker")
+        limite = time.monotonic() + self.espera_max
+        try:
+            while time.monotonic() < limite:
+                contenido = self._leer_resultado(redis_client, slot_key)
+                if contenido is not None:
+                    logger.info(f"Render de {clave} obtenido de otro worker")
+                    return contenido
+                if not redis_client.exists(lock_key):
+                    # El líder terminó sin publicar resultado (falló): reintentar localmente
+                    contenido = self._leer_resultado(redis_client, slot_key)
+                    if contenido is not None:
+                        return contenido
+                    break
+                time.sleep(self.intervalo)
+        except redis.RedisError as e:
+            logger.warning(f"Singleflight sin Redis para {clave}: {e}")
+
+        logger.warning(f"Render de {clave} no disponible desde otro worker: se genera localmente")
+        return funcion()
@@ -1,3 +1,4 @@
 from .certificado_validator import validate_with
 from .alumno_validator import validar_id_alumno, validar_datos_alumno
-from .context_validator import validar_contexto
\ No newline at end of file
+from .context_validator import validar_contexto
+from .payload_validator import validar_firma_payload
\ No newline at end of file
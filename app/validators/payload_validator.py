@@ -0,0 +1,40 @@
+import hashlib
+import hmac
+import logging
+from typing import Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+def validar_firma_payload(body: bytes, firma: Optional[str], secreto: str) -> bool:
+    """
+    Valida la firma HMAC-SHA256 del cuerpo de una solicitud.
+    
+    La firma se espera en hexadecimal, con o sin el prefijo 'sha256='
+    (formato habitual de webhooks).
+    
+    Args:
+        body: Cuerpo crudo de la solicitud
+        firma: Valor del header de firma enviado por el llamador
+        secreto: Secreto compartido con los microservicios llamadores
+        
+    Returns:
+        bool: True si la firma coincide, False en caso contrario
+    """
+    if not firma:
+        logger.warning("Solicitud sin firma de payload")
+        return False
+    
+    if firma.startswith('sha256='):
+        firma = firma[len('sha256='):]
+    
+    esperada = hmac.new(secreto.encode('utf-8'), body, hashlib.sha256).hexdigest()
+    # compare_digest solo acepta str ASCII: se comparan bytes para que un header
+    # con caracteres no ASCII sea simplemente una firma inválida
+    es_valida = hmac.compare_digest(esperada.encode('ascii'), firma.strip().lower().encode('utf-8'))
+    
+    if not es_valida:
+        logger.warning("Firma de payload inválida")
+    
+    return es_valida
@@ -0,0 +1,3 @@
+from .certificado_worker import CertificadoWorker
+
+__all__ = ['CertificadoWorker']
@@ -0,0 +1,97 @@
+import logging
+import signal
+import time
+from typing import Optional
+from flask import Flask
+
+from app.services.job_service import JobService, ERROR
+
+logger = logging.getLogger(__name__)
+
+
+class CertificadoWorker:
+    """
+    Worker que consume jobs de certificados desde la cola de Redis.
+
+    Corre fuera del servidor HTTP (ver worker.py), por lo que la cantidad de
+    procesos de renderizado se escala independientemente de Granian.
+    """
+
+    def __init__(self, app: Flask, job_service: Optional[JobService] = None):
+        """
+        Args:
+            app: Aplicación Flask (los generadores necesitan app context)
+            job_service: Servicio de jobs (opcional)
+        """
+        self.app = app
+        self._job_service = job_service
+        self._activo = False
+
+    def detener(self, *args) -> None:
+        """Pide al worker que termine después del job en curso"""
+        logger.info('Deteniendo worker de certificados')
+        self._activo = False
+
+    def run(self, max_jobs: Optional[int] = None) -> int:
+        """
+        Bucle principal: desencola y procesa jobs hasta que se pida detener.
+
+        Args:
+            max_jobs: Cantidad máxima de jobs a procesar (None = sin límite)
+
+        Returns:
+            Cantidad de jobs procesados
+        """
+        self._activo = True
+        procesados = 0
+
+        with self.app.app_context():
+            job_service = self._job_service or JobService()
+            timeout = self.app.config['JOB_WORKER_BLOCK_TIMEOUT']
+            intervalo_barrido = self.app.config['JOB_REAPER_INTERVAL']
+            proximo_barrido = 0.0
+            logger.info('Worker de certificados iniciado')
+
+            while self._activo and (max_jobs is None or procesados < max_jobs):
+                if time.monotonic() >= proximo_barrido:
+                    proximo_barrido = time.monotonic() + intervalo_barrido
+                    try:
+                        job_service.recuperar_huerfanos()
+                    except Exception as e:
+                        logger.error(f'Error al recuperar jobs huérfanos: {e}')
+
+                try:
+                    job_id = job_service.job_repository.desencolar(timeout=timeout)
+                except Exception as e:
+                    logger.error(f'Error al leer la cola de jobs: {e}')
+                    time.sleep(timeout)
+                    continue
+
+                if job_id is None:
+                    continue
+
+                try:
+                    job_service.procesar(job_id)
+                except Exception as e:
+                    logger.exception(f'Error inesperado procesando job {job_id}: {e}')
+                    try:
+                        job_service.job_repository.actualizar(
+                            job_id, estado=ERROR, errores={'job': str(e)}, actualizado=time.time()
+                        )
+                    except Exception:
+                        logger.error(f'No se pudo marcar el job {job_id} como fallido')
+
+                try:
+                    job_service.job_repository.confirmar(job_id)
+                except Exception as e:
+                    # Sin confirmar, recuperar_huerfanos lo reencola más tarde
+                    logger.error(f'No se pudo confirmar el job {job_id}: {e}')
+                procesados += 1
+
+        logger.info(f'Worker de certificados finalizado ({procesados} jobs)')
+        return procesados
+
+    def instalar_senales(self) -> None:
+        """Termina de forma ordenada con SIGTERM/SIGINT (docker stop, Ctrl+C)"""
+        signal.signal(signal.SIGTERM, self.detener)
+        signal.signal(signal.SIGINT, self.detener)
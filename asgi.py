@@ -0,0 +1,12 @@
+import os, logging
+from app.asgi import create_asgi_app
+
+#obtener contexto desde variable de entorno
+flask_context = os.getenv('FLASK_CONFIG', 'development')
+
+app = create_asgi_app()
+
+logger = logging.getLogger(__name__)
+logger.info(f"Aplicación ASGI iniciada en: {flask_context} modo")
+
+#entry point para granian en modo ASGI: granian --interface asgi asgi:app
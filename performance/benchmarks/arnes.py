@@ -0,0 +1,163 @@
+"""
+Arnés de los benchmarks en proceso: medición, baselines JSON y comparación.
+
+Cada benchmark se mide en dos pasadas: una de tiempos (mediana, p99 y
+operaciones por segundo) y otra corta con tracemalloc activo para el pico
+de memoria asignada por llamada. tracemalloc hace más lentas las
+asignaciones, por eso no se mezcla con la de tiempos.
+
+Uso desde la línea de comandos (solo biblioteca estándar):
+    python performance/benchmarks/arnes.py comparar base.json actual.json --umbral 0.10
+"""
+import argparse
+import gc
+import json
+import math
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+METRICAS_TIEMPO = ('mediana_ms', 'p99_ms')
+METRICAS_COMPARADAS = ('mediana_ms', 'p99_ms', 'pico_bytes')
+
+
+def percentil(valores: List[float], p: float) -> float:
+    """Percentil por rango más cercano (valores ya ordenados)"""
+    return valores[max(0, math.ceil(p / 100 * len(valores)) - 1)]
+
+
+def medir(funcion: Callable[[], object], iteraciones: int = 50, calentamiento: int = 3,
+          iteraciones_memoria: int = 3) -> Dict[str, Optional[float]]:
+    """
+    Mide una función sin argumentos.
+
+    Returns:
+        iteraciones, mediana_ms, p99_ms, media_ms, min_ms, ops_por_segundo y
+        pico_bytes (máximo de memoria asignada durante una llamada)
+    """
+    for _ in range(calentamiento):
+        funcion()
+
+    gc.collect()
+    tiempos = []
+    for _ in range(iteraciones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    tiempos.sort()
+
+    pico = 0
+    ya_activo = tracemalloc.is_tracing()
+    if not ya_activo:
+        tracemalloc.start()
+    try:
+        for _ in range(iteraciones_memoria):
+            gc.collect()
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            funcion()
+            _, maximo = tracemalloc.get_traced_memory()
+            pico = max(pico, maximo - base)
+    finally:
+        if not ya_activo:
+            tracemalloc.stop()
+
+    total = sum(tiempos)
+    return {
+        'iteraciones': iteraciones,
+        'mediana_ms': round(statistics.median(tiempos) * 1000, 4),
+        'p99_ms': round(percentil(tiempos, 99) * 1000, 4),
+        'media_ms': round(total / iteraciones * 1000, 4),
+        'min_ms': round(tiempos[0] * 1000, 4),
+        'ops_por_segundo': round(iteraciones / total, 2) if total > 0 else None,
+        'pico_bytes': pico,
+    }
+
+
+def documento(resultados: Dict[str, dict]) -> dict:
+    """Baseline serializable: resultados más el entorno donde se midieron"""
+    return {
+        'entorno': {
+            'python': platform.python_version(),
+            'implementacion': platform.python_implementation(),
+            'plataforma': platform.platform(),
+            'procesador': platform.machine(),
+            'fecha': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        },
+        'resultados': resultados,
+    }
+
+
+def guardar(ruta: str, resultados: Dict[str, dict]) -> None:
+    with open(ruta, 'w') as archivo:
+        json.dump(documento(resultados), archivo, indent=2, ensure_ascii=False, sort_keys=True)
+
+
+def cargar(ruta: str) -> Dict[str, dict]:
+    with open(ruta) as archivo:
+        return json.load(archivo)['resultados']
+
+
+def comparar(base: Dict[str, dict], actual: Dict[str, dict], umbral: float = 0.10,
+             umbral_p99: Optional[float] = None) -> List[dict]:
+    """
+    Regresiones de actual respecto de base: métricas que crecieron más que el
+    umbral (fracción). El p99 es más ruidoso y puede usar un umbral propio.
+    Solo se comparan los benchmarks presentes en los dos.
+    """
+    umbral_p99 = umbral if umbral_p99 is None else umbral_p99
+    regresiones = []
+    for nombre in sorted(set(base) & set(actual)):
+        for metrica in METRICAS_COMPARADAS:
+            anterior, nuevo = base[nombre].get(metrica), actual[nombre].get(metrica)
+            if not anterior or nuevo is None:
+                continue
+            limite = umbral_p99 if metrica == 'p99_ms' else umbral
+            cambio = nuevo / anterior - 1
+            if cambio > limite:
+                regresiones.append({'benchmark': nombre, 'metrica': metrica, 'base': anterior,
+                                    'actual': nuevo, 'cambio': round(cambio, 4)})
+    return regresiones
+
+
+def tabla(resultados: Dict[str, dict]) -> str:
+    filas = [f"{'benchmark':<44} {'mediana ms':>11} {'p99 ms':>10} {'ops/s':>10} {'pico KiB':>10}"]
+    for nombre, r in sorted(resultados.items()):
+        filas.append(f"{nombre:<44} {r['mediana_ms']:>11.3f} {r['p99_ms']:>10.3f} "
+                     f"{r['ops_por_segundo'] or 0:>10.1f} {r['pico_bytes'] / 1024:>10.1f}")
+    return '\n'.join(filas)
+
+
+def tabla_regresiones(regresiones: List[dict]) -> str:
+    return '\n'.join(f"REGRESIÓN {r['benchmark']} {r['metrica']}: {r['base']} -> {r['actual']} "
+                     f"(+{r['cambio'] * 100:.1f}%)" for r in regresiones)
+
+
+def main(argumentos=None) -> int:
+    parser = argparse.ArgumentParser(description='Comparar resultados de benchmarks contra un baseline')
+    subcomandos = parser.add_subparsers(dest='comando', required=True)
+    comparar_parser = subcomandos.add_parser('comparar', help='Marcar regresiones de actual respecto de base')
+    comparar_parser.add_argument('base')
+    comparar_parser.add_argument('actual')
+    comparar_parser.add_argument('--umbral', type=float, default=0.10,
+                                 help='Crecimiento tolerado de mediana y memoria (fracción, default 0.10)')
+    comparar_parser.add_argument('--umbral-p99', type=float, default=None,
+                                 help='Crecimiento tolerado del p99 (default: el de --umbral)')
+    args = parser.parse_args(argumentos)
+
+    actual = cargar(args.actual)
+    print(tabla(actual))
+    regresiones = comparar(cargar(args.base), actual, args.umbral, args.umbral_p99)
+    if regresiones:
+        print(tabla_regresiones(regresiones))
+        return 1
+    print('Sin regresiones')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
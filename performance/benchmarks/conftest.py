@@ -0,0 +1,116 @@
+"""
+Configuración de la suite de benchmarks (python -m pytest performance/benchmarks).
+
+Opciones:
+    --bench-iteraciones N   Iteraciones de la pasada de tiempos (default 50)
+    --bench-json RUTA       Guardar los resultados como baseline JSON
+    --bench-base RUTA       Comparar contra un baseline; las regresiones hacen fallar la corrida
+    --bench-umbral F        Crecimiento tolerado de mediana y memoria (default 0.10 = 10%)
+    --bench-umbral-p99 F    Crecimiento tolerado del p99 (default 0.25)
+"""
+import logging
+import os
+from unittest.mock import patch
+
+import pytest
+
+from performance.benchmarks.arnes import cargar, comparar, guardar, medir as medir_funcion, tabla, tabla_regresiones
+from performance.benchmarks.dobles import RedisEnMemoria, UpstreamFalso
+
+_RESULTADOS = pytest.StashKey[dict]()
+_REGRESIONES = pytest.StashKey[list]()
+
+
+def pytest_addoption(parser):
+    grupo = parser.getgroup('benchmarks')
+    grupo.addoption('--bench-iteraciones', type=int, default=50)
+    grupo.addoption('--bench-json', default=None)
+    grupo.addoption('--bench-base', default=None)
+    grupo.addoption('--bench-umbral', type=float, default=0.10)
+    grupo.addoption('--bench-umbral-p99', type=float, default=0.25)
+
+
+def pytest_configure(config):
+    config.stash[_RESULTADOS] = {}
+    config.stash[_REGRESIONES] = []
+
+
+@pytest.fixture(scope='session')
+def app():
+    """App de testing con datos mock y sin almacén de artefactos (cada llamada renderiza)"""
+    with patch.dict(os.environ, {'FLASK_CONTEXT': 'testing', 'USE_MOCK_DATA': 'true'}):
+        from app import create_app
+        aplicacion = create_app()
+        # Los logs INFO del camino caliente no forman parte de lo que se mide
+        logging.disable(logging.INFO)
+        with aplicacion.app_context():
+            yield aplicacion
+        logging.disable(logging.NOTSET)
+
+
+@pytest.fixture(scope='session')
+def contexto(app):
+    """Contexto validado del certificado del alumno mock 1"""
+    from app.services import CertificateService
+    return CertificateService()._construir_contexto(CertificateService._get_mock_alumno(1), 'pdf')
+
+
+@pytest.fixture
+def redis_falso():
+    """redis.Redis reemplazado por RedisEnMemoria para todo RedisClient creado en el test"""
+    with patch('app.repositories.redis_client.redis.Redis', RedisEnMemoria):
+        yield
+
+
+@pytest.fixture
+def upstream():
+    """Microservicios de alumnos y académica en proceso (requests.get de los repositorios)"""
+    falso = UpstreamFalso()
+    with patch('app.repositories.alumno_repository.requests.get', falso), \
+            patch('app.repositories.especialidad_repository.requests.get', falso):
+        yield falso
+
+
+@pytest.fixture
+def medir(request):
+    """
+    Mide una función y registra el resultado con el nombre del test:
+    medir(lambda: ...) devuelve el dict de arnes.medir.
+    """
+    resultados = request.config.stash[_RESULTADOS]
+    iteraciones_default = request.config.getoption('--bench-iteraciones')
+
+    def _medir(funcion, nombre=None, iteraciones=None):
+        resultado = medir_funcion(funcion, iteraciones or iteraciones_default)
+        resultados[nombre or request.node.name.removeprefix('test_')] = resultado
+        return resultado
+
+    return _medir
+
+
+def pytest_sessionfinish(session, exitstatus):
+    config = session.config
+    resultados = config.stash[_RESULTADOS]
+    if not resultados:
+        return
+    if config.getoption('--bench-json'):
+        guardar(config.getoption('--bench-json'), resultados)
+    if config.getoption('--bench-base'):
+        regresiones = comparar(cargar(config.getoption('--bench-base')), resultados,
+                               config.getoption('--bench-umbral'), config.getoption('--bench-umbral-p99'))
+        config.stash[_REGRESIONES] = regresiones
+        if regresiones:
+            session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    resultados = config.stash[_RESULTADOS]
+    if not resultados:
+        return
+    terminalreporter.section('benchmarks')
+    terminalreporter.write_line(tabla(resultados))
+    regresiones = config.stash[_REGRESIONES]
+    if regresiones:
+        terminalreporter.write_line(tabla_regresiones(regresiones), red=True)
+    elif config.getoption('--bench-base'):
+        terminalreporter.write_line('Sin regresiones respecto del baseline', green=True)
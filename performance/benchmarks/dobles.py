@@ -0,0 +1,151 @@
+"""
+Dobles en proceso para los benchmarks: Redis en memoria y microservicios de
+alumnos y académica que responden sin red.
+
+Reemplazan solo el transporte (redis.Redis y requests.get): el código de la
+app (RedisClient, repositorios, mappings, retry) se ejecuta completo.
+"""
+import json
+import re
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+
+_RUTA = re.compile(r'/(alumnos|especialidades)/(\d+)$')
+
+
+class RedisEnMemoria:
+    """
+    Subconjunto de redis.Redis que usa la app: get, set, setex, delete, exists,
+    ping y el eval de liberación de lock de SingleFlight.
+    """
+
+    def __init__(self, decode_responses: bool = True, **_opciones):
+        self.decode_responses = decode_responses
+        self._datos: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def _codificar(self, valor):
+        if isinstance(valor, bytes):
+            return valor
+        return str(valor).encode()
+
+    def _vigente(self, clave: str) -> Optional[bytes]:
+        entrada = self._datos.get(clave)
+        if entrada is None:
+            return None
+        valor, vence = entrada
+        if vence is not None and vence <= time.monotonic():
+            del self._datos[clave]
+            return None
+        return valor
+
+    def ping(self) -> bool:
+        return True
+
+    def get(self, clave: str):
+        with self._lock:
+            valor = self._vigente(clave)
+        if valor is None:
+            return None
+        return valor.decode() if self.decode_responses else valor
+
+    def set(self, clave: str, valor, ex: Optional[int] = None, px: Optional[int] = None, nx: bool = False):
+        with self._lock:
+            if nx and self._vigente(clave) is not None:
+                return None
+            segundos = ex if ex is not None else (px / 1000 if px is not None else None)
+            vence = time.monotonic() + segundos if segundos is not None else None
+            self._datos[clave] = (self._codificar(valor), vence)
+            return True
+
+    def setex(self, clave: str, ttl: int, valor) -> bool:
+        self.set(clave, valor, ex=ttl)
+        return True
+
+    def delete(self, *claves: str) -> int:
+        with self._lock:
+            return sum(self._datos.pop(clave, None) is not None for clave in claves)
+
+    def exists(self, *claves: str) -> int:
+        with self._lock:
+            return sum(self._vigente(clave) is not None for clave in claves)
+
+    def eval(self, _script: str, _numkeys: int, clave: str, token: str) -> int:
+        """Solo el script de SingleFlight: borra el lock si todavía tiene el token del líder"""
+        with self._lock:
+            if self._vigente(clave) == self._codificar(token):
+                del self._datos[clave]
+                return 1
+            return 0
+
+    def flushdb(self) -> bool:
+        with self._lock:
+            self._datos.clear()
+        return True
+
+
+def alumno_json(id: int, especialidad_id: int = 1) -> dict:
+    """Alumno como lo devuelve el microservicio de alumnos (especialidad anidada)"""
+    return {
+        'id': id,
+        'nombre': 'MARIANO PABLO CRISTOBAL',
+        'apellido': 'SOSA',
+        'nrodocumento': f'{40000000 + id}',
+        'legajo': f'{10000 + id}',
+        'tipo_documento': {'id': 1, 'nombre': 'Documento Nacional de Identidad', 'sigla': 'DNI'},
+        'especialidad': especialidad_json(especialidad_id),
+    }
+
+
+def especialidad_json(id: int) -> dict:
+    """Especialidad como la devuelve el microservicio de gestión académica"""
+    return {
+        'id': id,
+        'nombre': 'Ingeniería en Sistemas de Información',
+        'letra': 'K',
+        'observacion': 'Especialidad de grado',
+        'facultad': 'Facultad Regional San Rafael',
+    }
+
+
+class RespuestaFalsa:
+    """Lo que los repositorios leen de requests.Response: status_code, json() y raise_for_status()"""
+
+    def __init__(self, url: str, status_code: int, datos: dict):
+        self.url = url
+        self.status_code = status_code
+        self.headers = {'Content-Type': 'application/json'}
+        self._cuerpo = json.dumps(datos)
+
+    def json(self) -> dict:
+        return json.loads(self._cuerpo)
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.HTTPError(f'{self.status_code} Error for url: {self.url}', response=self)
+
+
+class UpstreamFalso:
+    """
+    Reemplazo de requests.get para /alumnos/<id> y /especialidades/<id>.
+
+    Los ids en faltantes responden 404; el resto, los datos generados por
+    alumno_json y especialidad_json. Cuenta las llamadas para verificar que
+    un benchmark de cache no sale a la red.
+    """
+
+    def __init__(self, faltantes=()):
+        self.faltantes = set(faltantes)
+        self.llamadas = 0
+
+    def __call__(self, url: str, timeout=None, **_opciones) -> RespuestaFalsa:
+        self.llamadas += 1
+        coincidencia = _RUTA.search(url)
+        if coincidencia is None or int(coincidencia.group(2)) in self.faltantes:
+            return RespuestaFalsa(url, 404, {'error': 'NotFound'})
+        recurso, id = coincidencia.group(1), int(coincidencia.group(2))
+        datos = alumno_json(id) if recurso == 'alumnos' else especialidad_json(id)
+        return RespuestaFalsa(url, 200, datos)
@@ -0,0 +1,32 @@
+"""Benchmarks de cada generador con el contexto del certificado ya validado"""
+import pytest
+
+from app.services.documentos_office_service import DOCXDocument, ODTDocument, OverlayPDFDocument, PDFDocument
+
+
+def _requiere_weasyprint():
+    try:
+        import weasyprint  # noqa: F401
+    except (OSError, ImportError) as e:
+        pytest.skip(f'WeasyPrint no disponible: {type(e).__name__}')
+
+
+def test_pdf_weasyprint(medir, contexto):
+    _requiere_weasyprint()
+    resultado = medir(lambda: PDFDocument.generar('certificado', 'certificado_pdf', contexto))
+    assert resultado['mediana_ms'] > 0
+
+
+def test_pdf_overlay(medir, contexto):
+    assert OverlayPDFDocument.generar('certificado', 'certificado_pdf', contexto).getvalue().startswith(b'%PDF')
+    medir(lambda: OverlayPDFDocument.generar('certificado', 'certificado_pdf', contexto))
+
+
+def test_docx(medir, contexto):
+    assert DOCXDocument.generar('certificado', 'certificado_plantilla', contexto).getvalue()[:2] == b'PK'
+    medir(lambda: DOCXDocument.generar('certificado', 'certificado_plantilla', contexto))
+
+
+def test_odt(medir, contexto):
+    assert ODTDocument.generar('certificado', 'certificado_plantilla', contexto).getvalue()[:2] == b'PK'
+    medir(lambda: ODTDocument.generar('certificado', 'certificado_plantilla', contexto))
@@ -0,0 +1,35 @@
+"""Benchmarks de la deserialización con marshmallow de las respuestas de los microservicios"""
+from typing import cast
+
+from app.mapping import AlumnoMapping, CertificadoPayloadMapping, EspecialidadMapping
+from app.models import Alumno
+
+from performance.benchmarks.dobles import alumno_json, especialidad_json
+
+
+def test_mapping_alumno(medir):
+    mapping, datos = AlumnoMapping(), alumno_json(1)
+    alumno = cast(Alumno, mapping.load(datos))
+    assert alumno.legajo == datos['legajo']
+    medir(lambda: mapping.load(datos), iteraciones=500)
+
+
+def test_mapping_especialidad(medir):
+    mapping, datos = EspecialidadMapping(), especialidad_json(1)
+    medir(lambda: mapping.load(datos), iteraciones=500)
+
+
+def test_mapping_payload_certificado(medir):
+    alumno = {clave: valor for clave, valor in alumno_json(1).items() if clave != 'especialidad'}
+    especialidad = {clave: valor for clave, valor in especialidad_json(1).items() if clave != 'facultad'}
+    datos = {
+        'alumno': alumno,
+        'especialidad': especialidad,
+        'facultad': {'id': 1, 'nombre': 'Facultad Regional San Rafael', 'ciudad': 'San Rafael',
+                     'provincia': 'Mendoza'},
+        'universidad': {'id': 1, 'nombre': 'Universidad Tecnológica Nacional'},
+    }
+    mapping = CertificadoPayloadMapping()
+    payload = cast(Alumno, mapping.load(datos))
+    assert payload.especialidad.facultad.universidad is not None
+    medir(lambda: mapping.load(datos), iteraciones=500)
@@ -0,0 +1,35 @@
+"""
+Benchmarks de CertificateService.generar_certificado_alumno_regular completo:
+búsqueda del alumno, validación, contexto y render, sin almacén de artefactos.
+
+El alumno sale de los datos mock (USE_MOCK_DATA): las respuestas reales de
+los microservicios traen la facultad como texto y el contexto del
+certificado necesita el objeto completo, así que el camino de cache y HTTP
+se mide aparte en test_redis.py.
+"""
+import pytest
+
+from app.services import CertificateService
+
+# pytest importa los módulos de test por nombre base (sin paquete)
+# pyrefly: ignore  # missing-import
+from test_generadores import _requiere_weasyprint
+
+
+@pytest.mark.parametrize('formato', ['pdf', 'docx', 'odt'])
+def test_certificado(medir, app, formato):
+    if formato == 'pdf' and app.config.get('PDF_ENGINE') != 'overlay':
+        _requiere_weasyprint()
+    servicio = CertificateService()
+    assert servicio.generar_certificado_alumno_regular(1, formato).getbuffer().nbytes > 0
+    medir(lambda: servicio.generar_certificado_alumno_regular(1, formato), nombre=f'certificado_{formato}')
+
+
+def test_certificado_pdf_overlay(medir, app):
+    servicio = CertificateService()
+    motor = app.config.get('PDF_ENGINE')
+    app.config['PDF_ENGINE'] = 'overlay'
+    try:
+        medir(lambda: servicio.generar_certificado_alumno_regular(1, 'pdf'))
+    finally:
+        app.config['PDF_ENGINE'] = motor
@@ -0,0 +1,45 @@
+"""Benchmarks de la codificación JSON de RedisClient y del camino de cache de los repositorios"""
+from app.repositories.alumno_repository import AlumnoRepository
+from app.repositories.especialidad_repository import EspecialidadRepository
+from app.repositories.redis_client import RedisClient
+
+from performance.benchmarks.dobles import alumno_json
+
+
+def test_redis_set(medir, app, redis_falso):
+    cliente, datos = RedisClient(), alumno_json(1)
+    medir(lambda: cliente.set('alumno:1', datos, 60), iteraciones=1000)
+
+
+def test_redis_get(medir, app, redis_falso):
+    cliente = RedisClient()
+    cliente.set('alumno:1', alumno_json(1), 60)
+    guardado = cliente.get('alumno:1')
+    assert guardado is not None and guardado['id'] == 1
+    medir(lambda: cliente.get('alumno:1'), iteraciones=1000)
+
+
+def test_repositorio_alumno_cache_hit(medir, app, redis_falso, upstream):
+    repositorio = AlumnoRepository()
+    repositorio.get_alumno_by_id(1)
+    llamadas = upstream.llamadas
+
+    medir(lambda: repositorio.get_alumno_by_id(1), iteraciones=500)
+
+    assert upstream.llamadas == llamadas
+
+
+def test_repositorio_alumno_cache_miss(medir, app, redis_falso, upstream):
+    repositorio = AlumnoRepository()
+
+    def buscar():
+        repositorio.redis_client.delete('alumno:1')
+        return repositorio.get_alumno_by_id(1)
+
+    medir(buscar, iteraciones=500)
+
+
+def test_repositorio_especialidad_cache_hit(medir, app, redis_falso, upstream):
+    repositorio = EspecialidadRepository()
+    repositorio.get_especialidad_by_id(1)
+    medir(lambda: repositorio.get_especialidad_by_id(1), iteraciones=500)
@@ -0,0 +1,103 @@
+"""
+Memoria por worker de Granian: USS, PSS y RSS (Linux, lee /proc/<pid>/smaps_rollup).
+
+USS (Unique Set Size) es la memoria privada del proceso: lo que se libera si
+el worker termina. La RSS cuenta también las páginas compartidas con el
+padre y con los otros workers, por eso no sirve para medir el efecto de la
+precarga (python wsgi.py --preload).
+
+Uso:
+    python performance/scripts/medir_memoria.py --pid <pid del proceso padre> --json sin-precarga.json
+    python performance/scripts/medir_memoria.py --pid <pid> --comparar sin-precarga.json
+
+Dentro del contenedor (el script solo usa la biblioteca estándar):
+    docker exec -i <contenedor> python - --pid 1 < performance/scripts/medir_memoria.py
+"""
+import argparse
+import json
+import os
+import sys
+
+CAMPOS = ('Rss', 'Pss', 'Shared_Clean', 'Shared_Dirty', 'Private_Clean', 'Private_Dirty')
+
+
+def leer_smaps(pid: int) -> dict:
+    """Totales de smaps_rollup en KiB, más la USS (Private_Clean + Private_Dirty)"""
+    valores = {}
+    with open(f'/proc/{pid}/smaps_rollup') as archivo:
+        for linea in archivo:
+            partes = linea.split()
+            if len(partes) >= 2 and partes[0].rstrip(':') in CAMPOS:
+                valores[partes[0].rstrip(':')] = int(partes[1])
+    valores['Uss'] = valores.get('Private_Clean', 0) + valores.get('Private_Dirty', 0)
+    return valores
+
+
+def hijos(pid: int) -> list:
+    """PIDs cuyo padre es pid (los workers de Granian)"""
+    resultado = []
+    for entrada in os.listdir('/proc'):
+        if not entrada.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entrada}/stat') as archivo:
+                # El nombre del comando va entre paréntesis y puede tener espacios
+                campos = archivo.read().rsplit(')', 1)[1].split()
+        except OSError:
+            continue
+        if int(campos[1]) == pid:
+            resultado.append(int(entrada))
+    return sorted(resultado)
+
+
+def medir(pid: int) -> dict:
+    workers = {hijo: leer_smaps(hijo) for hijo in hijos(pid)}
+    if not workers:
+        raise SystemExit(f'El proceso {pid} no tiene workers hijos')
+    return {
+        'padre': leer_smaps(pid),
+        'workers': workers,
+        'uss_promedio_kib': sum(w['Uss'] for w in workers.values()) / len(workers),
+        'pss_total_kib': leer_smaps(pid)['Pss'] + sum(w['Pss'] for w in workers.values()),
+    }
+
+
+def _mib(kib: float) -> str:
+    return f'{kib / 1024:8.1f}'
+
+
+def imprimir(medicion: dict) -> None:
+    print(f"{'proceso':>10} {'USS MiB':>8} {'PSS MiB':>8} {'RSS MiB':>8}")
+    padre = medicion['padre']
+    print(f"{'padre':>10} {_mib(padre['Uss'])} {_mib(padre['Pss'])} {_mib(padre['Rss'])}")
+    for pid, valores in medicion['workers'].items():
+        print(f"{pid:>10} {_mib(valores['Uss'])} {_mib(valores['Pss'])} {_mib(valores['Rss'])}")
+    print(f"USS promedio por worker: {_mib(medicion['uss_promedio_kib']).strip()} MiB")
+    print(f"PSS total (padre + workers): {_mib(medicion['pss_total_kib']).strip()} MiB")
+
+
+def comparar(antes: dict, despues: dict) -> None:
+    for clave, titulo in (('uss_promedio_kib', 'USS promedio por worker'), ('pss_total_kib', 'PSS total')):
+        delta = despues[clave] - antes[clave]
+        porcentaje = 100 * delta / antes[clave] if antes[clave] else 0
+        print(f"{titulo}: {_mib(antes[clave]).strip()} → {_mib(despues[clave]).strip()} MiB "
+              f"({delta / 1024:+.1f} MiB, {porcentaje:+.1f}%)")
+
+
+if __name__ == '__main__':
+    if not sys.platform.startswith('linux'):
+        raise SystemExit('Requiere Linux (/proc/<pid>/smaps_rollup)')
+    parser = argparse.ArgumentParser(description='USS/PSS/RSS de los workers de Granian')
+    parser.add_argument('--pid', type=int, required=True, help='PID del proceso padre de Granian')
+    parser.add_argument('--json', help='Guardar la medición en este archivo')
+    parser.add_argument('--comparar', help='Medición previa (JSON) contra la cual comparar')
+    args = parser.parse_args()
+
+    medicion = medir(args.pid)
+    imprimir(medicion)
+    if args.json:
+        with open(args.json, 'w') as archivo:
+            json.dump(medicion, archivo, indent=2)
+    if args.comparar:
+        with open(args.comparar) as archivo:
+            comparar(json.load(archivo), medicion)
@@ -0,0 +1,46 @@
+import http from 'k6/http';
+import { Counter, Rate, Trend } from 'k6/metrics';
+import { check, sleep } from 'k6';
+
+// Carga contra la app con USE_MOCK_DATA=false y los microservicios reemplazados por
+// performance/stub/servidor.py: recorre ids al azar para que haya cache misses, reintentos y 404.
+const BASE_URL = __ENV.BASE_URL || 'http://localhost:5000';
+const ALUMNOS = parseInt(__ENV.ALUMNOS || '1000');
+
+const respuestas = new Counter('respuestas_por_status');
+const errorRate = new Rate('error_rate');
+const duracionExitosa = new Trend('duracion_exitosa');
+
+export const options = {
+    insecureSkipTLSVerify: true,
+    stages: [
+        { duration: '30s', target: 10 },  // Ramp-up
+        { duration: '2m', target: 30 },   // Carga sostenida con upstreams degradados
+        { duration: '30s', target: 0 },   // Ramp-down
+    ],
+    thresholds: {
+        // Con errores inyectados se espera degradación, no caída: los 5xx propios no deben dominar
+        'error_rate': ['rate<0.5'],
+        'duracion_exitosa': ['p(95)<5000'],
+    },
+};
+
+export default function () {
+    const alumnoId = Math.floor(Math.random() * ALUMNOS) + 1;
+    const formato = Math.random() < 0.5 ? 'docx' : 'odt';
+
+    const res = http.get(`${BASE_URL}/api/v1/certificado/${alumnoId}/${formato}`, {
+        tags: { formato: formato },
+        timeout: '60s',
+    });
+
+    respuestas.add(1, { status: String(res.status) });
+    // Un 404 es la respuesta correcta para un alumno que el stub declara inexistente
+    errorRate.add(res.status >= 500);
+    check(res, { 'status 200 o 404': (r) => r.status === 200 || r.status === 404 });
+    if (res.status === 200) {
+        duracionExitosa.add(res.timings.duration);
+    }
+
+    sleep(Math.random() * 0.5);
+}
@@ -0,0 +1,271 @@
+"""
+Microservicios de alumnos y académica de reemplazo para pruebas de carga sin
+datos mock (USE_MOCK_DATA=false).
+
+Sirve /alumnos/<id>, /especialidades/<id> y /health (bajo --prefijo, por
+defecto /api/v1) a partir de un dataset generado, e inyecta degradación:
+latencia con distintas distribuciones, errores 5xx, alumnos inexistentes y
+respuestas slow-loris (el cuerpo llega de a tramos, cada uno antes del
+timeout de lectura de requests, así que REQUEST_TIMEOUT no corta la espera).
+
+La degradación se cambia en caliente, sin reiniciar:
+    curl -X PUT localhost:5001/_stub/degradacion -H 'Content-Type: application/json' \\
+         -d '{"latencia": "lognormal:40:0.6", "tasa_error": 0.2}'
+    curl localhost:5001/_stub/estadisticas
+
+Uso:
+    python performance/stub/servidor.py --puerto 5001 --alumnos 5000 --latencia normal:30:10
+    ALUMNO_SERVICE_URL=http://localhost:5001/api/v1 ESPECIALIDAD_SERVICE_URL=http://localhost:5001/api/v1 \\
+        USE_MOCK_DATA=false python wsgi.py
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+
+from flask import Flask, Response, jsonify, request
+
+NOMBRES = ('MARIANO PABLO', 'JUAN CARLOS', 'MARÍA FERNANDA', 'ROBERTO LUIS', 'ANA SOFÍA',
+           'DIEGO ALBERTO', 'LAURA BEATRIZ', 'CARLOS EDUARDO', 'LUCÍA', 'MARTÍN IGNACIO')
+APELLIDOS = ('SOSA', 'PÉREZ', 'GONZÁLEZ', 'MARTÍNEZ', 'RODRÍGUEZ', 'FERNÁNDEZ', 'LÓPEZ', 'RAMÍREZ',
+             'GÓMEZ', 'DÍAZ')
+ESPECIALIDADES = (('Ingeniería en Sistemas de Información', 'K'), ('Ingeniería Electromecánica', 'M'),
+                  ('Ingeniería Química', 'Q'), ('Ingeniería Civil', 'C'), ('Ingeniería Electrónica', 'R'),
+                  ('Ingeniería Industrial', 'I'))
+
+
+def parsear_latencia(spec: str) -> Callable[[random.Random], float]:
+    """
+    Distribución de latencia en ms a partir de 'tipo:parámetros':
+    fijo:20, uniforme:10:50, normal:30:10 (media, desvío),
+    exponencial:25 (media), lognormal:40:0.6 (mediana, sigma).
+    Devuelve una función que sortea la demora en segundos.
+    """
+    tipo, *parametros = (spec or 'fijo:0').split(':')
+    try:
+        valores = [float(p) for p in parametros]
+        if tipo == 'fijo':
+            ms = valores[0] if valores else 0.0
+            return lambda rng: ms / 1000
+        if tipo == 'uniforme':
+            minimo, maximo = valores
+            return lambda rng: rng.uniform(minimo, maximo) / 1000
+        if tipo == 'normal':
+            media, desvio = valores
+            return lambda rng: max(0.0, rng.gauss(media, desvio)) / 1000
+        if tipo == 'exponencial':
+            media, = valores
+            return lambda rng: rng.expovariate(1 / media) / 1000 if media > 0 else 0.0
+        if tipo == 'lognormal':
+            import math
+            mediana, sigma = valores
+            return lambda rng: rng.lognormvariate(math.log(mediana), sigma) / 1000
+    except ValueError:
+        pass
+    raise ValueError(f'Distribución de latencia inválida: {spec!r}')
+
+
+class Degradacion:
+    """Parámetros de degradación vigentes; se reemplazan en caliente con PUT /_stub/degradacion"""
+
+    CAMPOS = ('latencia', 'tasa_error', 'codigos_error', 'tasa_404', 'tasa_slowloris',
+              'slowloris_intervalo', 'slowloris_tramos')
+
+    def __init__(self, latencia: str = 'fijo:0', tasa_error: float = 0.0, codigos_error=(503,),
+                 tasa_404: float = 0.0, tasa_slowloris: float = 0.0, slowloris_intervalo: float = 1.0,
+                 slowloris_tramos: int = 10, semilla: Optional[int] = None):
+        self._lock = threading.Lock()
+        self._rng = random.Random(semilla)
+        self.semilla = semilla
+        self.latencia: str = 'fijo:0'
+        self._demora: Callable[[random.Random], float] = parsear_latencia(self.latencia)
+        self.tasa_error: float = 0.0
+        self.codigos_error: List[int] = [503]
+        self.tasa_404: float = 0.0
+        self.tasa_slowloris: float = 0.0
+        self.slowloris_intervalo: float = 1.0
+        self.slowloris_tramos: int = 10
+        self.actualizar({'latencia': latencia, 'tasa_error': tasa_error, 'codigos_error': list(codigos_error),
+                         'tasa_404': tasa_404, 'tasa_slowloris': tasa_slowloris,
+                         'slowloris_intervalo': slowloris_intervalo, 'slowloris_tramos': slowloris_tramos})
+
+    def actualizar(self, cambios: dict) -> None:
+        """Valida todos los campos antes de asignar: un campo inválido no deja un cambio a medias"""
+        desconocidos = set(cambios) - set(self.CAMPOS)
+        if desconocidos:
+            raise ValueError(f'Campos desconocidos: {sorted(desconocidos)}')
+        validados: Dict[str, Any] = {}
+        if 'latencia' in cambios:
+            validados['_demora'] = parsear_latencia(cambios['latencia'])
+            validados['latencia'] = cambios['latencia']
+        for campo in ('tasa_error', 'tasa_404', 'tasa_slowloris', 'slowloris_intervalo'):
+            if campo in cambios:
+                validados[campo] = float(cambios[campo])
+        if 'codigos_error' in cambios:
+            validados['codigos_error'] = [int(codigo) for codigo in cambios['codigos_error']]
+        if 'slowloris_tramos' in cambios:
+            validados['slowloris_tramos'] = max(1, int(cambios['slowloris_tramos']))
+        with self._lock:
+            for campo, valor in validados.items():
+                setattr(self, campo, valor)
+
+    def a_dict(self) -> dict:
+        return {campo: getattr(self, campo) for campo in self.CAMPOS}
+
+    def sortear(self) -> dict:
+        """Decide qué le pasa a un request: demora, error y slow-loris"""
+        with self._lock:
+            return {
+                'demora': self._demora(self._rng),
+                'error': self._rng.choice(self.codigos_error)
+                         if self._rng.random() < self.tasa_error else None,
+                'slowloris': self._rng.random() < self.tasa_slowloris,
+            }
+
+    def falta(self, recurso: str, id: int) -> bool:
+        """404 estable por id: el mismo alumno falta en todos los requests (y las caches lo reflejan)"""
+        return random.Random(f'{recurso}:{id}:{self.semilla}').random() < self.tasa_404
+
+
+def generar_datos(alumnos: int, especialidades: int, semilla: Optional[int] = None,
+                  especialidad_anidada: bool = False) -> Dict[str, Dict[int, dict]]:
+    """
+    Dataset de alumnos (ids 1..alumnos) y especialidades (ids 1..especialidades).
+
+    Por defecto el alumno trae solo especialidad_id y la app consulta al MS
+    académica; con especialidad_anidada la trae completa y ese paso se omite.
+    """
+    rng = random.Random(semilla)
+    facultad = {'id': 1, 'nombre': 'Facultad Regional San Rafael', 'ciudad': 'San Rafael',
+                'provincia': 'Mendoza', 'universidad': {'id': 1, 'nombre': 'Universidad Tecnológica Nacional'}}
+    datos_especialidades: Dict[int, dict] = {}
+    for id in range(1, especialidades + 1):
+        nombre, letra = ESPECIALIDADES[(id - 1) % len(ESPECIALIDADES)]
+        datos_especialidades[id] = {'id': id, 'nombre': nombre, 'letra': letra,
+                                    'observacion': 'Especialidad de grado', 'facultad': facultad}
+    datos_alumnos: Dict[int, dict] = {}
+    for id in range(1, alumnos + 1):
+        especialidad_id = rng.randint(1, especialidades)
+        alumno: Dict[str, Any] = {
+            'id': id,
+            'nombre': rng.choice(NOMBRES),
+            'apellido': rng.choice(APELLIDOS),
+            'nrodocumento': str(rng.randint(30_000_000, 48_000_000)),
+            'legajo': str(10_000 + id),
+            'tipo_documento': {'id': 1, 'nombre': 'Documento Nacional de Identidad', 'sigla': 'DNI'},
+        }
+        if especialidad_anidada:
+            alumno['especialidad'] = datos_especialidades[especialidad_id]
+        else:
+            alumno['especialidad_id'] = especialidad_id
+        datos_alumnos[id] = alumno
+    return {'alumnos': datos_alumnos, 'especialidades': datos_especialidades}
+
+
+def crear_app(datos: Dict[str, Dict[int, dict]], degradacion: Degradacion, prefijo: str = '/api/v1') -> Flask:
+    app = Flask(__name__)
+    estadisticas: Counter = Counter()
+    lock = threading.Lock()
+
+    def contar(recurso: str, resultado: str) -> None:
+        with lock:
+            estadisticas[f'{recurso}:{resultado}'] += 1
+
+    def responder(recurso: str, id: int):
+        sorteo = degradacion.sortear()
+        time.sleep(sorteo['demora'])
+        if sorteo['error'] is not None:
+            contar(recurso, str(sorteo['error']))
+            return jsonify({'error': 'InjectedFailure', 'status': sorteo['error']}), sorteo['error']
+        registro = datos[recurso].get(id)
+        if registro is None or degradacion.falta(recurso, id):
+            contar(recurso, '404')
+            return jsonify({'error': 'NotFound', 'status': 404}), 404
+        cuerpo = json.dumps(registro, ensure_ascii=False).encode()
+        if not sorteo['slowloris']:
+            contar(recurso, '200')
+            return Response(cuerpo, mimetype='application/json')
+        contar(recurso, 'slowloris')
+        return Response(_goteo(cuerpo, degradacion.slowloris_tramos, degradacion.slowloris_intervalo),
+                        mimetype='application/json')
+
+    @app.route(f'{prefijo}/alumnos/<int:id>')
+    def alumno(id: int):
+        return responder('alumnos', id)
+
+    @app.route(f'{prefijo}/especialidades/<int:id>')
+    def especialidad(id: int):
+        return responder('especialidades', id)
+
+    @app.route(f'{prefijo}/health')
+    @app.route('/health')
+    def health():
+        return jsonify({'status': 'ok', 'service': 'stub-upstream'})
+
+    @app.route('/_stub/degradacion', methods=['GET', 'PUT'])
+    def configurar():
+        if request.method == 'PUT':
+            try:
+                degradacion.actualizar(request.get_json(force=True) or {})
+            except (ValueError, TypeError) as e:
+                return jsonify({'error': 'BadRequest', 'message': str(e), 'status': 400}), 400
+        return jsonify(degradacion.a_dict())
+
+    @app.route('/_stub/estadisticas', methods=['GET', 'DELETE'])
+    def ver_estadisticas():
+        with lock:
+            if request.method == 'DELETE':
+                estadisticas.clear()
+            return jsonify(dict(estadisticas))
+
+    return app
+
+
+def _goteo(cuerpo: bytes, tramos: int, intervalo: float):
+    """Cuerpo en tramos separados por intervalo segundos (respuesta chunked)"""
+    tamano = max(1, -(-len(cuerpo) // tramos))
+    for inicio in range(0, len(cuerpo), tamano):
+        if inicio:
+            time.sleep(intervalo)
+        yield cuerpo[inicio:inicio + tamano]
+
+
+def main(argumentos=None) -> None:
+    parser = argparse.ArgumentParser(description='MS de alumnos y académica de reemplazo con degradación inyectable')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--puerto', type=int, default=5001)
+    parser.add_argument('--prefijo', default='/api/v1', help='Prefijo de las rutas (el de ALUMNO_SERVICE_URL)')
+    parser.add_argument('--alumnos', type=int, default=1000, help='Alumnos generados (ids 1..N)')
+    parser.add_argument('--especialidades', type=int, default=6)
+    parser.add_argument('--especialidad-anidada', action='store_true',
+                        help='El alumno trae la especialidad completa (sin consultas al MS académica)')
+    parser.add_argument('--semilla', type=int, default=None, help='Dataset y sorteos reproducibles')
+    parser.add_argument('--latencia', default='fijo:0',
+                        help='fijo:MS, uniforme:MIN:MAX, normal:MEDIA:DESVIO, exponencial:MEDIA, lognormal:MEDIANA:SIGMA')
+    parser.add_argument('--tasa-error', type=float, default=0.0, help='Fracción de respuestas 5xx')
+    parser.add_argument('--codigos-error', default='503', help='Códigos de error sorteados (ej: 500,502,503)')
+    parser.add_argument('--tasa-404', type=float, default=0.0, help='Fracción de ids inexistentes (estable por id)')
+    parser.add_argument('--tasa-slowloris', type=float, default=0.0, help='Fracción de respuestas con cuerpo en goteo')
+    parser.add_argument('--slowloris-intervalo', type=float, default=1.0, help='Segundos entre tramos del cuerpo')
+    parser.add_argument('--slowloris-tramos', type=int, default=10)
+    args = parser.parse_args(argumentos)
+
+    degradacion = Degradacion(
+        latencia=args.latencia, tasa_error=args.tasa_error,
+        codigos_error=[int(c) for c in args.codigos_error.split(',') if c],
+        tasa_404=args.tasa_404, tasa_slowloris=args.tasa_slowloris,
+        slowloris_intervalo=args.slowloris_intervalo, slowloris_tramos=args.slowloris_tramos,
+        semilla=args.semilla
+    )
+    datos = generar_datos(args.alumnos, args.especialidades, args.semilla, args.especialidad_anidada)
+    app = crear_app(datos, degradacion, args.prefijo.rstrip('/'))
+    print(f'Stub de upstreams en http://{args.host}:{args.puerto}{args.prefijo} '
+          f'({args.alumnos} alumnos, {args.especialidades} especialidades): {degradacion.a_dict()}')
+    app.run(host=args.host, port=args.puerto, threaded=True)
+
+
+if __name__ == '__main__':
+    main()
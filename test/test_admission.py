@@ -0,0 +1,133 @@
+import unittest
+import os
+import threading
+import time
+from app import create_app
+from app.middleware import ControlDeAdmision
+from app.middleware.admission_middleware import _ColaFormato, parsear_limites
+from app.exceptions import ServiceOverloadedException
+
+
+class ControlDeAdmisionTest(unittest.TestCase):
+    """Tests del semáforo por formato, la cola acotada y el descarte CoDel"""
+
+    def test_parsear_limites(self):
+        self.assertEqual(parsear_limites('pdf=2, docx=8,'), {'pdf': 2, 'docx': 8})
+
+    def test_formato_sin_limite_no_se_controla(self):
+        control = ControlDeAdmision({'pdf': 1})
+        self.assertFalse(control.adquirir('docx'))
+
+    def test_admite_hasta_el_limite_y_libera(self):
+        control = ControlDeAdmision({'pdf': 2}, espera_max=0.01)
+        self.assertTrue(control.adquirir('pdf'))
+        self.assertTrue(control.adquirir('pdf'))
+        self.assertEqual(control.estado()['pdf']['en_curso'], 2)
+
+        with self.assertRaises(ServiceOverloadedException):
+            control.adquirir('pdf')
+
+        control.liberar('pdf')
+        self.assertTrue(control.adquirir('pdf'))
+
+    def test_cola_llena_rechaza_sin_esperar(self):
+        control = ControlDeAdmision({'pdf': 1}, max_cola=0, espera_max=5)
+        control.adquirir('pdf')
+
+        inicio = time.monotonic()
+        with self.assertRaises(ServiceOverloadedException):
+            control.adquirir('pdf')
+        self.assertLess(time.monotonic() - inicio, 1)
+        self.assertEqual(control.estado()['pdf']['rechazados'], 1)
+
+    def test_request_en_cola_entra_cuando_se_libera_un_lugar(self):
+        control = ControlDeAdmision({'pdf': 1}, espera_max=2, objetivo=10)
+        control.adquirir('pdf')
+        threading.Timer(0.05, control.liberar, args=('pdf',)).start()
+
+        self.assertTrue(control.adquirir('pdf'))
+
+    def test_codel_descarta_si_la_espera_supera_el_objetivo_todo_un_intervalo(self):
+        control = ControlDeAdmision({'pdf': 1}, espera_max=2, objetivo=0.01, intervalo=0.05)
+        control.adquirir('pdf')
+
+        # Primera espera larga: solo marca el inicio del exceso
+        threading.Timer(0.03, control.liberar, args=('pdf',)).start()
+        self.assertTrue(control.adquirir('pdf'))
+
+        # La cola sigue por encima del objetivo pasado el intervalo: se descarta
+        threading.Timer(0.06, control.liberar, args=('pdf',)).start()
+        with self.assertRaises(ServiceOverloadedException):
+            control.adquirir('pdf')
+
+        # El lugar liberado se devolvió al semáforo
+        self.assertTrue(control.adquirir('pdf'))
+
+    def test_codel_espacia_los_descartes_y_sale_bajo_el_objetivo(self):
+        """Test: En descarte no se descarta a todos: uno cada intervalo/√n hasta que la espera baja"""
+        cola = _ColaFormato(1, 10, objetivo=0.1, intervalo=1.0)
+
+        self.assertFalse(cola._registrar_espera(0.2, 0.0))   # Empieza el exceso
+        self.assertTrue(cola._registrar_espera(0.2, 1.0))    # Un intervalo completo: primer descarte
+        self.assertFalse(cola._registrar_espera(0.2, 1.5))   # Antes del próximo descarte se admite
+        self.assertTrue(cola._registrar_espera(0.2, 2.0))    # 1.0 + 1/√1
+        self.assertFalse(cola._registrar_espera(0.2, 2.5))
+        self.assertTrue(cola._registrar_espera(0.2, 2.71))   # 2.0 + 1/√2
+        self.assertFalse(cola._registrar_espera(0.2, 3.2))
+        self.assertTrue(cola._registrar_espera(0.2, 3.29))   # 2.707 + 1/√3
+
+        # Una espera bajo el objetivo sale del estado de descarte
+        self.assertFalse(cola._registrar_espera(0.05, 3.3))
+        self.assertFalse(cola._registrar_espera(0.2, 3.4))
+        self.assertFalse(cola._registrar_espera(0.2, 4.0))
+
+    def test_limites_por_defecto_menores_a_los_hilos_del_worker(self):
+        from app.config.config import Config
+        if 'ADMISSION_LIMITES' in os.environ:
+            self.skipTest('ADMISSION_LIMITES definido en el entorno')
+        limites = parsear_limites(Config.ADMISSION_LIMITES)
+
+        self.assertTrue(all(limite < Config.GRANIAN_BLOCKING_THREADS for limite in limites.values()))
+
+
+class AdmissionMiddlewareTest(unittest.TestCase):
+    """Tests del middleware sobre los endpoints de certificados"""
+
+    def setUp(self):
+        os.environ['FLASK_CONTEXT'] = 'testing'
+        os.environ['USE_MOCK_DATA'] = 'true'
+        self.app = create_app()
+        self.client = self.app.test_client()
+
+    def test_libera_el_lugar_al_terminar_el_request(self):
+        self.app.extensions['admision'] = ControlDeAdmision({'docx': 1}, espera_max=0.01)
+
+        for _ in range(2):
+            response = self.client.get('/api/v1/certificado/1/docx')
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.app.extensions['admision'].estado()['docx']['en_curso'], 0)
+
+    def test_sobrecarga_retorna_503_con_retry_after(self):
+        control = ControlDeAdmision({'docx': 1}, max_cola=0, retry_after=3)
+        self.app.extensions['admision'] = control
+        control.adquirir('docx')
+
+        response = self.client.get('/api/v1/certificado/1/docx')
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers['Retry-After'], '3')
+        self.assertEqual(response.get_json()['error'], 'ServiceOverloaded')
+        self.assertEqual(response.get_json()['formato'], 'docx')
+
+    def test_otras_rutas_no_se_controlan(self):
+        control = ControlDeAdmision({'docx': 1, 'pdf': 1}, max_cola=0)
+        self.app.extensions['admision'] = control
+        control.adquirir('docx')
+
+        response = self.client.get('/api/v1/certificado/1/odt')
+
+        self.assertEqual(response.status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,163 @@
+import unittest
+import io
+import os
+import shutil
+import tempfile
+import time
+from unittest.mock import patch
+from app import create_app
+from app.repositories import ArtifactStore
+from app.services import CertificateService, AlumnoService
+from app.utils.fingerprint import huella_render, serializar_contexto
+import app.resources.certificado_resource as certificado_resource
+
+
+class ArtifactStoreTest(unittest.TestCase):
+    """Tests del almacén de artefactos en disco"""
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.store = ArtifactStore(self.directorio, max_bytes=1000, intervalo_barrido=3600)
+
+    def tearDown(self):
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+    def test_guardar_y_obtener(self):
+        clave = 'ab' + '0' * 62
+        self.assertIsNone(self.store.obtener(clave, 'pdf'))
+
+        ruta = self.store.guardar(clave, 'pdf', b'%PDF-contenido', {'alumno_id': 1})
+
+        self.assertEqual(self.store.obtener(clave, 'pdf'), ruta)
+        with open(ruta, 'rb') as f:
+            self.assertEqual(f.read(), b'%PDF-contenido')
+        meta = self.store.metadatos(clave, 'pdf')
+        self.assertIsInstance(meta, dict)
+        self.assertEqual(meta['tamanio'], 14)
+        self.assertEqual(meta['alumno_id'], 1)
+
+    def test_no_deja_temporales(self):
+        self.store.guardar('cd' + '1' * 62, 'docx', b'PK')
+        archivos = os.listdir(os.path.join(self.directorio, 'cd'))
+        self.assertFalse(any(nombre.endswith('.tmp') for nombre in archivos))
+
+    def test_barrido_elimina_los_menos_usados(self):
+        claves = [f'{i:02d}' + 'f' * 62 for i in range(5)]
+        for i, clave in enumerate(claves):
+            ruta = self.store.guardar(clave, 'pdf', b'x' * 300)
+            os.utime(ruta, (time.time() - 100 + i, time.time() - 100 + i))
+
+        # La primera clave se vuelve a usar: pasa a ser la más reciente
+        self.store.obtener(claves[0], 'pdf')
+
+        eliminados = self.store.barrer()
+
+        self.assertEqual(eliminados, 2)
+        self.assertIsNotNone(self.store.obtener(claves[0], 'pdf'))
+        self.assertIsNone(self.store.obtener(claves[1], 'pdf'))
+        self.assertIsNone(self.store.metadatos(claves[1], 'pdf'))
+        self.assertIsNone(self.store.obtener(claves[2], 'pdf'))
+        self.assertIsNotNone(self.store.obtener(claves[4], 'pdf'))
+
+    def test_barrido_conserva_el_documento_recien_guardado(self):
+        store = ArtifactStore(self.directorio, max_bytes=100, intervalo_barrido=0)
+
+        ruta = store.guardar('ef' + '2' * 62, 'pdf', b'x' * 200)
+
+        self.assertTrue(os.path.exists(ruta))
+
+    def test_documento_abierto_sobrevive_al_barrido(self):
+        clave = 'ab' + '3' * 62
+        self.store.guardar(clave, 'pdf', b'%PDF-abierto')
+
+        documento, ruta = self.store.abrir(clave, 'pdf'), self.store.obtener(clave, 'pdf')
+        self.assertIsInstance(documento, io.BufferedReader)
+        self.assertIsInstance(ruta, str)
+        with documento:
+            # Otro worker barre el almacén entre la búsqueda y el envío
+            os.unlink(ruta)
+            self.assertEqual(documento.read(), b'%PDF-abierto')
+        self.assertIsNone(self.store.abrir(clave, 'pdf'))
+
+
+class FingerprintTest(unittest.TestCase):
+    """Tests de la huella de los insumos de renderizado"""
+
+    def setUp(self):
+        self.app = create_app()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.alumno = CertificateService._get_mock_alumno(1)
+        self.context = CertificateService()._obtener_contexto_alumno(self.alumno)
+
+    def tearDown(self):
+        self.app_context.pop()
+
+    def test_huella_determinista(self):
+        rutas = CertificateService._rutas_plantilla('pdf')
+        self.assertEqual(huella_render(self.context, 'pdf', rutas),
+                         huella_render(dict(self.context), 'pdf', rutas))
+
+    def test_huella_cambia_con_los_datos_y_el_formato(self):
+        rutas = CertificateService._rutas_plantilla('docx')
+        base = huella_render(self.context, 'docx', rutas)
+
+        self.assertNotEqual(base, huella_render(self.context, 'odt', rutas))
+        self.alumno.legajo = '99999'
+        self.assertNotEqual(base, huella_render(self.context, 'docx', rutas))
+
+    def test_serializa_modelos_anidados(self):
+        self.assertIn('Universidad Tecnológica Nacional'.encode('utf-8'),
+                      serializar_contexto(self.context))
+
+
+class ArtifactStoreEndpointTest(unittest.TestCase):
+    """Tests de los endpoints de certificados servidos desde el almacén"""
+
+    def setUp(self):
+        os.environ['FLASK_CONTEXT'] = 'testing'
+        os.environ['USE_MOCK_DATA'] = 'true'
+        self.directorio = tempfile.mkdtemp()
+        self.app = create_app()
+        self.app.config['ARTIFACT_STORE_ENABLED'] = True
+        self.client = self.app.test_client()
+        self.store = ArtifactStore(self.directorio, max_bytes=10 * 1024 * 1024)
+        with self.app.app_context():
+            self.service = AlumnoService(CertificateService(artifact_store=self.store))
+        self.patcher = patch.object(certificado_resource, 'get_alumno_service', return_value=self.service)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+    def test_segunda_descarga_no_renderiza(self):
+        with patch.object(CertificateService, '_renderizar', wraps=CertificateService._renderizar) as mock_render:
+            primera = self.client.get('/api/v1/certificado/1/docx')
+            segunda = self.client.get('/api/v1/certificado/1/docx')
+
+        self.assertEqual(primera.status_code, 200)
+        self.assertEqual(segunda.status_code, 200)
+        self.assertEqual(primera.data, segunda.data)
+        self.assertEqual(mock_render.call_count, 1)
+        primera.close()
+        segunda.close()
+
+    def test_documento_barrido_tras_el_render_se_envia_desde_memoria(self):
+        with patch.object(self.store, 'abrir', return_value=None):
+            response = self.client.get('/api/v1/certificado/1/docx')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[:2], b'PK')
+        response.close()
+
+    def test_soporta_range(self):
+        response = self.client.get('/api/v1/certificado/1/odt', headers={'Range': 'bytes=0-1'})
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.data, b'PK')
+        response.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
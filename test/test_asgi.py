@@ -0,0 +1,106 @@
+import unittest
+import asyncio
+import os
+import httpx
+from unittest.mock import Mock
+from app import create_app
+from app.asgi import create_asgi_app
+from app.utils import retry
+
+
+class AsgiAppTest(unittest.TestCase):
+    """Tests del modo ASGI (ruta asíncrona de certificados + delegación a Flask)"""
+
+    def setUp(self):
+        os.environ['FLASK_CONTEXT'] = 'testing'
+        os.environ['USE_MOCK_DATA'] = 'true'
+        self.asgi_app = create_asgi_app(create_app())
+
+    def _get(self, path: str, headers=None) -> httpx.Response:
+        async def pedir():
+            transport = httpx.ASGITransport(app=self.asgi_app)
+            async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+                response = await client.get(path, headers=headers)
+            await self.asgi_app._cerrar()
+            return response
+        return asyncio.run(pedir())
+
+    def test_certificado_por_ruta_asincrona(self):
+        """Test: GET /certificado/<id>/docx se atiende en la ruta nativa ASGI"""
+        response = self._get('/api/v1/certificado/1/docx')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('certificado_alumno_1.docx', response.headers['content-disposition'])
+        self.assertTrue(response.content.startswith(b'PK'))
+
+    def test_alumno_inexistente_retorna_404_json(self):
+        response = self._get('/api/v1/certificado/999/odt')
+        
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json()['error'], 'AlumnoNotFound')
+
+    def test_certificado_con_etag_y_server_timing(self):
+        """Test: La ruta asíncrona comparte el pipeline Flask (ETag, 304 y Server-Timing)"""
+        response = self._get('/api/v1/certificado/1/docx')
+        
+        self.assertIn('alumno;dur=', response.headers['server-timing'])
+        self.assertIn('total;dur=', response.headers['server-timing'])
+        etag = response.headers['etag']
+        
+        response = self._get('/api/v1/certificado/1/docx', headers={'If-None-Match': etag})
+        
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_documento_enviado_en_tramos(self):
+        """Test: El cuerpo se envía en varios mensajes more_body, no como un único bloque"""
+        self.asgi_app.TAMANIO_TRAMO = 1024
+        mensajes = []
+
+        async def recibir():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def enviar(mensaje):
+            mensajes.append(mensaje)
+
+        async def pedir():
+            scope = {'type': 'http', 'method': 'GET', 'path': '/api/v1/certificado/1/docx', 'raw_path': b'',
+                     'query_string': b'', 'headers': [], 'http_version': '1.1', 'scheme': 'http',
+                     'server': ('test', 80), 'client': ('127.0.0.1', 1234), 'root_path': ''}
+            await self.asgi_app(scope, recibir, enviar)
+            await self.asgi_app._cerrar()
+        asyncio.run(pedir())
+
+        cuerpos = [m for m in mensajes if m['type'] == 'http.response.body']
+        self.assertGreater(len(cuerpos), 2)
+        self.assertTrue(all(m['more_body'] for m in cuerpos[:-1]))
+        self.assertFalse(cuerpos[-1]['more_body'])
+        contenido = b''.join(m['body'] for m in cuerpos)
+        self.assertTrue(contenido.startswith(b'PK'))
+        longitud = dict(mensajes[0]['headers'])[b'content-length']
+        self.assertEqual(len(contenido), int(longitud))
+
+    def test_resto_de_rutas_delegadas_a_flask(self):
+        """Test: Las rutas que no son certificados pasan por la app Flask"""
+        response = self._get('/api/v1/')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), 'OK')
+
+
+class AsyncRetryTest(unittest.TestCase):
+    """Tests del decorador retry aplicado a corrutinas"""
+
+    def test_reintenta_corrutinas(self):
+        llamadas = Mock(side_effect=[ValueError('falla'), 'ok'])
+
+        @retry(max_attempts=3, delay=0.01, exceptions=(ValueError,))
+        async def operacion():
+            return llamadas()
+
+        self.assertEqual(asyncio.run(operacion()), 'ok')
+        self.assertEqual(llamadas.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+import os
+import subprocess
+import sys
+from io import BytesIO
+from app import create_app
+from app.services.documentos_office_service import (
+    Document, RegistroDocumentos, calentar_backends, obtener_tipo_documento, DOCXDocument
+)
+from app.exceptions import FormatNotEnabledException
+
+
+class _GeneradorFalso(Document):
+    @staticmethod
+    def generar(carpeta: str, plantilla: str, context: dict) -> BytesIO:
+        return BytesIO()
+
+
+class RegistroDocumentosTest(unittest.TestCase):
+    """Tests del registro de backends con carga diferida"""
+
+    def test_modulos_se_importan_en_el_primer_uso(self):
+        registro = RegistroDocumentos()
+        registro.registrar('txt', ('json',), _GeneradorFalso)
+
+        self.assertFalse(registro.estado()['txt']['cargado'])
+        self.assertIs(registro.obtener('txt'), _GeneradorFalso)
+
+        estado = registro.estado()['txt']
+        self.assertTrue(estado['cargado'])
+        self.assertIsNotNone(estado['import_ms'])
+
+    def test_backend_que_no_carga_reporta_el_error(self):
+        registro = RegistroDocumentos()
+        registro.registrar('txt', ('modulo_que_no_existe',), _GeneradorFalso)
+
+        # El generador se devuelve igual: es quien informa el error al usarse
+        self.assertIs(registro.obtener('txt'), _GeneradorFalso)
+        self.assertFalse(registro.estado()['txt']['cargado'])
+        self.assertIn('modulo_que_no_existe', registro.estado()['txt']['error'])
+
+    def test_formato_desconocido(self):
+        self.assertIsNone(RegistroDocumentos().obtener('rtf'))
+
+    def test_importar_los_servicios_no_carga_los_backends(self):
+        codigo = ('import sys, app.services; '
+                  'print(any(m in sys.modules for m in ("docxtpl", "python_odt_template", "weasyprint")))')
+        salida = subprocess.run([sys.executable, '-c', codigo], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+        self.assertEqual(salida.stdout.strip().splitlines()[-1], 'False')
+
+
+class FormatosHabilitadosTest(unittest.TestCase):
+    """Tests de una réplica especializada (FORMATOS_HABILITADOS)"""
+
+    def setUp(self):
+        os.environ['FLASK_CONTEXT'] = 'testing'
+        os.environ['USE_MOCK_DATA'] = 'true'
+        self.app = create_app()
+        self.app.config['FORMATOS_HABILITADOS'] = ('docx',)
+        self.client = self.app.test_client()
+
+    def test_formato_deshabilitado_responde_404(self):
+        response = self.client.get('/api/v1/certificado/1/odt')
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.get_json()['error'], 'FormatNotEnabled')
+        self.assertEqual(response.get_json()['formatos_habilitados'], ['docx'])
+
+    def test_formato_habilitado_se_genera(self):
+        self.assertEqual(self.client.get('/api/v1/certificado/1/docx').status_code, 200)
+
+    def test_factory_y_calentamiento_respetan_la_configuracion(self):
+        with self.app.app_context():
+            self.assertIs(obtener_tipo_documento('docx'), DOCXDocument)
+            with self.assertRaises(FormatNotEnabledException):
+                obtener_tipo_documento('pdf')
+            self.assertEqual(list(calentar_backends()), ['docx'])
+
+
+if __name__ == '__main__':
+    unittest.main()
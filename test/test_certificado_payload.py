@@ -0,0 +1,114 @@
+import unittest
+import hashlib
+import hmac
+import json
+import os
+from unittest.mock import patch
+from app import create_app
+from app.mapping import CertificadoPayloadMapping
+from app.models import Alumno
+from app.validators import validar_firma_payload
+
+
+def _payload_valido():
+    return {
+        'alumno': {
+            'id': 7,
+            'nombre': 'ANA SOFÍA',
+            'apellido': 'RODRÍGUEZ',
+            'nrodocumento': '41234567',
+            'legajo': '13001',
+            'tipo_documento': {'id': 1, 'nombre': 'DNI', 'sigla': 'DNI'}
+        },
+        'especialidad': {'id': 3, 'nombre': 'Ingeniería Química', 'letra': 'Q'},
+        'facultad': {'id': 1, 'nombre': 'Facultad Regional San Rafael', 'ciudad': 'San Rafael', 'provincia': 'Mendoza'},
+        'universidad': {'id': 1, 'nombre': 'Universidad Tecnológica Nacional'}
+    }
+
+
+class CertificadoPayloadMappingTest(unittest.TestCase):
+    """Tests del mapping del body de certificados"""
+
+    def test_arma_relaciones_completas(self):
+        """Test: El mapping encadena especialidad → facultad → universidad"""
+        alumno = CertificadoPayloadMapping().load(_payload_valido())
+        
+        self.assertIsInstance(alumno, Alumno)
+        self.assertEqual(alumno.legajo, '13001')
+        self.assertEqual(alumno.especialidad.nombre, 'Ingeniería Química')
+        self.assertEqual(alumno.especialidad.facultad.ciudad, 'San Rafael')
+        self.assertEqual(alumno.especialidad.facultad.universidad.nombre, 'Universidad Tecnológica Nacional')
+
+
+class ValidarFirmaPayloadTest(unittest.TestCase):
+    """Tests de la firma HMAC del body"""
+
+    def test_firma_valida_con_y_sin_prefijo(self):
+        firma = hmac.new(b'secreto', b'{}', hashlib.sha256).hexdigest()
+        self.assertTrue(validar_firma_payload(b'{}', firma, 'secreto'))
+        self.assertTrue(validar_firma_payload(b'{}', f'sha256={firma}', 'secreto'))
+
+    def test_firma_invalida_o_ausente(self):
+        self.assertFalse(validar_firma_payload(b'{}', 'abc', 'secreto'))
+        self.assertFalse(validar_firma_payload(b'{}', None, 'secreto'))
+
+    def test_firma_no_ascii_es_invalida(self):
+        self.assertFalse(validar_firma_payload(b'{}', 'sha256=ñandú', 'secreto'))
+
+
+class CertificadoPayloadEndpointTest(unittest.TestCase):
+    """Tests del endpoint POST /certificado/<formato>"""
+
+    def setUp(self):
+        os.environ['FLASK_CONTEXT'] = 'testing'
+        self.app = create_app()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        self.app_context.pop()
+
+    @patch('app.services.certificate_service.CertificateService._buscar_alumno_por_id')
+    def test_genera_docx_sin_consultar_microservicios(self, mock_buscar):
+        """Test: El body se renderiza directo, sin buscar al alumno"""
+        response = self.client.post('/api/v1/certificado/docx', json=_payload_valido())
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('certificado_alumno_7.docx', response.headers['Content-Disposition'])
+        mock_buscar.assert_not_called()
+
+    def test_payload_invalido_retorna_400(self):
+        """Test: Un body incompleto retorna 400 con el detalle de validación"""
+        payload = _payload_valido()
+        del payload['facultad']
+        
+        response = self.client.post('/api/v1/certificado/odt', json=payload)
+        
+        self.assertEqual(response.status_code, 400)
+        data = response.get_json()
+        self.assertEqual(data['error'], 'InvalidPayload')
+        self.assertIn('facultad', data['errors'])
+
+    def test_formato_no_soportado_retorna_404(self):
+        response = self.client.post('/api/v1/certificado/xls', json=_payload_valido())
+        self.assertEqual(response.status_code, 404)
+
+    def test_firma_requerida_si_hay_secreto(self):
+        """Test: Con secreto configurado se exige la firma HMAC del body"""
+        self.app.config['PAYLOAD_SIGNATURE_SECRET'] = 'secreto'
+        body = json.dumps(_payload_valido()).encode('utf-8')
+        
+        response = self.client.post('/api/v1/certificado/docx', data=body,
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 401)
+        
+        firma = hmac.new(b'secreto', body, hashlib.sha256).hexdigest()
+        response = self.client.post('/api/v1/certificado/docx', data=body,
+                                    content_type='application/json',
+                                    headers={'X-Signature': f'sha256={firma}'})
+        self.assertEqual(response.status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+import os
+import tempfile
+from unittest.mock import patch
+from app import create_app
+from app.services import CertificateService
+
+
+class ConditionalGetTest(unittest.TestCase):
+    """Tests de ETag en GET /certificado/<id>/<formato>"""
+
+    def setUp(self):
+        os.environ['FLASK_CONTEXT'] = 'testing'
+        os.environ['USE_MOCK_DATA'] = 'true'
+        self.app = create_app()
+        self.client = self.app.test_client()
+
+    def test_respuesta_incluye_validadores(self):
+        response = self.client.get('/api/v1/certificado/1/docx')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(response.headers.get('ETag'))
+        self.assertIsNone(response.headers.get('Last-Modified'))
+        self.assertIn('no-cache', response.headers['Cache-Control'])
+
+    def test_etag_estable_y_distinto_por_alumno(self):
+        primera = self.client.get('/api/v1/certificado/1/odt').headers['ETag']
+        segunda = self.client.get('/api/v1/certificado/1/odt').headers['ETag']
+        otro_alumno = self.client.get('/api/v1/certificado/2/odt').headers['ETag']
+
+        self.assertEqual(primera, segunda)
+        self.assertNotEqual(primera, otro_alumno)
+
+    def test_if_none_match_retorna_304_sin_renderizar(self):
+        etag = self.client.get('/api/v1/certificado/1/docx').headers['ETag']
+
+        with patch.object(CertificateService, '_renderizar') as mock_render:
+            response = self.client.get('/api/v1/certificado/1/docx', headers={'If-None-Match': etag})
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers['ETag'], etag)
+        self.assertEqual(response.data, b'')
+        mock_render.assert_not_called()
+
+    def test_if_none_match_distinto_retorna_documento(self):
+        response = self.client.get('/api/v1/certificado/1/docx', headers={'If-None-Match': '"otra-version"'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data.startswith(b'PK'))
+
+    def test_if_modified_since_no_valida(self):
+        """Test: Sin fecha que refleje cambios de datos, If-Modified-Since solo no da 304"""
+        response = self.client.get('/api/v1/certificado/1/docx',
+                                   headers={'If-Modified-Since': 'Fri, 01 Jan 2100 00:00:00 GMT'})
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_almacen_sin_last_modified_y_con_range(self):
+        """Test: Desde el almacén tampoco se expone el mtime del archivo y Range sigue funcionando"""
+        with tempfile.TemporaryDirectory() as directorio:
+            self.app.config.update(ARTIFACT_STORE_ENABLED=True, ARTIFACT_STORE_DIR=directorio)
+            etag = self.client.get('/api/v1/certificado/1/docx').headers['ETag']
+            response = self.client.get('/api/v1/certificado/1/docx',
+                                       headers={'If-Modified-Since': 'Fri, 01 Jan 2100 00:00:00 GMT'})
+            parcial = self.client.get('/api/v1/certificado/1/docx', headers={'Range': 'bytes=0-1'})
+            response.close()
+            parcial.close()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.headers.get('Last-Modified'))
+        self.assertEqual(response.headers['ETag'], etag)
+        self.assertEqual(parcial.status_code, 206)
+        self.assertEqual(parcial.data, b'PK')
+
+    def test_alumno_inexistente_sigue_retornando_404(self):
+        response = self.client.get('/api/v1/certificado/999/docx', headers={'If-None-Match': '*'})
+
+        self.assertEqual(response.status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
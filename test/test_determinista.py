@@ -0,0 +1,111 @@
+import unittest
+import datetime
+import os
+import zipfile
+from io import BytesIO
+from app import create_app
+from app.services import CertificateService
+from app.utils.determinista import momento_emision, normalizar_zip, normalizar_docx, fijar_fechas_odf
+
+
+def _zip(entradas, fecha):
+    salida = BytesIO()
+    with zipfile.ZipFile(salida, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for nombre, datos in entradas:
+            zf.writestr(zipfile.ZipInfo(nombre, date_time=fecha), datos)
+    return salida.getvalue()
+
+
+class NormalizarZipTest(unittest.TestCase):
+    """Tests de la normalización de contenedores ZIP"""
+
+    def setUp(self):
+        self.momento = momento_emision(datetime.date(2025, 3, 14))
+
+    def test_mismo_contenido_mismos_bytes(self):
+        a = _zip([('b.xml', b'<b/>'), ('mimetype', b'application/x'), ('a.xml', b'<a/>')], (2024, 1, 1, 10, 0, 0))
+        b = _zip([('a.xml', b'<a/>'), ('b.xml', b'<b/>'), ('mimetype', b'application/x')], (2025, 6, 2, 11, 30, 4))
+
+        self.assertNotEqual(a, b)
+        self.assertEqual(normalizar_zip(a, self.momento), normalizar_zip(b, self.momento))
+
+    def test_mimetype_primero_sin_comprimir_y_fecha_fija(self):
+        original = _zip([('content.xml', b'<c/>'), ('mimetype', b'application/x')], (2024, 1, 1, 10, 0, 0))
+
+        with zipfile.ZipFile(BytesIO(normalizar_zip(original, self.momento))) as zf:
+            infos = zf.infolist()
+
+        self.assertEqual(infos[0].filename, 'mimetype')
+        self.assertEqual(infos[0].compress_type, zipfile.ZIP_STORED)
+        self.assertTrue(all(info.date_time == (2025, 3, 14, 0, 0, 0) for info in infos))
+
+    def test_fija_fechas_de_metadatos(self):
+        core = (b'<cp:coreProperties><dcterms:created xsi:type="dcterms:W3CDTF">2020-01-01T10:00:00Z'
+                b'</dcterms:created><dcterms:modified xsi:type="dcterms:W3CDTF">2021-01-01T10:00:00Z'
+                b'</dcterms:modified></cp:coreProperties>')
+        docx = _zip([('docProps/core.xml', core)], (2024, 1, 1, 10, 0, 0))
+
+        with zipfile.ZipFile(BytesIO(normalizar_docx(docx, datetime.date(2025, 3, 14)))) as zf:
+            resultado = zf.read('docProps/core.xml')
+
+        self.assertEqual(resultado.count(b'2025-03-14T00:00:00Z'), 2)
+        self.assertNotIn(b'2020', resultado)
+
+        meta = b'<meta:creation-date>2020-01-01T10:00:00.1</meta:creation-date><dc:date>2021-01-01</dc:date>'
+        self.assertEqual(fijar_fechas_odf(meta, self.momento).count(b'2025-03-14T00:00:00'), 2)
+
+
+class DocumentosDeterministasTest(unittest.TestCase):
+    """Tests de los generadores en modo determinístico"""
+
+    def setUp(self):
+        os.environ['USE_MOCK_DATA'] = 'true'
+        self.app = create_app()
+        self.app.config['DOCUMENTOS_DETERMINISTAS'] = True
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.service = CertificateService()
+
+    def tearDown(self):
+        self.app_context.pop()
+
+    def _renderizar_dos_veces(self, tipo):
+        context, _ = self.service.preparar_certificado(1, tipo)
+        context['fecha_emision'] = datetime.date(2025, 3, 14)
+        primero = self.service.renderizar_certificado(context, tipo).getvalue()
+        segundo = self.service.renderizar_certificado(dict(context), tipo).getvalue()
+        return primero, segundo
+
+    def test_docx_reproducible(self):
+        primero, segundo = self._renderizar_dos_veces('docx')
+
+        self.assertEqual(primero, segundo)
+        with zipfile.ZipFile(BytesIO(primero)) as zf:
+            self.assertIn(b'2025-03-14T00:00:00Z', zf.read('docProps/core.xml'))
+            self.assertEqual(zf.infolist()[0].date_time, (2025, 3, 14, 0, 0, 0))
+
+    def test_odt_reproducible(self):
+        primero, segundo = self._renderizar_dos_veces('odt')
+
+        self.assertEqual(primero, segundo)
+        with zipfile.ZipFile(BytesIO(primero)) as zf:
+            self.assertEqual(zf.namelist()[0], 'mimetype')
+            self.assertIn(b'2025-03-14T00:00:00', zf.read('meta.xml'))
+
+    def test_pdf_reproducible(self):
+        try:
+            import weasyprint  # noqa: F401
+        except (OSError, ImportError) as e:
+            self.skipTest(f'WeasyPrint no disponible: {e}')
+        self.app.config['PDF_ENGINE'] = 'weasyprint'
+        self.app.config['PDF_MICROBATCH_ENABLED'] = False
+
+        primero, segundo = self._renderizar_dos_veces('pdf')
+
+        self.assertEqual(primero, segundo)
+        # Fechas de creación/modificación fijadas a la emisión, no al momento del render
+        self.assertIn(b'20250314', primero)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,6 +4,7 @@ from app.exceptions.custom_exceptions import (
     AlumnoNotFoundException,
     EspecialidadNotFoundException,
     ServiceUnavailableException,
+    UpstreamResponseException,
     CacheException,
     DocumentGenerationException
 )
@@ -76,6 +77,16 @@ class TestServiceUnavailableException(unittest.TestCase):
         self.assertIn("Connection timeout", result["message"])
 
 
+class TestUpstreamResponseException(unittest.TestCase):
+    def test_upstream_response_creation(self):
+        exc = UpstreamResponseException("academica", "facultad sin universidad")
+        
+        self.assertEqual(exc.status_code, 502)
+        self.assertEqual(exc.error_code, "InvalidUpstreamResponse")
+        self.assertEqual(exc.to_dict()["service_name"], "academica")
+        self.assertIn("facultad sin universidad", str(exc))
+
+
 class TestCacheException(unittest.TestCase):
     
     def test_cache_exception_creation(self):
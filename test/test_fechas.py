@@ -0,0 +1,52 @@
+import unittest
+import datetime
+import locale
+import os
+from unittest.mock import patch
+from app import create_app
+from app.services import CertificateService
+from app.utils.fechas import formatear_fecha
+
+
+class FormatearFechaTest(unittest.TestCase):
+    """Tests del formateo de fechas en español sin locale del sistema"""
+
+    def test_nombres_de_meses_en_espanol(self):
+        self.assertEqual(formatear_fecha(datetime.date(2025, 3, 5)), '05 de marzo de 2025')
+        self.assertEqual(formatear_fecha(datetime.date(2025, 12, 1), 'es_AR.UTF-8'), '01 de diciembre de 2025')
+
+    def test_datetime_se_formatea_por_su_dia(self):
+        self.assertEqual(formatear_fecha(datetime.datetime(2025, 9, 30, 23, 59)), '30 de septiembre de 2025')
+
+    def test_locale_sin_traduccion_usa_espanol(self):
+        self.assertEqual(formatear_fecha(datetime.date(2025, 1, 2), 'fr_FR'), '02 de enero de 2025')
+
+    def test_memoizado_por_dia(self):
+        formatear_fecha.cache_clear()
+        formatear_fecha(datetime.date(2025, 7, 9))
+        formatear_fecha(datetime.date(2025, 7, 9))
+
+        self.assertEqual(formatear_fecha.cache_info().hits, 1)
+
+
+class FechaCertificadoTest(unittest.TestCase):
+    """La fecha del contexto no modifica el locale del proceso"""
+
+    def setUp(self):
+        os.environ['FLASK_CONTEXT'] = 'testing'
+        os.environ['USE_MOCK_DATA'] = 'true'
+        self.app = create_app()
+
+    def test_contexto_sin_setlocale(self):
+        antes = locale.setlocale(locale.LC_TIME)
+        with self.app.app_context(), patch('locale.setlocale') as setlocale:
+            service = CertificateService()
+            context = service._obtener_contexto_alumno(service._get_mock_alumno(1))
+
+        setlocale.assert_not_called()
+        self.assertEqual(locale.setlocale(locale.LC_TIME), antes)
+        self.assertEqual(context['fecha'], formatear_fecha(datetime.date.today()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,248 @@
+"""
+Tests de la API de jobs asíncronos de certificados.
+Los tests de integración requieren Redis en localhost:6379 (se saltean si no está).
+"""
+import unittest
+import os
+import zipfile
+from io import BytesIO
+from unittest.mock import Mock
+from app import create_app
+from app.exceptions import DocumentGenerationException, JobNotReadyException
+from app.repositories import RedisClient, JobRepository
+from app.services.job_service import JobService
+from app.workers import CertificadoWorker
+
+
+class JobRepositoryEnMemoria(JobRepository):
+    """Doble de JobRepository sin Redis (no llama al constructor: no crea RedisClient)"""
+
+    def __init__(self):
+        self.jobs = {}
+        self.resultados = {}
+        self.cola = []
+        self.procesando = []
+        self.esperas = []
+
+    def crear(self, datos):
+        job_id = f'job{len(self.jobs) + 1}'
+        self.jobs[job_id] = dict(datos)
+        self.cola.insert(0, job_id)
+        return job_id
+
+    def obtener(self, job_id):
+        job = self.jobs.get(job_id)
+        return dict(job) if job else None
+
+    def actualizar(self, job_id, **campos):
+        self.jobs[job_id].update(campos)
+
+    def guardar_resultado(self, job_id, contenido):
+        self.resultados[job_id] = contenido
+
+    def obtener_resultado(self, job_id):
+        return self.resultados.get(job_id)
+
+    def desencolar(self, timeout=2):
+        if not self.cola:
+            return None
+        job_id = self.cola.pop()
+        self.procesando.insert(0, job_id)
+        return job_id
+
+    def confirmar(self, job_id):
+        if job_id in self.procesando:
+            self.procesando.remove(job_id)
+
+    def en_proceso(self):
+        return list(self.procesando)
+
+    def reencolar(self, job_id):
+        if job_id not in self.procesando:
+            return False
+        self.procesando.remove(job_id)
+        self.cola.append(job_id)
+        return True
+
+    def descartar(self, job_id):
+        self.confirmar(job_id)
+
+    def esperar_fin(self, job_id, timeout):
+        self.esperas.append(timeout)
+        return self.jobs[job_id]['estado'] in ('completado', 'error')
+
+
+class JobServiceTest(unittest.TestCase):
+    """Tests unitarios del servicio de jobs (sin Redis)"""
+
+    def setUp(self):
+        os.environ['FLASK_CONTEXT'] = 'testing'
+        self.app = create_app()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.repo = JobRepositoryEnMemoria()
+        self.certificate_service = Mock()
+        self.service = JobService(job_repository=self.repo, certificate_service=self.certificate_service)
+
+    def tearDown(self):
+        self.app_context.pop()
+
+    def test_job_individual_guarda_documento(self):
+        """Test: Un job de un alumno guarda el documento tal cual"""
+        self.certificate_service.generar_certificado_alumno_regular.return_value = BytesIO(b'%PDF-1')
+        job = self.service.crear_job([1], 'pdf')
+        
+        self.service.procesar(job['job_id'])
+        
+        documento, mimetype, nombre = self.service.obtener_resultado(job['job_id'])
+        self.assertEqual(documento.getvalue(), b'%PDF-1')
+        self.assertEqual(mimetype, 'application/pdf')
+        self.assertTrue(nombre.endswith('.pdf'))
+
+    def test_lote_empaqueta_zip_y_reporta_errores(self):
+        """Test: Un lote genera un ZIP y registra los alumnos que fallaron"""
+        def generar(alumno_id, formato):
+            if alumno_id == 2:
+                raise DocumentGenerationException(formato, 'datos incompletos')
+            return BytesIO(b'doc')
+        self.certificate_service.generar_certificado_alumno_regular.side_effect = generar
+        job = self.service.crear_job([1, 2, 3], 'docx')
+        
+        self.service.procesar(job['job_id'])
+        
+        estado = self.service.obtener_estado(job['job_id'])
+        self.assertEqual(estado['estado'], 'completado')
+        self.assertIn('2', estado['errores'])
+        documento, mimetype, _ = self.service.obtener_resultado(job['job_id'])
+        self.assertEqual(mimetype, 'application/zip')
+        with zipfile.ZipFile(documento) as zf:
+            self.assertEqual(sorted(zf.namelist()),
+                             ['certificado_alumno_1.docx', 'certificado_alumno_3.docx'])
+
+    def test_resultado_de_job_pendiente(self):
+        """Test: Pedir el resultado de un job sin terminar lanza JobNotReadyException"""
+        job = self.service.crear_job([1], 'odt')
+        with self.assertRaises(JobNotReadyException):
+            self.service.obtener_resultado(job['job_id'])
+
+    def test_worker_procesa_la_cola(self):
+        """Test: El worker desencola y procesa los jobs pendientes"""
+        self.certificate_service.generar_certificado_alumno_regular.return_value = BytesIO(b'doc')
+        job = self.service.crear_job([5], 'odt')
+        
+        procesados = CertificadoWorker(self.app, job_service=self.service).run(max_jobs=1)
+        
+        self.assertEqual(procesados, 1)
+        self.assertEqual(self.repo.jobs[job['job_id']]['estado'], 'completado')
+        self.assertEqual(self.repo.procesando, [])
+
+    def test_worker_confirma_job_fallido(self):
+        """Test: Un error inesperado marca el job como fallido y lo saca de procesando"""
+        self.certificate_service.generar_certificado_alumno_regular.side_effect = RuntimeError('boom')
+        job = self.service.crear_job([5], 'odt')
+
+        CertificadoWorker(self.app, job_service=self.service).run(max_jobs=1)
+
+        self.assertEqual(self.repo.jobs[job['job_id']]['estado'], 'error')
+        self.assertEqual(self.repo.procesando, [])
+
+    def test_job_huerfano_se_reencola(self):
+        """Test: Un job tomado por un worker que murió vuelve a la cola"""
+        job = self.service.crear_job([1], 'pdf')
+        self.repo.desencolar()
+        self.repo.actualizar(job['job_id'], estado='procesando', intentos=1, actualizado=0)
+
+        self.assertEqual(self.service.recuperar_huerfanos(), 1)
+        self.assertEqual(self.repo.cola, [job['job_id']])
+        self.assertEqual(self.repo.jobs[job['job_id']]['estado'], 'pendiente')
+
+    def test_job_con_latido_reciente_no_se_reencola(self):
+        job = self.service.crear_job([1], 'pdf')
+        self.repo.desencolar()
+
+        self.assertEqual(self.service.recuperar_huerfanos(), 0)
+        self.assertEqual(self.repo.procesando, [job['job_id']])
+
+    def test_job_huerfano_sin_intentos_restantes_falla(self):
+        """Test: Un job que agotó JOB_MAX_INTENTOS se marca como error en lugar de reencolarse"""
+        job = self.service.crear_job([1], 'pdf')
+        self.repo.desencolar()
+        self.repo.actualizar(job['job_id'], intentos=self.app.config['JOB_MAX_INTENTOS'], actualizado=0)
+
+        self.assertEqual(self.service.recuperar_huerfanos(), 0)
+        self.assertEqual(self.repo.jobs[job['job_id']]['estado'], 'error')
+        self.assertEqual(self.repo.procesando, [])
+
+    def test_long_polling_bloquea_en_redis_con_tope(self):
+        """Test: La espera se delega al repositorio y se limita a JOB_MAX_WAIT"""
+        job = self.service.crear_job([1], 'pdf')
+
+        estado = self.service.obtener_estado(job['job_id'], espera=60)
+
+        self.assertEqual(estado['estado'], 'pendiente')
+        self.assertEqual(self.repo.esperas, [self.app.config['JOB_MAX_WAIT']])
+
+
+class JobEndpointsTest(unittest.TestCase):
+    """Tests de los endpoints /jobs (validación, sin Redis)"""
+
+    def setUp(self):
+        os.environ['FLASK_CONTEXT'] = 'testing'
+        self.app = create_app()
+        self.client = self.app.test_client()
+
+    def test_body_invalido_retorna_400(self):
+        response = self.client.post('/api/v1/jobs/certificados', json={'formato': 'pdf'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json()['error'], 'InvalidPayload')
+
+    def test_formato_invalido_retorna_400(self):
+        response = self.client.post('/api/v1/jobs/certificados', json={'formato': 'xls', 'alumno_id': 1})
+        self.assertEqual(response.status_code, 400)
+
+
+class JobRedisIntegrationTest(unittest.TestCase):
+    """Tests de integración (REQUIEREN Redis corriendo en localhost:6379)"""
+
+    def setUp(self):
+        os.environ['FLASK_CONTEXT'] = 'testing'
+        os.environ['USE_MOCK_DATA'] = 'true'
+        self.app = create_app()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.repo = JobRepository()
+        
+        if not self.repo.redis_client.client:
+            self.skipTest("Redis no disponible - Inicia: docker run -d -p 6379:6379 redis:7-alpine")
+        
+        import app.resources.job_resource as job_resource
+        job_resource._job_service = JobService(job_repository=self.repo)
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        import app.resources.job_resource as job_resource
+        job_resource._job_service = None
+        self.app_context.pop()
+
+    def test_flujo_completo_job(self):
+        """Verifica crear job (202), procesarlo con el worker y descargar el resultado"""
+        response = self.client.post('/api/v1/jobs/certificados', json={'formato': 'docx', 'alumno_id': 1})
+        self.assertEqual(response.status_code, 202)
+        job_id = response.get_json()['job_id']
+        
+        CertificadoWorker(self.app, job_service=JobService(job_repository=self.repo)).run(max_jobs=1)
+        
+        estado = self.client.get(f'/api/v1/jobs/{job_id}?wait=5').get_json()
+        self.assertEqual(estado['estado'], 'completado')
+        
+        resultado = self.client.get(f'/api/v1/jobs/{job_id}/resultado')
+        self.assertEqual(resultado.status_code, 200)
+        self.assertGreater(len(resultado.data), 0)
+
+    def test_job_inexistente_retorna_404(self):
+        response = self.client.get('/api/v1/jobs/no-existe')
+        self.assertEqual(response.status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
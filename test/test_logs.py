@@ -0,0 +1,187 @@
+import unittest
+import io
+import json
+import logging
+import os
+import sys
+from logging.handlers import QueueHandler
+from unittest.mock import patch
+from flask import Flask
+from app.middleware.logging_middleware import register_logging_middleware
+from app.utils import logs
+from app.utils.logs import FormateadorJSON, configurar_logging, detener_logging
+
+
+class _Restaurar:
+    """Guarda los handlers y el nivel del logger raíz y los restaura al terminar el test"""
+
+    def __init__(self, test: unittest.TestCase):
+        raiz = logging.getLogger()
+        handlers, nivel = list(raiz.handlers), raiz.level
+
+        def restaurar():
+            detener_logging()
+            raiz.handlers[:] = handlers
+            raiz.setLevel(nivel)
+
+        test.addCleanup(restaurar)
+
+
+class FormateadorJSONTest(unittest.TestCase):
+    """Tests del formato JSON de los logs"""
+
+    def _registro(self, mensaje, *args, **kwargs):
+        return logging.getLogger('app.prueba').makeRecord('app.prueba', logging.WARNING, __file__, 1,
+                                                          mensaje, args, None, **kwargs)
+
+    def test_campos_del_registro(self):
+        datos = json.loads(FormateadorJSON().format(self._registro('Certificado %s: %d bytes', 'pdf', 1024)))
+
+        self.assertEqual(datos['mensaje'], 'Certificado pdf: 1024 bytes')
+        self.assertEqual(datos['nivel'], 'WARNING')
+        self.assertEqual(datos['logger'], 'app.prueba')
+        self.assertEqual(datos['pid'], os.getpid())
+        self.assertTrue(datos['ts'].endswith('+00:00'))
+
+    def test_campos_extra_y_caracteres_no_ascii(self):
+        linea = FormateadorJSON().format(self._registro('Generación', extra={'alumno_id': 7}))
+
+        self.assertIn('Generación', linea)
+        self.assertEqual(json.loads(linea)['alumno_id'], 7)
+
+    def test_excepcion(self):
+        try:
+            raise ValueError('fallo')
+        except ValueError:
+            registro = logging.getLogger('app.prueba').makeRecord(
+                'app.prueba', logging.ERROR, __file__, 1, 'Error', (), sys.exc_info())
+
+        self.assertIn('ValueError: fallo', json.loads(FormateadorJSON().format(registro))['excepcion'])
+
+
+class ConfigurarLoggingTest(unittest.TestCase):
+    """Tests de la salida de logs a través de la cola"""
+
+    def setUp(self):
+        _Restaurar(self)
+        self.salida = io.StringIO()
+
+    def _handler(self) -> QueueHandler:
+        handler = logs._handler
+        self.assertIsInstance(handler, QueueHandler)
+        return handler
+
+    def test_los_registros_se_escriben_desde_el_hilo_de_la_cola(self):
+        configurar_logging('INFO', 'json', en_cola=True, salida=self.salida)
+
+        logging.getLogger('app.prueba').info('Alumno %s', 1)
+        logging.getLogger('app.prueba').debug('Descartado %s', 2)
+        detener_logging()
+
+        lineas = self.salida.getvalue().splitlines()
+        self.assertEqual(len(lineas), 1)
+        self.assertEqual(json.loads(lineas[0])['mensaje'], 'Alumno 1')
+
+    def test_el_mensaje_se_fija_en_el_hilo_que_logea(self):
+        configurar_logging('INFO', 'json', en_cola=True, salida=self.salida)
+        alumnos = [1]
+        registro = logging.getLogger('app.prueba').makeRecord('app.prueba', logging.INFO, __file__, 1,
+                                                              'Alumnos %s', (alumnos,), None)
+
+        encolado = self._handler().prepare(registro)
+        alumnos.append(2)
+
+        self.assertIs(encolado, registro)
+        self.assertIsNone(encolado.args)
+        self.assertEqual(encolado.getMessage(), 'Alumnos [1]')
+
+    def test_argumentos_modificados_despues_de_logear(self):
+        configurar_logging('INFO', 'json', en_cola=True, salida=self.salida)
+        alumnos = [1]
+
+        logging.getLogger('app.prueba').info('Alumnos %s', alumnos)
+        alumnos.append(2)
+        detener_logging()
+
+        self.assertEqual(json.loads(self.salida.getvalue())['mensaje'], 'Alumnos [1]')
+
+    def test_formato_texto_sin_cola(self):
+        configurar_logging('INFO', 'texto', en_cola=False, salida=self.salida)
+
+        logging.getLogger('app.prueba').warning('Reintento %s', 3)
+
+        self.assertIn('[WARNING] app.prueba: Reintento 3', self.salida.getvalue())
+
+    def test_cada_proceso_hijo_crea_su_cola(self):
+        configurar_logging('INFO', 'json', en_cola=True, salida=self.salida)
+        cola_padre = self._handler().queue
+
+        # Lo que ejecuta os.register_at_fork en el hijo
+        logs._reiniciar_en_hijo()
+        logging.getLogger('app.prueba').info('Desde el worker')
+        detener_logging()
+
+        self.assertIsNot(self._handler().queue, cola_padre)
+        self.assertIn('Desde el worker', self.salida.getvalue())
+
+    def test_create_app_aplica_la_configuracion_de_logs(self):
+        from app import create_app
+        # Config lee LOG_* al importarse: se parchean los atributos de la clase
+        with patch.dict(os.environ, {'FLASK_CONTEXT': 'production'}), patch('app.config.config.Config.LOG_LEVEL', 'WARNING'), \
+                patch('app.config.config.Config.LOG_FORMAT', 'texto'), patch('app.config.config.Config.LOG_QUEUE', False), \
+                patch.object(sys, 'stdout', self.salida):
+            create_app()
+
+        logging.getLogger('app.prueba').info('Descartado')
+        logging.getLogger('app.prueba').warning('Reintento %s', 3)
+
+        self.assertEqual(logging.getLogger().level, logging.WARNING)
+        self.assertNotIn('Descartado', self.salida.getvalue())
+        self.assertIn('[WARNING] app.prueba: Reintento 3', self.salida.getvalue())
+
+
+class MuestreoLogsTest(unittest.TestCase):
+    """Tests del muestreo de los logs de requests exitosos"""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['LOG_SAMPLE_RATE'] = 0.0
+        register_logging_middleware(self.app)
+
+        @self.app.route('/ok')
+        def ok():
+            return 'ok'
+
+        @self.app.route('/error')
+        def error():
+            return 'error', 500
+
+        self.client = self.app.test_client()
+
+    @patch('app.middleware.logging_middleware.logger')
+    def test_requests_exitosos_no_muestreados_no_se_logean(self, mock_logger):
+        self.client.get('/ok')
+
+        mock_logger.info.assert_not_called()
+        mock_logger.log.assert_not_called()
+
+    @patch('app.middleware.logging_middleware.logger')
+    def test_errores_se_logean_siempre(self, mock_logger):
+        self.client.get('/error')
+
+        nivel = mock_logger.log.call_args[0][0]
+        self.assertEqual(nivel, logging.ERROR)
+        self.assertIn('/error', str(mock_logger.log.call_args))
+
+    @patch('app.middleware.logging_middleware.logger')
+    def test_tasa_completa(self, mock_logger):
+        self.app.config['LOG_SAMPLE_RATE'] = 1.0
+
+        self.client.get('/ok')
+
+        self.assertTrue(mock_logger.info.called)
+        self.assertTrue(mock_logger.log.called)
+
+
+if __name__ == '__main__':
+    unittest.main()
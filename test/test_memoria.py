@@ -0,0 +1,158 @@
+import unittest
+import os
+import signal
+import sys
+import tracemalloc
+from typing import Any, Dict
+from unittest.mock import patch
+from prometheus_client import REGISTRY
+from app import create_app
+from app.config import config
+from app.utils import memoria
+from app.utils.memoria import ReciclajeWorker, SnapshotsMemoria, rss_bytes
+
+
+class ReciclajeWorkerTest(unittest.TestCase):
+    """Tests del reciclaje de workers por cantidad de requests"""
+
+    def test_recicla_una_sola_vez_al_llegar_al_limite(self):
+        reciclaje = ReciclajeWorker(3, edad_minima=0)
+
+        resultados = [reciclaje.registrar_request() for _ in range(5)]
+
+        self.assertEqual(resultados, [False, False, True, False, False])
+
+    def test_worker_joven_no_se_recicla(self):
+        reciclaje = ReciclajeWorker(1, edad_minima=3600)
+
+        self.assertFalse(reciclaje.registrar_request())
+        self.assertFalse(reciclaje.estado()['solicitado'])
+
+    def test_jitter_desplaza_el_limite(self):
+        limites = {ReciclajeWorker(100, jitter=50).limite for _ in range(50)}
+
+        self.assertTrue(all(100 <= limite <= 150 for limite in limites))
+        self.assertGreater(len(limites), 1)
+
+    def test_reciclar_envia_sigterm_al_propio_worker(self):
+        with patch('app.utils.memoria.os.kill') as kill:
+            ReciclajeWorker(1).reciclar()
+
+        kill.assert_called_once_with(os.getpid(), signal.SIGTERM)
+
+
+@unittest.skipUnless(sys.platform.startswith('linux'), 'Requiere /proc/self/statm')
+class RssTest(unittest.TestCase):
+
+    def test_rss_del_proceso(self):
+        rss = rss_bytes()
+        self.assertIsInstance(rss, int)
+        self.assertGreater(rss, 1024 * 1024)
+
+
+class MemoryMiddlewareTest(unittest.TestCase):
+    """Tests de la instrumentación de memoria por request"""
+
+    def setUp(self):
+        os.environ['FLASK_CONTEXT'] = 'testing'
+        self.addCleanup(tracemalloc.stop)
+        for nombre in ('_reciclaje', '_snapshots'):
+            parche = patch.object(memoria, nombre, None)
+            parche.start()
+            self.addCleanup(parche.stop)
+
+    def _cliente(self, **opciones):
+        valores: Dict[str, Any] = {'TRACEMALLOC_ENABLED': False, 'WORKER_MAX_REQUESTS': 0, **opciones}
+        with patch.multiple(config.TestConfig, create=True, **valores):
+            return create_app().test_client()
+
+    def test_memoria_retenida_por_formato(self):
+        cliente = self._cliente(TRACEMALLOC_ENABLED=True)
+        antes = REGISTRY.get_sample_value('documentos_request_memoria_bytes_count', {'formato': 'docx'}) or 0
+
+        cliente.get('/api/v1/certificado/1/docx')
+
+        self.assertTrue(tracemalloc.is_tracing())
+        self.assertEqual(REGISTRY.get_sample_value('documentos_request_memoria_bytes_count', {'formato': 'docx'}),
+                         antes + 1)
+
+    def test_rss_del_worker_en_metricas(self):
+        self._cliente().get('/api/v1/')
+
+        rss = REGISTRY.get_sample_value('documentos_worker_rss_bytes')
+        self.assertIsInstance(rss, float)
+        self.assertGreater(rss, 0)
+
+    def test_reciclaje_al_llegar_a_max_requests(self):
+        cliente = self._cliente(WORKER_MAX_REQUESTS=2)
+        memoria._reciclaje = ReciclajeWorker(2, edad_minima=0)
+
+        with patch('app.utils.memoria.os.kill') as kill:
+            cliente.get('/api/v1/')
+            kill.assert_not_called()
+            self.assertEqual(cliente.get('/api/v1/').status_code, 200)
+
+        kill.assert_called_once_with(os.getpid(), signal.SIGTERM)
+
+    def test_sin_limite_no_se_recicla(self):
+        with patch('app.utils.memoria.os.kill') as kill:
+            cliente = self._cliente()
+            for _ in range(3):
+                cliente.get('/api/v1/')
+
+        kill.assert_not_called()
+        self.assertIsNone(memoria.reciclaje_actual())
+
+
+class AdminMemoriaTest(unittest.TestCase):
+    """Tests de los endpoints de snapshots de tracemalloc"""
+
+    def setUp(self):
+        os.environ['FLASK_CONTEXT'] = 'testing'
+        self.addCleanup(tracemalloc.stop)
+        parche = patch.object(memoria, '_snapshots', None)
+        parche.start()
+        self.addCleanup(parche.stop)
+
+    def _cliente(self, **opciones):
+        with patch.multiple(config.TestConfig, create=True, ADMIN_ENABLED=True, **opciones):
+            return create_app().test_client()
+
+    def test_snapshot_y_diferencias(self):
+        cliente = self._cliente(TRACEMALLOC_ENABLED=True)
+
+        respuesta = cliente.post('/api/v1/admin/memoria/snapshot?top=5')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertLessEqual(len(respuesta.get_json()['asignaciones']), 5)
+
+        retenido = [bytearray(64 * 1024) for _ in range(16)]
+        diferencias = cliente.get('/api/v1/admin/memoria/diff?top=10').get_json()['diferencias']
+        self.assertTrue(any(d['bytes_diferencia'] >= 1024 * 1024 and __file__ in d['ubicacion'][0]
+                            for d in diferencias))
+        del retenido
+
+        estado = cliente.get('/api/v1/admin/memoria').get_json()
+        self.assertTrue(estado['tracemalloc']['activo'])
+        self.assertIsNotNone(estado['tracemalloc']['snapshot_base'])
+
+    def test_diferencias_sin_base(self):
+        respuesta = self._cliente(TRACEMALLOC_ENABLED=True).get('/api/v1/admin/memoria/diff')
+
+        self.assertEqual(respuesta.status_code, 409)
+        self.assertEqual(respuesta.get_json()['error'], 'MemoryTracingUnavailable')
+
+    def test_sin_tracemalloc(self):
+        cliente = self._cliente()
+
+        self.assertEqual(cliente.post('/api/v1/admin/memoria/snapshot').status_code, 409)
+        self.assertFalse(cliente.get('/api/v1/admin/memoria').get_json()['tracemalloc']['activo'])
+
+
+class SnapshotsMemoriaTest(unittest.TestCase):
+
+    def test_sin_base_no_hay_diferencias(self):
+        self.assertIsNone(SnapshotsMemoria().diferencias())
+
+
+if __name__ == '__main__':
+    unittest.main()
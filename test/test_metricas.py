@@ -0,0 +1,205 @@
+import unittest
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+from prometheus_client import REGISTRY
+from app import create_app
+from app.config import config
+from app.utils import retry
+from app.utils.metricas import CostosPorFormato, costos, etapa, limpiar_directorio_multiproceso, registrar_cache
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _valor(nombre, **labels):
+    return REGISTRY.get_sample_value(nombre, labels) or 0.0
+
+
+class EtapaTest(unittest.TestCase):
+    """Tests del cronómetro de etapas y los contadores"""
+
+    def test_etapa_se_registra_aunque_falle(self):
+        antes = _valor('documentos_etapa_segundos_count', etapa='prueba_error', formato='pdf')
+        with self.assertRaises(ValueError):
+            with etapa('prueba_error', 'pdf'):
+                raise ValueError('falla')
+        self.assertEqual(_valor('documentos_etapa_segundos_count', etapa='prueba_error', formato='pdf'), antes + 1)
+
+    def test_cache_cuenta_hits_y_misses(self):
+        hits = _valor('documentos_cache_consultas_total', nivel='prueba', resultado='hit')
+        misses = _valor('documentos_cache_consultas_total', nivel='prueba', resultado='miss')
+        registrar_cache('prueba', True)
+        registrar_cache('prueba', False)
+        registrar_cache('prueba', False)
+        self.assertEqual(_valor('documentos_cache_consultas_total', nivel='prueba', resultado='hit'), hits + 1)
+        self.assertEqual(_valor('documentos_cache_consultas_total', nivel='prueba', resultado='miss'), misses + 2)
+
+    def test_retry_cuenta_reintentos(self):
+        intentos = []
+
+        @retry(max_attempts=3, delay=0, exceptions=(ConnectionError,))
+        def operacion_inestable():
+            intentos.append(1)
+            if len(intentos) < 3:
+                raise ConnectionError('caído')
+            return 'ok'
+
+        antes = _valor('documentos_reintentos_total', operacion='operacion_inestable')
+        self.assertEqual(operacion_inestable(), 'ok')
+        self.assertEqual(_valor('documentos_reintentos_total', operacion='operacion_inestable'), antes + 2)
+
+
+class MetricsEndpointTest(unittest.TestCase):
+    """Tests del endpoint /metrics"""
+
+    def setUp(self):
+        os.environ['FLASK_CONTEXT'] = 'testing'
+        self.app = create_app()
+        self.client = self.app.test_client()
+
+    def test_certificado_registra_etapas_y_request(self):
+        render = _valor('documentos_etapa_segundos_count', etapa='render', formato='docx')
+        requests = _valor('documentos_request_segundos_count',
+                          endpoint='/api/v1/certificado/<int:id>/docx', metodo='GET', status='200')
+
+        respuesta = self.client.get('/api/v1/certificado/1/docx')
+        self.assertEqual(respuesta.status_code, 200)
+
+        self.assertEqual(_valor('documentos_etapa_segundos_count', etapa='render', formato='docx'), render + 1)
+        self.assertEqual(_valor('documentos_request_segundos_count',
+                                endpoint='/api/v1/certificado/<int:id>/docx', metodo='GET', status='200'),
+                         requests + 1)
+        # El request terminó: no queda contado como en curso
+        self.assertEqual(_valor('documentos_requests_en_curso'), 0)
+
+    def test_exposicion_en_formato_prometheus(self):
+        self.client.get('/api/v1/')
+        respuesta = self.client.get('/metrics')
+
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertTrue(respuesta.content_type.startswith('text/plain'))
+        texto = respuesta.get_data(as_text=True)
+        self.assertIn('documentos_etapa_segundos_bucket', texto)
+        self.assertIn('documentos_requests_en_curso', texto)
+
+    def test_metricas_deshabilitadas(self):
+        with patch.object(config.TestConfig, 'METRICS_ENABLED', False):
+            app = create_app()
+        self.assertEqual(app.test_client().get('/metrics').status_code, 404)
+
+
+class ServerTimingTest(unittest.TestCase):
+    """Tests del header Server-Timing con los tiempos por etapa del request"""
+
+    def setUp(self):
+        os.environ['FLASK_CONTEXT'] = 'testing'
+        self.app = create_app()
+        self.client = self.app.test_client()
+
+    def _metricas(self, encabezado):
+        return [parte.split(';')[0] for parte in encabezado.split(', ')]
+
+    def test_certificado_informa_sus_etapas(self):
+        respuesta = self.client.get('/api/v1/certificado/1/docx')
+
+        metricas = self._metricas(respuesta.headers['Server-Timing'])
+        for nombre in ('alumno', 'especialidad', 'contexto', 'render', 'empaquetado', 'total'):
+            self.assertIn(nombre, metricas)
+        self.assertRegex(respuesta.headers['Server-Timing'], r'render;dur=\d+\.\d')
+
+    def test_rutas_sin_etapas_no_agregan_header(self):
+        self.assertNotIn('Server-Timing', self.client.get('/api/v1/').headers)
+
+    def test_deshabilitado_por_config(self):
+        self.app.config['SERVER_TIMING_ENABLED'] = False
+        self.assertNotIn('Server-Timing', self.client.get('/api/v1/certificado/1/docx').headers)
+
+    def test_tiempos_en_el_log_de_la_respuesta(self):
+        self.app.config['LOG_SERVER_TIMING'] = True
+        with patch('app.middleware.logging_middleware.logger') as logger:
+            self.client.get('/api/v1/certificado/1/docx')
+
+        _, formato, *args = logger.log.call_args[0]
+        mensaje = formato % tuple(args)
+        self.assertIn('Response: 200', mensaje)
+        self.assertIn('render;dur=', mensaje)
+
+
+class CostosTest(unittest.TestCase):
+    """Tests de la CPU y el tiempo real por etapa y formato"""
+
+    def setUp(self):
+        os.environ['FLASK_CONTEXT'] = 'testing'
+        costos.reiniciar()
+        self.addCleanup(costos.reiniciar)
+
+    def test_relacion_cpu_tiempo_real(self):
+        with etapa('calculo', 'prueba'):
+            fin = time.thread_time() + 0.05
+            while time.thread_time() < fin:
+                pass
+        with etapa('espera', 'prueba'):
+            time.sleep(0.05)
+
+        etapas = costos.resumen()['prueba']['etapas']
+        self.assertGreater(etapas['calculo']['cpu_real'], 0.8)
+        self.assertLess(etapas['espera']['cpu_real'], 0.2)
+        self.assertGreater(_valor('documentos_etapa_cpu_segundos_total', etapa='calculo', formato='prueba'), 0.04)
+
+    def test_resumen_por_formato(self):
+        acumulado = CostosPorFormato()
+        acumulado.registrar('request', 'pdf', 0.02, 0.05)
+        acumulado.registrar('request', 'pdf', 0.04, 0.05)
+
+        request = acumulado.resumen()['pdf']['etapas']['request']
+        self.assertEqual(request['cantidad'], 2)
+        self.assertAlmostEqual(request['cpu_ms_promedio'], 30.0)
+        self.assertAlmostEqual(request['cpu_real'], 0.6)
+        # 30 ms de CPU por certificado: 3 núcleos cada 100 req/s
+        self.assertAlmostEqual(acumulado.resumen()['pdf']['nucleos_por_100_rps'], 3.0)
+
+    def test_endpoint_admin(self):
+        with patch.object(config.TestConfig, 'ADMIN_ENABLED', True, create=True):
+            client = create_app().test_client()
+
+        client.get('/api/v1/certificado/1/docx')
+        client.get('/api/v1/certificado/999999/docx')
+        datos = client.get('/api/v1/admin/costos').get_json()
+
+        docx = datos['formatos']['docx']
+        self.assertEqual(docx['etapas']['request']['cantidad'], 1)
+        self.assertIn('render', docx['etapas'])
+        self.assertIn('nucleos_por_100_rps', docx)
+
+        self.assertEqual(client.delete('/api/v1/admin/costos').get_json()['formatos'], {})
+        self.assertEqual(client.get('/api/v1/admin/costos').get_json()['formatos'], {})
+
+
+class MultiprocesoTest(unittest.TestCase):
+    """Los valores de varios procesos se agregan desde PROMETHEUS_MULTIPROC_DIR"""
+
+    def _ejecutar(self, directorio, codigo):
+        entorno = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=directorio)
+        salida = subprocess.run([sys.executable, '-c', codigo], capture_output=True, text=True,
+                                cwd=RAIZ, env=entorno, check=True)
+        return salida.stdout
+
+    def test_workers_se_suman(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            for _ in range(2):
+                # Cada proceso es un "worker" distinto (otro pid, otro archivo)
+                self._ejecutar(directorio, "from app.utils.metricas import registrar_cache; "
+                                           "registrar_cache('almacen', True)")
+            texto = self._ejecutar(directorio, "from app.utils.metricas import exportar; "
+                                               "print(exportar()[0].decode())")
+            self.assertIn('documentos_cache_consultas_total{nivel="almacen",resultado="hit"} 2.0', texto)
+
+            limpiar_directorio_multiproceso(directorio)
+            self.assertEqual(os.listdir(directorio), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import unittest
+import os
+import threading
+import time
+from typing import cast
+from unittest.mock import patch
+from app import create_app
+from app.utils import monitor_salud
+from app.utils.monitor_salud import MonitorSalud
+
+
+def _lento(segundos, status='healthy'):
+    def chequeo():
+        time.sleep(segundos)
+        return {'status': status}
+    return chequeo
+
+
+class MonitorSaludTest(unittest.TestCase):
+    """Tests del monitor de salud en segundo plano"""
+
+    def _monitor(self, chequeos, **opciones):
+        monitor = MonitorSalud(chequeos, **opciones)
+        self.addCleanup(monitor.detener)
+        return monitor
+
+    def test_los_chequeos_corren_en_paralelo(self):
+        monitor = self._monitor({'a': _lento(0.2), 'b': _lento(0.2), 'c': _lento(0.2)})
+
+        inicio = time.perf_counter()
+        monitor.refrescar()
+
+        self.assertLess(time.perf_counter() - inicio, 0.35)
+        self.assertTrue(all(r['status'] == 'healthy' for r in monitor.instantanea().values()))
+
+    def test_la_instantanea_no_vuelve_a_chequear(self):
+        llamadas = []
+        monitor = self._monitor({'redis': lambda: llamadas.append(1) or {'status': 'healthy'}})
+        monitor.refrescar()
+
+        dependencias = [monitor.instantanea() for _ in range(5)][-1]
+
+        self.assertEqual(len(llamadas), 1)
+        self.assertIn('age_seconds', dependencias['redis'])
+        self.assertTrue(dependencias['redis']['checked_at'].endswith('Z'))
+
+    def test_timeout_no_bloquea_y_no_se_relanza(self):
+        liberar = threading.Event()
+        llamadas = []
+
+        def colgado():
+            llamadas.append(1)
+            liberar.wait()
+            return {'status': 'healthy'}
+
+        monitor = self._monitor({'colgado': colgado, 'ok': _lento(0)}, timeout=0.1)
+        self.addCleanup(liberar.set)
+
+        inicio = time.perf_counter()
+        monitor.refrescar()
+        monitor.refrescar()
+
+        self.assertLess(time.perf_counter() - inicio, 0.5)
+        self.assertEqual(len(llamadas), 1)
+        dependencias = monitor.instantanea()
+        self.assertEqual(dependencias['colgado']['status'], 'unhealthy')
+        self.assertEqual(dependencias['ok']['status'], 'healthy')
+
+    def test_excepcion_del_chequeo(self):
+        monitor = self._monitor({'redis': lambda: 1 / 0})
+        monitor.refrescar()
+
+        self.assertEqual(monitor.instantanea()['redis']['status'], 'unhealthy')
+
+    def test_resultado_vencido(self):
+        monitor = self._monitor({'redis': _lento(0)}, intervalo=1, max_edad=0.05)
+        monitor.refrescar()
+        time.sleep(0.1)
+
+        resultado = monitor.instantanea()['redis']
+        self.assertEqual(resultado['status'], 'unhealthy')
+        self.assertTrue(resultado['stale'])
+
+    def test_refresco_en_segundo_plano(self):
+        llamadas = []
+        monitor = self._monitor({'redis': lambda: llamadas.append(1) or {'status': 'healthy'}}, intervalo=0.02)
+
+        monitor.iniciar()
+        monitor.instantanea()
+        time.sleep(0.15)
+
+        self.assertGreater(len(llamadas), 2)
+
+
+class HealthEndpointTest(unittest.TestCase):
+    """Tests de /health con el monitor de salud"""
+
+    def setUp(self):
+        os.environ['FLASK_CONTEXT'] = 'testing'
+        for parche in (patch.dict(os.environ, {'USE_MOCK_DATA': 'false'}),
+                       patch.object(monitor_salud, '_monitor', None)):
+            parche.start()
+            self.addCleanup(parche.stop)
+        self.client = create_app().test_client()
+
+    def tearDown(self):
+        # Todos los tests consultan /health, que crea el monitor del proceso
+        cast(MonitorSalud, monitor_salud.monitor_actual()).detener()
+
+    @patch('app.resources.home._check_service', return_value={'status': 'healthy'})
+    @patch('app.resources.home._check_redis', return_value={'status': 'healthy'})
+    def test_health_devuelve_la_instantanea(self, check_redis, check_service):
+        respuesta = [self.client.get('/api/v1/health') for _ in range(3)][-1]
+
+        self.assertEqual(respuesta.status_code, 200)
+        dependencias = respuesta.get_json()['dependencies']
+        self.assertEqual(set(dependencias), {'redis', 'alumno_service', 'especialidad_service'})
+        self.assertIn('age_seconds', dependencias['redis'])
+        self.assertEqual(check_redis.call_count, 1)
+
+    @patch('app.resources.home._check_service', return_value={'status': 'healthy'})
+    @patch('app.resources.home._check_redis', return_value={'status': 'unhealthy', 'message': 'down'})
+    def test_dependencia_caida(self, check_redis, check_service):
+        respuesta = self.client.get('/api/v1/health')
+
+        self.assertEqual(respuesta.status_code, 503)
+        self.assertEqual(respuesta.get_json()['status'], 'degraded')
+
+
+if __name__ == '__main__':
+    unittest.main()
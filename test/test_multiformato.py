@@ -0,0 +1,67 @@
+import unittest
+import os
+import zipfile
+from io import BytesIO
+from unittest.mock import patch
+from app import create_app
+from app.services import CertificateService
+
+
+class MultiformatoServiceTest(unittest.TestCase):
+    """Tests de CertificateService.generar_certificados_multiformato"""
+
+    def setUp(self):
+        os.environ['FLASK_CONTEXT'] = 'testing'
+        os.environ['USE_MOCK_DATA'] = 'true'
+        self.app = create_app()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+    def tearDown(self):
+        self.app_context.pop()
+
+    def test_busca_al_alumno_una_sola_vez(self):
+        """Test: El contexto se arma una vez y se renderiza cada formato"""
+        service = CertificateService()
+        with patch.object(service, '_buscar_alumno_por_id', wraps=service._buscar_alumno_por_id) as mock_buscar:
+            documentos = service.generar_certificados_multiformato(1, ['docx', 'odt'])
+        
+        mock_buscar.assert_called_once_with(1)
+        self.assertEqual(set(documentos), {'docx', 'odt'})
+        self.assertTrue(documentos['docx'].getvalue().startswith(b'PK'))
+        self.assertTrue(documentos['odt'].getvalue().startswith(b'PK'))
+
+
+class MultiformatoEndpointTest(unittest.TestCase):
+    """Tests del endpoint /certificado/<id>/multiformato"""
+
+    def setUp(self):
+        os.environ['FLASK_CONTEXT'] = 'testing'
+        os.environ['USE_MOCK_DATA'] = 'true'
+        self.app = create_app()
+        self.client = self.app.test_client()
+
+    def test_retorna_zip_con_los_formatos_pedidos(self):
+        response = self.client.get('/api/v1/certificado/1/multiformato?formatos=docx,odt')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/zip')
+        with zipfile.ZipFile(BytesIO(response.data)) as zf:
+            self.assertEqual(sorted(zf.namelist()),
+                             ['certificado_alumno_1.docx', 'certificado_alumno_1.odt'])
+
+    def test_retorna_multipart_si_se_pide(self):
+        response = self.client.get('/api/v1/certificado/1/multiformato?formatos=docx,odt',
+                                   headers={'Accept': 'multipart/mixed'})
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'multipart/mixed')
+        self.assertEqual(response.data.count(b'Content-Disposition: attachment'), 2)
+
+    def test_formato_no_soportado_retorna_400(self):
+        response = self.client.get('/api/v1/certificado/1/multiformato?formatos=pdf,xls')
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
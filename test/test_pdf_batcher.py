@@ -0,0 +1,159 @@
+import unittest
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from app import create_app
+from app.services import CertificateService, pdf_batcher
+from app.services.pdf_batcher import PDFMicroBatcher
+
+
+class _Metadata:
+    def __init__(self):
+        self.title = None
+        self.created = None
+        self.modified = None
+
+
+class _Pagina:
+    def __init__(self, texto, anchors):
+        self.texto = texto
+        self.anchors = anchors
+
+
+class DocumentoFalso:
+    """Doble de weasyprint.Document: una página por sección (o por documento)"""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.metadata = _Metadata()
+
+    def copy(self, pages):
+        return DocumentoFalso(list(pages))
+
+    def write_pdf(self, **opciones):
+        return ('PDF[' + '|'.join(p.texto for p in self.pages) + f']{self.metadata.title}').encode('utf-8')
+
+
+class RenderizadorFalso:
+    def __init__(self, falla_en_lote=False):
+        self.llamadas = []
+        self.falla_en_lote = falla_en_lote
+        self._lock = threading.Lock()
+
+    def __call__(self, html_string, base_url):
+        with self._lock:
+            self.llamadas.append(html_string)
+        secciones = re.findall(r'<section class="lote-certificado" id="(lote-\d+)">(.*?)</section>', html_string, re.S)
+        if secciones and self.falla_en_lote:
+            raise RuntimeError('layout fallido')
+        if not secciones:
+            cuerpo = re.findall(r'<body>(.*)</body>', html_string, re.S)[0]
+            return DocumentoFalso([_Pagina(cuerpo.strip(), {})])
+        return DocumentoFalso([_Pagina(cuerpo.strip(), {ancla: (0, 0)}) for ancla, cuerpo in secciones])
+
+
+def _html(nombre):
+    return (f'<!DOCTYPE html><html><head><title>Certificado {nombre}</title><style>p{{}}</style></head>'
+            f'<body><p>{nombre}</p></body></html>')
+
+
+class PDFMicroBatcherTest(unittest.TestCase):
+    """Tests del micro-batching de PDFs (con un renderizador falso)"""
+
+    def test_request_aislado_se_renderiza_sin_agrupar(self):
+        renderizador = RenderizadorFalso()
+        batcher = PDFMicroBatcher(renderizador, ventana=0.001)
+
+        resultado = batcher.renderizar(_html('SOSA'), 'file:///app')
+
+        self.assertEqual(resultado, 'PDF[<p>SOSA</p>]Certificado SOSA'.encode('utf-8'))
+        self.assertEqual(renderizador.llamadas, [_html('SOSA')])
+
+    def test_requests_concurrentes_una_pasada_y_un_pdf_cada_uno(self):
+        renderizador = RenderizadorFalso()
+        batcher = PDFMicroBatcher(renderizador, ventana=0.2, max_lote=4)
+        nombres = ['SOSA', 'PEREZ', 'GONZALEZ', 'LOPEZ']
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            resultados = list(executor.map(lambda n: batcher.renderizar(_html(n), 'file:///app'), nombres))
+
+        self.assertEqual(len(renderizador.llamadas), 1)
+        self.assertIn('break-before: page', renderizador.llamadas[0])
+        for nombre, resultado in zip(nombres, resultados):
+            self.assertEqual(resultado, f'PDF[<p>{nombre}</p>]Certificado {nombre}'.encode('utf-8'))
+
+    def test_lote_lleno_sale_sin_esperar_la_ventana(self):
+        renderizador = RenderizadorFalso()
+        batcher = PDFMicroBatcher(renderizador, ventana=30, max_lote=2)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futuros = [executor.submit(batcher.renderizar, _html(n), 'file:///app') for n in ('A', 'B')]
+            resultados = [f.result(timeout=5) for f in futuros]
+
+        self.assertEqual(len(resultados), 2)
+        self.assertEqual(len(renderizador.llamadas), 1)
+
+    def test_si_falla_el_lote_se_renderiza_por_separado(self):
+        renderizador = RenderizadorFalso(falla_en_lote=True)
+        batcher = PDFMicroBatcher(renderizador, ventana=0.2, max_lote=2)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            resultados = list(executor.map(lambda n: batcher.renderizar(_html(n), 'file:///app'), ['A', 'B']))
+
+        self.assertEqual(sorted(resultados), [b'PDF[<p>A</p>]Certificado A', b'PDF[<p>B</p>]Certificado B'])
+        self.assertEqual(len(renderizador.llamadas), 3)
+
+    def test_plantillas_distintas_no_se_agrupan(self):
+        renderizador = RenderizadorFalso()
+        batcher = PDFMicroBatcher(renderizador, ventana=0.1)
+        otro = _html('B').replace('<style>p{}</style>', '<style>h1{}</style>')
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            list(executor.map(lambda h: batcher.renderizar(h, 'file:///app'), [_html('A'), otro]))
+
+        self.assertEqual(len(renderizador.llamadas), 2)
+
+
+
+class PDFMicroBatcherWeasyPrintTest(unittest.TestCase):
+    """El PDF que sale de un lote es idéntico al renderizado solo (requiere WeasyPrint)"""
+
+    @classmethod
+    def setUpClass(cls):
+        try:
+            import weasyprint  # noqa: F401
+        except (OSError, ImportError) as e:
+            raise unittest.SkipTest(f'WeasyPrint no disponible: {e}')
+
+    def setUp(self):
+        os.environ['FLASK_CONTEXT'] = 'testing'
+        self.app = create_app()
+        self.app.config['DOCUMENTOS_DETERMINISTAS'] = True
+        with self.app.app_context():
+            servicio = CertificateService()
+            self.contextos = [servicio._construir_contexto(CertificateService._get_mock_alumno(i), 'pdf')
+                              for i in (1, 2, 3)]
+
+    def _renderizar(self, context):
+        with self.app.app_context():
+            return CertificateService._renderizar(context, 'pdf').getvalue()
+
+    def test_lote_byte_a_byte_igual_al_renderizado_individual(self):
+        self.app.config['PDF_MICROBATCH_ENABLED'] = False
+        individuales = [self._renderizar(context) for context in self.contextos]
+
+        self.app.config['PDF_MICROBATCH_ENABLED'] = True
+        batcher = PDFMicroBatcher(ventana=1, max_lote=len(self.contextos))
+        with patch.object(pdf_batcher, '_batcher', batcher), \
+                patch.object(batcher, '_renderizar_lote', wraps=batcher._renderizar_lote) as lote:
+            with ThreadPoolExecutor(max_workers=len(self.contextos)) as executor:
+                agrupados = list(executor.map(self._renderizar, self.contextos))
+
+        lote.assert_called_once()
+        self.assertEqual(agrupados, individuales)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,206 @@
+import unittest
+import os
+import re
+import zlib
+from io import BytesIO
+from typing import ClassVar, Dict
+from unittest.mock import patch
+from app import create_app
+from app.services import CertificateService
+from app.services.documentos_office_service import obtener_tipo_documento, OverlayPDFDocument, PDFDocument
+from app.services.pdf_overlay import ANCHO_UTIL, FuenteEmbebida, TextoNoRepresentable, dividir_lineas, parrafos_certificado
+from app.config.config import Config
+
+FUENTES = (Config.PDF_OVERLAY_FUENTE, Config.PDF_OVERLAY_FUENTE_NEGRITA)
+
+
+def _fuentes():
+    if not all(os.path.exists(ruta) for ruta in FUENTES):
+        raise unittest.SkipTest(f'Fuentes del overlay no instaladas: {FUENTES}')
+    return {False: FuenteEmbebida(FUENTES[0]), True: FuenteEmbebida(FUENTES[1])}
+
+
+def _to_unicode(pdf: bytes, numero: int) -> dict:
+    """Glifo -> caracter según el CMap ToUnicode del objeto `numero`"""
+    cmap = re.findall(rb'\n%d 0 obj\n<< /Length \d+ >>\nstream\n(.*?)\nendstream' % numero, pdf, re.S)[0]
+    return {glifo: chr(int(codigo, 16)) for glifo, codigo in re.findall(rb'<([0-9A-F]{4})> <([0-9A-F]{4})>', cmap)}
+
+
+def _texto_del_pdf(pdf: bytes) -> str:
+    """Texto mostrado con Tj en el content stream del request, decodificado con los ToUnicode"""
+    mapas = {b'F1': _to_unicode(pdf, 14), b'F2': _to_unicode(pdf, 18)}
+    contenido = zlib.decompress(re.findall(rb'19 0 obj\n<< /Length \d+ /Filter /FlateDecode >>\nstream\n(.*?)\nendstream',
+                                           pdf, re.S)[0])
+    texto, mapa = [], {}
+    for fuente, glifos in re.findall(rb'/(F\d) [\d.]+ Tf|<([0-9A-F]*)> Tj', contenido):
+        if fuente:
+            mapa = mapas[fuente]
+        else:
+            texto.append(''.join(mapa[glifos[i:i + 4]] for i in range(0, len(glifos), 4)))
+    return ' '.join(texto)
+
+
+def _lineas_overlay(context, fuentes):
+    return [' '.join(''.join(texto for texto, _ in palabra) for palabra, _ in linea)
+            for parrafo in parrafos_certificado(context) for linea in dividir_lineas(parrafo, fuentes)]
+
+
+class LayoutOverlayTest(unittest.TestCase):
+    """Tests del corte de líneas con las métricas de las fuentes embebidas"""
+
+    fuentes: ClassVar[Dict[bool, FuenteEmbebida]]
+
+    @classmethod
+    def setUpClass(cls):
+        cls.fuentes = _fuentes()
+
+    def test_anchos_de_la_fuente(self):
+        regular = self.fuentes[False]
+        self.assertAlmostEqual(regular.ancho('Hola', 1000),
+                               sum(regular.ancho(c, 1000) for c in 'Hola'))
+        self.assertGreater(self.fuentes[True].ancho('Hola'), regular.ancho('Hola'))
+        # Texto descompuesto (NFD) mide lo mismo que el compuesto
+        self.assertEqual(regular.ancho('a\u0301'), regular.ancho('á'))
+
+    def test_caracter_fuera_del_repertorio(self):
+        with self.assertRaises(TextoNoRepresentable):
+            self.fuentes[False].codificar('李')
+        with self.assertRaises(TextoNoRepresentable):
+            self.fuentes[True].ancho('Łódź 李')
+
+    def test_lineas_no_exceden_el_ancho_util(self):
+        segmentos = [('palabra ' * 40, False), ('NEGRITA final', True)]
+
+        lineas = dividir_lineas(segmentos, self.fuentes)
+
+        self.assertGreater(len(lineas), 1)
+        espacio = self.fuentes[False].ancho(' ')
+        for linea in lineas:
+            natural = sum(ancho for _, ancho in linea) + espacio * (len(linea) - 1)
+            self.assertLessEqual(natural, ANCHO_UTIL)
+
+    def test_palabra_puede_mezclar_negrita_y_normal(self):
+        lineas = dividir_lineas([('LEGAJO Nº: ', False), ('12345', True), (', es', False)], self.fuentes)
+
+        palabras = [palabra for palabra, _ in lineas[0]]
+        self.assertEqual(palabras[2], [('12345', True), (',', False)])
+
+
+class OverlayPDFDocumentTest(unittest.TestCase):
+    """Tests del motor PDF de fondo precalculado (no requiere WeasyPrint)"""
+
+    @classmethod
+    def setUpClass(cls):
+        _fuentes()
+
+    def setUp(self):
+        os.environ['FLASK_CONTEXT'] = 'testing'
+        os.environ['USE_MOCK_DATA'] = 'true'
+        self.app = create_app()
+        self.app.config['PDF_ENGINE'] = 'overlay'
+
+    def _generar(self, alumno_id=1):
+        with self.app.app_context():
+            return CertificateService().generar_certificado_alumno_regular(alumno_id, 'pdf').getvalue()
+
+    def test_motor_seleccionado_por_configuracion(self):
+        with self.app.app_context():
+            self.assertIs(obtener_tipo_documento('pdf'), OverlayPDFDocument)
+            self.app.config['PDF_ENGINE'] = 'weasyprint'
+            self.assertIs(obtener_tipo_documento('pdf'), PDFDocument)
+
+    def test_pdf_con_los_datos_del_alumno(self):
+        pdf = self._generar()
+
+        self.assertTrue(pdf.startswith(b'%PDF-1.7'))
+        self.assertTrue(pdf.rstrip().endswith(b'%%EOF'))
+        texto = _texto_del_pdf(pdf)
+        self.assertIn('Estudiante', texto)
+        self.assertIn('LEGAJO Nº:', texto)
+        self.assertIn(b'/Subtype /CIDFontType2', pdf)
+        self.assertIn(b'/FontFile2', pdf)
+
+    def test_caracteres_latinos_se_embeben_sin_reemplazos(self):
+        with self.app.app_context():
+            service = CertificateService()
+            context, _ = service.preparar_certificado(1, 'pdf')
+            context['alumno'].apellido = 'ŁUKASZEWICZ ØRSTED'
+            pdf = OverlayPDFDocument.generar('certificado', 'certificado_pdf', context).getvalue()
+
+        self.assertIn('ŁUKASZEWICZ ØRSTED', _texto_del_pdf(pdf))
+        self.assertNotIn('?', _texto_del_pdf(pdf))
+
+    def test_texto_no_representable_usa_weasyprint(self):
+        with self.app.app_context():
+            service = CertificateService()
+            context, _ = service.preparar_certificado(1, 'pdf')
+            context['alumno'].apellido = '李'
+            with patch.object(PDFDocument, 'generar', return_value=BytesIO(b'%PDF weasyprint')) as weasyprint:
+                pdf = OverlayPDFDocument.generar('certificado', 'certificado_pdf', context).getvalue()
+
+        weasyprint.assert_called_once()
+        self.assertEqual(pdf, b'%PDF weasyprint')
+
+    def test_xref_apunta_a_cada_objeto(self):
+        pdf = self._generar()
+
+        inicio_xref = int(re.findall(rb'startxref\n(\d+)\n', pdf)[0])
+        self.assertEqual(pdf[inicio_xref:inicio_xref + 4], b'xref')
+        offsets = re.findall(rb'(\d{10}) 00000 n ', pdf[inicio_xref:])
+        for numero, offset in enumerate(offsets, start=1):
+            self.assertTrue(pdf[int(offset):].startswith(b'%d 0 obj' % numero))
+
+    def test_mismos_datos_mismos_bytes(self):
+        self.assertEqual(self._generar(), self._generar())
+
+    def test_huella_distinta_por_motor(self):
+        with self.app.app_context():
+            service = CertificateService()
+            context, huella_overlay = service.preparar_certificado(1, 'pdf')
+            self.app.config['PDF_ENGINE'] = 'weasyprint'
+            self.assertNotEqual(service.huella_certificado(context, 'pdf'), huella_overlay)
+
+
+class OverlayComparadoConWeasyPrintTest(unittest.TestCase):
+    """El overlay corta las líneas igual que WeasyPrint con la plantilla HTML (requiere WeasyPrint)"""
+
+    fuentes: ClassVar[Dict[bool, FuenteEmbebida]]
+
+    @classmethod
+    def setUpClass(cls):
+        try:
+            import weasyprint  # noqa: F401
+        except (OSError, ImportError) as e:
+            raise unittest.SkipTest(f'WeasyPrint no disponible: {e}')
+        cls.fuentes = _fuentes()
+
+    def _lineas_weasyprint(self, app, context):
+        from flask import render_template
+        from weasyprint import HTML
+        from weasyprint.formatting_structure import boxes
+
+        base_url = f'file:///{app.root_path}'
+        html = render_template('certificado/certificado_pdf.html', url_base=base_url, **context)
+        pagina = HTML(string=html, base_url=base_url).render().pages[0]
+        lineas = []
+        for caja in pagina._page_box.descendants():
+            if isinstance(caja, boxes.LineBox):
+                texto = ''.join(t.text for t in caja.descendants() if isinstance(t, boxes.TextBox))
+                if texto.strip():
+                    lineas.append(' '.join(texto.split()))
+        return lineas
+
+    def test_mismo_texto_y_mismos_cortes_de_linea(self):
+        os.environ['FLASK_CONTEXT'] = 'testing'
+        os.environ['USE_MOCK_DATA'] = 'true'
+        app = create_app()
+        with app.app_context():
+            service = CertificateService()
+            for alumno_id in (1, 2, 3):
+                context, _ = service.preparar_certificado(alumno_id, 'pdf')
+                with self.subTest(alumno=alumno_id):
+                    self.assertEqual(_lineas_overlay(context, self.fuentes), self._lineas_weasyprint(app, context))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+import unittest
+import os
+import tempfile
+import threading
+import time
+from unittest.mock import patch
+from app import create_app
+from app.config import config
+from app.utils import perfilador_muestreo
+from app.utils.perfilador_muestreo import OTRAS_PILAS, PerfiladorMuestreo
+
+
+def _calcular_hasta(evento):
+    while not evento.is_set():
+        sum(i * i for i in range(1000))
+
+
+class PerfiladorMuestreoTest(unittest.TestCase):
+    """Tests del perfilador por muestreo de pilas"""
+
+    def setUp(self):
+        self.detener = threading.Event()
+        self.addCleanup(self.detener.set)
+
+    def _hilo_ocupado(self, formato=None):
+        listo = threading.Event()
+
+        def trabajar():
+            if formato:
+                self.perfilador.etiquetar(formato)
+            listo.set()
+            _calcular_hasta(self.detener)
+
+        threading.Thread(target=trabajar, daemon=True).start()
+        listo.wait()
+
+    def test_muestra_la_pila_del_hilo_con_su_formato(self):
+        self.perfilador = PerfiladorMuestreo()
+        self._hilo_ocupado('pdf')
+
+        self.perfilador.muestrear()
+
+        pilas = [pila for pila in self.perfilador.total if '_calcular_hasta' in pila]
+        self.assertEqual(len(pilas), 1)
+        self.assertTrue(pilas[0].startswith('pdf;'))
+        # De la raíz a la hoja: la función del hilo aparece antes que la que calcula
+        self.assertLess(pilas[0].index('trabajar'), pilas[0].index('_calcular_hasta'))
+
+    def test_hilos_ociosos_se_omiten(self):
+        self.perfilador = PerfiladorMuestreo()
+        esperando = threading.Thread(target=self.detener.wait, daemon=True)
+        esperando.start()
+        time.sleep(0.01)
+
+        self.perfilador.muestrear()
+
+        self.assertFalse(any('Event.wait' in pila for pila in self.perfilador.total))
+
+    def test_limite_de_pilas_distintas(self):
+        self.perfilador = PerfiladorMuestreo(max_pilas=1)
+        self.perfilador.total['-;a.py:x'] = 1
+        self._hilo_ocupado()
+
+        self.perfilador.muestrear()
+
+        self.assertIn(OTRAS_PILAS, self.perfilador.total)
+        self.assertEqual(len(self.perfilador.total), 2)
+
+    def test_volcado_escribe_la_ventana_y_la_reinicia(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            self.perfilador = PerfiladorMuestreo(directorio=directorio)
+            self._hilo_ocupado('docx')
+            self.perfilador.muestrear()
+
+            ruta = self.perfilador.volcar()
+            self.assertIsInstance(ruta, str)
+
+            with open(ruta) as archivo:
+                lineas = archivo.read().splitlines()
+            self.assertTrue(os.path.basename(ruta).endswith(f'_{os.getpid()}.folded'))
+            self.assertTrue(any(linea.startswith('docx;') and linea.endswith(' 1') for linea in lineas))
+            self.assertEqual(self.perfilador.texto(ventana=True), '')
+            self.assertNotEqual(self.perfilador.texto(), '')
+
+    def test_el_intervalo_se_alarga_para_respetar_el_overhead(self):
+        self.perfilador = PerfiladorMuestreo(intervalo=0.001, overhead_max=0.0001)
+        self.perfilador.iniciar()
+        time.sleep(0.05)
+        self.perfilador.detener()
+
+        estado = self.perfilador.estado()
+        self.assertFalse(estado['activo'])
+        self.assertGreater(estado['muestras'], 0)
+        self.assertGreater(estado['intervalo_efectivo_ms'], estado['intervalo_ms'])
+
+    def test_un_perfilador_por_proceso(self):
+        cfg = {'PROFILING_SAMPLER_INTERVAL': 1, 'PROFILING_SAMPLER_MAX_OVERHEAD': 0.01,
+               'PROFILING_DIR': None, 'PROFILING_SAMPLER_FLUSH_INTERVAL': 60}
+        with patch.object(perfilador_muestreo, '_perfilador', None):
+            padre = perfilador_muestreo.obtener_perfilador(cfg)
+            self.addCleanup(padre.detener)
+            self.assertIs(perfilador_muestreo.obtener_perfilador(cfg), padre)
+
+            # Tras el fork el pid cambia: el worker crea e inicia el suyo
+            with patch('app.utils.perfilador_muestreo.os.getpid', return_value=padre.pid + 1):
+                hijo = perfilador_muestreo.obtener_perfilador(cfg)
+                self.addCleanup(hijo.detener)
+                self.assertIsNot(hijo, padre)
+                self.assertIs(perfilador_muestreo.perfilador_actual(), hijo)
+
+
+class AdminPerfilTest(unittest.TestCase):
+    """Tests de los endpoints de administración del perfilador"""
+
+    def setUp(self):
+        os.environ['FLASK_CONTEXT'] = 'testing'
+        parche = patch.object(perfilador_muestreo, '_perfilador', None)
+        parche.start()
+        self.addCleanup(parche.stop)
+
+    def _cliente(self, **opciones):
+        with patch.multiple(config.TestConfig, create=True, **opciones):
+            return create_app().test_client()
+
+    def test_deshabilitado_por_defecto(self):
+        self.assertEqual(create_app().test_client().get('/api/v1/admin/perfil/estado').status_code, 404)
+
+    def test_token_requerido(self):
+        cliente = self._cliente(ADMIN_ENABLED=True, ADMIN_TOKEN='secreto')
+
+        respuesta = cliente.get('/api/v1/admin/perfil/estado')
+        self.assertEqual(respuesta.status_code, 401)
+        self.assertEqual(respuesta.get_json()['error'], 'AdminUnauthorized')
+
+        respuesta = cliente.get('/api/v1/admin/perfil/estado', headers={'X-Admin-Token': 'secreto'})
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertFalse(respuesta.get_json()['activo'])
+
+    def test_muestras_del_worker(self):
+        cliente = self._cliente(ADMIN_ENABLED=True, PROFILING_SAMPLER_ENABLED=True,
+                                PROFILING_SAMPLER_INTERVAL=0.001, PROFILING_DIR=None)
+        cliente.get('/api/v1/certificado/1/docx')
+        perfilador = perfilador_muestreo.perfilador_actual()
+        self.assertIsInstance(perfilador, PerfiladorMuestreo)
+        self.addCleanup(perfilador.detener)
+        perfilador.muestrear()
+
+        estado = cliente.get('/api/v1/admin/perfil/estado').get_json()
+        self.assertTrue(estado['activo'])
+        self.assertGreater(estado['muestras'], 0)
+
+        respuesta = cliente.get('/api/v1/admin/perfil/muestras')
+        self.assertEqual(respuesta.mimetype, 'text/plain')
+        for linea in respuesta.get_data(as_text=True).splitlines():
+            pila, cantidad = linea.rsplit(' ', 1)
+            self.assertTrue(cantidad.isdigit())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+import shutil
+import tempfile
+from unittest.mock import patch
+from app.utils.plantillas import EntornoCacheado, obtener_bytecode_cache
+
+
+class EntornoCacheadoTest(unittest.TestCase):
+    """Tests de la compilación cacheada de plantillas from_string (DOCX/ODT)"""
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directorio, True)
+
+    def test_mismo_xml_se_compila_una_vez(self):
+        entorno = EntornoCacheado('docx')
+
+        with patch.object(entorno, 'compile', wraps=entorno.compile) as compilar:
+            primera = entorno.from_string('<w:t>{{ alumno }}</w:t>')
+            segunda = entorno.from_string('<w:t>{{ alumno }}</w:t>')
+
+        self.assertIs(primera, segunda)
+        self.assertEqual(compilar.call_count, 1)
+        self.assertEqual(segunda.render(alumno='SOSA'), '<w:t>SOSA</w:t>')
+
+    def test_otro_proceso_carga_el_bytecode_sin_compilar(self):
+        cache = obtener_bytecode_cache(self.directorio)
+        EntornoCacheado('odt', bytecode_cache=cache).from_string('{{ nombre|upper }}')
+
+        # Un entorno nuevo (como un worker recién iniciado) no recompila
+        nuevo = EntornoCacheado('odt', bytecode_cache=cache)
+        with patch.object(nuevo, 'compile', side_effect=AssertionError('no debería compilar')):
+            plantilla = nuevo.from_string('{{ nombre|upper }}')
+
+        self.assertEqual(plantilla.render(nombre='ana'), 'ANA')
+
+    def test_plantilla_modificada_no_usa_bytecode_viejo(self):
+        cache = obtener_bytecode_cache(self.directorio)
+        EntornoCacheado('docx', bytecode_cache=cache).from_string('Hola {{ nombre }}')
+
+        nuevo = EntornoCacheado('docx', bytecode_cache=cache)
+        plantilla = nuevo.from_string('Chau {{ nombre }}')
+
+        self.assertEqual(plantilla.render(nombre='Ana'), 'Chau Ana')
+
+    def test_opciones_del_entorno_se_respetan(self):
+        entorno = EntornoCacheado('odt', autoescape=True)
+
+        self.assertEqual(entorno.from_string('{{ v }}').render(v='a & b'), 'a &amp; b')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,28 @@
+import unittest
+import gc
+import os
+from unittest.mock import patch
+
+os.environ.setdefault('FLASK_CONTEXT', 'testing')
+import wsgi
+
+
+class PrecargaTest(unittest.TestCase):
+    """Tests de la precarga previa al fork de los workers de Granian"""
+
+    def tearDown(self):
+        gc.enable()
+
+    def test_precarga_congela_objetos_y_rehabilita_gc_en_los_workers(self):
+        with patch('wsgi.gc.freeze') as freeze, patch('wsgi.os.register_at_fork') as register_at_fork:
+            wsgi.precargar()
+
+        freeze.assert_called_once()
+        register_at_fork.assert_called_once_with(after_in_child=gc.enable)
+
+    def test_loader_de_granian_reutiliza_la_app_del_padre(self):
+        self.assertIs(wsgi._cargar_app('wsgi:app'), wsgi.app)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+import os
+import pstats
+import tempfile
+from typing import Any, Dict
+from unittest.mock import patch
+from app import create_app
+from app.config import config
+from app.middleware import profiling_middleware
+
+
+class ProfilingMiddlewareTest(unittest.TestCase):
+    """Tests del perfilado por request de los certificados"""
+
+    def setUp(self):
+        os.environ['FLASK_CONTEXT'] = 'testing'
+        self.directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directorio.cleanup)
+
+    def _cliente(self, **opciones):
+        valores: Dict[str, Any] = {'PROFILING_ENABLED': True, 'PROFILING_DIR': self.directorio.name, **opciones}
+        with patch.multiple(config.TestConfig, create=True, **valores):
+            return create_app().test_client()
+
+    def _perfiles(self):
+        return sorted(os.listdir(self.directorio.name))
+
+    def test_header_perfila_el_request(self):
+        respuesta = self._cliente().get('/api/v1/certificado/1/docx',
+                                        headers={'X-Profile': '1', 'X-Request-ID': 'abc-123'})
+
+        self.assertEqual(respuesta.status_code, 200)
+        perfiles = self._perfiles()
+        self.assertEqual(len(perfiles), 1)
+        self.assertTrue(perfiles[0].endswith('_abc-123_docx.pstats'))
+        self.assertEqual(respuesta.headers['X-Profile-File'], perfiles[0])
+
+        estadisticas = pstats.Stats(os.path.join(self.directorio.name, perfiles[0]))
+        funciones = set(estadisticas.get_stats_profile().func_profiles)
+        self.assertIn('_renderizar', funciones)
+
+    def test_sin_header_ni_muestreo_no_perfila(self):
+        respuesta = self._cliente().get('/api/v1/certificado/1/docx')
+
+        self.assertNotIn('X-Profile-File', respuesta.headers)
+        self.assertEqual(self._perfiles(), [])
+
+    def test_muestreo_sin_header(self):
+        self._cliente(PROFILING_SAMPLE_RATE=1.0).get('/api/v1/certificado/1/docx')
+
+        self.assertEqual(len(self._perfiles()), 1)
+
+    def test_token_invalido_no_perfila(self):
+        cliente = self._cliente(PROFILING_TOKEN='secreto')
+        cliente.get('/api/v1/certificado/1/docx', headers={'X-Profile': 'otro'})
+        self.assertEqual(self._perfiles(), [])
+
+        cliente.get('/api/v1/certificado/1/docx', headers={'X-Profile': 'secreto'})
+        self.assertEqual(len(self._perfiles()), 1)
+
+    def test_request_id_inseguro_se_reemplaza(self):
+        self._cliente().get('/api/v1/certificado/1/docx', headers={'X-Profile': '1', 'X-Request-ID': '../../etc'})
+
+        perfil, = self._perfiles()
+        self.assertNotIn('..', perfil)
+
+    def test_otras_rutas_no_se_perfilan(self):
+        self._cliente(PROFILING_SAMPLE_RATE=1.0).get('/api/v1/', headers={'X-Profile': '1'})
+
+        self.assertEqual(self._perfiles(), [])
+
+    def test_perfil_en_curso_atiende_sin_perfilar(self):
+        """Test: Un segundo request perfilado en el mismo worker se sirve sin perfil"""
+        cliente = self._cliente()
+        with profiling_middleware._perfil_en_curso:
+            respuesta = cliente.get('/api/v1/certificado/1/docx', headers={'X-Profile': '1'})
+
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertNotIn('X-Profile-File', respuesta.headers)
+        self.assertEqual(self._perfiles(), [])
+
+    def test_otro_perfilador_activo_no_falla(self):
+        """Test: Si el perfilador del proceso está ocupado (ValueError) el request no da 500"""
+        cliente = self._cliente()
+        with patch('cProfile.Profile.enable', side_effect=ValueError('Another profiling tool is already active')):
+            respuesta = cliente.get('/api/v1/certificado/1/docx', headers={'X-Profile': '1'})
+
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(self._perfiles(), [])
+        self.assertFalse(profiling_middleware._perfil_en_curso.locked())
+
+    def test_deshabilitado_por_defecto(self):
+        with patch.object(config.TestConfig, 'PROFILING_DIR', self.directorio.name):
+            create_app().test_client().get('/api/v1/certificado/1/docx', headers={'X-Profile': '1'})
+
+        self.assertEqual(self._perfiles(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
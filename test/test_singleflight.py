@@ -0,0 +1,140 @@
+import unittest
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import cast
+from unittest.mock import patch
+import redis
+from app import create_app
+from app.services import CertificateService
+from app.utils.singleflight import SingleFlight
+from performance.benchmarks.dobles import RedisEnMemoria
+
+
+def _redis_en_memoria() -> redis.Redis:
+    """Doble compartido por los workers (sin decode_responses, como el cliente de la app)"""
+    return cast(redis.Redis, RedisEnMemoria(decode_responses=False))
+
+
+class SingleFlightTest(unittest.TestCase):
+    """Tests de la deduplicación de trabajos en vuelo"""
+
+    def _lento(self, contador, resultado=b'documento'):
+        def funcion():
+            contador.append(1)
+            time.sleep(0.1)
+            return resultado
+        return funcion
+
+    def test_requests_concurrentes_comparten_un_render(self):
+        singleflight = SingleFlight()
+        llamadas = []
+        funcion = self._lento(llamadas)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            resultados = list(executor.map(lambda _: singleflight.ejecutar('1:pdf:abc', funcion), range(8)))
+
+        self.assertEqual(len(llamadas), 1)
+        self.assertEqual(resultados, [b'documento'] * 8)
+
+    def test_claves_distintas_no_se_comparten(self):
+        singleflight = SingleFlight()
+        llamadas = []
+        funcion = self._lento(llamadas)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            list(executor.map(lambda clave: singleflight.ejecutar(clave, funcion), ['1:pdf:a', '2:pdf:b']))
+
+        self.assertEqual(len(llamadas), 2)
+
+    def test_error_del_lider_llega_a_los_seguidores(self):
+        singleflight = SingleFlight()
+
+        def falla():
+            time.sleep(0.1)
+            raise ValueError('render fallido')
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futuros = [executor.submit(singleflight.ejecutar, 'k', falla) for _ in range(4)]
+            for futuro in futuros:
+                with self.assertRaises(ValueError):
+                    futuro.result()
+
+        # El vuelo terminó: el próximo request vuelve a ejecutar
+        self.assertEqual(singleflight.ejecutar('k', lambda: b'ok'), b'ok')
+
+    def test_seguidor_no_espera_indefinidamente_a_un_lider_colgado(self):
+        """Test: Pasado espera_max el seguidor renderiza por su cuenta"""
+        singleflight = SingleFlight(espera_max=0.05)
+        liberar = threading.Event()
+
+        def colgado():
+            liberar.wait(5)
+            return b'tarde'
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            lider = executor.submit(singleflight.ejecutar, 'k', colgado)
+            time.sleep(0.02)
+            inicio = time.monotonic()
+            self.assertEqual(singleflight.ejecutar('k', lambda: b'local'), b'local')
+            self.assertLess(time.monotonic() - inicio, 1)
+            liberar.set()
+            self.assertEqual(lider.result(), b'tarde')
+
+    def test_distribuido_seguidor_espera_resultado_de_otro_worker(self):
+        redis_compartido = _redis_en_memoria()
+        worker_a = SingleFlight(redis_compartido, intervalo=0.01)
+        worker_b = SingleFlight(redis_compartido, intervalo=0.01)
+        llamadas = []
+        funcion = self._lento(llamadas)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futuro_a = executor.submit(worker_a.ejecutar, 'k', funcion)
+            time.sleep(0.02)
+            futuro_b = executor.submit(worker_b.ejecutar, 'k', funcion)
+
+        self.assertEqual(futuro_a.result(), b'documento')
+        self.assertEqual(futuro_b.result(), b'documento')
+        self.assertEqual(len(llamadas), 1)
+        self.assertFalse(redis_compartido.exists('singleflight:k:lock'))
+
+    def test_distribuido_lider_caido_renderiza_localmente(self):
+        redis_compartido = _redis_en_memoria()
+        redis_compartido.set('singleflight:k:lock', 'otro-worker')
+        singleflight = SingleFlight(redis_compartido, espera_max=0.05, intervalo=0.01)
+
+        self.assertEqual(singleflight.ejecutar('k', lambda: b'local'), b'local')
+
+
+class CertificateServiceSingleFlightTest(unittest.TestCase):
+    """Tests de la deduplicación en CertificateService"""
+
+    def setUp(self):
+        os.environ['FLASK_CONTEXT'] = 'testing'
+        os.environ['USE_MOCK_DATA'] = 'true'
+        self.app = create_app()
+
+    def test_certificados_concurrentes_identicos_un_solo_render(self):
+        with self.app.app_context():
+            service = CertificateService()
+        original = CertificateService._renderizar
+
+        def render_lento(context, tipo):
+            time.sleep(0.1)
+            return original(context, tipo)
+
+        def pedir(_):
+            with self.app.app_context():
+                return service.generar_certificado_alumno_regular(1, 'docx').getvalue()
+
+        with patch.object(CertificateService, '_renderizar', side_effect=render_lento) as mock_render:
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                documentos = list(executor.map(pedir, range(4)))
+
+        self.assertEqual(mock_render.call_count, 1)
+        self.assertEqual(len(set(documentos)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+import unittest
+import unittest.mock
+from typing import ClassVar
+
+import requests
+
+from app import create_app
+
+SERVIDOR = os.path.join(os.path.dirname(__file__), '..', 'performance', 'stub', 'servidor.py')
+LATENCIA_MS = 20
+TASA_ERROR = 0.3
+TASA_404 = 0.2
+PEDIDOS = 100
+
+
+def _puerto_libre() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+class StubUpstreamSmokeTest(unittest.TestCase):
+    """Levanta performance/stub/servidor.py como proceso y mide la degradación que inyecta"""
+
+    url: ClassVar[str]
+    proceso: ClassVar[subprocess.Popen]
+
+    @classmethod
+    def setUpClass(cls):
+        puerto = _puerto_libre()
+        cls.url = f'http://127.0.0.1:{puerto}'
+        cls.proceso = subprocess.Popen(
+            [sys.executable, SERVIDOR, '--puerto', str(puerto), '--alumnos', str(PEDIDOS), '--semilla', '7',
+             '--latencia', f'fijo:{LATENCIA_MS}', '--tasa-error', str(TASA_ERROR), '--codigos-error', '502,503',
+             '--tasa-404', str(TASA_404)],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        limite = time.monotonic() + 15
+        while True:
+            try:
+                requests.get(f'{cls.url}/health', timeout=1).raise_for_status()
+                break
+            except requests.RequestException:
+                if cls.proceso.poll() is not None or time.monotonic() > limite:
+                    cls.tearDownClass()
+                    raise RuntimeError('El stub de upstreams no arrancó')
+                time.sleep(0.1)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.proceso.terminate()
+        cls.proceso.wait(timeout=10)
+
+    def setUp(self):
+        requests.delete(f'{self.url}/_stub/estadisticas', timeout=5)
+
+    def test_latencia_y_tasas_de_fallo_inyectadas(self):
+        status, duraciones = [], []
+        for id in range(1, PEDIDOS + 1):
+            inicio = time.perf_counter()
+            respuesta = requests.get(f'{self.url}/api/v1/alumnos/{id}', timeout=5)
+            duraciones.append(time.perf_counter() - inicio)
+            status.append(respuesta.status_code)
+
+        self.assertGreaterEqual(min(duraciones), LATENCIA_MS / 1000)
+        errores = sum(s in (502, 503) for s in status)
+        self.assertAlmostEqual(errores / PEDIDOS, TASA_ERROR, delta=0.12)
+        # El 404 se decide después del error inyectado: su tasa es sobre los que no fallaron
+        self.assertAlmostEqual(status.count(404) / (PEDIDOS - errores), TASA_404, delta=0.12)
+        self.assertEqual(set(status), {200, 404, 502, 503})
+
+        estadisticas = requests.get(f'{self.url}/_stub/estadisticas', timeout=5).json()
+        self.assertEqual(estadisticas.get('alumnos:200', 0), status.count(200))
+        self.assertEqual(estadisticas.get('alumnos:404', 0), status.count(404))
+
+    def test_degradacion_en_caliente(self):
+        requests.put(f'{self.url}/_stub/degradacion', json={'tasa_error': 0, 'latencia': 'fijo:0'},
+                     timeout=5).raise_for_status()
+        try:
+            status = {requests.get(f'{self.url}/api/v1/especialidades/{id}', timeout=5).status_code
+                      for id in range(1, 7)}
+            # Sin errores inyectados, las especialidades que no faltan de forma estable responden 200
+            self.assertLessEqual(status, {200, 404})
+            self.assertIn(200, status)
+        finally:
+            requests.put(f'{self.url}/_stub/degradacion', timeout=5, json={
+                'tasa_error': TASA_ERROR, 'latencia': f'fijo:{LATENCIA_MS}'
+            })
+
+    def test_degradacion_invalida_no_se_aplica_a_medias(self):
+        respuesta = requests.put(f'{self.url}/_stub/degradacion', json={'tasa_error': 0.9, 'latencia': 'bogus:1'},
+                                 timeout=5)
+
+        self.assertEqual(respuesta.status_code, 400)
+        vigente = requests.get(f'{self.url}/_stub/degradacion', timeout=5).json()
+        self.assertEqual(vigente['tasa_error'], TASA_ERROR)
+        self.assertEqual(vigente['latencia'], f'fijo:{LATENCIA_MS}')
+
+    def test_certificado_por_el_camino_real(self):
+        """Con USE_MOCK_DATA=false la app consulta al stub: alumno y luego especialidad por ID"""
+        requests.put(f'{self.url}/_stub/degradacion', json={'tasa_error': 0, 'tasa_404': 0}, timeout=5).raise_for_status()
+        try:
+            with unittest.mock.patch.dict(os.environ, {'USE_MOCK_DATA': 'false'}):
+                app = create_app()
+                app.config['ALUMNO_SERVICE_URL'] = app.config['ESPECIALIDAD_SERVICE_URL'] = f'{self.url}/api/v1'
+                status = {app.test_client().get(f'/api/v1/certificado/{id}/odt').status_code for id in range(1, 4)}
+        finally:
+            requests.put(f'{self.url}/_stub/degradacion', json={'tasa_error': TASA_ERROR, 'tasa_404': TASA_404}, timeout=5)
+
+        self.assertEqual(status, {200})
+        estadisticas = requests.get(f'{self.url}/_stub/estadisticas', timeout=5).json()
+        self.assertGreater(estadisticas.get('especialidades:200', 0), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import os
+import unittest
+from typing import cast
+from unittest.mock import Mock, patch
+
+from marshmallow import ValidationError
+
+from app import create_app
+from app.exceptions import EspecialidadNotFoundException, UpstreamResponseException
+from app.mapping import AlumnoMapping, EspecialidadMapping
+from app.models import Alumno, Especialidad
+from app.services import CertificateService
+
+FACULTAD = {'id': 1, 'nombre': 'Facultad Regional San Rafael', 'ciudad': 'San Rafael', 'provincia': 'Mendoza',
+            'universidad': {'id': 1, 'nombre': 'Universidad Tecnológica Nacional'}}
+ESPECIALIDAD = {'id': 5, 'nombre': 'Ingeniería en Sistemas de Información', 'letra': 'K', 'facultad': FACULTAD}
+ALUMNO = {'id': 7, 'nombre': 'JUAN', 'apellido': 'PÉREZ', 'nrodocumento': '40000007', 'legajo': '10007',
+          'tipo_documento': {'id': 1, 'nombre': 'Documento Nacional de Identidad', 'sigla': 'DNI'}}
+
+
+def _especialidad(datos: dict) -> Especialidad:
+    return cast(Especialidad, EspecialidadMapping().load(datos))
+
+
+def _alumno(datos: dict) -> Alumno:
+    return cast(Alumno, AlumnoMapping().load(datos))
+
+
+class EspecialidadMappingFacultadTest(unittest.TestCase):
+    """Respuestas reales del MS académica (sin datos mock)"""
+
+    def test_facultad_anidada_con_universidad(self):
+        especialidad = _especialidad(ESPECIALIDAD)
+        self.assertEqual(especialidad.facultad.nombre, 'Facultad Regional San Rafael')
+        self.assertEqual(especialidad.facultad.universidad.nombre, 'Universidad Tecnológica Nacional')
+
+    def test_facultad_como_nombre(self):
+        especialidad = _especialidad({**ESPECIALIDAD, 'facultad': 'Facultad Regional San Rafael'})
+        self.assertEqual(especialidad.facultad, 'Facultad Regional San Rafael')
+
+    def test_facultad_invalida(self):
+        with self.assertRaises(ValidationError):
+            EspecialidadMapping().load({**ESPECIALIDAD, 'facultad': 3})
+
+
+class EnriquecerEspecialidadTest(unittest.TestCase):
+    """Alumnos que el MS devuelve solo con especialidad_id"""
+
+    def setUp(self):
+        self.app = create_app()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.entorno = patch.dict(os.environ, {'USE_MOCK_DATA': 'false'})
+        self.entorno.start()
+        self.alumnos, self.especialidades = Mock(), Mock()
+        self.service = CertificateService(alumno_repository=self.alumnos, especialidad_repository=self.especialidades)
+
+    def tearDown(self):
+        self.entorno.stop()
+        self.app_context.pop()
+
+    def test_consulta_ms_academica_por_especialidad_id(self):
+        self.especialidades.get_especialidad_by_id.return_value = _especialidad(ESPECIALIDAD)
+        alumno = _alumno({**ALUMNO, 'especialidad_id': 5})
+
+        alumno = self.service._enriquecer_especialidad(alumno)
+
+        self.especialidades.get_especialidad_by_id.assert_called_once_with(5)
+        self.assertEqual(alumno.especialidad.facultad.universidad.nombre, 'Universidad Tecnológica Nacional')
+
+    def test_especialidad_inexistente(self):
+        self.especialidades.get_especialidad_by_id.return_value = None
+        alumno = _alumno({**ALUMNO, 'especialidad_id': 99})
+
+        with self.assertRaises(EspecialidadNotFoundException):
+            self.service._enriquecer_especialidad(alumno)
+
+    def test_facultad_solo_nombre_es_respuesta_invalida(self):
+        especialidad = {**ESPECIALIDAD, 'facultad': 'Facultad Regional San Rafael'}
+        self.especialidades.get_especialidad_by_id.return_value = _especialidad(especialidad)
+        alumno = _alumno({**ALUMNO, 'especialidad_id': 5})
+
+        with self.assertRaises(UpstreamResponseException):
+            self.service._enriquecer_especialidad(alumno)
+
+    def test_facultad_solo_nombre_anidada_en_el_alumno_retorna_502(self):
+        """Sin la facultad completa no se llega a armar el contexto (antes: AttributeError y 500)"""
+        alumno = _alumno({**ALUMNO, 'especialidad': {**ESPECIALIDAD, 'facultad': 'FRSR'}})
+        self.alumnos.get_alumno_by_id.return_value = alumno
+
+        with self.assertRaises(UpstreamResponseException) as contexto:
+            self.service.preparar_certificado(7, 'pdf')
+
+        self.assertEqual(contexto.exception.status_code, 502)
+        self.especialidades.get_especialidad_by_id.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import os, logging, argparse
+from multiprocessing import Process
+from app import create_app
+from app.workers import CertificadoWorker
+
+logger = logging.getLogger(__name__)
+
+
+def ejecutar_worker(app=None):
+    """Corre un worker de certificados hasta recibir SIGTERM (cada proceso hijo crea su propia app)"""
+    app = app or create_app()
+    worker = CertificadoWorker(app)
+    worker.instalar_senales()
+    worker.run()
+
+
+#entry point para los workers de jobs asíncronos
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Workers de la cola de certificados')
+    parser.add_argument('--procesos', type=int, default=int(os.getenv('JOB_WORKER_PROCESSES', 1)),
+                        help='Cantidad de procesos worker a lanzar')
+    args = parser.parse_args()
+
+    # create_app configura el logging del proceso (Config.init_app)
+    app = create_app()
+    logger.info(f"Iniciando {args.procesos} worker(s) de certificados")
+    if args.procesos == 1:
+        ejecutar_worker(app)
+    else:
+        procesos = [Process(target=ejecutar_worker) for _ in range(args.procesos)]
+        for proceso in procesos:
+            proceso.start()
+        for proceso in procesos:
+            proceso.join()
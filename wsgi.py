@@ -1,4 +1,4 @@
-import os, logging
+import os, gc, logging, argparse
 from app import create_app
 
 #obtener contexto desde variable de entorno
@@ -9,17 +9,103 @@ app = create_app()
 with app.app_context():
     pass  # El contexto se activa aquí si es necesario
 
-log_level = os.getenv('LOG_LEVEL', 'INFO')
-logging.basicConfig(
-    level=getattr(logging, log_level),
-    format='%(asctime)s [%(levelname)s] %(name)s: %(message)s'
-)
-
 logger = logging.getLogger(__name__)
 logger.info(f"Aplicación iniciada en: {flask_context} modo")
 
+
+def precargar():
+    """
+    Importa y calienta los módulos pesados en el proceso padre, antes del fork de los workers.
+
+    Los workers heredan las páginas ya cargadas (Flask, marshmallow, los
+    backends de los formatos habilitados, plantillas compiladas) y las comparten
+    copy-on-write. gc.freeze() mueve esos objetos a la generación permanente
+    para que el GC de cada worker no los recorra ni escriba sus headers, lo
+    que copiaría las páginas. El GC queda deshabilitado durante la precarga
+    (evita huecos en las páginas a congelar) y se rehabilita en cada worker.
+    """
+    gc.disable()
+    os.register_at_fork(after_in_child=gc.enable)
+
+    with app.app_context():
+        from app.services.documentos_office_service import calentar_backends, backend_de, formatos_habilitados
+        # Solo los backends de FORMATOS_HABILITADOS
+        for backend, segundos in calentar_backends().items():
+            logger.info(f"Backend {backend} precargado en {segundos * 1000:.0f} ms")
+        if 'pdf' in formatos_habilitados() and backend_de('pdf') == 'pdf':
+            try:
+                from weasyprint import HTML
+                # Un render mínimo inicializa fuentes, Pango y la cascada de estilos por defecto
+                HTML(string='<p>precarga</p>').render()
+            except (OSError, ImportError) as e:
+                logger.warning(f"WeasyPrint no disponible para la precarga: {e}")
+
+        from app.services import CertificateService
+        for linea in CertificateService().precompilar_plantillas():
+            logger.debug(f"Plantilla precargada: {linea}")
+
+    gc.collect()
+    gc.freeze()
+    logger.info(f"Precarga completa: {gc.get_freeze_count()} objetos congelados antes del fork")
+
+
+def _cargar_app(target):
+    """Loader de Granian: los workers usan la app ya creada en el padre en lugar de importar wsgi"""
+    return app
+
+
+def servir_con_precarga(host, port, workers, blocking_threads, backlog, workers_max_rss=None, workers_kill_timeout=None):
+    """
+    Precarga en el padre y lanza Granian (WSGI); los workers se crean por fork.
+
+    Con workers_max_rss (MiB) Granian reemplaza al worker que lo supera: crea
+    el nuevo y detiene el viejo en forma ordenada, esperando hasta
+    workers_kill_timeout segundos a que terminen sus requests en curso.
+    """
+    from granian import Granian
+    from granian.constants import Interfaces, HTTPModes
+
+    from app.utils.metricas import limpiar_directorio_multiproceso
+
+    precargar()
+    # Contadores de una ejecución anterior no deben sumarse a los de los workers nuevos
+    limpiar_directorio_multiproceso()
+    Granian(
+        'wsgi:app',
+        address=host,
+        port=port,
+        interface=Interfaces.WSGI,
+        workers=workers,
+        blocking_threads=blocking_threads,
+        backlog=backlog,
+        http=HTTPModes.auto,
+        workers_max_rss=workers_max_rss,
+        workers_kill_timeout=workers_kill_timeout,
+        # Los workers que se reciclan solos (WORKER_MAX_REQUESTS) salen y Granian los vuelve a crear
+        respawn_failed_workers=app.config.get('WORKER_MAX_REQUESTS', 0) > 0,
+    ).serve(target_loader=_cargar_app)
+
+
 #entry point para graian
 if __name__ == "__main__":
-    port = int(os.getenv('PORT', 5000))
-    logger.info(f"Servidor corriendo en el puerto {port}")
-    app.run(host="0.0.0.0", port=port, debug=flask_context != 'production')
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Servidor del microservicio de documentos')
+    parser.add_argument('--preload', action='store_true',
+                        help='Granian con precarga de módulos y gc.freeze() antes del fork de los workers')
+    parser.add_argument('--host', default=os.getenv('GRANIAN_HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.getenv('GRANIAN_PORT', os.getenv('PORT', 5000))))
+    parser.add_argument('--workers', type=int, default=int(os.getenv('GRANIAN_WORKERS', 4)))
+    parser.add_argument('--blocking-threads', type=int, default=int(os.getenv('GRANIAN_BLOCKING_THREADS', 4)))
+    parser.add_argument('--backlog', type=int, default=int(os.getenv('GRANIAN_BACKLOG', 2048)))
+    parser.add_argument('--workers-max-rss', type=int, default=int(os.getenv('GRANIAN_WORKERS_MAX_RSS', 0)) or None,
+                        help='MiB de RSS a partir de los cuales Granian reemplaza al worker')
+    parser.add_argument('--workers-kill-timeout', type=int, default=int(os.getenv('GRANIAN_WORKERS_KILL_TIMEOUT', 30)),
+                        help='Segundos para que un worker reemplazado termine sus requests en curso')
+    args = parser.parse_args()
+
+    if args.preload:
+        logger.info(f"Granian con precarga: {args.workers} worker(s) en el puerto {args.port}")
+        servir_con_precarga(args.host, args.port, args.workers, args.blocking_threads, args.backlog,
+                            args.workers_max_rss, args.workers_kill_timeout)
+    else:
+        logger.info(f"Servidor corriendo en el puerto {args.port}")
+        app.run(host="0.0.0.0", port=args.port, debug=flask_context != 'production')